@@ -141,17 +141,23 @@ register('behavior.do-not-show-previously-seen-addon-updates', True)
 register('behavior.date-about-range', 50)
 register('behavior.date-after-range', 50)
 register('behavior.date-before-range', 50)
+register('behavior.export-compresslevel', 6)
+register('behavior.export-processes', 0)
+register('behavior.filter-processes', 0)
 register('behavior.generation-depth', 15)
+register('behavior.import-processes', 0)
 register('behavior.max-age-prob-alive', 110)
 register('behavior.max-sib-age-diff', 20)
 register('behavior.min-generation-years', 13)
 register('behavior.owner-warn', False)
 register('behavior.pop-plugin-status', False)
 register('behavior.recent-export-type', 3)
+register('behavior.report-processes', 0)
 register('behavior.runcheck', False)
 register('behavior.spellcheck', False)
 register('behavior.startup', 0)
 register('behavior.surname-guessing', 0)
+register('behavior.thumbnail-cache-size', 256)
 register('behavior.translator-needed', True)
 register('behavior.use-tips', False)
 register('behavior.welcome', 100)
@@ -162,6 +168,8 @@ register('database.backend', 'sqlite')
 register('database.compress-backup', True)
 register('database.backup-path', USER_HOME)
 register('database.backup-on-exit', True)
+register('database.blob-codec', 'pickle')
+register('database.cache-size', 20000)
 register('database.autobackup', 0)
 register('database.path', os.path.join(HOME_DIR, 'grampsdb'))
 register('database.host', '')
@@ -45,8 +45,11 @@ from ..const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.gettext
 from ..lib.childreftype import ChildRefType
 from ..lib.childref import ChildRef
+from ..lib.eventtype import EventType
 from .txn import DbTxn
 from .exceptions import DbTransactionCancel, DbException
+from .graph import ObjectFamilyGraph
+from .treestats import TreeStatistics
 
 _LOG = logging.getLogger(DBLOGNAME)
 
@@ -605,6 +608,156 @@ class DbReadBase:
         """
         raise NotImplementedError
 
+    def get_citations_from_handles(self, handles):
+        """
+        Return a list of Citation objects in the database from the passed
+        handles, in the same order as the handles.
+
+        :param handles: handles of the objects to search for.
+        :type handles: iterable of str
+
+        If a Citation does not exist, a HandleError is raised.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the objects in batches.
+        """
+        return [self.get_citation_from_handle(handle) for handle in handles]
+
+    def get_events_from_handles(self, handles):
+        """
+        Return a list of Event objects in the database from the passed
+        handles, in the same order as the handles.
+
+        :param handles: handles of the objects to search for.
+        :type handles: iterable of str
+
+        If a Event does not exist, a HandleError is raised.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the objects in batches.
+        """
+        return [self.get_event_from_handle(handle) for handle in handles]
+
+    def get_families_from_handles(self, handles):
+        """
+        Return a list of Family objects in the database from the passed
+        handles, in the same order as the handles.
+
+        :param handles: handles of the objects to search for.
+        :type handles: iterable of str
+
+        If a Family does not exist, a HandleError is raised.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the objects in batches.
+        """
+        return [self.get_family_from_handle(handle) for handle in handles]
+
+    def get_media_from_handles(self, handles):
+        """
+        Return a list of Media objects in the database from the passed
+        handles, in the same order as the handles.
+
+        :param handles: handles of the objects to search for.
+        :type handles: iterable of str
+
+        If a Media does not exist, a HandleError is raised.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the objects in batches.
+        """
+        return [self.get_media_from_handle(handle) for handle in handles]
+
+    def get_notes_from_handles(self, handles):
+        """
+        Return a list of Note objects in the database from the passed
+        handles, in the same order as the handles.
+
+        :param handles: handles of the objects to search for.
+        :type handles: iterable of str
+
+        If a Note does not exist, a HandleError is raised.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the objects in batches.
+        """
+        return [self.get_note_from_handle(handle) for handle in handles]
+
+    def get_people_from_handles(self, handles):
+        """
+        Return a list of Person objects in the database from the passed
+        handles, in the same order as the handles.
+
+        :param handles: handles of the objects to search for.
+        :type handles: iterable of str
+
+        If a Person does not exist, a HandleError is raised.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the objects in batches.
+        """
+        return [self.get_person_from_handle(handle) for handle in handles]
+
+    def get_places_from_handles(self, handles):
+        """
+        Return a list of Place objects in the database from the passed
+        handles, in the same order as the handles.
+
+        :param handles: handles of the objects to search for.
+        :type handles: iterable of str
+
+        If a Place does not exist, a HandleError is raised.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the objects in batches.
+        """
+        return [self.get_place_from_handle(handle) for handle in handles]
+
+    def get_repositories_from_handles(self, handles):
+        """
+        Return a list of Repository objects in the database from the passed
+        handles, in the same order as the handles.
+
+        :param handles: handles of the objects to search for.
+        :type handles: iterable of str
+
+        If a Repository does not exist, a HandleError is raised.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the objects in batches.
+        """
+        return [self.get_repository_from_handle(handle) for handle in handles]
+
+    def get_sources_from_handles(self, handles):
+        """
+        Return a list of Source objects in the database from the passed
+        handles, in the same order as the handles.
+
+        :param handles: handles of the objects to search for.
+        :type handles: iterable of str
+
+        If a Source does not exist, a HandleError is raised.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the objects in batches.
+        """
+        return [self.get_source_from_handle(handle) for handle in handles]
+
+    def get_tags_from_handles(self, handles):
+        """
+        Return a list of Tag objects in the database from the passed
+        handles, in the same order as the handles.
+
+        :param handles: handles of the objects to search for.
+        :type handles: iterable of str
+
+        If a Tag does not exist, a HandleError is raised.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the objects in batches.
+        """
+        return [self.get_tag_from_handle(handle) for handle in handles]
+
     def get_citation_handles(self, sort_handles=False, locale=glocale):
         """
         Return a list of database handles, one handle for each Citation in
@@ -991,6 +1144,116 @@ class DbReadBase:
         """
         raise NotImplementedError
 
+    def get_raw_citation_data_many(self, handles):
+        """
+        Return a list of raw (serialized and pickled) Citation objects from
+        the passed handles, in the same order as the handles.  None is
+        returned for handles that are not found.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the data in batches.
+        """
+        return [self.get_raw_citation_data(handle) for handle in handles]
+
+    def get_raw_event_data_many(self, handles):
+        """
+        Return a list of raw (serialized and pickled) Event objects from
+        the passed handles, in the same order as the handles.  None is
+        returned for handles that are not found.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the data in batches.
+        """
+        return [self.get_raw_event_data(handle) for handle in handles]
+
+    def get_raw_family_data_many(self, handles):
+        """
+        Return a list of raw (serialized and pickled) Family objects from
+        the passed handles, in the same order as the handles.  None is
+        returned for handles that are not found.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the data in batches.
+        """
+        return [self.get_raw_family_data(handle) for handle in handles]
+
+    def get_raw_media_data_many(self, handles):
+        """
+        Return a list of raw (serialized and pickled) Media objects from
+        the passed handles, in the same order as the handles.  None is
+        returned for handles that are not found.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the data in batches.
+        """
+        return [self.get_raw_media_data(handle) for handle in handles]
+
+    def get_raw_note_data_many(self, handles):
+        """
+        Return a list of raw (serialized and pickled) Note objects from
+        the passed handles, in the same order as the handles.  None is
+        returned for handles that are not found.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the data in batches.
+        """
+        return [self.get_raw_note_data(handle) for handle in handles]
+
+    def get_raw_person_data_many(self, handles):
+        """
+        Return a list of raw (serialized and pickled) Person objects from
+        the passed handles, in the same order as the handles.  None is
+        returned for handles that are not found.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the data in batches.
+        """
+        return [self.get_raw_person_data(handle) for handle in handles]
+
+    def get_raw_place_data_many(self, handles):
+        """
+        Return a list of raw (serialized and pickled) Place objects from
+        the passed handles, in the same order as the handles.  None is
+        returned for handles that are not found.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the data in batches.
+        """
+        return [self.get_raw_place_data(handle) for handle in handles]
+
+    def get_raw_repository_data_many(self, handles):
+        """
+        Return a list of raw (serialized and pickled) Repository objects from
+        the passed handles, in the same order as the handles.  None is
+        returned for handles that are not found.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the data in batches.
+        """
+        return [self.get_raw_repository_data(handle) for handle in handles]
+
+    def get_raw_source_data_many(self, handles):
+        """
+        Return a list of raw (serialized and pickled) Source objects from
+        the passed handles, in the same order as the handles.  None is
+        returned for handles that are not found.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the data in batches.
+        """
+        return [self.get_raw_source_data(handle) for handle in handles]
+
+    def get_raw_tag_data_many(self, handles):
+        """
+        Return a list of raw (serialized and pickled) Tag objects from
+        the passed handles, in the same order as the handles.  None is
+        returned for handles that are not found.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the data in batches.
+        """
+        return [self.get_raw_tag_data(handle) for handle in handles]
+
     def get_researcher(self):
         """
         Return the Researcher instance, providing information about the owner
@@ -1433,6 +1696,109 @@ class DbReadBase:
         """
         return False
 
+    def select_handles(self, obj_class, where, values):
+        """
+        Return the handles of the objects of the given class matching an SQL
+        condition on the columns of their table.
+
+        Returns None for databases that cannot be queried with SQL, which
+        includes the proxies.
+        """
+        return None
+
+    def get_column_values(self, obj_class, column):
+        """
+        Return a list of (handle, value) pairs, with the value of a column of
+        the table of the given object class for each of its objects.
+
+        Returns None for databases that cannot be queried with SQL, which
+        includes the proxies.
+        """
+        return None
+
+    def get_column_counts(self, obj_class, columns):
+        """
+        Return a list of tuples, with the values of the given columns of the
+        table of the given object class followed by the number of objects
+        with these values, for each distinct combination of values.
+
+        Returns None for databases that cannot be queried with SQL, which
+        includes the proxies.
+        """
+        return None
+
+    def get_raw_data_by_columns(self, obj_class, values):
+        """
+        Return a list of (handle, raw data) pairs, for the objects of the
+        given class whose table columns have the values of the dictionary
+        values, {column: value}.
+
+        Returns None for databases that cannot be queried with SQL, which
+        includes the proxies.
+        """
+        return None
+
+    def get_family_graph(self):
+        """
+        Return a :class:`~.graph.FamilyGraph` of the people and families of
+        the database, to look up their ancestors and descendants.
+
+        The default graph loads the people and families it needs, so that it
+        also works with the proxies; backends may return an indexed graph.
+        """
+        return ObjectFamilyGraph(self)
+
+    def get_statistics(self):
+        """
+        Return the :class:`~.treestats.TreeStatistics` of the people and
+        media objects of the database.
+
+        The default statistics are counted from all the people and media
+        objects, so that they also work with the proxies; backends may keep
+        them up to date as objects are committed.  The returned statistics
+        must not be changed.
+        """
+        return TreeStatistics.build(self)
+
+    def get_event_handles_by_date(self, start=None, stop=None,
+                                  event_types=None, place_handle=None):
+        """
+        Return the handles of the events whose date lies between the start
+        and stop dates, both included.
+
+        Dates are compared by their sort value.  When a start or stop date is
+        given, events without a regular date are left out.
+
+        :param start: first date, or None for no lower bound
+        :type start: :class:`~.date.Date`
+        :param stop: last date, or None for no upper bound
+        :type stop: :class:`~.date.Date`
+        :param event_types: only return events of these types, given as
+                            :class:`~.eventtype.EventType` or integer values
+        :type event_types: list
+        :param place_handle: only return events in this place
+        :type place_handle: str
+        :returns: list of event handles
+        """
+        start = start.get_sort_value() if start is not None else None
+        stop = stop.get_sort_value() if stop is not None else None
+        if event_types is not None:
+            event_types = [EventType(event_type) for event_type in event_types]
+        handles = []
+        for event in self.iter_events():
+            if start is not None or stop is not None:
+                sortval = event.get_date_object().get_sort_value()
+                if (sortval == 0 or (start is not None and sortval < start)
+                        or (stop is not None and sortval > stop)):
+                    continue
+            if (event_types is not None
+                    and event.get_type() not in event_types):
+                continue
+            if place_handle and event.get_place_handle() != place_handle:
+                continue
+            handles.append(event.handle)
+        return handles
+
     def method(self, fmt, *args):
         """
         Convenience function to return database methods.
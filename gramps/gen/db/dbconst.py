@@ -57,6 +57,7 @@ DBLOCKS = 100000          # Maximum number of locks supported
 DBOBJECTS = 100000          # Maximum number of simultaneously locked objects
 DBUNDO = 1000            # Maximum size of undo buffer
 ARRAYSIZE = 1000            # The arraysize for a SQL cursor
+CHUNKSIZE = 500             # Max number of handles in a batched SQL query
 
 PERSON_KEY = 0
 FAMILY_KEY = 1
@@ -53,8 +53,11 @@ from ..errors import HandleError
 from ..utils.callback import Callback
 from ..updatecallback import UpdateCallback
 from .bookmarks import DbBookmarks
+from .idalloc import GrampsIdAllocator
+from .treestats import TreeStatistics, is_dated
 
 from ..utils.id import create_id
+from ..utils.lru import LRU
 from ..lib.researcher import Researcher
 from ..lib import (Tag, Media, Person, Family, Source, Citation, Event,
                    Place, Repository, Note, NameOriginType)
@@ -139,6 +142,7 @@ class DbGenericUndo(DbUndo):
                 else:
                     self.db.undo_data(new_data, handle, key)
                     sigs[key][trans_type].append(handle)
+            db.has_changed += 1
             # now emit the signals
             self.undo_sigs(sigs, False)
 
@@ -188,6 +192,7 @@ class DbGenericUndo(DbUndo):
                 else:
                     self.db.undo_data(old_data, handle, key)
                     sigs[key][trans_type].append(handle)
+            db.has_changed += 1
             # now emit the signals
             self.undo_sigs(sigs, True)
 
@@ -302,7 +307,7 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
 
     __callback_map = {}
 
-    VERSION = (20, 0, 0)
+    VERSION = (24, 0, 0)
 
     def __init__(self, directory=None):
         DbReadBase.__init__(self)
@@ -520,6 +525,8 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.omap_index = 0
         self.rmap_index = 0
         self.nmap_index = 0
+        self._id_allocators = {}
+        self._statistics = None
         self.undo_callback = None
         self.redo_callback = None
         self.undo_history_callback = None
@@ -531,6 +538,11 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.surname_list = []
         self.genderStats = GenderStats() # can pass in loaded stats as dict
         self.owner = Researcher()
+        # Write-through cache of raw (serialized) objects, keyed on
+        # (obj_key, handle).  Maintained by the backend.
+        self._cache = LRU(config.get('database.cache-size'))
+        self._cache_hits = 0
+        self._cache_misses = 0
         if directory:
             self.load(directory)
 
@@ -580,6 +592,8 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         if not self.readonly and directory != ':memory:':
             write_lock_file(directory)
 
+        self._cache_clear()
+
         # run backend-specific code:
         self._initialize(directory, username, password)
 
@@ -647,6 +661,8 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.omap_index = self._get_metadata('omap_index', 0)
         self.rmap_index = self._get_metadata('rmap_index', 0)
         self.nmap_index = self._get_metadata('nmap_index', 0)
+        self._id_allocators = {}
+        self._statistics = self._load_statistics()
 
         self.db_is_open = True
 
@@ -661,6 +677,7 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
                       dbversion, self.VERSION[0])
             if force_schema_upgrade:
                 self._gramps_upgrade(dbversion, directory, callback)
+                self._statistics = None
             else:
                 self.close()
                 raise DbUpgradeRequiredError(dbversion, self.VERSION[0])
@@ -735,6 +752,10 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
                 self._set_metadata('rmap_index', self.rmap_index)
                 self._set_metadata('nmap_index', self.nmap_index)
 
+                if self._statistics is not None:
+                    self._set_metadata('statistics',
+                                       self._statistics.serialize())
+
             self._close()
 
             try:
@@ -742,6 +763,9 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             except IOError:
                 pass
 
+        self._cache_clear()
+        self._id_allocators = {}
+        self._statistics = None
         self.db_is_open = False
         self._directory = None
 
@@ -833,6 +857,55 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         """
         raise NotImplementedError
 
+    ################################################################
+    #
+    # Object cache methods
+    #
+    ################################################################
+
+    def set_cache_size(self, size):
+        """
+        Set the maximum number of objects held in the object cache.
+
+        A size of 0 or 1 disables the cache.
+        """
+        self._cache = LRU(size)
+
+    def _cache_get(self, obj_key, handle):
+        """
+        Return the cached value stored for the handle, or None if the object
+        is not in the cache.
+        """
+        key = (obj_key, handle)
+        if key in self._cache:
+            self._cache_hits += 1
+            value = self._cache[key]
+            # Re-insert to mark as most recently used
+            self._cache[key] = value
+            return value
+        self._cache_misses += 1
+        return None
+
+    def _cache_put(self, obj_key, handle, value):
+        """
+        Store a value for the handle in the cache.
+        """
+        self._cache[(obj_key, handle)] = value
+
+    def _cache_invalidate(self, obj_key, handle):
+        """
+        Remove the handle from the cache.
+        """
+        key = (obj_key, handle)
+        if key in self._cache:
+            del self._cache[key]
+
+    def _cache_clear(self):
+        """
+        Empty the cache.
+        """
+        self._cache.clear()
+
     ################################################################
     #
     # set_*_id_prefix methods
@@ -1006,12 +1079,108 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         """
         Helper function for find_next_<object>_gramps_id methods
         """
-        index = prefix % map_index
-        while self._has_gramps_id(obj_key, index):
-            map_index += 1
-            index = prefix % map_index
-        map_index += 1
-        return (map_index, index)
+        return self._get_id_allocator(obj_key, prefix).find_next(map_index)
+
+    def _get_id_allocator(self, obj_key, prefix):
+        """
+        Return the allocator of the Gramps IDs of a type of object, loading
+        the IDs in use when the allocator does not exist yet or the ID
+        prefix has changed.
+        """
+        allocator = self._id_allocators.get(obj_key)
+        if allocator is None or allocator.pattern != prefix:
+            allocator = GrampsIdAllocator(prefix, self._get_gramps_ids(obj_key))
+            self._id_allocators[obj_key] = allocator
+        return allocator
+
+    def _update_id_allocator(self, obj_key, old_data, obj):
+        """
+        Update the allocator of the Gramps IDs of a type of object, if it is
+        loaded, after an object has been committed or removed.
+
+        :param old_data: serialized data of the object before the change,
+                         or None if it is new
+        :param obj: the committed object, or None if it has been removed
+        """
+        allocator = self._id_allocators.get(obj_key)
+        if allocator is None:
+            return
+        gramps_id = obj.gramps_id if obj is not None else None
+        if gramps_id:
+            allocator.add(gramps_id)
+        if old_data and old_data[1] != gramps_id:
+            # Another object may still use the ID
+            if not self._has_gramps_id(obj_key, old_data[1]):
+                allocator.discard(old_data[1])
+
+    def get_statistics(self):
+        """
+        Return the :class:`~.treestats.TreeStatistics` of the people and
+        media objects of the database.
+
+        The statistics are counted when first needed, and then kept up to
+        date as objects are committed.  Batch transactions, undo and raw
+        commits drop them, so that they are counted again.
+        """
+        if self._statistics is None:
+            stats = TreeStatistics.build(self)
+            if self.transaction is not None and self.transaction.batch:
+                return stats
+            self._statistics = stats
+        return self._statistics
+
+    def _load_statistics(self):
+        """
+        Return the statistics stored in the metadata when the database was
+        last closed, if they still match the database.
+
+        The stored statistics are cleared, so that they are not used again
+        if the database is not closed properly.
+        """
+        stats = TreeStatistics.unserialize(
+            self._get_metadata('statistics', None))
+        if stats is None:
+            return None
+        if not self.readonly:
+            self._set_metadata('statistics', None)
+        if (stats.people != self.get_number_of_people()
+                or len(stats.media) != self.get_number_of_media()):
+            return None
+        return stats
+
+    def _update_statistics(self, obj_key, old_data, obj, trans):
+        """
+        Update the statistics, if they are loaded, after an object has been
+        committed or removed.
+
+        :param old_data: serialized data of the object before the change,
+                         or None if it is new
+        :param obj: the committed object, or None if it has been removed
+        """
+        stats = self._statistics
+        if stats is None:
+            return
+        if trans.batch:
+            self._statistics = None
+        elif obj_key == PERSON_KEY:
+            if old_data:
+                stats.count_person(self, Person.create(old_data), -1)
+            if obj is not None:
+                stats.count_person(self, obj)
+        elif obj_key == EVENT_KEY:
+            # The people born on the event gain or lose their birth date
+            dated = obj is not None and is_dated(obj.get_date_object())
+            if is_dated(old_data[3] if old_data else None) != dated:
+                handle = obj.handle if obj is not None else old_data[0]
+                stats.count_birth(
+                    self, [ref[1] for ref in
+                           self.find_backlink_handles(handle, ['Person'])],
+                    handle, -1 if dated else 1)
+        elif obj_key == MEDIA_KEY:
+            if obj is not None:
+                stats.count_media(self, obj)
+            else:
+                stats.uncount_media(old_data[0])
 
     def find_next_person_gramps_id(self):
         """
@@ -1298,6 +1467,52 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
     def get_tag_from_handle(self, handle):
         return self._get_from_handle(TAG_KEY, Tag, handle)
 
+    ################################################################
+    #
+    # get_*_from_handles methods
+    #
+    ################################################################
+
+    def _get_from_handles(self, obj_key, obj_class, handles):
+        handles = list(handles)
+        result = []
+        for handle, data in zip(handles,
+                                self._get_raw_data_many(obj_key, handles)):
+            if data is None:
+                raise HandleError('Handle %s not found' % handle)
+            result.append(obj_class.create(data))
+        return result
+
+    def get_citations_from_handles(self, handles):
+        return self._get_from_handles(CITATION_KEY, Citation, handles)
+
+    def get_events_from_handles(self, handles):
+        return self._get_from_handles(EVENT_KEY, Event, handles)
+
+    def get_families_from_handles(self, handles):
+        return self._get_from_handles(FAMILY_KEY, Family, handles)
+
+    def get_media_from_handles(self, handles):
+        return self._get_from_handles(MEDIA_KEY, Media, handles)
+
+    def get_notes_from_handles(self, handles):
+        return self._get_from_handles(NOTE_KEY, Note, handles)
+
+    def get_people_from_handles(self, handles):
+        return self._get_from_handles(PERSON_KEY, Person, handles)
+
+    def get_places_from_handles(self, handles):
+        return self._get_from_handles(PLACE_KEY, Place, handles)
+
+    def get_repositories_from_handles(self, handles):
+        return self._get_from_handles(REPOSITORY_KEY, Repository, handles)
+
+    def get_sources_from_handles(self, handles):
+        return self._get_from_handles(SOURCE_KEY, Source, handles)
+
+    def get_tags_from_handles(self, handles):
+        return self._get_from_handles(TAG_KEY, Tag, handles)
+
     ################################################################
     #
     # get_*_from_gramps_id methods
@@ -1688,6 +1903,52 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
     def get_raw_tag_data(self, handle):
         return self._get_raw_data(TAG_KEY, handle)
 
+    ################################################################
+    #
+    # get_raw_*_data_many methods
+    #
+    ################################################################
+
+    def _get_raw_data_many(self, obj_key, handles):
+        """
+        Return a list of raw (serialized and pickled) objects from the
+        handles, with None for handles that are not found.
+
+        This default implementation looks up the handles one at a time.
+        Backends can override this method to fetch the data in batches.
+        """
+        return [self._get_raw_data(obj_key, handle) for handle in handles]
+
+    def get_raw_citation_data_many(self, handles):
+        return self._get_raw_data_many(CITATION_KEY, handles)
+
+    def get_raw_event_data_many(self, handles):
+        return self._get_raw_data_many(EVENT_KEY, handles)
+
+    def get_raw_family_data_many(self, handles):
+        return self._get_raw_data_many(FAMILY_KEY, handles)
+
+    def get_raw_media_data_many(self, handles):
+        return self._get_raw_data_many(MEDIA_KEY, handles)
+
+    def get_raw_note_data_many(self, handles):
+        return self._get_raw_data_many(NOTE_KEY, handles)
+
+    def get_raw_person_data_many(self, handles):
+        return self._get_raw_data_many(PERSON_KEY, handles)
+
+    def get_raw_place_data_many(self, handles):
+        return self._get_raw_data_many(PLACE_KEY, handles)
+
+    def get_raw_repository_data_many(self, handles):
+        return self._get_raw_data_many(REPOSITORY_KEY, handles)
+
+    def get_raw_source_data_many(self, handles):
+        return self._get_raw_data_many(SOURCE_KEY, handles)
+
+    def get_raw_tag_data_many(self, handles):
+        return self._get_raw_data_many(TAG_KEY, handles)
+
     ################################################################
     #
     # get_raw_*_from_id_data methods
@@ -2292,6 +2553,8 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         return self._get_metadata("media-path", None)
 
     def set_mediapath(self, mediapath):
+        # The sizes of the media files are read again from the new path
+        self._statistics = None
         return self._set_metadata("media-path", mediapath)
 
     def get_surname_list(self):
@@ -2424,6 +2687,8 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             _("Number of notes"): self.get_number_of_notes(),
             _("Number of tags"): self.get_number_of_tags(),
             _("Schema version"): ".".join([str(v) for v in self.VERSION]),
+            _("Cache hits"): self._cache_hits,
+            _("Cache misses"): self._cache_misses,
         }
 
     def _order_by_person_key(self, person):
@@ -2460,6 +2725,25 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
                         surname = surname_obj.surname
         return (given_name, surname)
 
+    def _get_person_group_data(self, person):
+        """
+        Given a Person, return the group_as value of the primary name, its
+        primary surname, and whether that surname is the only one and a
+        patronymic or matronymic, which decide the group of the person in
+        the person tree view.
+        """
+        primary_name = person.get_primary_name()
+        surname_list = primary_name.get_surname_list()
+        for surname in surname_list:
+            if surname.get_primary():
+                lone_patronymic = (len(surname_list) == 1 and
+                                   int(surname.get_origintype()) in
+                                   (NameOriginType.PATRONYMIC,
+                                    NameOriginType.MATRONYMIC))
+                return (primary_name.get_group_as(), surname.get_surname(),
+                        lone_patronymic)
+        return (primary_name.get_group_as(), '', False)
+
     def _get_place_data(self, place):
         """
         Given a Place, return the first PlaceRef handle.
@@ -2482,7 +2766,8 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         from gramps.gen.db.upgrade import (
             gramps_upgrade_14, gramps_upgrade_15, gramps_upgrade_16,
             gramps_upgrade_17, gramps_upgrade_18, gramps_upgrade_19,
-            gramps_upgrade_20)
+            gramps_upgrade_20, gramps_upgrade_21, gramps_upgrade_22,
+            gramps_upgrade_23, gramps_upgrade_24)
 
         if version < 14:
             gramps_upgrade_14(self)
@@ -2498,6 +2783,14 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             gramps_upgrade_19(self)
         if version < 20:
             gramps_upgrade_20(self)
+        if version < 21:
+            gramps_upgrade_21(self)
+        if version < 22:
+            gramps_upgrade_22(self)
+        if version < 23:
+            gramps_upgrade_23(self)
+        if version < 24:
+            gramps_upgrade_24(self)
 
         self.rebuild_secondary(callback)
         self.reindex_reference_map(callback)
@@ -0,0 +1,325 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Parent/child graph of the people and families of a database.
+
+A family graph answers the questions the genealogical filter rules and the
+relationship calculator ask over and over: which families a person is a
+child or a spouse in, who the parents and children of a family are, and from
+there who the ancestors and descendants of a person are.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+from array import array
+
+#-------------------------------------------------------------------------
+#
+# FamilyGraph class
+#
+#-------------------------------------------------------------------------
+class FamilyGraph:
+    """
+    Base class of the family graphs, with the traversals written in terms
+    of four lookups.
+    """
+    # True when the lookups do not load objects from the database
+    indexed = False
+
+    def get_parent_families(self, handle):
+        """
+        Return the handles of the families in which the person is a child,
+        main family first.
+        """
+        raise NotImplementedError
+
+    def get_spouse_families(self, handle):
+        """
+        Return the handles of the families in which the person is a spouse.
+        """
+        raise NotImplementedError
+
+    def get_parents(self, handle):
+        """
+        Return the (father, mother) handles of the family; either can be
+        None.
+        """
+        raise NotImplementedError
+
+    def get_children(self, handle):
+        """
+        Return the handles of the children of the family.
+        """
+        raise NotImplementedError
+
+    def get_ancestors(self, handle, generations=None, main_only=True):
+        """
+        Return a dictionary of the ancestors of a person, mapping their handle
+        to the number of generations between them and the person.
+
+        The person is included, as generation 0.  With a number of generations
+        only the ancestors up to that generation are returned.  With main_only
+        only the main parents of every person are followed, otherwise the
+        parents of all the families they are a child in.
+        """
+        result = {handle: 0}
+        todo = [handle]
+        generation = 0
+        while todo and (generations is None or generation < generations):
+            generation += 1
+            parents = []
+            for person_handle in todo:
+                families = self.get_parent_families(person_handle)
+                if main_only:
+                    families = families[:1]
+                for family_handle in families:
+                    for parent_handle in self.get_parents(family_handle):
+                        if parent_handle and parent_handle not in result:
+                            result[parent_handle] = generation
+                            parents.append(parent_handle)
+            todo = parents
+        return result
+
+    def get_descendants(self, handle, generations=None):
+        """
+        Return a dictionary of the descendants of a person, mapping their
+        handle to the number of generations between the person and them.
+
+        The person is included, as generation 0.  With a number of generations
+        only the descendants up to that generation are returned.
+        """
+        result = {handle: 0}
+        todo = [handle]
+        generation = 0
+        while todo and (generations is None or generation < generations):
+            generation += 1
+            children = []
+            for person_handle in todo:
+                for family_handle in self.get_spouse_families(person_handle):
+                    for child_handle in self.get_children(family_handle):
+                        if child_handle not in result:
+                            result[child_handle] = generation
+                            children.append(child_handle)
+            todo = children
+        return result
+
+    def get_common_ancestors(self, handle1, handle2, main_only=False):
+        """
+        Return the set of the handles of the common ancestors of two people.
+
+        Each person counts as their own ancestor, so a person who is an
+        ancestor of the other one is returned.
+        """
+        ancestors = self.get_ancestors(handle1, main_only=main_only)
+        return set(ancestors).intersection(
+            self.get_ancestors(handle2, main_only=main_only))
+
+#-------------------------------------------------------------------------
+#
+# ObjectFamilyGraph class
+#
+#-------------------------------------------------------------------------
+class ObjectFamilyGraph(FamilyGraph):
+    """
+    Family graph reading the people and families of a database.
+
+    It works with any database, including the proxies, and is the default
+    when a database does not maintain an index.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    def get_parent_families(self, handle):
+        person = self.db.get_person_from_handle(handle)
+        if person is None:
+            return []
+        return person.get_parent_family_handle_list()
+
+    def get_spouse_families(self, handle):
+        person = self.db.get_person_from_handle(handle)
+        if person is None:
+            return []
+        return person.get_family_handle_list()
+
+    def get_parents(self, handle):
+        family = self.db.get_family_from_handle(handle)
+        if family is None:
+            return (None, None)
+        return (family.get_father_handle() or None,
+                family.get_mother_handle() or None)
+
+    def get_children(self, handle):
+        family = self.db.get_family_from_handle(handle)
+        if family is None:
+            return []
+        return [child_ref.ref for child_ref in family.get_child_ref_list()]
+
+#-------------------------------------------------------------------------
+#
+# IndexedFamilyGraph class
+#
+#-------------------------------------------------------------------------
+class IndexedFamilyGraph(FamilyGraph):
+    """
+    Family graph held in memory.
+
+    Every handle is mapped to an integer, and the links between people and
+    families are stored as tuples and arrays of those integers, indexed by
+    them.  The backend fills the graph from its index, and keeps it up to
+    date as people and families are committed.
+    """
+    indexed = True
+
+    def __init__(self):
+        self._ids = {}
+        self._handles = []
+        self._parent_families = []
+        self._spouse_families = []
+        self._fathers = array('i')
+        self._mothers = array('i')
+        self._children = []
+
+    def _get_id(self, handle):
+        """
+        Return the integer of a handle, allocating it if needed.
+        """
+        if not handle:
+            return -1
+        node = self._ids.get(handle)
+        if node is None:
+            node = self._ids[handle] = len(self._handles)
+            self._handles.append(handle)
+            self._parent_families.append(())
+            self._spouse_families.append(())
+            self._fathers.append(-1)
+            self._mothers.append(-1)
+            self._children.append(())
+        return node
+
+    def set_person(self, handle, parent_families, spouse_families):
+        """
+        Set the families in which a person is a child and a spouse.
+        """
+        node = self._get_id(handle)
+        get_id = self._get_id
+        self._parent_families[node] = tuple(map(get_id, parent_families))
+        self._spouse_families[node] = tuple(map(get_id, spouse_families))
+
+    def set_family(self, handle, father, mother, children):
+        """
+        Set the parents and the children of a family.
+        """
+        node = self._get_id(handle)
+        self._fathers[node] = self._get_id(father)
+        self._mothers[node] = self._get_id(mother)
+        self._children[node] = tuple(map(self._get_id, children))
+
+    def remove(self, handle):
+        """
+        Remove the links of a person or family.
+        """
+        node = self._ids.get(handle)
+        if node is not None:
+            self._parent_families[node] = ()
+            self._spouse_families[node] = ()
+            self._fathers[node] = -1
+            self._mothers[node] = -1
+            self._children[node] = ()
+
+    def _to_handles(self, nodes):
+        handles = self._handles
+        return [handles[node] for node in nodes]
+
+    def get_parent_families(self, handle):
+        node = self._ids.get(handle)
+        if node is None:
+            return []
+        return self._to_handles(self._parent_families[node])
+
+    def get_spouse_families(self, handle):
+        node = self._ids.get(handle)
+        if node is None:
+            return []
+        return self._to_handles(self._spouse_families[node])
+
+    def get_parents(self, handle):
+        node = self._ids.get(handle)
+        if node is None:
+            return (None, None)
+        return tuple(self._handles[parent] if parent >= 0 else None
+                     for parent in (self._fathers[node], self._mothers[node]))
+
+    def get_children(self, handle):
+        node = self._ids.get(handle)
+        if node is None:
+            return []
+        return self._to_handles(self._children[node])
+
+    def get_ancestors(self, handle, generations=None, main_only=True):
+        root = self._ids.get(handle)
+        if root is None:
+            return {handle: 0}
+        parent_families = self._parent_families
+        fathers = self._fathers
+        mothers = self._mothers
+        result = {root: 0}
+        todo = [root]
+        generation = 0
+        while todo and (generations is None or generation < generations):
+            generation += 1
+            parents = []
+            for node in todo:
+                families = parent_families[node]
+                if main_only:
+                    families = families[:1]
+                for family in families:
+                    for parent in (fathers[family], mothers[family]):
+                        if parent >= 0 and parent not in result:
+                            result[parent] = generation
+                            parents.append(parent)
+            todo = parents
+        handles = self._handles
+        return {handles[node]: gen for node, gen in result.items()}
+
+    def get_descendants(self, handle, generations=None):
+        root = self._ids.get(handle)
+        if root is None:
+            return {handle: 0}
+        spouse_families = self._spouse_families
+        family_children = self._children
+        result = {root: 0}
+        todo = [root]
+        generation = 0
+        while todo and (generations is None or generation < generations):
+            generation += 1
+            children = []
+            for node in todo:
+                for family in spouse_families[node]:
+                    for child in family_children[family]:
+                        if child not in result:
+                            result[child] = generation
+                            children.append(child)
+            todo = children
+        handles = self._handles
+        return {handles[node]: gen for node, gen in result.items()}
@@ -0,0 +1,169 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Allocation of Gramps IDs.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import re
+
+# Numbers above this limit are kept in a set rather than in the bitmap, so
+# that a single large imported ID does not allocate a huge bitmap.
+_MAX_BITMAP = 1 << 24
+
+_FULL_BYTE = re.compile(b'[^\xff]')
+
+#-------------------------------------------------------------------------
+#
+# GrampsIdAllocator class
+#
+#-------------------------------------------------------------------------
+class GrampsIdAllocator:
+    """
+    Keep track of the Gramps IDs used by one type of object, and find the
+    next free one.
+
+    The IDs are matched against an ID pattern, such as ``I%04d``.  The
+    numbers of the IDs following the pattern are stored in a bitmap, one
+    bit per number, the others in a set.
+    """
+    def __init__(self, pattern, gramps_ids=()):
+        self.pattern = pattern
+        self._bitmap = bytearray()
+        self._large = set()
+        self._others = set()
+        match = re.match(r"(.*?)%[-+ 0#]*\d*[diu](.*)$", pattern, re.S)
+        if match and '%' not in match.group(1).replace('%%', ''):
+            self._match = re.compile(
+                "%s(\\d+)%s$" % (re.escape(match.group(1).replace('%%', '%')),
+                                re.escape(match.group(2).replace('%%', '%'))),
+                re.S).match
+        else:
+            self._match = None
+        for gramps_id in gramps_ids:
+            self.add(gramps_id)
+
+    def _number(self, gramps_id):
+        """
+        Return the number of an ID following the pattern, or None.
+        """
+        if self._match is not None:
+            match = self._match(gramps_id)
+            if match:
+                number = int(match.group(1))
+                # "I01" does not follow the pattern "I%04d"
+                if self.pattern % number == gramps_id:
+                    return number
+        return None
+
+    def add(self, gramps_id):
+        """
+        Mark an ID as used.
+        """
+        if not gramps_id:
+            return
+        number = self._number(gramps_id)
+        if number is None:
+            self._others.add(gramps_id)
+        elif number >= _MAX_BITMAP:
+            self._large.add(number)
+        else:
+            byte = number >> 3
+            if byte >= len(self._bitmap):
+                self._bitmap.extend(
+                    bytes(max(byte + 1, 2 * len(self._bitmap))
+                          - len(self._bitmap)))
+            self._bitmap[byte] |= 1 << (number & 7)
+
+    def discard(self, gramps_id):
+        """
+        Mark an ID as free.
+        """
+        if not gramps_id:
+            return
+        number = self._number(gramps_id)
+        if number is None:
+            self._others.discard(gramps_id)
+        elif number >= _MAX_BITMAP:
+            self._large.discard(number)
+        elif (number >> 3) < len(self._bitmap):
+            self._bitmap[number >> 3] &= ~(1 << (number & 7)) & 0xff
+
+    def __contains__(self, gramps_id):
+        number = self._number(gramps_id)
+        if number is None:
+            return gramps_id in self._others
+        return self._is_used(number)
+
+    def _is_used(self, number):
+        if number >= _MAX_BITMAP:
+            return number in self._large
+        byte = number >> 3
+        return (byte < len(self._bitmap)
+                and bool(self._bitmap[byte] & (1 << (number & 7))))
+
+    def _find_free(self, number):
+        """
+        Return the first free number, starting from the given one.
+        """
+        bitmap = self._bitmap
+        while number < _MAX_BITMAP:
+            byte = number >> 3
+            if byte >= len(bitmap):
+                return number
+            bits = bitmap[byte] >> (number & 7)
+            if bits != 0xff >> (number & 7):
+                # there is a free number in the rest of this byte
+                while bits & 1:
+                    bits >>= 1
+                    number += 1
+                return number
+            # skip to the first byte that is not full
+            match = _FULL_BYTE.search(bitmap, byte + 1)
+            if match is None:
+                number = len(bitmap) << 3
+            else:
+                number = match.start() << 3
+        while number in self._large:
+            number += 1
+        return number
+
+    def find_next(self, index):
+        """
+        Return the first free ID with a number at least index, as a tuple
+        of the following index and the ID.
+
+        The ID is not marked as used, as it is when an object with it is
+        committed.
+        """
+        if self._match is None:
+            gramps_id = self.pattern % index
+            while gramps_id in self._others:
+                index += 1
+                gramps_id = self.pattern % index
+        else:
+            index = self._find_free(index)
+            gramps_id = self.pattern % index
+        return (index + 1, gramps_id)
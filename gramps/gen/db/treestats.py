@@ -0,0 +1,260 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Aggregate statistics of the people and media objects of a database.
+
+The statistics gramplets and the summary report show how many people are
+males or females, have incomplete names or missing birth dates, how often
+each surname and given name is used, and how large the media files are.
+A database keeps one :class:`TreeStatistics` up to date as objects are
+committed, so that they can be shown without scanning the tree.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+from collections import Counter
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from ..errors import HandleError
+from ..lib.date import Date
+from ..lib.person import Person
+from ..utils.file import media_path_full
+
+#-------------------------------------------------------------------------
+#
+# Local functions
+#
+#-------------------------------------------------------------------------
+def given_subnames(first_name):
+    """
+    Return the parts of a given name, as counted by the given name cloud.
+
+    A non-breaking space keeps its two neighbouring words together.
+    """
+    subnames = []
+    nbsp = first_name.split('\u00A0')
+    rest = nbsp[1].split() if len(nbsp) > 1 else []
+    if rest:
+        subnames.append(nbsp[0] + '\u00A0' + rest[0])
+        first_name = ' '.join(rest[1:])
+    subnames.extend(first_name.split())
+    return subnames
+
+def is_dated(date):
+    """
+    Return True if the date of an event, given as a :class:`~.date.Date`
+    or in serialized form, is not empty.
+    """
+    if date is None:
+        return False
+    if not isinstance(date, Date):
+        date = Date().unserialize(date)
+    return not date.is_empty()
+
+#-------------------------------------------------------------------------
+#
+# TreeStatistics class
+#
+#-------------------------------------------------------------------------
+class TreeStatistics:
+    """
+    Counters about the people and the media objects of a database.
+
+    The counters are updated by counting the old version of a changed
+    person out, and the new one in.  The sizes of the media files are read
+    when the media objects are committed.
+    """
+    VERSION = 1
+
+    def __init__(self):
+        self.people = 0
+        self.males = 0
+        self.females = 0
+        self.unknowns = 0
+        self.incomplete_names = 0
+        self.disconnected = 0
+        self.missing_births = 0
+        self.with_media = 0
+        self.media_refs = 0
+        # group name: number of people with a name in the group
+        self.surnames = Counter()
+        # surname: number of names using it
+        self.all_surnames = Counter()
+        # given name: number of people with a name using it
+        self.given_names = Counter()
+        # media handle: (path, size of the file or None if it is missing)
+        self.media = {}
+
+    @classmethod
+    def build(cls, db):
+        """
+        Return the statistics of a database, counted from all its people
+        and media objects.
+        """
+        stats = cls()
+        for person in db.iter_people():
+            stats.count_person(db, person)
+        for media in db.iter_media():
+            stats.count_media(db, media)
+        return stats
+
+    def count_person(self, db, person, sign=1):
+        """
+        Count a person in, or out with a sign of -1.
+        """
+        self.people += sign
+        gender = person.get_gender()
+        if gender == Person.FEMALE:
+            self.females += sign
+        elif gender == Person.MALE:
+            self.males += sign
+        else:
+            self.unknowns += sign
+
+        names = [person.get_primary_name()] + person.get_alternate_names()
+        for name in names:
+            surnames = name.get_surname_list()
+            if name.get_first_name().strip() == "" or not surnames:
+                self.incomplete_names += sign
+            else:
+                self.incomplete_names += sign * sum(
+                    1 for surname in surnames
+                    if surname.get_surname().strip() == "")
+            surname = name.get_surname().strip()
+            if surname:
+                self._count(self.all_surnames, surname, sign)
+        for surname in set(name.get_group_name().strip() for name in names):
+            self._count(self.surnames, surname, sign)
+        for first_name in set(name.get_first_name().strip()
+                              for name in names):
+            for subname in given_subnames(first_name):
+                self._count(self.given_names, subname, sign)
+
+        if (not person.get_main_parents_family_handle() and
+                not person.get_family_handle_list()):
+            self.disconnected += sign
+
+        birth_ref = person.get_birth_ref()
+        if not birth_ref or not self._birth_dated(db, birth_ref.ref):
+            self.missing_births += sign
+
+        length = len(person.get_media_list())
+        if length > 0:
+            self.with_media += sign
+            self.media_refs += sign * length
+
+    def count_birth(self, db, person_handles, event_handle, sign):
+        """
+        Count the people using an event as birth as missing a birth date,
+        or not with a sign of -1, after the date of the event was removed
+        or added.
+        """
+        for person_handle in person_handles:
+            person = db.get_person_from_handle(person_handle)
+            birth_ref = person.get_birth_ref()
+            if birth_ref and birth_ref.ref == event_handle:
+                self.missing_births += sign
+
+    def count_media(self, db, media):
+        """
+        Count a media object in, reading the size of its file.
+        """
+        path = media.get_path()
+        try:
+            size = os.path.getsize(media_path_full(db, path))
+        except (OSError, KeyError):
+            # KeyError: the base media path uses an unknown variable
+            size = None
+        self.media[media.handle] = (path, size)
+
+    def uncount_media(self, handle):
+        """
+        Count a removed media object out.
+        """
+        self.media.pop(handle, None)
+
+    def get_media_size(self):
+        """
+        Return the total size of the media files, in bytes.
+        """
+        return sum(size for path, size in self.media.values() if size)
+
+    def get_missing_media(self):
+        """
+        Return the paths of the media objects whose file is missing.
+        """
+        return sorted(path for path, size in self.media.values()
+                      if size is None)
+
+    def serialize(self):
+        """
+        Return the statistics as a dictionary of standard types, to store
+        them in the metadata of a database.
+        """
+        return {'version': self.VERSION,
+                'counts': (self.people, self.males, self.females,
+                           self.unknowns, self.incomplete_names,
+                           self.disconnected, self.missing_births,
+                           self.with_media, self.media_refs),
+                'surnames': dict(self.surnames),
+                'all_surnames': dict(self.all_surnames),
+                'given_names': dict(self.given_names),
+                'media': self.media}
+
+    @classmethod
+    def unserialize(cls, data):
+        """
+        Return the statistics stored by :meth:`serialize`, or None if they
+        were stored by another version.
+        """
+        if not isinstance(data, dict) or data.get('version') != cls.VERSION:
+            return None
+        stats = cls()
+        (stats.people, stats.males, stats.females, stats.unknowns,
+         stats.incomplete_names, stats.disconnected, stats.missing_births,
+         stats.with_media, stats.media_refs) = data['counts']
+        stats.surnames.update(data['surnames'])
+        stats.all_surnames.update(data['all_surnames'])
+        stats.given_names.update(data['given_names'])
+        stats.media = dict(data['media'])
+        return stats
+
+    @staticmethod
+    def _count(counter, key, sign):
+        counter[key] += sign
+        if not counter[key]:
+            del counter[key]
+
+    @staticmethod
+    def _birth_dated(db, handle):
+        try:
+            event = db.get_event_from_handle(handle)
+        except HandleError:
+            return False
+        return event is not None and is_dated(event.get_date_object())
@@ -47,6 +47,73 @@ _ = glocale.translation.gettext
 LOG = logging.getLogger(".upgrade")
 
 
+def gramps_upgrade_24(self):
+    """
+    Upgrade database from version 23 to 24.
+
+    Add the name group columns of the person table, and their index.  They
+    are filled by the rebuild of the secondary indexes which ends the
+    upgrade.
+    """
+    self.set_total(0)
+    self._txn_begin()
+    self.dbapi.execute("ALTER TABLE person ADD COLUMN group_as TEXT")
+    self.dbapi.execute("ALTER TABLE person ADD COLUMN primary_surname TEXT")
+    self.dbapi.execute("ALTER TABLE person ADD COLUMN lone_patronymic INTEGER")
+    self._create_name_group_index()
+    self._txn_commit()
+    # Bump up database version. Separate transaction to save metadata.
+    self._set_metadata('version', 24)
+
+
+def gramps_upgrade_23(self):
+    """
+    Upgrade database from version 22 to 23.
+
+    Add the date sort value and type columns of the event table, and the
+    indexes of these columns and of the existing place column.  The new
+    columns are filled by the rebuild of the secondary indexes which ends
+    the upgrade.
+    """
+    self.set_total(0)
+    self._txn_begin()
+    self.dbapi.execute("ALTER TABLE event ADD COLUMN sortval INTEGER")
+    self.dbapi.execute("ALTER TABLE event ADD COLUMN event_type INTEGER")
+    self._create_event_indexes()
+    self._txn_commit()
+    # Bump up database version. Separate transaction to save metadata.
+    self._set_metadata('version', 23)
+
+
+def gramps_upgrade_22(self):
+    """
+    Upgrade database from version 21 to 22.
+
+    Add the table of the links between people and families.  It is filled
+    by the rebuild of the secondary indexes which ends the upgrade.
+    """
+    self.set_total(0)
+    self._txn_begin()
+    self._create_family_link_table()
+    self._txn_commit()
+    # Bump up database version. Separate transaction to save metadata.
+    self._set_metadata('version', 22)
+
+
+def gramps_upgrade_21(self):
+    """
+    Upgrade database from version 20 to 21.
+
+    The data of primary objects may be written by the JSON blob codec, when
+    it is chosen with the 'database.blob-codec' setting.  Since pickle stays
+    the default codec, the existing data is kept as it is, and only the
+    version changes, so that earlier versions of Gramps do not open a tree
+    which may hold JSON blobs.
+    """
+    self.set_total(0)
+    self._set_metadata('version', 21)
+
+
 def gramps_upgrade_20(self):
     """
     Placeholder update.
@@ -1010,6 +1010,27 @@ class NameDisplay:
         return db.get_name_group_mapping(_raw_primary_surname_only(
                                                     pn[_SURNAME_LIST]))
 
+    def name_grouping_columns(self, db, group_as, surname, lone_patronymic):
+        """
+        Return the name under which to group, as name_grouping_data does,
+        from the columns of the person table of the database.
+
+        :param group_as: the group_as value of the primary name
+        :type group_as: str
+        :param surname: the primary surname of the primary name
+        :type surname: str
+        :param lone_patronymic: whether the primary surname is the only one,
+            and a patronymic or matronymic
+        :type lone_patronymic: bool
+        :returns: Returns the groupname string representation
+        :rtype: str
+        """
+        if group_as:
+            return group_as
+        if lone_patronymic and not PAT_AS_SURN:
+            surname = ''
+        return db.get_name_group_mapping(surname)
+
     def _make_fn(self, format_str, d, args):
         """
         Create the name display function and handles dependent
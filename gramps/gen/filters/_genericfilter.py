@@ -24,6 +24,17 @@
 Package providing filtering framework for Gramps.
 """
 
+#------------------------------------------------------------------------
+#
+# Python modules
+#
+#------------------------------------------------------------------------
+import logging
+import multiprocessing
+import pickle
+from itertools import islice
+from queue import Empty
+
 #------------------------------------------------------------------------
 #
 # Gramps imports
@@ -39,9 +50,145 @@ from ..lib.repo import Repository
 from ..lib.media import Media
 from ..lib.note import Note
 from ..lib.tag import Tag
+from ..config import config
 from ..const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.gettext
 
+LOG = logging.getLogger(".filter")
+
+# Number of objects fetched from the database at a time when filtering a list
+_CHUNKSIZE = 1000
+
+# Minimum number of objects for a filter to be applied by worker processes
+_PARALLEL_THRESHOLD = 20000
+
+# Progress queue of a worker process, None in the main process
+_QUEUE = None
+
+def _rule_to_sql(rule, db):
+    """
+    Return the SQL condition of a rule, unless a subclass overrides the apply
+    method of the class providing the condition.
+    """
+    for cls in type(rule).__mro__:
+        if 'to_sql' in cls.__dict__:
+            break
+        if 'apply' in cls.__dict__:
+            return None
+    return rule.to_sql(db)
+
+def _rule_has_sql(rule):
+    """
+    Return True if the class of a rule provides an SQL condition, which
+    _rule_to_sql may return once the rule is prepared.
+    """
+    from .rules import Rule
+    for cls in type(rule).__mro__:
+        if 'to_sql' in cls.__dict__:
+            return cls is not Rule
+        if 'apply' in cls.__dict__:
+            return False
+    return False
+
+#-------------------------------------------------------------------------
+#
+# Worker processes
+#
+#-------------------------------------------------------------------------
+class _QueueUser:
+    """
+    Minimal user object of a worker process, which reports progress to the
+    main process through a queue.
+    """
+    def __init__(self, queue, step=100):
+        self.queue = queue
+        self.step = step
+        self.count = 0
+
+    def begin_progress(self, title, message, steps):
+        pass
+
+    def step_progress(self):
+        self.count += 1
+        if self.count == self.step:
+            self.queue.put(self.count)
+            self.count = 0
+
+    def end_progress(self):
+        if self.count:
+            self.queue.put(self.count)
+            self.count = 0
+
+def _init_worker(queue):
+    global _QUEUE
+    _QUEUE = queue
+
+def _filter_definition(filter_):
+    """
+    Return the definition of a filter, which can be sent to a worker
+    process: its logical operator, whether it is inverted, and the class,
+    values and use of regular expressions of its rules.
+    """
+    rules = [(rule.__class__, rule.list, rule.use_regex)
+             for rule in filter_.flist]
+    return (filter_.logical_op, filter_.invert, rules)
+
+def _make_filter(namespace, name, definition):
+    """
+    Return a filter of a namespace, made from its definition.
+    """
+    logical_op, invert, rules = definition
+    filter_ = GenericFilterFactory(namespace)()
+    filter_.set_name(name)
+    filter_.set_logical_op(logical_op)
+    filter_.set_invert(invert)
+    for rule_class, values, use_regex in rules:
+        filter_.add_rule(rule_class(values, use_regex))
+    return filter_
+
+def _custom_definitions():
+    """
+    Return the definitions of the custom filters, as a list of (namespace,
+    name, definition), or None if they are not loaded.
+    """
+    from .. import filters
+    if filters.CustomFilters is None:
+        return None
+    custom = []
+    for namespace in ('Person', 'Family', 'Event', 'Source', 'Citation',
+                      'Place', 'Media', 'Repository', 'Note'):
+        for name, filter_ in sorted(
+                filters.CustomFilters.get_filters_dict(namespace).items()):
+            custom.append((namespace, name, _filter_definition(filter_)))
+    return custom
+
+def _check_partition(task):
+    """
+    Apply a filter to a partition of the handles of a database.
+
+    The worker opens its own read-only connection to the database, and the
+    rules are prepared and reset for it by GenericFilter.apply; they are not
+    prepared in the main process.  The custom filters of the main process
+    are loaded first, for the rules matching another filter.
+    """
+    from .. import filters
+    from ..const import CUSTOM_FILTERS
+    from ..db.dbconst import DBMODE_R
+    from ..db.utils import make_database
+    namespace, definition, custom, directory, handles = task
+    if custom is not None:
+        filters.CustomFilters = filters.FilterList(CUSTOM_FILTERS)
+        for space, name, custom_definition in custom:
+            filters.CustomFilters.add(space, _make_filter(space, name,
+                                                          custom_definition))
+    db = make_database('sqlite')
+    db.load(directory, mode=DBMODE_R, update=False)
+    try:
+        filter_ = _make_filter(namespace, '', definition)
+        return filter_.apply(db, handles, user=_QueueUser(_QUEUE))
+    finally:
+        db.close(update=False)
+
 #-------------------------------------------------------------------------
 #
 # GenericFilter
@@ -133,9 +280,28 @@ class GenericFilter:
     def find_from_handle(self, db, handle):
         return db.get_person_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_people_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_people()
 
+    def iter_objects(self, db, id_list, tupleind=None):
+        """
+        Iterate over (data, object) pairs for the entries in id_list, fetching
+        the objects from the database in batches.
+        """
+        id_iter = iter(id_list)
+        while True:
+            chunk = list(islice(id_iter, _CHUNKSIZE))
+            if not chunk:
+                break
+            if tupleind is None:
+                handles = chunk
+            else:
+                handles = [data[tupleind] for data in chunk]
+            yield from zip(chunk, self.find_from_handles(db, handles))
+
     def check_func(self, db, id_list, task, user=None, tupleind=None,
                    tree=False):
         final_list = []
@@ -153,12 +319,7 @@ class GenericFilter:
                     if task(db, person) != self.invert:
                         final_list.append(handle)
         else:
-            for data in id_list:
-                if tupleind is None:
-                    handle = data
-                else:
-                    handle = data[tupleind]
-                person = self.find_from_handle(db, handle)
+            for data, person in self.iter_objects(db, id_list, tupleind):
                 if user:
                     user.step_progress()
                 if task(db, person) != self.invert:
@@ -185,12 +346,7 @@ class GenericFilter:
                     if val != self.invert:
                         final_list.append(handle)
         else:
-            for data in id_list:
-                if tupleind is None:
-                    handle = data
-                else:
-                    handle = data[tupleind]
-                person = self.find_from_handle(db, handle)
+            for data, person in self.iter_objects(db, id_list, tupleind):
                 if user:
                     user.step_progress()
                 val = all(rule.apply(db, person) for rule in flist if person)
@@ -240,6 +396,145 @@ class GenericFilter:
     def check(self, db, handle):
         return self.get_check_func()(db, [handle])
 
+    def plan_sql(self, db):
+        """
+        Split the rules into an SQL condition, which the database can
+        evaluate using its indexes, and the rules that still need to be
+        applied in Python.
+
+        Returns a tuple (where, values, rules), or None if the filter cannot
+        use SQL.
+        """
+        if self.invert or self.logical_op not in ('and', 'or'):
+            return None
+        clauses = []
+        values = []
+        rules = []
+        for rule in self.flist:
+            sql = _rule_to_sql(rule, db)
+            if sql is None:
+                rules.append(rule)
+            else:
+                clauses.append("(%s)" % sql[0])
+                values.extend(sql[1])
+        if not clauses or (rules and self.logical_op == 'or'):
+            return None
+        where = (" %s " % self.logical_op.upper()).join(clauses)
+        return (where, values, rules)
+
+    def may_use_sql(self):
+        """
+        Return True if plan_sql may find an SQL condition for the filter,
+        looking only at the classes of its rules, before they are prepared.
+        """
+        if self.invert or self.logical_op not in ('and', 'or'):
+            return False
+        has_sql = [_rule_has_sql(rule) for rule in self.flist]
+        if self.logical_op == 'or':
+            return bool(has_sql) and all(has_sql)
+        return any(has_sql)
+
+    def check_sql(self, db, user=None):
+        """
+        Apply the filter to the whole database, selecting the candidates with
+        SQL.  Returns None if the database or the filter does not support it.
+        """
+        plan = self.plan_sql(db)
+        if plan is None:
+            return None
+        where, values, rules = plan
+        handles = db.select_handles(self.make_obj().__class__.__name__,
+                                    where, values)
+        if handles is None or not rules:
+            return handles
+        final_list = []
+        if user:
+            user.begin_progress(_('Filter'), _('Applying ...'), len(handles))
+        for handle, obj in self.iter_objects(db, handles):
+            if user:
+                user.step_progress()
+            if all(rule.apply(db, obj) for rule in rules):
+                final_list.append(handle)
+        if user:
+            user.end_progress()
+        return final_list
+
+    def check_parallel(self, db, user=None):
+        """
+        Apply the filter to the whole database in worker processes, each
+        evaluating the rules on a partition of the handles.  The number of
+        processes is set by the 'behavior.filter-processes' option.
+
+        Returns None if the filter should be applied in this process: the
+        option is not set, the database is not a SQLite family tree, the
+        table is too small to benefit, or the workers could not apply it.
+
+        The rules must not be prepared yet: each worker prepares them for
+        its own connection.  The workers are started with the 'spawn'
+        method, so that they do not inherit the state of this process,
+        like the open database or the threads of the user interface; the
+        custom filters are sent to them with the filter.
+        """
+        from ..db.generic import DbGeneric
+        from ..db.utils import get_dbid_from_path
+        processes = config.get('behavior.filter-processes')
+        if processes < 2 or _QUEUE is not None:
+            return None
+        if not isinstance(db, DbGeneric):
+            return None
+        directory = db.get_save_path()
+        if (not directory or directory == ':memory:' or
+                get_dbid_from_path(directory) != 'sqlite'):
+            return None
+        namespace = self.make_obj().__class__.__name__
+        handles = db.method('get_%s_handles', namespace)()
+        if len(handles) < _PARALLEL_THRESHOLD:
+            return None
+        definition = _filter_definition(self)
+        custom = _custom_definitions()
+        try:
+            pickle.dumps((definition, custom))
+        except (pickle.PicklingError, AttributeError, TypeError):
+            return None
+
+        size = -(-len(handles) // processes)
+        tasks = [(namespace, definition, custom, directory,
+                  handles[start:start + size])
+                 for start in range(0, len(handles), size)]
+        if user:
+            user.begin_progress(_('Filter'), _('Applying ...'), len(handles))
+        context = multiprocessing.get_context('spawn')
+        queue = context.Queue()
+        steps = 0
+        with context.Pool(processes, _init_worker, (queue,)) as pool:
+            result = pool.map_async(_check_partition, tasks)
+            while not result.ready():
+                try:
+                    count = queue.get(timeout=0.1)
+                except Empty:
+                    continue
+                if user:
+                    for dummy in range(count):
+                        user.step_progress()
+                steps += count
+            try:
+                partitions = result.get()
+            except Exception as err:
+                # a rule of a plugin which cannot be loaded by the workers
+                LOG.warning("Cannot apply the filter in worker processes:"
+                            " %s", err)
+                partitions = None
+        if partitions is None:
+            if user:
+                user.end_progress()
+            return None
+        if user:
+            # Account for the progress still in the queue
+            for dummy in range(steps, len(handles)):
+                user.step_progress()
+            user.end_progress()
+        return [handle for partition in partitions for handle in partition]
+
     def apply(self, db, id_list=None, tupleind=None, user=None, tree=False):
         """
         Apply the filter using db.
@@ -258,9 +553,19 @@ class GenericFilter:
                 match the filter are returned as a list of handles
         """
         m = self.get_check_func()
+        whole = id_list is None and not tree
+        if whole and not self.may_use_sql():
+            # the workers prepare the rules themselves
+            res = self.check_parallel(db, user)
+            if res is not None:
+                return res
         for rule in self.flist:
             rule.requestprepare(db, user)
-        res = m(db, id_list, user, tupleind, tree)
+        res = None
+        if whole:
+            res = self.check_sql(db, user)
+        if res is None:
+            res = m(db, id_list, user, tupleind, tree)
         for rule in self.flist:
             rule.requestreset()
         return res
@@ -279,6 +584,9 @@ class GenericFamilyFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_family_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_families_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_families()
 
@@ -296,6 +604,9 @@ class GenericEventFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_event_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_events_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_events()
 
@@ -313,6 +624,9 @@ class GenericSourceFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_source_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_sources_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_sources()
 
@@ -333,6 +647,9 @@ class GenericCitationFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_citation_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_citations_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_citations()
 
@@ -353,6 +670,9 @@ class GenericPlaceFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_place_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_places_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_places()
 
@@ -370,6 +690,9 @@ class GenericMediaFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_media_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_media_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_media()
 
@@ -387,6 +710,9 @@ class GenericRepoFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_repository_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_repositories_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_repositories()
 
@@ -404,6 +730,9 @@ class GenericNoteFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_note_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_notes_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_notes()
 
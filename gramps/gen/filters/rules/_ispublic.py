@@ -40,3 +40,6 @@ class IsPublic(Rule):
 
     def apply(self, db, obj):
         return not obj.get_privacy()
+
+    def to_sql(self, db):
+        return ("private = 0", [])
@@ -54,3 +54,12 @@ class RegExpIdBase(Rule):
 
     def apply(self, db, obj):
         return self.match_substring(0, obj.gramps_id)
+
+    def to_sql(self, db):
+        if not self.list[0]:
+            return None
+        if self.use_regex:
+            return ("gramps_id REGEXP ?", ["(?i)" + self.regex[0].pattern])
+        if all(ord(char) < 128 for char in self.list[0]):
+            return ("instr(upper(gramps_id), ?) > 0", [self.list[0].upper()])
+        return None
@@ -139,6 +139,16 @@ class Rule:
         """Apply the rule to some database entry; must be overwritten."""
         return True
 
+    def to_sql(self, dummy_db):
+        """
+        Return an SQL condition equivalent to the rule, as a tuple of a WHERE
+        clause over the columns of the object table and a list of values for
+        its parameters, or None if the rule can only be applied in Python.
+
+        Called after the rule has been prepared.
+        """
+        return None
+
     def display_values(self):
         """Return the labels and values of this rule."""
         l_v = ('%s="%s"' % (_(self.labels[ix][0] if
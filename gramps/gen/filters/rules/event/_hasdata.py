@@ -89,3 +89,12 @@ class HasData(Rule):
 
         # All conditions matched
         return True
+
+    def to_sql(self, db):
+        if any(self.list[1:4]):
+            return None
+        if not self.event_type:
+            return ("1", [])
+        if self.event_type.is_custom():
+            return None
+        return ("event_type = ?", [self.event_type.value])
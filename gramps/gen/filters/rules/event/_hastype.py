@@ -54,3 +54,12 @@ class HasType(Rule):
             specified_type = EventType()
             specified_type.set_from_xml_str(self.list[0])
             return event.get_type() == specified_type
+
+    def to_sql(self, db):
+        if not self.list[0]:
+            return ("0", [])
+        specified_type = EventType()
+        specified_type.set_from_xml_str(self.list[0])
+        if specified_type.is_custom():
+            return None
+        return ("event_type = ?", [specified_type.value])
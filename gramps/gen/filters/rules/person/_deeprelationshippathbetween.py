@@ -43,35 +43,32 @@ _ = glocale.translation.gettext
 #-------------------------------------------------------------------------
 
 
-def get_family_handle_people(db, exclude_handle, family_handle):
+def get_family_handle_people(graph, exclude_handle, family_handle):
     people = set()
 
-    family = db.get_family_from_handle(family_handle)
-
     def possibly_add_handle(h):
         if h is not None and h != exclude_handle:
             people.add(h)
 
-    possibly_add_handle(family.get_father_handle())
-    possibly_add_handle(family.get_mother_handle())
+    for parent_handle in graph.get_parents(family_handle):
+        possibly_add_handle(parent_handle)
 
-    for child_ref in family.get_child_ref_list():
-        if child_ref:
-            possibly_add_handle(child_ref.get_reference_handle())
+    for child_handle in graph.get_children(family_handle):
+        possibly_add_handle(child_handle)
 
     return people
 
 
-def get_person_family_people(db, person, person_handle):
+def get_person_family_people(graph, person_handle):
     people = set()
 
     def add_family_handle_list(fam_list):
         for family_handle in fam_list:
-            people.update(get_family_handle_people(db, person_handle,
+            people.update(get_family_handle_people(graph, person_handle,
                                                    family_handle))
 
-    add_family_handle_list(person.get_family_handle_list())
-    add_family_handle_list(person.get_parent_family_handle_list())
+    add_family_handle_list(graph.get_spouse_families(person_handle))
+    add_family_handle_list(graph.get_parent_families(person_handle))
 
     return people
 
@@ -88,6 +85,7 @@ def find_deep_relations(db, user, person, target_people):
     return_paths = set()  # all people in paths between targets and person
     if person is None:
         return return_paths
+    graph = db.get_family_graph()
     todo = deque([person.handle])  # list of work to do, handles, add to right,
     #                                pop from left
     done = {}  # The key records handles already examined,
@@ -111,11 +109,7 @@ def find_deep_relations(db, user, person, target_people):
             if not target_people:  # Quit searching if all targets found
                 break
 
-        person = db.get_person_from_handle(handle)
-        if person is None:
-            continue
-
-        people = get_person_family_people(db, person, handle)
+        people = get_person_family_people(graph, handle)
         for p_hndl in people:
             if p_hndl in done:     # check if we have already been here
                 continue           # and ignore if we have
@@ -35,8 +35,13 @@ from ....datehandler import parser
 from ....display.place import displayer as place_displayer
 from ....lib.eventtype import EventType
 from ....lib.eventroletype import EventRoleType
+from ....db.base import DbReadBase
 from .. import Rule
 
+# Number of people checked one at a time, before the handles of all the
+# events of the type are read from the index of the database
+_BATCH_THRESHOLD = 100
+
 #-------------------------------------------------------------------------
 #
 # HasBirth
@@ -56,16 +61,42 @@ class HasBirth(Rule):
             self.date = parser.parse(self.list[0])
         else:
             self.date = None
+        # The events of the type are found with the index of the database,
+        # when it has one and many people are checked
+        self.events = None
+        self.checked = 0
+        self.indexed = (type(db).get_event_handles_by_date is not
+                        DbReadBase.get_event_handles_by_date)
+
+    def reset(self):
+        self.events = None
+
+    def get_events(self, db):
+        """
+        Return the handles of the events of the type, or None if the type of
+        each event should be checked.
+        """
+        if self.events is None and self.indexed:
+            if self.checked < _BATCH_THRESHOLD:
+                self.checked += 1
+            else:
+                self.events = set(db.get_event_handles_by_date(
+                    event_types=[EventType.BIRTH]))
+        return self.events
 
     def apply(self,db,person):
+        events = self.get_events(db)
         for event_ref in person.get_event_ref_list():
             if not event_ref:
                 continue
             elif event_ref.role != EventRoleType.PRIMARY:
                 # Only match primaries, no witnesses
                 continue
+            elif events is not None and event_ref.ref not in events:
+                # No match: wrong type
+                continue
             event = db.get_event_from_handle(event_ref.ref)
-            if event.get_type() != EventType.BIRTH:
+            if events is None and event.get_type() != EventType.BIRTH:
                 # No match: wrong type
                 continue
             if not self.match_substring(2, event.get_description()):
@@ -57,34 +57,16 @@ class IsLessThanNthGenerationAncestorOfDefaultPerson(Rule):
         if p:
             self.def_handle = p.get_handle()
             self.apply = self.apply_real
-            self.init_ancestor_list(self.def_handle, 1)
+            self.init_ancestor_list(self.def_handle)
         else:
             self.apply = lambda db,p: False
 
-    def init_ancestor_list(self, handle, gen):
-#        if p.get_handle() in self.map:
-#            loop_error(self.orig,p)
-        if not handle or handle in self.map:
-            # if we have been here before, skip
+    def init_ancestor_list(self, handle):
+        if not handle:
             return
-        if gen:
-            self.map.add(handle)
-            if gen >= int(self.list[0]):
-                return
-
-        p = self.db.get_person_from_handle(handle)
-        fam_id = p.get_main_parents_family_handle()
-        if not fam_id:
-            return
-        fam = self.db.get_family_from_handle(fam_id)
-        if fam:
-            f_id = fam.get_father_handle()
-            m_id = fam.get_mother_handle()
-
-            if f_id:
-                self.init_ancestor_list(f_id, gen+1)
-            if m_id:
-                self.init_ancestor_list(m_id, gen+1)
+        # generation 1 is the person
+        self.map.update(self.db.get_family_graph().get_ancestors(
+            handle, max(int(self.list[0]) - 1, 0)))
 
     def apply_real(self,db,person):
         return person.handle in self.map
@@ -67,12 +67,12 @@ class IsMoreThanNthGenerationDescendantOf(Rule):
     def init_list(self, person, gen):
         if not person:
             return
-        if gen >= int(self.list[1]):
-            self.map.add(person.handle)
-
-        for fam_id in person.get_family_handle_list():
-            fam = self.db.get_family_from_handle(fam_id)
-            if fam:
-                for child_ref in fam.get_child_ref_list():
-                    self.init_list(
-                        self.db.get_person_from_handle(child_ref.ref), gen+1)
+        graph = self.db.get_family_graph()
+        queue = [(person.handle, gen)]
+        while queue:
+            handle, gen = queue.pop()
+            if gen >= int(self.list[1]):
+                self.map.add(handle)
+            for fam_id in graph.get_spouse_families(handle):
+                for child_id in graph.get_children(fam_id):
+                    queue.append((child_id, gen+1))
@@ -68,37 +68,28 @@ class IsRelatedWith(Rule):
         if not(start):
             return
 
-        expand = [start]
+        graph = self.db.get_family_graph()
+        expand = [start.handle]
         relatives = {}
 
         while expand:
-            person = expand.pop()
+            handle = expand.pop()
             # Add the relative to the list
-            if person is None or (person.handle in relatives):
+            if handle is None or (handle in relatives):
                 continue
-            relatives[person.handle] = True
+            relatives[handle] = True
 
-            for family_handle in person.get_parent_family_handle_list():
-                family = self.db.get_family_from_handle(family_handle)
-                if family:
+            for family_handle in graph.get_parent_families(handle):
             # Check Parents
-                    for parent_handle in (family.get_father_handle(), family.get_mother_handle()):
-                        if parent_handle:
-                            expand.append(self.db.get_person_from_handle(parent_handle))
+                expand.extend(graph.get_parents(family_handle))
             # Check Sibilings
-                    for child_ref in family.get_child_ref_list():
-                        expand.append(self.db.get_person_from_handle(child_ref.ref))
+                expand.extend(graph.get_children(family_handle))
 
-            for family_handle in person.get_family_handle_list():
-                family = self.db.get_family_from_handle(family_handle)
-                if family:
+            for family_handle in graph.get_spouse_families(handle):
             # Check Spouse
-                    for parent_handle in (family.get_father_handle(), family.get_mother_handle()):
-                        if parent_handle:
-                            expand.append(self.db.get_person_from_handle(parent_handle))
+                expand.extend(graph.get_parents(family_handle))
             # Check Children
-                    for child_ref in family.get_child_ref_list():
-                        expand.append(self.db.get_person_from_handle(child_ref.ref))
+                expand.extend(graph.get_children(family_handle))
 
         self.relatives = list(relatives.keys())
         return
@@ -48,3 +48,6 @@ class MatchIdOf(Rule):
 
     def apply(self,db,person):
         return person.gramps_id.find(self.list[0]) !=-1
+
+    def to_sql(self, db):
+        return ("instr(gramps_id, ?) > 0", [self.list[0]])
@@ -31,10 +31,14 @@ _ = glocale.translation.gettext
 # Gramps modules
 #
 #-------------------------------------------------------------------------
-from ....utils.alive import probably_alive
+from ....utils.alive import probably_alive, ProbablyAliveRanges
 from .. import Rule
 from ....datehandler import parser
 
+# Number of people checked one at a time, before the estimates of all the
+# people are computed together
+_BATCH_THRESHOLD = 100
+
 #-------------------------------------------------------------------------
 # "People probably alive"
 #-------------------------------------------------------------------------
@@ -51,6 +55,16 @@ class ProbablyAlive(Rule):
             self.current_date = parser.parse(str(self.list[0]))
         except:
             self.current_date = None
+        self.ranges = None
+        self.checked = 0
+
+    def reset(self):
+        self.ranges = None
 
     def apply(self,db,person):
-        return probably_alive(person,db,self.current_date)
+        if self.ranges is None:
+            if self.checked < _BATCH_THRESHOLD:
+                self.checked += 1
+                return probably_alive(person, db, self.current_date)
+            self.ranges = ProbablyAliveRanges(db)
+        return self.ranges.probably_alive(person, self.current_date)
@@ -28,6 +28,7 @@ from ....db.utils import import_as_dict
 from ....filters import GenericFilterFactory
 from ....const import DATA_DIR
 from ....user import User
+from ....lib import EventType
 
 from ..event import (
     AllEvents, HasType, HasIdOf, HasGallery, RegExpIdOf, HasCitation, HasNote,
@@ -199,6 +200,20 @@ class BaseTest(unittest.TestCase):
         rule = HasDayOfWeek(['2'])
         self.assertEqual(len(self.filter_with_rule(rule)), 185)
 
+    def test_hastype_sql(self):
+        """
+        Test the SQL condition of the HasType rule.
+        """
+        rule = HasType(['Burial'])
+        self.assertEqual(rule.to_sql(self.db),
+                         ("event_type = ?", [EventType.BURIAL]))
+        self.assertIsNone(HasType(['Custom type']).to_sql(self.db))
+        filter_ = GenericEventFilter()
+        filter_.add_rule(rule)
+        self.assertEqual(set(filter_.apply(self.db)),
+                         set(filter_.apply(self.db,
+                                           self.db.get_event_handles())))
+
 
 if __name__ == "__main__":
     unittest.main()
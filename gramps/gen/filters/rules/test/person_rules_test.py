@@ -23,13 +23,20 @@ Unittest that tests person-specific filter rules
 """
 import unittest
 import os
+import shutil
+import tempfile
 from time import perf_counter
+from unittest import mock
 import inspect
 
 from ....filters import reload_custom_filters
 reload_custom_filters()
-from ....db.utils import import_as_dict
-from ....filters import GenericFilter, CustomFilters
+from ....db.utils import import_as_dict, make_database, import_from_filename
+from ....db.dbconst import DBBACKEND
+from ....config import config
+from ....db.base import DbReadBase
+from ....proxy import PrivateProxyDb
+from ....filters import GenericFilter, CustomFilters, DeferredFilter
 from ....const import DATA_DIR
 from ....user import User
 
@@ -50,10 +57,12 @@ from ..person import (
     IsLessThanNthGenerationAncestorOfBookmarked, IsMale,
     IsMoreThanNthGenerationAncestorOf, IsMoreThanNthGenerationDescendantOf,
     IsParentOfFilterMatch, IsRelatedWith, IsSiblingOfFilterMatch,
-    IsSpouseOfFilterMatch, IsWitness, MissingParent, MultipleMarriages,
+    IsSpouseOfFilterMatch, IsWitness, MatchesFilter, MissingParent,
+    MultipleMarriages,
     NeverMarried, NoBirthdate, NoDeathdate, PeoplePrivate, PeoplePublic,
     PersonWithIncompleteEvent, ProbablyAlive, RegExpName,
-    RelationshipPathBetweenBookmarks,
+    RelationshipPathBetweenBookmarks, RegExpIdOf, MatchIdOf, HasTag,
+    ChangedSince,
 )
 
 TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
@@ -249,6 +258,29 @@ class BaseTest(unittest.TestCase):
         res = self.filter_with_rule(rule)
         self.assertEqual(len(res), 2)
 
+    def test_HasBirth_index(self):
+        """
+        Test that the index of the events is only used when many people
+        are checked, and not through a proxy.
+        """
+        rule = HasBirth(['', '', ''])
+        everyone = self.filter_with_rule(rule)
+        handles = sorted(self.db.get_person_handles())
+        with mock.patch.object(self.db, 'get_event_handles_by_date',
+                               wraps=self.db.get_event_handles_by_date) as idx:
+            filter_ = GenericFilter()
+            filter_.add_rule(rule)
+            res = filter_.apply(self.db, handles[:50])
+            idx.assert_not_called()
+            self.assertEqual(set(res), everyone & set(handles[:50]))
+            filter_.apply(self.db, handles)
+            self.assertEqual(idx.call_count, 1)
+        proxy = PrivateProxyDb(self.db)
+        with mock.patch.object(DbReadBase, 'get_event_handles_by_date') as idx:
+            res = filter_.apply(proxy, handles)
+            idx.assert_not_called()
+        self.assertEqual(set(res), everyone)
+
     def test_HasEvent(self):
         """
         Test rule.
@@ -348,6 +380,21 @@ class BaseTest(unittest.TestCase):
         res = self.filter_with_rule(rule)
         self.assertEqual(len(res), 766)
 
+    def test_ProbablyAlive_few(self):
+        """
+        Test that the estimates of all the people are not computed to check
+        a few of them.
+        """
+        filter_ = GenericFilter()
+        filter_.add_rule(ProbablyAlive(['1900']))
+        handles = sorted(self.db.get_person_handles())
+        with mock.patch('gramps.gen.filters.rules.person._probablyalive.'
+                   'ProbablyAliveRanges') as ranges:
+            res = filter_.apply(self.db, handles[:50])
+        ranges.assert_not_called()
+        self.assertEqual(set(res), self.filter_with_rule(
+            ProbablyAlive(['1900'])) & set(handles[:50]))
+
     def test_RegExpName(self):
         """
         Test rule.
@@ -875,6 +922,173 @@ class BaseTest(unittest.TestCase):
         self.assertEqual(self.filter_with_rule(rule), set([
             'GNUJQCL9MD64AM56OH']))
 
+    def filter_without_sql(self, rules, l_op='and'):
+        """
+        Apply a filter to an explicit list of handles, so that the rules are
+        all applied in Python.
+        """
+        filter_ = GenericFilter()
+        filter_.set_rules(rules)
+        filter_.set_logical_op(l_op)
+        return set(filter_.apply(self.db, self.db.get_person_handles()))
+
+    def test_sql_plan(self):
+        """
+        Test the split of rules between SQL and Python.
+        """
+        filter_ = GenericFilter()
+        filter_.set_rules([IsMale([]), HasBirth(['', '', ''])])
+        for rule in filter_.get_rules():
+            rule.requestprepare(self.db, None)
+        where, values, rules = filter_.plan_sql(self.db)
+        self.assertEqual(where, "(gender = ?)")
+        self.assertEqual(len(rules), 1)
+        filter_.set_logical_op('or')
+        self.assertIsNone(filter_.plan_sql(self.db))
+        filter_.set_logical_op('and')
+        filter_.set_invert(True)
+        self.assertIsNone(filter_.plan_sql(self.db))
+        for rule in filter_.get_rules():
+            rule.requestreset()
+
+    def test_sql_and(self):
+        """
+        Test SQL rules combined with a Python rule.
+        """
+        rules = [IsFemale([]), RegExpIdOf(['^I0[0-4]'], use_regex=True),
+                 HasBirth(['', '', ''])]
+        res = self.filter_with_rule(rules)
+        self.assertEqual(res, self.filter_without_sql(rules))
+        self.assertTrue(res)
+
+    def test_sql_or(self):
+        """
+        Test SQL rules combined with 'or'.
+        """
+        rules = [HasIdOf(['I0044']), MatchIdOf(['I01']), HasTag(['ToDo']),
+                 ChangedSince(['2000-01-01', '']), PeoplePrivate([])]
+        res = self.filter_with_rule(rules, l_op='or')
+        self.assertEqual(res, self.filter_without_sql(rules, l_op='or'))
+        self.assertTrue(res)
+
+
+
+class ParallelTest(unittest.TestCase):
+    """
+    Person filters applied by worker processes.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Import example database into a family tree directory.
+        """
+        cls.dirname = tempfile.mkdtemp()
+        with open(os.path.join(cls.dirname, DBBACKEND), 'w') as backend:
+            backend.write('sqlite')
+        cls.db = make_database('sqlite')
+        cls.db.load(cls.dirname)
+        import_from_filename(cls.db, EXAMPLE, User())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+        shutil.rmtree(cls.dirname)
+
+    def setUp(self):
+        self.processes = config.get('behavior.filter-processes')
+        config.set('behavior.filter-processes', 3)
+
+    def tearDown(self):
+        config.set('behavior.filter-processes', self.processes)
+
+    def apply(self, rules, l_op='and', invert=False, id_list=None, user=None):
+        filter_ = GenericFilter()
+        filter_.set_rules(rules)
+        filter_.set_logical_op(l_op)
+        filter_.set_invert(invert)
+        return filter_.apply(self.db, id_list, user=user)
+
+    def test_parallel(self):
+        """
+        Test that worker processes give the same results, in the order of
+        the handles.
+        """
+        for rules, l_op in (([HasBirth(['', '', '']), HasNickname([])], 'or'),
+                            ([MultipleMarriages([]), HaveChildren([])], 'and'),
+                            ([HaveChildren([])], 'one')):
+            serial = self.apply(rules, l_op,
+                                id_list=self.db.get_person_handles())
+            results = []
+            original = GenericFilter.check_parallel
+            def check_parallel(filter_, db, user=None):
+                results.append(original(filter_, db, user))
+                return results[-1]
+            with mock.patch('gramps.gen.filters._genericfilter.'
+                            '_PARALLEL_THRESHOLD', 0), \
+                    mock.patch.object(GenericFilter, 'check_parallel',
+                                      check_parallel):
+                parallel = self.apply(rules, l_op)
+            self.assertEqual(results, [serial])
+            self.assertEqual(parallel, serial)
+            self.assertTrue(parallel)
+
+    def test_prepare(self):
+        """
+        Test that the rules are only prepared by the workers.
+        """
+        original = HasBirth.prepare
+        calls = []
+        def prepare(rule, db, user):
+            calls.append(rule)
+            original(rule, db, user)
+        with mock.patch('gramps.gen.filters._genericfilter.'
+                        '_PARALLEL_THRESHOLD', 0), \
+                mock.patch.object(HasBirth, 'prepare', prepare):
+            parallel = self.apply([HasBirth(['', '', ''])])
+            self.assertEqual(calls, [])
+            serial = self.apply([HasBirth(['', '', ''])],
+                                id_list=self.db.get_person_handles())
+            self.assertEqual(len(calls), 1)
+        self.assertEqual(parallel, serial)
+
+    def test_custom_filter(self):
+        """
+        Test that the workers match the custom filters of this process.
+        """
+        males = GenericFilter()
+        males.set_name('Parallel males')
+        males.add_rule(IsMale([]))
+        filters = CustomFilters.get_filters_dict('Person')
+        filters['Parallel males'] = males
+        try:
+            for rule in (MatchesFilter(['Parallel males']),
+                         IsParentOfFilterMatch(['Parallel males'])):
+                serial = self.apply([rule],
+                                    id_list=self.db.get_person_handles())
+                filter_ = DeferredFilter('People matching <%s>', 'a rule')
+                filter_.add_rule(rule)
+                with mock.patch('gramps.gen.filters._genericfilter.'
+                                '_PARALLEL_THRESHOLD', 0), \
+                        mock.patch.object(GenericFilter, 'check_sql',
+                                          side_effect=AssertionError):
+                    parallel = filter_.apply(self.db)
+                self.assertEqual(parallel, serial)
+                self.assertTrue(parallel)
+        finally:
+            del filters['Parallel males']
+
+    def test_progress(self):
+        """
+        Test that the progress of the workers is reported.
+        """
+        user = mock.Mock()
+        with mock.patch('gramps.gen.filters._genericfilter.'
+                        '_PARALLEL_THRESHOLD', 0):
+            self.apply([HasBirth(['', '', ''])], invert=True, user=user)
+        self.assertEqual(user.step_progress.call_count,
+                         self.db.get_number_of_people())
+
 
 if __name__ == "__main__":
     unittest.main()
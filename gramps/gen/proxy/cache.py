@@ -154,3 +154,82 @@ class CacheProxyDb:
         if handle not in self.cache_handle:
             self.cache_handle[handle] = self.db.get_tag_from_handle(handle)
         return self.cache_handle[handle]
+
+    def __get_many(self, handles, get_many_func):
+        """
+        Gets items from the cache where they exist, and fetches the rest
+        from the database in a single batch.
+        """
+        handles = list(handles)
+        objs = {}
+        missing = []
+        for handle in handles:
+            if handle in self.cache_handle:
+                objs[handle] = self.cache_handle[handle]
+            else:
+                missing.append(handle)
+        if missing:
+            for handle, obj in zip(missing, get_many_func(missing)):
+                self.cache_handle[handle] = obj
+                objs[handle] = obj
+        return [objs[handle] for handle in handles]
+
+    def get_people_from_handles(self, handles):
+        """
+        Gets items from cache if they exist, fetching the others in a batch.
+        """
+        return self.__get_many(handles, self.db.get_people_from_handles)
+
+    def get_events_from_handles(self, handles):
+        """
+        Gets items from cache if they exist, fetching the others in a batch.
+        """
+        return self.__get_many(handles, self.db.get_events_from_handles)
+
+    def get_families_from_handles(self, handles):
+        """
+        Gets items from cache if they exist, fetching the others in a batch.
+        """
+        return self.__get_many(handles, self.db.get_families_from_handles)
+
+    def get_repositories_from_handles(self, handles):
+        """
+        Gets items from cache if they exist, fetching the others in a batch.
+        """
+        return self.__get_many(handles, self.db.get_repositories_from_handles)
+
+    def get_places_from_handles(self, handles):
+        """
+        Gets items from cache if they exist, fetching the others in a batch.
+        """
+        return self.__get_many(handles, self.db.get_places_from_handles)
+
+    def get_citations_from_handles(self, handles):
+        """
+        Gets items from cache if they exist, fetching the others in a batch.
+        """
+        return self.__get_many(handles, self.db.get_citations_from_handles)
+
+    def get_sources_from_handles(self, handles):
+        """
+        Gets items from cache if they exist, fetching the others in a batch.
+        """
+        return self.__get_many(handles, self.db.get_sources_from_handles)
+
+    def get_notes_from_handles(self, handles):
+        """
+        Gets items from cache if they exist, fetching the others in a batch.
+        """
+        return self.__get_many(handles, self.db.get_notes_from_handles)
+
+    def get_media_from_handles(self, handles):
+        """
+        Gets items from cache if they exist, fetching the others in a batch.
+        """
+        return self.__get_many(handles, self.db.get_media_from_handles)
+
+    def get_tags_from_handles(self, handles):
+        """
+        Gets items from cache if they exist, fetching the others in a batch.
+        """
+        return self.__get_many(handles, self.db.get_tags_from_handles)
@@ -35,6 +35,9 @@ from ..lib import (Date, Person, Name, Surname, NameOriginType, Family, Source,
                    Citation, Event, Media, Place, Repository, Note, Tag)
 from ..const import GRAMPS_LOCALE as glocale
 
+# Number of people read from the database at a time
+_CHUNKSIZE = 1000
+
 class FilterProxyDb(ProxyDbBase):
     """
     A proxy to a Gramps database. This proxy will act like a Gramps database,
@@ -68,11 +71,13 @@ class FilterProxyDb(ProxyDbBase):
             self.nlist = set(self.db.iter_note_handles())
 
         self.flist = set()
-        for handle in self.plist:
-            person = self.db.get_person_from_handle(handle)
-            if person:
-                self.flist.update(person.get_family_handle_list())
-                self.flist.update(person.get_parent_family_handle_list())
+        handles = list(self.plist)
+        for start in range(0, len(handles), _CHUNKSIZE):
+            for person in self.db.get_people_from_handles(
+                    handles[start:start + _CHUNKSIZE]):
+                if person:
+                    self.flist.update(person.get_family_handle_list())
+                    self.flist.update(person.get_parent_family_handle_list())
 
     def get_person_from_handle(self, handle):
         """
@@ -31,10 +31,14 @@ Proxy class for the Gramps databases. Filter out all living people.
 from .proxybase import ProxyDbBase
 from ..lib import (Date, Person, Name, Surname, NameOriginType, Family, Source,
                    Citation, Event, Media, Place, Repository, Note, Tag)
-from ..utils.alive import probably_alive
+from ..utils.alive import probably_alive, ProbablyAliveRanges
 from ..config import config
 from ..const import GRAMPS_LOCALE as glocale
 
+# Number of people checked one at a time, before the estimates of all the
+# people are computed together
+_BATCH_THRESHOLD = 100
+
 #-------------------------------------------------------------------------
 #
 # LivingProxyDb
@@ -91,6 +95,8 @@ class LivingProxyDb(ProxyDbBase):
         else:
             self.current_date = None
         self.years_after_death = years_after_death
+        self.__living = {}
+        self.__ranges = None
         self._ = llocale.translation.gettext
         self._p_f_n = self._(config.get('preferences.private-given-text'))
         self._p_s_n = self._(config.get('preferences.private-surname-text'))
@@ -239,11 +245,24 @@ class LivingProxyDb(ProxyDbBase):
         Returns False if the person is not considered living.
         """
         person_handle = person.get_handle()
-        unfil_person = self.get_unfiltered_person(person_handle)
-        return probably_alive( unfil_person,
-                               self.db,
-                               self.current_date,
-                               self.years_after_death )
+        living = self.__living.get(person_handle)
+        if living is not None:
+            return living
+        if (self.__ranges is None and
+                len(self.__living) >= _BATCH_THRESHOLD):
+            self.__ranges = ProbablyAliveRanges(self.db)
+        if self.__ranges is not None:
+            living = self.__ranges.probably_alive(person,
+                                                  self.current_date,
+                                                  self.years_after_death)
+        else:
+            unfil_person = self.get_unfiltered_person(person_handle)
+            living = probably_alive( unfil_person,
+                                     self.db,
+                                     self.current_date,
+                                     self.years_after_death )
+        self.__living[person_handle] = living
+        return living
 
     def __remove_living_from_family(self, family):
         """
@@ -27,6 +27,7 @@ Classes for relationships.
 #
 #-------------------------------------------------------------------------
 import logging
+from collections import OrderedDict
 
 #-------------------------------------------------------------------------
 #
@@ -829,15 +830,18 @@ class RelationshipCalculator:
     PARTNER_EX_CIVIL_UNION = 7
     PARTNER_EX_UNKNOWN_REL = 8
 
+    #number of ancestor maps kept in the map cache
+    MAP_CACHE_SIZE = 32
+
     def __init__(self):
         self.signal_keys = []
         self.state_signal_key = None
         self.storemap = False
-        self.dirtymap = True
-        self.stored_map = None
-        self.map_handle = None
-        self.map_meta = None
+        # (person handle, depth, all families, only birth):
+        #       (map, meta data, person handles, family handles)
+        self.map_cache = OrderedDict()
         self.__db_connected = False
+        self.__batch = False
         self.depth = 15
         try:
             from .config import config
@@ -854,15 +858,15 @@ class RelationshipCalculator:
         self.__only_birth = False
         self.__crosslinks = False
         self.__msg = []
+        self.__people = set()
+        self.__families = set()
 
     def set_depth(self, depth):
         """
         Set how deep relationships must be searched. Input must be an
         integer > 0
         """
-        if depth != self.depth:
-            self.depth = depth
-            self.dirtymap = True
+        self.depth = depth
 
     def get_depth(self):
         """
@@ -1249,34 +1253,34 @@ class RelationshipCalculator:
         second_map = {}
         rank = 9999999
 
+        if self._share_no_ancestor(db, orig_person, other_person):
+            if not self.__all_dist:
+                return (-1, None, '', [], '', []), self.__msg
+            else:
+                return [(-1, None, '', [], '', [])], self.__msg
+
+        key = (orig_person.handle, self.__max_depth, all_families, only_birth)
         try:
-            if (self.storemap and self.stored_map is not None
-                    and self.map_handle == orig_person.handle
-                    and not self.dirtymap):
-                first_map = self.stored_map
-                self.__max_depth_reached, self.__loop_detected, \
-                 self.__all_families,\
-                 self.__all_dist, self.__only_birth,\
-                 self.__crosslinks, self.__msg = self.map_meta
+            cached = self.__get_map(key)
+            if cached is not None:
+                first_map, meta = cached
+                (self.__max_depth_reached, self.__loop_detected,
+                 self.__crosslinks, self.__msg) = meta
                 self.__msg = list(self.__msg)
             else:
+                self.__people = set([orig_person.handle])
+                self.__families = set()
                 self.__apply_filter(db, orig_person, '', [], first_map)
-                self.map_meta = (self.__max_depth_reached,
-                                 self.__loop_detected,
-                                 self.__all_families,
-                                 self.__all_dist, self.__only_birth,
-                                 self.__crosslinks, list(self.__msg))
+                self.__store_map(key, first_map,
+                                 (self.__max_depth_reached,
+                                  self.__loop_detected, self.__crosslinks,
+                                  list(self.__msg)))
             self.__apply_filter(db, other_person, '', [], second_map,
                                 stoprecursemap=first_map)
         except RuntimeError:
             return (-1, None, -1, [], -1, []), \
                             [_("Relationship loop detected")] + self.__msg
 
-        if self.storemap:
-            self.stored_map = first_map
-            self.dirtymap = False
-            self.map_handle = orig_person.handle
-
         for person_handle in second_map:
             if person_handle in first_map:
                 com = []
@@ -1352,6 +1356,52 @@ class RelationshipCalculator:
         else:
             return [(-1, None, '', [], '', [])], self.__msg
 
+    def __get_map(self, key):
+        """
+        Return the ancestor map and its meta data stored in the map cache
+        for a key, or None if it is not stored or cannot be used.
+        """
+        if not (self.storemap or self.__batch) or key not in self.map_cache:
+            return None
+        self.map_cache.move_to_end(key)
+        return self.map_cache[key][:2]
+
+    def __store_map(self, key, pmap, meta):
+        """
+        Store an ancestor map in the map cache, with the people and families
+        it was built from, removing the least recently used maps.
+        """
+        if not (self.storemap or self.__batch):
+            return
+        self.map_cache[key] = (pmap, meta, self.__people, self.__families)
+        while len(self.map_cache) > self.MAP_CACHE_SIZE:
+            self.map_cache.popitem(last=False)
+
+    def _share_no_ancestor(self, db, orig_person, other_person):
+        """
+        Return True if the indexed family graph of the database shows that
+        the two people have no common ancestor, and no siblings in a family
+        without parents, within the maximum depth.  The relationship search
+        can then be skipped.
+        """
+        graph = db.get_family_graph()
+        if not graph.indexed:
+            return False
+        first = graph.get_ancestors(orig_person.handle, main_only=False)
+        second = graph.get_ancestors(other_person.handle, main_only=False)
+        if max(max(first.values()), max(second.values())) >= self.get_depth():
+            # the search must report that the maximum depth was reached
+            return False
+        if not first.keys().isdisjoint(second):
+            return False
+        families = set()
+        for handle in first:
+            families.update(graph.get_parent_families(handle))
+        for handle in second:
+            if not families.isdisjoint(graph.get_parent_families(handle)):
+                return False
+        return True
+
     def __apply_filter(self, db, person, rel_str, rel_fam, pmap,
                        depth=1, stoprecursemap=None):
         """
@@ -1428,6 +1478,8 @@ class RelationshipCalculator:
         try:
             parentstodo = {}
             fam = 0
+            if stoprecursemap is None:
+                self.__families.update(family_handles)
             for family_handle in family_handles:
                 rel_fam_new = rel_fam + [fam]
                 family = db.get_family_from_handle(family_handle)
@@ -1445,6 +1497,8 @@ class RelationshipCalculator:
                              (mhandle, self.REL_MOTHER,
                               self.REL_MOTHER_NOTBIRTH, childrel[0][0])]:
                     if data[0] and data[0] not in parentstodo:
+                        if stoprecursemap is None:
+                            self.__people.add(data[0])
                         persontodo = db.get_person_from_handle(data[0])
                         if data[3] == ChildRefType.BIRTH:
                             addstr = data[1]
@@ -1852,6 +1906,27 @@ class RelationshipCalculator:
             common_list.append(commons[rel_str])
         return (relstrings, common_list)
 
+    def get_relationships(self, db, orig_person, other_people,
+                          extra_info=False, olocale=glocale):
+        """
+        Return a list with the most relevant relationship between a person
+        and each of a list of other people, as returned by
+        :meth:`get_one_relationship`.
+
+        The ancestors of the first person are only looked up once, even if
+        the calculator is not connected to the database signals.
+        """
+        batch = self.__batch
+        self.__batch = True
+        try:
+            return [self.get_one_relationship(db, orig_person, other_person,
+                                              extra_info, olocale)
+                    for other_person in other_people]
+        finally:
+            self.__batch = batch
+            if not (self.storemap or batch):
+                self.map_cache.clear()
+
     def get_plural_relationship_string(self, Ga, Gb,
                                        reltocommon_a='', reltocommon_b='',
                                        only_birth=True,
@@ -2238,11 +2313,17 @@ class RelationshipCalculator:
         self.__connect_db_signals(dbstate.db)
 
     def __connect_db_signals(self, db):
-        signals = ['person-add', 'person-update', 'person-delete',
-                   'person-rebuild', 'family-add', 'family-update',
-                   'family-delete', 'family-rebuild', 'database-changed']
-        for name in signals:
-            self.signal_keys.append(db.connect(name, self._datachange_callback))
+        signals = [('person-add', self._person_callback),
+                   ('person-update', self._person_callback),
+                   ('person-delete', self._person_callback),
+                   ('person-rebuild', self._datachange_callback),
+                   ('family-add', self._family_callback),
+                   ('family-update', self._family_callback),
+                   ('family-delete', self._family_callback),
+                   ('family-rebuild', self._datachange_callback),
+                   ('database-changed', self._datachange_callback)]
+        for name, callback in signals:
+            self.signal_keys.append(db.connect(name, callback))
         self.storemap = True
         self.__db_connected = True
 
@@ -2254,25 +2335,40 @@ class RelationshipCalculator:
         dbstate.disconnect(self.state_signal_key)
         list(map(dbstate.db.disconnect, self.signal_keys))
         self.storemap = False
-        self.stored_map = None
+        self.map_cache.clear()
 
     def _dbchange_callback(self, db):
         """
-        When database changes, the map can no longer be used.
+        When database changes, the maps can no longer be used.
         Connects must be remade
         """
-        self.dirtymap = True
+        self.map_cache.clear()
         #signals are disconnected on close of old database, connect to new
         self.__connect_db_signals(db)
 
+    def _person_callback(self, handle_list):
+        """
+        Remove the maps built from the added, changed or removed people.
+        """
+        self.__invalidate(handle_list, 2)
+
+    def _family_callback(self, handle_list):
+        """
+        Remove the maps built from the added, changed or removed families.
+        """
+        self.__invalidate(handle_list, 3)
+
+    def __invalidate(self, handle_list, index):
+        handles = set(handle_list)
+        for key, entry in list(self.map_cache.items()):
+            if not handles.isdisjoint(entry[index]):
+                del self.map_cache[key]
+
     def _datachange_callback(self, handle_list=None):
         """
-        When data in database changes, the map can no  longer be used.
-        As the map might be in use or might be generated at the moment,
-        this method sets a dirty flag. Before reusing the map, this flag
-        will be checked
+        When many people or families change, the maps can no longer be used.
         """
-        self.dirtymap = True
+        self.map_cache.clear()
 
 #-------------------------------------------------------------------------
 #
@@ -0,0 +1,117 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest for the ancestor maps kept by the relationship calculator.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from ..const import DATA_DIR
+from ..db import DbTxn
+from ..db.utils import import_as_dict
+from ..dbstate import DbState
+from ..relationship import RelationshipCalculator
+from ...cli.user import User
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+
+class MapCacheTest(unittest.TestCase):
+    """
+    Compare the relationships found with stored ancestor maps with those
+    found by a new calculator.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+        cls.home = cls.db.get_default_person()
+        cls.people = sorted(cls.db.iter_people(),
+                            key=lambda person: person.gramps_id)[:300]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+
+    def relationships(self, orig_person, people):
+        calc = RelationshipCalculator()
+        return [calc.get_one_relationship(self.db, orig_person, person,
+                                          extra_info=True)
+                for person in people]
+
+    def test_batch(self):
+        calc = RelationshipCalculator()
+        self.assertEqual(calc.get_relationships(self.db, self.home,
+                                                self.people, True),
+                         self.relationships(self.home, self.people))
+        self.assertFalse(calc.map_cache)
+
+    def test_invalidate(self):
+        dbstate = DbState()
+        dbstate.change_database_noclose(self.db)
+        calc = RelationshipCalculator()
+        calc.connect_db_signals(dbstate)
+        try:
+            family = self.db.get_family_from_handle(
+                self.home.get_main_parents_family_handle())
+            father = self.db.get_person_from_handle(family.father_handle)
+            grandmother = self.db.get_person_from_handle(
+                self.db.get_family_from_handle(
+                    father.get_main_parents_family_handle()).mother_handle)
+            calc.get_one_relationship(self.db, self.home, grandmother)
+            calc.get_one_relationship(self.db, father, grandmother)
+            self.assertEqual(len(calc.map_cache), 2)
+
+            # the parents of the home person are only in its own map, and
+            # the father in both maps
+            with DbTxn("Change the parents", self.db) as trans:
+                self.db.commit_family(family, trans)
+            self.assertEqual([key[0] for key in calc.map_cache],
+                             [father.handle])
+            with DbTxn("Change the father", self.db) as trans:
+                self.db.commit_person(father, trans)
+            self.assertFalse(calc.map_cache)
+
+            self.assertEqual(calc.get_one_relationship(
+                self.db, self.home, grandmother), "stepgrandmother")
+            with DbTxn("Remove the father", self.db) as trans:
+                family.set_father_handle(None)
+                self.db.commit_family(family, trans)
+            self.assertEqual(
+                calc.get_relationships(self.db, self.home, self.people, True),
+                self.relationships(self.home, self.people))
+            self.assertEqual(calc.get_one_relationship(
+                self.db, self.home, grandmother), "")
+        finally:
+            calc.disconnect_db_signals(dbstate)
+            self.db.undo()
@@ -31,6 +31,7 @@ privacy in reports and exports.
 #
 #-------------------------------------------------------------------------
 import logging
+from array import array
 LOG = logging.getLogger(".gen.utils.alive")
 
 #-------------------------------------------------------------------------
@@ -40,6 +41,8 @@ LOG = logging.getLogger(".gen.utils.alive")
 #-------------------------------------------------------------------------
 from ..display.name import displayer as name_displayer
 from ..lib.date import Date, Today
+from ..lib.eventtype import EventType
+from ..lib.eventroletype import EventRoleType
 from ..errors import DatabaseError
 from ..const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.sgettext
@@ -467,6 +470,495 @@ class ProbablyAlive:
 
         return (None, None, "", None)
 
+#-------------------------------------------------------------------------
+#
+# ProbablyAliveRanges class
+#
+#-------------------------------------------------------------------------
+# Flags of the events
+_BIRTH = 0x01
+_DEATH = 0x02
+_BIRTH_FALLBACK = 0x04
+_DEATH_FALLBACK = 0x08
+_EMPTY = 0x10           # the date has no start date
+_VALID = 0x20           # the date is valid
+
+_NO_RANGE = (None, None, "", None)
+
+class ProbablyAliveRanges:
+    """
+    Estimated birth and death dates of all the people of a database.
+
+    The people, families and events are read once, into compact per-object
+    state indexed by integers, and the estimates of
+    :meth:`ProbablyAlive.probably_alive_range` are then computed from that
+    state rather than from the database.  The results are cached, so this
+    should only be used while the database does not change, such as during
+    a report or an export.
+    """
+
+    def __init__(self,
+                 db,
+                 max_sib_age_diff=None,
+                 max_age_prob_alive=None,
+                 avg_generation_gap=None):
+        from ..proxy.proxybase import ProxyDbBase
+        while isinstance(db, ProxyDbBase):
+            db = db.db
+        self.db = db
+        if max_sib_age_diff is None:
+            max_sib_age_diff = _MAX_SIB_AGE_DIFF
+        if max_age_prob_alive is None:
+            max_age_prob_alive = _MAX_AGE_PROB_ALIVE
+        if avg_generation_gap is None:
+            avg_generation_gap = _AVG_GENERATION_GAP
+        self.MAX_SIB_AGE_DIFF = max_sib_age_diff
+        self.MAX_AGE_PROB_ALIVE = max_age_prob_alive
+        self.AVG_GENERATION_GAP = avg_generation_gap
+        self.pset = set()
+        self._loaded = False
+        self._ranges = {}
+        self._siblings = {}
+
+    def _load(self):
+        """
+        Read the events, people and families of the database.
+
+        The serialized data is read, rather than the objects, which would
+        take most of the time.
+        """
+        self._loaded = True
+        event_flags = {}
+        def get_flag(value):
+            etype = EventType(value)
+            if etype.is_birth():
+                flag = _BIRTH
+            elif etype.is_death():
+                flag = _DEATH
+            elif etype.is_birth_fallback():
+                flag = _BIRTH_FALLBACK
+            elif etype.is_death_fallback():
+                flag = _DEATH_FALLBACK
+            else:
+                flag = 0
+            event_flags[value] = flag
+            return flag
+
+        # events: flags, year and serialized date
+        event_ids = {}
+        self._ev_flags = flags = array('B')
+        self._ev_year = years = array('i')
+        self._ev_date = dates = []
+        with self.db.get_event_cursor() as cursor:
+            for handle, data in cursor:
+                # data[2] is the type, data[3] the date
+                event_ids[handle] = len(dates)
+                date = Date()
+                if data[3]:
+                    date.unserialize(data[3])
+                flag = event_flags.get(data[2][0])
+                if flag is None:
+                    flag = get_flag(data[2][0])
+                if date.get_start_date() == Date.EMPTY:
+                    flag |= _EMPTY
+                if date.is_valid():
+                    flag |= _VALID
+                flags.append(flag)
+                years.append(date.get_year())
+                dates.append(data[3])
+
+        def event_ref(event_ref_list, index):
+            if 0 <= index < len(event_ref_list):
+                # ref[3] is the handle, ref[4] the role
+                ref = event_ref_list[index]
+                return (event_ids.get(ref[3], -1),
+                        ref[4][0] == EventRoleType.PRIMARY)
+            return None
+
+        # people: birth and death references, primary events and families
+        self._ids = person_ids = {}
+        self._handles = []
+        self._birth = []
+        self._death = []
+        self._events = []
+        self._person_families = []
+        self._parent_families = []
+        family_lists = []
+        with self.db.get_person_cursor() as cursor:
+            for handle, data in cursor:
+                # data[5] is the death reference index, data[6] the birth
+                # reference index, data[7] the event references, data[8]
+                # the families and data[9] the parent families
+                person_ids[handle] = len(self._handles)
+                self._handles.append(handle)
+                event_ref_list = data[7]
+                self._death.append(event_ref(event_ref_list, data[5]))
+                self._birth.append(event_ref(event_ref_list, data[6]))
+                self._events.append(tuple(
+                    event_ids.get(ref[3], -1) for ref in event_ref_list
+                    if ref[4][0] == EventRoleType.PRIMARY))
+                family_lists.append((data[8], data[9]))
+
+        # families: parents, children and events
+        family_ids = {}
+        self._fathers = array('i')
+        self._mothers = array('i')
+        self._children = []
+        self._family_events = []
+        with self.db.get_family_cursor() as cursor:
+            for handle, data in cursor:
+                # data[2] is the father, data[3] the mother, data[4] the
+                # child references and data[6] the event references
+                family_ids[handle] = len(self._children)
+                for parent_handle, parents in ((data[2], self._fathers),
+                                               (data[3], self._mothers)):
+                    # -1 for no parent, -2 for a missing person
+                    parents.append(person_ids.get(parent_handle, -2)
+                                   if parent_handle else -1)
+                self._children.append(tuple(
+                    person_ids.get(ref[3], -1) for ref in data[4]))
+                self._family_events.append(tuple(
+                    event_ids.get(ref[3], -1) for ref in data[6]))
+
+        for families, parent_families in family_lists:
+            self._person_families.append(tuple(
+                family_ids.get(handle, -1) for handle in families))
+            self._parent_families.append(tuple(
+                family_ids.get(handle, -1) for handle in parent_families))
+
+    def _date(self, event):
+        """
+        Return a new Date object for the date of an event.
+        """
+        date = Date()
+        if self._ev_date[event]:
+            date.unserialize(self._ev_date[event])
+        return date
+
+    def get_range(self, handle):
+        """
+        Return the estimated (birth_date, death_date, explain_text,
+        related_person_handle) of a person.
+        """
+        if not self._loaded:
+            self._load()
+        result = self._ranges.get(handle)
+        if result is None:
+            person = self._ids.get(handle)
+            if person is None:
+                return _NO_RANGE
+            date1, date2, explain, other = self._range(person)
+            if other is not None:
+                other = self._handles[other]
+            result = self._ranges[handle] = (date1, date2, explain, other)
+        return result
+
+    def probably_alive_range(self, person):
+        """
+        Return the estimated (birth_date, death_date, explain_text,
+        related_person) of a person, as :func:`probably_alive_range` does.
+        """
+        if person is None:
+            return _NO_RANGE
+        date1, date2, explain, other = self.get_range(person.handle)
+        if other is not None:
+            other = self.db.get_person_from_handle(other)
+        return (date1, date2, explain, other)
+
+    def probably_alive(self, person, current_date=None, limit=0,
+                       return_range=False):
+        """
+        Return true if the person may be alive on current_date, as
+        :func:`probably_alive` does.
+        """
+        birth, death, explain, relative = self.get_range(person.handle)
+        if return_range and relative is not None:
+            relative = self.db.get_person_from_handle(relative)
+        return _alive_on(birth, death, explain, relative, current_date,
+                         limit, return_range)
+
+    def _range(self, person, is_spouse=False):
+        """
+        Compute the range of a person, in the same order and with the same
+        results as :meth:`ProbablyAlive.probably_alive_range`.
+        """
+        self.pset = set()
+        flags = self._ev_flags
+        death_date = None
+        birth_date = None
+        explain = ""
+
+        death_ref = self._death[person]
+        if death_ref and death_ref[1] and death_ref[0] >= 0:
+            death_date = self._date(death_ref[0])
+
+        if not death_date:
+            for event in self._events[person]:
+                if event >= 0 and flags[event] & _DEATH_FALLBACK:
+                    death_date = self._date(event)
+                    if not flags[event] & _VALID:
+                        death_date = Today() # before today
+                        death_date.set_modifier(Date.MOD_BEFORE)
+
+        birth_ref = self._birth[person]
+        if birth_ref and birth_ref[1] and birth_ref[0] >= 0:
+            if not flags[birth_ref[0]] & _EMPTY:
+                birth_date = self._date(birth_ref[0])
+
+        if not birth_date:
+            for event in self._events[person]:
+                if event >= 0 and flags[event] & _BIRTH_FALLBACK:
+                    birth_date = self._date(event)
+
+        if not birth_date and death_date:
+            if death_date.is_valid():
+                birth_date = death_date.copy_offset_ymd(year=-self.MAX_AGE_PROB_ALIVE)
+            explain = _("death date")
+
+        if not death_date and birth_date:
+            death_date = birth_date.copy_offset_ymd(year=self.MAX_AGE_PROB_ALIVE)
+            explain = _("birth date")
+
+        if death_date and birth_date:
+            return (birth_date, death_date, explain, person)
+
+        for family in self._parent_families[person]:
+            if family < 0:
+                continue
+            result = self._siblings.get(family)
+            if result is None:
+                result = self._siblings[family] = self._sibling_range(family)
+            if result is not _NO_RANGE:
+                return result
+
+        if not is_spouse:
+            result = self._spouse_range(person)
+            if result is not None:
+                return result
+
+        try:
+            date1, date2, explain, other = self._descendants_too_old(
+                person, self.AVG_GENERATION_GAP)
+        except RuntimeError:
+            raise DatabaseError(
+                _("Database error: loop in %s's descendants") %
+                self._name(person))
+        if date1 and date2:
+            return (date1, date2, explain, other)
+
+        try:
+            date1, date2, explain, other = self._ancestors_too_old(
+                person, - self.AVG_GENERATION_GAP)
+        except RuntimeError:
+            raise DatabaseError(
+                _("Database error: loop in %s's ancestors") %
+                self._name(person))
+        if date1 and date2:
+            return (date1, date2, explain, other)
+
+        return _NO_RANGE
+
+    def _name(self, person):
+        return name_displayer.display(
+            self.db.get_person_from_handle(self._handles[person]))
+
+    def _sibling_range(self, family):
+        """
+        Return the range given by the first child of a family with a birth
+        or death date.
+        """
+        flags = self._ev_flags
+        years = self._ev_year
+        for child in self._children[family]:
+            if child < 0:
+                continue
+            # Go through once looking for direct evidence:
+            for event in self._events[child]:
+                if event < 0:
+                    continue
+                flag = flags[event]
+                if flag & (_BIRTH | _DEATH) and not flag & _EMPTY:
+                    year = years[event]
+                    if year == 0:
+                        continue
+                    if flag & _BIRTH:
+                        return (Date().copy_ymd(year - self.MAX_SIB_AGE_DIFF),
+                                Date().copy_ymd(year - self.MAX_SIB_AGE_DIFF + self.MAX_AGE_PROB_ALIVE),
+                                _("sibling birth date"),
+                                child)
+                    return (Date().copy_ymd(year - self.MAX_SIB_AGE_DIFF - self.MAX_AGE_PROB_ALIVE),
+                            Date().copy_ymd(year - self.MAX_SIB_AGE_DIFF),
+                            _("sibling death date"),
+                            child)
+            # Go through again looking for fallback:
+            for event in self._events[child]:
+                if event < 0:
+                    continue
+                flag = flags[event]
+                if (flag & (_BIRTH_FALLBACK | _DEATH_FALLBACK)
+                        and not flag & _EMPTY):
+                    year = years[event]
+                    if year == 0:
+                        continue
+                    if flag & _BIRTH_FALLBACK:
+                        return (Date().copy_ymd(year - self.MAX_SIB_AGE_DIFF),
+                                Date().copy_ymd(year - self.MAX_SIB_AGE_DIFF + self.MAX_AGE_PROB_ALIVE),
+                                _("sibling birth-related date"),
+                                child)
+                    return (Date().copy_ymd(year - self.MAX_SIB_AGE_DIFF - self.MAX_AGE_PROB_ALIVE),
+                            Date().copy_ymd(year - self.MAX_SIB_AGE_DIFF),
+                            _("sibling death-related date"),
+                            child)
+        return _NO_RANGE
+
+    def _spouse_range(self, person):
+        """
+        Return the range given by the spouses and the family events of a
+        person, or None.
+        """
+        for family in self._person_families[person]:
+            if family < 0:
+                continue
+            father = self._fathers[family]
+            mother = self._mothers[family]
+            spouse = None
+            if mother == person and father != -1:
+                spouse = father
+            elif father == person and mother != -1:
+                spouse = mother
+            if spouse is not None:
+                if spouse >= 0:
+                    date1, date2, explain, other = self._range(
+                        spouse, is_spouse=True)
+                else:
+                    date1, date2, explain, other = _NO_RANGE
+                if date1 and date1.get_year() != 0:
+                    return (Date().copy_ymd(date1.get_year() - self.AVG_GENERATION_GAP),
+                            Date().copy_ymd(date1.get_year() - self.AVG_GENERATION_GAP + self.MAX_AGE_PROB_ALIVE),
+                            _("a spouse's birth-related date, ") + explain, other)
+                elif date2 and date2.get_year() != 0:
+                    return (Date().copy_ymd(date2.get_year() + self.AVG_GENERATION_GAP - self.MAX_AGE_PROB_ALIVE),
+                            Date().copy_ymd(date2.get_year() + self.AVG_GENERATION_GAP),
+                            _("a spouse's death-related date, ") + explain, other)
+            # Let's check the family events and see if we find something
+            for event in self._family_events[family]:
+                if event < 0:
+                    continue
+                year = self._ev_year[event]
+                if year != 0:
+                    other = spouse if spouse is not None and spouse >= 0 else None
+                    return (Date().copy_ymd(year - self.AVG_GENERATION_GAP),
+                            Date().copy_ymd(year - self.AVG_GENERATION_GAP +
+                                            self.MAX_AGE_PROB_ALIVE),
+                            _("event with spouse"), other)
+        return None
+
+    def _descendants_too_old(self, person, years):
+        if person in self.pset:
+            return _NO_RANGE
+        self.pset.add(person)
+        flags = self._ev_flags
+        for family in self._person_families[person]:
+            if family < 0:
+                continue
+            for child in self._children[family]:
+                if child < 0:
+                    continue
+                child_birth_ref = self._birth[child]
+                if child_birth_ref and child_birth_ref[0] >= 0:
+                    event = child_birth_ref[0]
+                    if not flags[event] & _EMPTY:
+                        d = self._date(event)
+                        d.set_year(d.get_year() - years)
+                        return (d, d.copy_offset_ymd(self.MAX_AGE_PROB_ALIVE),
+                                _("descendant birth date"),
+                                child)
+                child_death_ref = self._death[child]
+                if child_death_ref and child_death_ref[0] >= 0:
+                    event = child_death_ref[0]
+                    if not flags[event] & _EMPTY:
+                        dobj = self._date(event)
+                        return (dobj.copy_offset_ymd(- self.AVG_GENERATION_GAP),
+                                dobj.copy_offset_ymd(- self.AVG_GENERATION_GAP + self.MAX_AGE_PROB_ALIVE),
+                                _("descendant death date"),
+                                child)
+                date1, date2, explain, other = self._descendants_too_old(
+                    child, years + self.AVG_GENERATION_GAP)
+                if date1 and date2:
+                    return date1, date2, explain, other
+                # Check fallback data:
+                for event in self._events[child]:
+                    if event < 0 or flags[event] & _EMPTY:
+                        continue
+                    if flags[event] & _BIRTH_FALLBACK:
+                        d = self._date(event)
+                        d.set_year(d.get_year() - years)
+                        return (d, d.copy_offset_ymd(self.MAX_AGE_PROB_ALIVE),
+                                _("descendant birth-related date"),
+                                child)
+                    elif flags[event] & _DEATH_FALLBACK:
+                        dobj = self._date(event)
+                        return (dobj.copy_offset_ymd(- self.AVG_GENERATION_GAP),
+                                dobj.copy_offset_ymd(- self.AVG_GENERATION_GAP + self.MAX_AGE_PROB_ALIVE),
+                                _("descendant death-related date"),
+                                child)
+        return _NO_RANGE
+
+    def _ancestors_too_old(self, person, year):
+        if person in self.pset:
+            return _NO_RANGE
+        self.pset.add(person)
+        families = self._parent_families[person]
+        if not families:
+            return _NO_RANGE
+        family = families[0]
+        if family < 0:
+            return _NO_RANGE
+        flags = self._ev_flags
+        for parent in (self._fathers[family], self._mothers[family]):
+            if parent < 0:
+                continue
+            birth_ref = self._birth[parent]
+            if birth_ref and birth_ref[1] and birth_ref[0] >= 0:
+                if not flags[birth_ref[0]] & _EMPTY:
+                    dobj = self._date(birth_ref[0])
+                    return (dobj.copy_offset_ymd(- year),
+                            dobj.copy_offset_ymd(- year + self.MAX_AGE_PROB_ALIVE),
+                            _("ancestor birth date"),
+                            parent)
+            death_ref = self._death[parent]
+            if death_ref and death_ref[1] and death_ref[0] >= 0:
+                if not flags[death_ref[0]] & _EMPTY:
+                    dobj = self._date(death_ref[0])
+                    return (dobj.copy_offset_ymd(- year - self.MAX_AGE_PROB_ALIVE),
+                            dobj.copy_offset_ymd(- year),
+                            _("ancestor death date"),
+                            parent)
+
+            # Check fallback data:
+            for event in self._events[parent]:
+                if event < 0 or flags[event] & _EMPTY:
+                    continue
+                if flags[event] & _BIRTH_FALLBACK:
+                    dobj = self._date(event)
+                    return (dobj.copy_offset_ymd(- year),
+                            dobj.copy_offset_ymd(- year + self.MAX_AGE_PROB_ALIVE),
+                            _("ancestor birth-related date"),
+                            parent)
+                elif flags[event] & _DEATH_FALLBACK:
+                    dobj = self._date(event)
+                    return (dobj.copy_offset_ymd(- year - self.MAX_AGE_PROB_ALIVE),
+                            dobj.copy_offset_ymd(- year),
+                            _("ancestor death-related date"),
+                            parent)
+
+            date1, date2, explain, other = self._ancestors_too_old(
+                parent, year - self.AVG_GENERATION_GAP)
+            if date1 and date2:
+                return date1, date2, explain, other
+
+        return _NO_RANGE
+
 #-------------------------------------------------------------------------
 #
 # probably_alive
@@ -497,11 +989,20 @@ def probably_alive(person, db,
     # for determining alive status:
     birth, death, explain, relative = probably_alive_range(person, db,
             max_sib_age_diff, max_age_prob_alive, avg_generation_gap)
-    if current_date is None:
-        current_date = Today()
     LOG.debug("%s: b.%s, d.%s - %s".format(
         " ".join(person.get_primary_name().get_text_data_list()),
         birth, death, explain))
+    return _alive_on(birth, death, explain, relative, current_date, limit,
+                     return_range)
+
+def _alive_on(birth, death, explain, relative, current_date, limit,
+              return_range):
+    """
+    Return true if current_date is within the estimated birth and death
+    dates, as returned by probably_alive_range.
+    """
+    if current_date is None:
+        current_date = Today()
     if not birth or not death:
         # no evidence, must consider alive
         return ((True, None, None, _("no evidence"), None) if return_range
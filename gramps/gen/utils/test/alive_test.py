@@ -0,0 +1,93 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest for the probably alive estimates.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from ...const import DATA_DIR
+from ...db.utils import import_as_dict
+from ...lib import Date
+from ...proxy import LivingProxyDb
+from ..alive import probably_alive, probably_alive_range, ProbablyAliveRanges
+from ....cli.user import User
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+
+def serialize(date):
+    return None if date is None else date.serialize()
+
+class ProbablyAliveRangesTest(unittest.TestCase):
+    """
+    Compare the estimates computed for all people with those computed one
+    person at a time.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+
+    def test_ranges(self):
+        ranges = ProbablyAliveRanges(self.db)
+        for person in self.db.iter_people():
+            expected = probably_alive_range(person, self.db)
+            result = ranges.probably_alive_range(person)
+            self.assertEqual(serialize(result[0]), serialize(expected[0]))
+            self.assertEqual(serialize(result[1]), serialize(expected[1]))
+            self.assertEqual(result[2], expected[2])
+            self.assertEqual(result[3] and result[3].handle,
+                             expected[3] and expected[3].handle)
+
+    def test_probably_alive(self):
+        ranges = ProbablyAliveRanges(self.db)
+        date = Date(1900, 1, 1)
+        for person in self.db.iter_people():
+            self.assertEqual(ranges.probably_alive(person, date, 5),
+                             probably_alive(person, self.db, date, 5))
+
+    def test_living_proxy(self):
+        proxy = LivingProxyDb(self.db, LivingProxyDb.MODE_EXCLUDE_ALL)
+        expected = set(person.handle for person in self.db.iter_people()
+                       if not probably_alive(person, self.db))
+        self.assertEqual(set(person.handle for person in proxy.iter_people()),
+                         expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
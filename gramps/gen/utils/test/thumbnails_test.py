@@ -0,0 +1,200 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Thumbnail cache tests.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from hashlib import md5
+from unittest.mock import patch
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from ...config import config
+from .. import thumbnails
+
+# the private functions of the module, whose names would be mangled in the
+# class below
+get_digest = getattr(thumbnails, '__get_digest')
+save_index = getattr(thumbnails, '__save_index')
+build_thumb_path = getattr(thumbnails, '__build_thumb_path')
+add_to_cache = getattr(thumbnails, '__add_to_cache')
+
+#-------------------------------------------------------------------------
+#
+# ThumbnailsTest class
+#
+#-------------------------------------------------------------------------
+class ThumbnailsTest(unittest.TestCase):
+    """
+    Thumbnail cache tests, in a temporary thumbnail directory.
+    """
+
+    def setUp(self):
+        self.thumb_dir = tempfile.mkdtemp()
+        normal = os.path.join(self.thumb_dir, 'normal')
+        large = os.path.join(self.thumb_dir, 'large')
+        os.mkdir(normal)
+        os.mkdir(large)
+        patches = (
+            patch.object(thumbnails, 'THUMB_DIR', self.thumb_dir),
+            patch.object(thumbnails, 'THUMB_NORMAL', normal),
+            patch.object(thumbnails, 'THUMB_LARGE', large),
+            patch.object(thumbnails, 'INDEX_FILE',
+                         os.path.join(self.thumb_dir, 'index.json')),
+            patch.object(thumbnails, '_DIGESTS', None),
+            # the index is saved by the tests, not at exit
+            patch.object(thumbnails, '_DIGESTS_CHANGED', True),
+            patch.object(thumbnails, '_CACHE_SIZE', None))
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        cache_size = config.get('behavior.thumbnail-cache-size')
+        self.addCleanup(config.set, 'behavior.thumbnail-cache-size',
+                        cache_size)
+        self.addCleanup(shutil.rmtree, self.thumb_dir)
+
+    def write(self, path, content, mtime=None):
+        """
+        Write a file, with the given modification time.
+        """
+        with open(path, 'wb') as out:
+            out.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_digest(self):
+        """
+        Test that the digest is only computed when the size or modification
+        time of the file changed.
+        """
+        src = self.write(os.path.join(self.thumb_dir, 'photo.jpg'),
+                         b'first', 1000000)
+        first = md5(b'first').hexdigest()
+        self.assertEqual(get_digest(src), first)
+        # same size and modification time: the digest is reused
+        self.write(src, b'other', 1000000)
+        self.assertEqual(get_digest(src), first)
+        # new modification time
+        self.write(src, b'other', 2000000)
+        self.assertEqual(get_digest(src), md5(b'other').hexdigest())
+        # new size
+        self.write(src, b'longer', 2000000)
+        self.assertEqual(get_digest(src), md5(b'longer').hexdigest())
+
+    def test_index(self):
+        """
+        Test that the digests are saved for the files which still exist,
+        and reused by the next session.
+        """
+        src = self.write(os.path.join(self.thumb_dir, 'photo.jpg'),
+                         b'first', 1000000)
+        gone = self.write(os.path.join(self.thumb_dir, 'gone.jpg'), b'gone')
+        get_digest(src)
+        get_digest(gone)
+        os.remove(gone)
+        save_index()
+        with open(thumbnails.INDEX_FILE, encoding='utf-8') as index_file:
+            self.assertEqual(list(json.load(index_file)), [src])
+        # a new session reads the index
+        thumbnails._DIGESTS = None
+        self.write(src, b'other', 1000000)
+        self.assertEqual(get_digest(src), md5(b'first').hexdigest())
+
+    def test_thumb_path(self):
+        """
+        Test the names of the thumbnails, with and without a rectangle.
+        """
+        digest = md5(b'first').hexdigest()
+        self.assertEqual(build_thumb_path(digest),
+                         os.path.join(thumbnails.THUMB_NORMAL,
+                                      digest + '.png'))
+        self.assertEqual(build_thumb_path(digest, [10, 20, 30, 40]),
+                         os.path.join(thumbnails.THUMB_NORMAL,
+                                      digest + '-10,20-30,40.png'))
+        self.assertEqual(build_thumb_path(digest, (0, 0, 50, 50),
+                                          thumbnails.SIZE_LARGE),
+                         os.path.join(thumbnails.THUMB_LARGE,
+                                      digest + '-0,0-50,50.png'))
+        self.assertNotEqual(build_thumb_path(digest, (10, 20, 30, 40)),
+                            build_thumb_path(digest, (10, 20, 30, 41)))
+
+    def add_thumb(self, number):
+        """
+        Write a thumbnail of 300 KiB, used at the time given by its number.
+        """
+        return self.write(
+            os.path.join(thumbnails.THUMB_NORMAL, '%d.png' % number),
+            b'x' * (300 * 1024), 1000000 + number)
+
+    def remaining(self):
+        """
+        Return the names of the thumbnails in the cache.
+        """
+        return sorted(os.listdir(thumbnails.THUMB_NORMAL))
+
+    def test_eviction(self):
+        """
+        Test that the least recently used thumbnails are removed down to
+        three quarters of the size limit.
+        """
+        config.set('behavior.thumbnail-cache-size', 1)
+        for number in range(5):
+            path = self.add_thumb(number)
+        # the cache is measured on first use: 1500 KiB is over 1 MiB
+        add_to_cache(path)
+        self.assertEqual(self.remaining(), ['3.png', '4.png'])
+        self.assertEqual(thumbnails._CACHE_SIZE, 600 * 1024)
+        # 900 KiB is under the limit
+        add_to_cache(self.add_thumb(5))
+        self.assertEqual(self.remaining(), ['3.png', '4.png', '5.png'])
+        # 1200 KiB is over it, and 600 KiB is under 768 KiB
+        os.utime(os.path.join(thumbnails.THUMB_NORMAL, '3.png'),
+                 (1000010, 1000010))
+        add_to_cache(self.add_thumb(6))
+        self.assertEqual(self.remaining(), ['3.png', '6.png'])
+        self.assertEqual(thumbnails._CACHE_SIZE, 600 * 1024)
+
+    def test_no_limit(self):
+        """
+        Test that nothing is removed when the cache size is not limited.
+        """
+        config.set('behavior.thumbnail-cache-size', 0)
+        for number in range(5):
+            path = self.add_thumb(number)
+        add_to_cache(path)
+        self.assertEqual(len(self.remaining()), 5)
+
+if __name__ == "__main__":
+    unittest.main()
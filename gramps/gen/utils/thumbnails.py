@@ -28,7 +28,11 @@ Handles generation and access to thumbnails used in Gramps.
 #
 #-------------------------------------------------------------------------
 import os
+import atexit
+import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import md5
 
 #-------------------------------------------------------------------------
@@ -50,8 +54,10 @@ except:
 # gramps modules
 #
 #-------------------------------------------------------------------------
-from gramps.gen.const import (ICON, IMAGE_DIR, THUMB_LARGE, THUMB_NORMAL,
-                              THUMBSCALE, THUMBSCALE_LARGE, USE_THUMBNAILER)
+from gramps.gen.config import config
+from gramps.gen.const import (ICON, IMAGE_DIR, THUMB_DIR, THUMB_LARGE,
+                              THUMB_NORMAL, THUMBSCALE, THUMBSCALE_LARGE,
+                              USE_THUMBNAILER)
 from gramps.gen.constfunc import win
 
 #-------------------------------------------------------------------------
@@ -81,6 +87,39 @@ LOG = logging.getLogger(".thumbnail")
 SIZE_NORMAL = 0
 SIZE_LARGE = 1
 
+# Number of threads creating the thumbnails in the background
+THREADS = min(4, os.cpu_count() or 1)
+
+# Content digests of the source files, by path: [size, mtime, digest]
+INDEX_FILE = os.path.join(THUMB_DIR, "index.json")
+
+#-------------------------------------------------------------------------
+#
+# Cache state, shared by the threads
+#
+#-------------------------------------------------------------------------
+_LOCK = threading.RLock()
+_POOL = None
+_POOL_PID = None
+_PENDING = {}           # (src_file, rectangle, size): future of the path
+_DIGESTS = None         # loaded from INDEX_FILE on first use
+_DIGESTS_CHANGED = False
+_CACHE_SIZE = None      # total size of the thumbnails, in bytes
+
+def __after_fork():
+    """
+    Reset the lock in a forked process, where the threads which could hold
+    it do not exist.
+    """
+    global _LOCK
+    _LOCK = threading.RLock()
+    _PENDING.clear()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(before=lambda: _LOCK.acquire(),
+                        after_in_parent=lambda: _LOCK.release(),
+                        after_in_child=__after_fork)
+
 #-------------------------------------------------------------------------
 #
 # __get_gconf_string
@@ -123,43 +162,179 @@ def __get_gconf_bool(key):
         val = None
     return val
 
+#-------------------------------------------------------------------------
+#
+# __load_index
+#
+#-------------------------------------------------------------------------
+def __load_index():
+    """
+    Read the content digests of the source files found by earlier sessions.
+
+    :returns: the [size, mtime, digest] of each source file, by path
+    :rtype: dict
+    """
+    try:
+        with open(INDEX_FILE, encoding='utf-8') as index_file:
+            return json.load(index_file)
+    except (IOError, OSError, ValueError) as err:
+        LOG.debug("No thumbnail index: %s", str(err))
+        return {}
+
+#-------------------------------------------------------------------------
+#
+# __save_index
+#
+#-------------------------------------------------------------------------
+def __save_index():
+    """
+    Write the content digests of the source files which still exist, for
+    the next sessions.
+    """
+    with _LOCK:
+        digests = dict((path, entry) for path, entry in _DIGESTS.items()
+                       if os.path.isfile(path))
+    temp = "%s.%d.tmp" % (INDEX_FILE, os.getpid())
+    try:
+        with open(temp, 'w', encoding='utf-8') as index_file:
+            json.dump(digests, index_file)
+        os.replace(temp, INDEX_FILE)
+    except (IOError, OSError) as err:
+        LOG.warning("Could not write the thumbnail index: %s", str(err))
+
+#-------------------------------------------------------------------------
+#
+# __get_digest
+#
+#-------------------------------------------------------------------------
+def __get_digest(src_file):
+    """
+    Return the MD5SUM value of the content of a file. It is only read again
+    if its size or modification time changed since it was last read, also
+    in an earlier session.
+
+    :param src_file: filename of the source file
+    :type src_file: unicode
+    :rtype: unicode
+    :returns: hexadecimal digest of the content of the file
+    """
+    global _DIGESTS, _DIGESTS_CHANGED
+    stat = os.stat(src_file)
+    with _LOCK:
+        if _DIGESTS is None:
+            _DIGESTS = __load_index()
+        entry = _DIGESTS.get(src_file)
+    if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime:
+        return entry[2]
+    md5_hash = md5()
+    with open(src_file, 'rb') as src:
+        for block in iter(lambda: src.read(1 << 16), b''):
+            md5_hash.update(block)
+    digest = md5_hash.hexdigest()
+    with _LOCK:
+        _DIGESTS[src_file] = [stat.st_size, stat.st_mtime, digest]
+        if not _DIGESTS_CHANGED:
+            _DIGESTS_CHANGED = True
+            atexit.register(__save_index)
+    return digest
+
 #-------------------------------------------------------------------------
 #
 # __build_thumb_path
 #
 #-------------------------------------------------------------------------
-def __build_thumb_path(path, rectangle=None, size=SIZE_NORMAL):
+def __build_thumb_path(digest, rectangle=None, size=SIZE_NORMAL):
     """
-    Convert the specified path into a corresponding path for the thumbnail
-    image. We do this by converting the original path into an MD5SUM value
-    (which should be unique), adding the '.png' extension, and prepending
-    with the Gramps thumbnail directory.
+    Return the path of the thumbnail image of a file with the given content.
+    The thumbnails are named after the MD5SUM value of the content of the
+    source file, followed by the subsection rectangle, so a file which is
+    renamed or moved keeps its thumbnails.
 
-    :type path: unicode
-    :param path: filename of the source file
+    :type digest: unicode
+    :param digest: MD5SUM value of the content of the source file
     :type rectangle: tuple
     :param rectangle: subsection rectangle
     :rtype: unicode
     :returns: full path name to the corresponding thumbnail file.
     """
-    extra = ""
+    name = digest
     if rectangle is not None:
-        extra = "?" + str(rectangle)
-    prehash = path + extra
-    prehash = prehash.encode('utf-8')
-    md5_hash = md5(prehash)
+        name += "-%d,%d-%d,%d" % tuple(rectangle)
     if size == SIZE_LARGE:
         base_dir = THUMB_LARGE
     else:
         base_dir = THUMB_NORMAL
-    return os.path.join(base_dir, md5_hash.hexdigest()+'.png')
+    return os.path.join(base_dir, name + '.png')
+
+#-------------------------------------------------------------------------
+#
+# __list_cache
+#
+#-------------------------------------------------------------------------
+def __list_cache():
+    """
+    Return the (modification time, size, path) of every thumbnail image.
+    """
+    thumbs = []
+    for base_dir in (THUMB_NORMAL, THUMB_LARGE):
+        try:
+            names = os.listdir(base_dir)
+        except OSError:
+            continue
+        for name in names:
+            if name.endswith('.png'):
+                path = os.path.join(base_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                thumbs.append((stat.st_mtime, stat.st_size, path))
+    return thumbs
+
+#-------------------------------------------------------------------------
+#
+# __add_to_cache
+#
+#-------------------------------------------------------------------------
+def __add_to_cache(filename):
+    """
+    Count a new thumbnail image in the size of the cache. If the cache gets
+    larger than the 'behavior.thumbnail-cache-size' option, in megabytes,
+    the least recently used thumbnails are removed until it is back to
+    three quarters of it.
+
+    :param filename: path of the new thumbnail image
+    :type filename: unicode
+    """
+    global _CACHE_SIZE
+    limit = config.get('behavior.thumbnail-cache-size') * 1024 * 1024
+    with _LOCK:
+        if _CACHE_SIZE is None:
+            _CACHE_SIZE = sum(size for dummy, size, dummy in __list_cache())
+        else:
+            try:
+                _CACHE_SIZE += os.path.getsize(filename)
+            except OSError:
+                pass
+        if limit <= 0 or _CACHE_SIZE <= limit:
+            return
+        # thumbnails are touched when used: the oldest were used least
+        # recently
+        for dummy, size, path in sorted(__list_cache()):
+            if _CACHE_SIZE <= limit * 3 // 4:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            _CACHE_SIZE -= size
 
 #-------------------------------------------------------------------------
 #
 # __create_thumbnail_image
 #
 #-------------------------------------------------------------------------
-def __create_thumbnail_image(src_file, mtype=None, rectangle=None,
+def __create_thumbnail_image(src_file, filename, mtype=None, rectangle=None,
                              size=SIZE_NORMAL):
     """
     Generates the thumbnail image for a file. If the mime type is specified,
@@ -167,8 +342,13 @@ def __create_thumbnail_image(src_file, mtype=None, rectangle=None,
     utility to create a thumbnail. For images, we simply create a smaller
     image, scaled to thumbnail size.
 
+    The image is written to a temporary file first, so other threads and
+    processes never read a partial thumbnail.
+
     :param src_file: filename of the source file
     :type src_file: unicode
+    :param filename: filename of the thumbnail image
+    :type filename: unicode
     :param mtype: mime type of the specified file (optional)
     :type mtype: unicode
     :param rectangle: subsection rectangle
@@ -176,11 +356,11 @@ def __create_thumbnail_image(src_file, mtype=None, rectangle=None,
     :rtype: bool
     :returns: True is the thumbnailwas successfully generated
     """
-    filename = __build_thumb_path(src_file, rectangle, size)
+    temp = "%s.%d-%d.tmp" % (filename, os.getpid(), threading.get_ident())
 
     if mtype and not mtype.startswith('image/'):
         # Not an image, so run the thumbnailer
-        return run_thumbnailer(mtype, src_file, filename)
+        created = run_thumbnailer(mtype, src_file, temp)
     else:
         # build a thumbnail by scaling the image using GTK's built in
         # routines.
@@ -214,11 +394,21 @@ def __create_thumbnail_image(src_file, mtype=None, rectangle=None,
 
             pixbuf = pixbuf.scale_simple(scaled_width, scaled_height,
                                          GdkPixbuf.InterpType.BILINEAR)
-            pixbuf.savev(filename, "png", "", "")
-            return True
+            pixbuf.savev(temp, "png", "", "")
+            created = True
         except Exception as err:
             LOG.warning("Error scaling image down: %s", str(err))
-            return False
+            created = False
+
+    try:
+        if created:
+            os.replace(temp, filename)
+        elif os.path.exists(temp):
+            os.remove(temp)
+    except OSError as err:
+        LOG.warning("Error saving thumbnail: %s", str(err))
+        return False
+    return created
 
 #-------------------------------------------------------------------------
 #
@@ -291,6 +481,102 @@ def run_thumbnailer(mime_type, src_file, dest_file, size=SIZE_NORMAL):
             return os.spawnvpe(os.P_WAIT, cmdlist[0], cmdlist, os.environ) == 0
     return False
 
+#-------------------------------------------------------------------------
+#
+# __make_thumbnail
+#
+#-------------------------------------------------------------------------
+def __make_thumbnail(src_file, mtype, rectangle, size):
+    """
+    Return the path to the thumbnail image of an existing source file,
+    creating it if it is not in the cache. Thumbnails found in the cache
+    are touched, to mark them as recently used.
+
+    :param src_file: Source media file
+    :type src_file: unicode
+    :param mime_type: mime type of the source file
+    :type mime_type: unicode
+    :param rectangle: subsection rectangle
+    :type rectangle: tuple
+    :returns: path to the thumbnail image
+    :rtype: unicode
+    """
+    try:
+        filename = __build_thumb_path(__get_digest(src_file), rectangle,
+                                      size)
+    except (IOError, OSError) as err:
+        LOG.warning("Error reading media file: %s", str(err))
+        return os.path.join(IMAGE_DIR, "document.png")
+    if os.path.isfile(filename):
+        try:
+            os.utime(filename, None)
+        except OSError:
+            pass
+        return os.path.abspath(filename)
+    if not __create_thumbnail_image(src_file, filename, mtype, rectangle,
+                                    size):
+        return os.path.join(IMAGE_DIR, "document.png")
+    __add_to_cache(filename)
+    return os.path.abspath(filename)
+
+#-------------------------------------------------------------------------
+#
+# __submit
+#
+#-------------------------------------------------------------------------
+def __submit(src_file, mtype, rectangle, size):
+    """
+    Start creating a thumbnail in the background, unless it is already
+    being created.
+
+    :returns: future of the path to the thumbnail image
+    :rtype: concurrent.futures.Future
+    """
+    global _POOL, _POOL_PID
+    if rectangle is not None:
+        rectangle = tuple(rectangle)
+    key = (src_file, rectangle, size)
+    with _LOCK:
+        if _POOL_PID != os.getpid():
+            # a forked process does not have the threads of its parent
+            _POOL = ThreadPoolExecutor(THREADS)
+            _POOL_PID = os.getpid()
+            _PENDING.clear()
+        future = _PENDING.get(key)
+        if future is None:
+            future = _POOL.submit(__make_thumbnail, src_file, mtype,
+                                  rectangle, size)
+            _PENDING[key] = future
+            future.add_done_callback(lambda done: __forget(key, done))
+    return future
+
+def __forget(key, future):
+    """
+    Forget a thumbnail created in the background.
+    """
+    with _LOCK:
+        if _PENDING.get(key) is future:
+            del _PENDING[key]
+
+#-------------------------------------------------------------------------
+#
+# __load_thumbnail_image
+#
+#-------------------------------------------------------------------------
+def __load_thumbnail_image(filename, mtype):
+    """
+    Return the thumbnail image at the given path, or the icon for the mime
+    type if it cannot be loaded.
+    """
+    try:
+        return GdkPixbuf.Pixbuf.new_from_file(filename)
+    except (GLib.GError, OSError):
+        if mtype:
+            return find_mime_type_pixbuf(mtype)
+        else:
+            default = os.path.join(IMAGE_DIR, "document.png")
+            return GdkPixbuf.Pixbuf.new_from_file(default)
+
 #-------------------------------------------------------------------------
 #
 # get_thumbnail_image
@@ -303,8 +589,8 @@ def get_thumbnail_image(src_file, mtype=None, rectangle=None, size=SIZE_NORMAL):
     the associated icon for the mime type is returned, or if that cannot be
     found, a generic document icon is returned.
 
-    The image is not generated every time, but only if the thumbnail does not
-    exist, or if the source file is newer than the thumbnail.
+    The image is not generated every time, but only if there is no
+    thumbnail of the content of the file in the cache.
 
     :param src_file: Source media file
     :type src_file: unicode
@@ -315,15 +601,8 @@ def get_thumbnail_image(src_file, mtype=None, rectangle=None, size=SIZE_NORMAL):
     :returns: thumbnail representing the source file
     :rtype: GdkPixbuf.Pixbuf
     """
-    try:
-        filename = get_thumbnail_path(src_file, mtype, rectangle, size)
-        return GdkPixbuf.Pixbuf.new_from_file(filename)
-    except (GLib.GError, OSError):
-        if mtype:
-            return find_mime_type_pixbuf(mtype)
-        else:
-            default = os.path.join(IMAGE_DIR, "document.png")
-            return GdkPixbuf.Pixbuf.new_from_file(default)
+    return __load_thumbnail_image(
+        get_thumbnail_path(src_file, mtype, rectangle, size), mtype)
 
 #-------------------------------------------------------------------------
 #
@@ -333,8 +612,19 @@ def get_thumbnail_image(src_file, mtype=None, rectangle=None, size=SIZE_NORMAL):
 def get_thumbnail_path(src_file, mtype=None, rectangle=None, size=SIZE_NORMAL):
     """
     Return the path to the thumbnail image associated with the
-    source file passed to the function. If the thumbnail does not exist,
-    or if it is older than the source file, we create a new thumbnail image.
+    source file passed to the function. If there is no thumbnail of the
+    content of the file in the cache, we create a new thumbnail image.
+
+    If the thumbnail is being created in the background, we wait for it,
+    otherwise it is created by the calling thread.
+
+    The cache is indexed by the MD5SUM value of the content of the source
+    file, so the first time a file is seen, and each time its size or
+    modification time changes, the whole file is read by the calling thread,
+    even if its thumbnail is in the cache. For large files, such as videos,
+    this blocks the main loop for as long as reading the file takes: the GUI
+    should rather use request_thumbnail_images, which reads the file in the
+    background.
 
     :param src_file: Source media file
     :type src_file: unicode
@@ -342,15 +632,97 @@ def get_thumbnail_path(src_file, mtype=None, rectangle=None, size=SIZE_NORMAL):
     :type mime_type: unicode
     :param rectangle: subsection rectangle
     :type rectangle: tuple
-    :returns: thumbnail representing the source file
-    :rtype: GdkPixbuf.Pixbuf
+    :returns: path to the thumbnail image
+    :rtype: unicode
     """
-    filename = __build_thumb_path(src_file, rectangle, size)
     if not os.path.isfile(src_file):
         return os.path.join(IMAGE_DIR, "image-missing.png")
-    else:
-        if (not os.path.isfile(filename)) or (
-                os.path.getmtime(src_file) > os.path.getmtime(filename)):
-            if not __create_thumbnail_image(src_file, mtype, rectangle, size):
-                return os.path.join(IMAGE_DIR, "document.png")
-        return os.path.abspath(filename)
+    if rectangle is not None:
+        rectangle = tuple(rectangle)
+    with _LOCK:
+        future = _PENDING.get((src_file, rectangle, size))
+        if _POOL_PID != os.getpid():
+            future = None
+    if future is not None and (future.running() or future.done()):
+        return future.result()
+    return __make_thumbnail(src_file, mtype, rectangle, size)
+
+#-------------------------------------------------------------------------
+#
+# prefetch_thumbnails
+#
+#-------------------------------------------------------------------------
+def prefetch_thumbnails(media, size=SIZE_NORMAL):
+    """
+    Start creating the thumbnail images of several source files in the
+    background, by a pool of THREADS threads, so they are in the cache when
+    get_thumbnail_path or get_thumbnail_image are called.
+
+    :param media: the (source media file, mime type, subsection rectangle)
+      of each thumbnail
+    :type media: iterable
+    :param size: size of the thumbnails
+    :type size: int
+    """
+    for src_file, mtype, rectangle in media:
+        if os.path.isfile(src_file):
+            __submit(src_file, mtype, rectangle, size)
+
+#-------------------------------------------------------------------------
+#
+# stop_thumbnail_threads
+#
+#-------------------------------------------------------------------------
+def stop_thumbnail_threads():
+    """
+    Wait until the thumbnail images being created in the background are
+    written, and stop the threads creating them, for example before forking
+    the process. They are started again by the next request.
+    """
+    global _POOL, _POOL_PID
+    with _LOCK:
+        pool = _POOL if _POOL_PID == os.getpid() else None
+        _POOL = None
+        _POOL_PID = None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+#-------------------------------------------------------------------------
+#
+# request_thumbnail_images
+#
+#-------------------------------------------------------------------------
+def request_thumbnail_images(media, callback, size=SIZE_NORMAL):
+    """
+    Request the thumbnail images of several source files, which are created
+    in the background like with prefetch_thumbnails. The callback is called
+    from the GLib main loop for each of them when it is ready, with the
+    index of the source file in media, and the image as returned by
+    get_thumbnail_image.
+
+    :param media: the (source media file, mime type, subsection rectangle)
+      of each thumbnail
+    :type media: list
+    :param callback: function called with the index and image of each
+      thumbnail
+    :type callback: callable
+    :param size: size of the thumbnails
+    :type size: int
+    """
+    for index, (src_file, mtype, rectangle) in enumerate(media):
+        if os.path.isfile(src_file):
+            future = __submit(src_file, mtype, rectangle, size)
+            future.add_done_callback(
+                lambda done, index=index, mtype=mtype: GLib.idle_add(
+                    __deliver, callback, index, done.result(), mtype))
+        else:
+            GLib.idle_add(__deliver, callback, index,
+                          os.path.join(IMAGE_DIR, "image-missing.png"), mtype)
+
+def __deliver(callback, index, filename, mtype):
+    """
+    Load a thumbnail image requested by request_thumbnail_images, and give
+    it to the callback.
+    """
+    callback(index, __load_thumbnail_image(filename, mtype))
+    return False
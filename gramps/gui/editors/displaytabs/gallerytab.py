@@ -53,7 +53,8 @@ from gramps.gen.lib import Media, MediaRef
 from gramps.gen.db import DbTxn
 from gramps.gen.utils.file import (media_path_full, media_path, relative_path,
                                    create_checksum)
-from gramps.gen.utils.thumbnails import get_thumbnail_image
+from gramps.gen.utils.thumbnails import (request_thumbnail_images,
+                                         find_mime_type_pixbuf)
 from gramps.gen.errors import WindowActiveError
 from gramps.gen.mime import get_type, is_valid_type
 from ...ddtargets import DdTargets
@@ -249,6 +250,8 @@ class GalleryTab(ButtonTab, DbGUIElement):
 
     def rebuild(self):
         self._build_icon_model()
+        thumbnails = []
+        thumbnail_refs = []
         for ref in self.media_list:
             handle = ref.get_reference_handle()
             obj = self.dbstate.db.get_media_from_handle(handle)
@@ -259,18 +262,34 @@ class GalleryTab(ButtonTab, DbGUIElement):
                     _('Non existing media found in the Gallery'),
                     parent=self.uistate.window)
             else :
-                pixbuf = get_thumbnail_image(
-                                media_path_full(self.dbstate.db,
-                                                      obj.get_path()),
-                                obj.get_mime_type(),
-                                ref.get_rectangle())
+                # show the icon of the mime type until the thumbnail is ready
+                pixbuf = find_mime_type_pixbuf(obj.get_mime_type())
                 self.iconmodel.append(row=[pixbuf, obj.get_description(), ref])
+                thumbnails.append((media_path_full(self.dbstate.db,
+                                                   obj.get_path()),
+                                   obj.get_mime_type(),
+                                   ref.get_rectangle()))
+                thumbnail_refs.append(ref)
+        model = self.iconmodel
+        request_thumbnail_images(
+            thumbnails,
+            lambda index, pixbuf: self._set_thumbnail(
+                model, thumbnail_refs[index], pixbuf))
         self._connect_icon_model()
         self._set_label()
         self._selection_changed()
         if self.update:
             self.update()
 
+    def _set_thumbnail(self, model, ref, pixbuf):
+        """
+        Show the thumbnail of a media reference, in the row it was moved to.
+        """
+        for row in model:
+            if row[2] is ref:
+                row[0] = pixbuf
+                break
+
     def get_selected(self):
         node = self.iconlist.get_selected_items()
         if len(node) > 0:
@@ -72,6 +72,8 @@ from ..ddtargets import DdTargets
 from ..plug.quick import create_quickreport_menu, create_web_connect_menu
 from ..utils import is_right_click
 from ..widgets.interactivesearchbox import InteractiveSearchBox
+from .treemodels.flatbasemodel import FlatBaseModel
+from .treemodels.treebasemodel import TreeBaseModel
 
 #----------------------------------------------------------------
 #
@@ -123,6 +125,7 @@ class ListView(NavigationView):
         self.multiple_selection = multiple
         self.generic_filter = None
         dbstate.connect('database-changed', self.change_db)
+        dbstate.connect('no-database', self.cancel_build)
         self.connect_signals()
         self.at_popup_action = None
         self.at_popup_menu = None
@@ -160,6 +163,7 @@ class ListView(NavigationView):
         self.list.connect('button-press-event', self._button_press)
         self.list.connect('key-press-event', self._key_press)
         self.list.connect('start-interactive-search',self.open_all_nodes)
+        self.list.connect('row-collapsed', self._row_collapsed)
         self.searchbox = InteractiveSearchBox(self.list)
 
         if self.drag_info():
@@ -318,7 +322,8 @@ class ListView(NavigationView):
                     self.model.destroy()
                 self.model = self.make_model(
                     self.dbstate.db, self.uistate, self.sort_col,
-                    search=filter_info, sort_map=self.column_order())
+                    search=filter_info, sort_map=self.column_order(),
+                    **self._build_options())
             else:
                 #the entire data to show is already in memory.
                 #run only the part that determines what to show
@@ -358,6 +363,43 @@ class ListView(NavigationView):
     def search_build_tree(self):
         self.build_tree()
 
+    def _build_options(self):
+        """
+        Return the options to build a flat model in the background, so that
+        its first rows are shown before all of them are read.
+        """
+        if issubclass(self.make_model, FlatBaseModel):
+            return {'build_callback': self._model_built}
+        return {}
+
+    def cancel_build(self):
+        """
+        Stop building the model in the background, before the database is
+        closed.
+        """
+        if isinstance(self.model, FlatBaseModel):
+            self.model.cancel_build()
+
+    def _row_collapsed(self, treeview, iter_, path):
+        """
+        Free the rows below a collapsed node of a tree built lazily.
+        """
+        if isinstance(self.model, TreeBaseModel):
+            self.model.unload_children(iter_)
+
+    def _model_built(self):
+        """
+        Called when all the rows of a model built in the background are
+        known.
+        """
+        self.list.set_model(None)
+        self.list.set_model(self.model)
+        self.goto_active(None)
+        if self.active:
+            self.uistate.show_filter_results(self.dbstate,
+                                             self.model.displayed(),
+                                             self.model.total())
+
     def exact_search(self):
         """
         Returns a tuple indicating columns requiring an exact search
@@ -652,9 +694,12 @@ class ListView(NavigationView):
                 self.model.reverse_order()
                 self.list.set_model(self.model)
         else:
+            self.list.set_model(None)
+            self.model.destroy()
             self.model = self.make_model(
                 self.dbstate.db, self.uistate, self.sort_col, self.sort_order,
-                search=filter_info, sort_map=self.column_order())
+                search=filter_info, sort_map=self.column_order(),
+                **self._build_options())
 
             self.list.set_model(self.model)
 
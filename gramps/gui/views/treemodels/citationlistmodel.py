@@ -44,7 +44,7 @@ from gi.repository import Gtk
 # Gramps modules
 #
 #-------------------------------------------------------------------------
-from .flatbasemodel import FlatBaseModel
+from .flatbasemodel import FlatBaseModel, change_sort_value
 from .citationbasemodel import CitationBaseModel
 
 #-------------------------------------------------------------------------
@@ -56,8 +56,16 @@ class CitationListModel(CitationBaseModel, FlatBaseModel):
     """
     Flat citation model.  (Original code in CitationBaseModel).
     """
+    obj_class = 'Citation'
+    sort_columns = {
+        0: ('page', str),
+        1: ('gramps_id', str),
+        6: ('change', change_sort_value),
+        }
+
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
-                 search=None, skip=set(), sort_map=None):
+                 search=None, skip=set(), sort_map=None,
+                 build_callback=None):
         self.map = db.get_raw_citation_data
         self.gen_cursor = db.get_citation_cursor
         self.fmap = [
@@ -95,7 +103,8 @@ class CitationListModel(CitationBaseModel, FlatBaseModel):
             self.citation_tag_color
             ]
         FlatBaseModel.__init__(self, db, uistate, scol, order, search=search,
-                               skip=skip, sort_map=sort_map)
+                               skip=skip, sort_map=sort_map,
+                               build_callback=build_callback)
 
     def destroy(self):
         """
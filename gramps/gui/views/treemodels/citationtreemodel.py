@@ -70,6 +70,7 @@ class CitationTreeModel(CitationBaseModel, TreeBaseModel):
         self.db = db
         self.number_items = self.db.get_number_of_sources
         self.map = self.db.get_raw_source_data
+        self.map_many = self.db.get_raw_source_data_many
         self.gen_cursor = self.db.get_source_cursor
         # The items here must correspond, in order, with data in
         # CitationTreeView, and with the items in the secondary fmap, fmap2
@@ -113,11 +114,13 @@ class CitationTreeModel(CitationBaseModel, TreeBaseModel):
         self.db = None
         self.gen_cursor = None
         self.map = None
+        self.map_many = None
         self.fmap = None
         self.smap = None
         self.number_items = None
         self.gen_cursor2 = None
         self.map2 = None
+        self.map2_many = None
         self.fmap2 = None
         self.smap2 = None
         self.number_items2 = None
@@ -129,6 +132,7 @@ class CitationTreeModel(CitationBaseModel, TreeBaseModel):
         """
         self.number_items2 = self.db.get_number_of_citations
         self.map2 = self.db.get_raw_citation_data
+        self.map2_many = self.db.get_raw_citation_data_many
         self.gen_cursor2 = self.db.get_citation_cursor
         self.fmap2 = [
             self.citation_page,
@@ -44,7 +44,7 @@ from gramps.gen.lib import Event, EventType
 from gramps.gen.utils.db import get_participant_from_event
 from gramps.gen.display.place import displayer as place_displayer
 from gramps.gen.config import config
-from .flatbasemodel import FlatBaseModel
+from .flatbasemodel import FlatBaseModel, change_sort_value
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 
 #-------------------------------------------------------------------------
@@ -70,9 +70,16 @@ INVALID_DATE_FORMAT = config.get('preferences.invalid-date-format')
 #
 #-------------------------------------------------------------------------
 class EventModel(FlatBaseModel):
+    obj_class = 'Event'
+    sort_columns = {
+        0: ('description', str),
+        1: ('gramps_id', str),
+        7: ('change', change_sort_value),
+        }
 
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
-                 search=None, skip=set(), sort_map=None):
+                 search=None, skip=set(), sort_map=None,
+                 build_callback=None):
         self.gen_cursor = db.get_event_cursor
         self.map = db.get_raw_event_data
 
@@ -101,7 +108,8 @@ class EventModel(FlatBaseModel):
             self.column_tag_color
            ]
         FlatBaseModel.__init__(self, db, uistate, scol, order, search=search,
-                               skip=skip, sort_map=sort_map)
+                               skip=skip, sort_map=sort_map,
+                               build_callback=build_callback)
 
     def destroy(self):
         """
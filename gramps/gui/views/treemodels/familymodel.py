@@ -42,7 +42,7 @@ from gi.repository import Gtk
 from gramps.gen.datehandler import displayer, format_time, get_date_valid
 from gramps.gen.display.name import displayer as name_displayer
 from gramps.gen.lib import EventRoleType, FamilyRelType
-from .flatbasemodel import FlatBaseModel
+from .flatbasemodel import FlatBaseModel, change_sort_value
 from gramps.gen.utils.db import get_marriage_or_fallback
 from gramps.gen.config import config
 from gramps.gen.const import GRAMPS_LOCALE as glocale
@@ -55,9 +55,15 @@ invalid_date_format = config.get('preferences.invalid-date-format')
 #
 #-------------------------------------------------------------------------
 class FamilyModel(FlatBaseModel):
+    obj_class = 'Family'
+    sort_columns = {
+        0: ('gramps_id', str),
+        7: ('change', change_sort_value),
+        }
 
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
-                 search=None, skip=set(), sort_map=None):
+                 search=None, skip=set(), sort_map=None,
+                 build_callback=None):
         self.gen_cursor = db.get_family_cursor
         self.map = db.get_raw_family_data
         self.fmap = [
@@ -83,7 +89,8 @@ class FamilyModel(FlatBaseModel):
             self.column_tag_color,
             ]
         FlatBaseModel.__init__(self, db, uistate, scol, order, search=search,
-                               skip=skip, sort_map=sort_map)
+                               skip=skip, sort_map=sort_map,
+                               build_callback=build_callback)
 
     def destroy(self):
         """
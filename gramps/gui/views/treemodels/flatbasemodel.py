@@ -38,6 +38,12 @@ handle to path
 As a user selects another column to sort, the sortkey must be rebuild, and the
 map remade.
 
+The sortkeys of columns that show a column of the database table of the
+objects are computed from that column alone, without reading the objects, and
+kept for each database until it changes.  The sortkeys of other columns can be
+computed in the background, in chunks read in idle time, so that the first
+rows are shown while the others are still being read.
+
 The class FlatNodeMap keeps a sortkeyhandle list with (sortkey, handle) entries,
 and a handle2path dictionary. As the Map is flat, the index in sortkeyhandle
 corresponds to the path.
@@ -53,6 +59,7 @@ It keeps a FlatNodeMap, and obtains data from database as needed
 #-------------------------------------------------------------------------
 import logging
 import bisect
+import weakref
 from time import perf_counter
 
 _LOG = logging.getLogger(".gui.basetreemodel")
@@ -62,6 +69,7 @@ _LOG = logging.getLogger(".gui.basetreemodel")
 # GNOME/GTK modules
 #
 #-------------------------------------------------------------------------
+from gi.repository import GLib
 from gi.repository import GObject
 from gi.repository import Gtk
 
@@ -84,6 +92,21 @@ from gramps.gen.proxy.cache import CacheProxyDb
 
 UEMPTY = ""
 
+def change_sort_value(change):
+    """
+    Return the sort value of the time an object was last changed.
+    """
+    return "%012x" % change
+
+# Number of rows of the first chunk read by a model built in the background,
+# which are shown at once, and of the next chunks
+FIRST_CHUNK_SIZE = 250
+CHUNK_SIZE = 5000
+
+# Sorted (sortkey, handle) lists of the columns of the database tables, for
+# each database: {(object class, column): (db.has_changed, list)}
+_COLUMN_SORT_KEYS = weakref.WeakKeyDictionary()
+
 class FlatNodeMap:
     """
     A NodeMap for a flat treeview. In such a TreeView, the paths possible are
@@ -445,11 +468,23 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
     It keeps a FlatNodeMap, and obtains data from database as needed
     ..Note: glocale.sort_key is applied to the underlying sort key,
             so as to have localized sort
+
+    Inheriting classes set obj_class to the name of the class of the objects,
+    and sort_columns to the model columns that show a column of the database
+    table of the objects, as {model column: (table column, function)}, the
+    function giving the value of the model column from the table column.
+
+    If build_callback is given, and the sort keys cannot be computed from a
+    column of the table, the model is built in the background.  The first
+    rows are shown at once, and build_callback is called once all the rows
+    are known, to attach the model to the view again.
     """
+    obj_class = None
+    sort_columns = {}
 
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
                  search=None, skip=set(),
-                 sort_map=None):
+                 sort_map=None, build_callback=None):
         cput = perf_counter()
         GObject.GObject.__init__(self)
         BaseModel.__init__(self)
@@ -474,16 +509,25 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             col = scol
         # get the function that maps data to sort_keys
         self.sort_func = lambda x: glocale.sort_key(self.smap[col](x))
+        self.sort_column = self.sort_columns.get(col)
         self.sort_col = scol
         self.skip = skip
         self._in_build = False
+        self._builder = None
+        self._build_id = 0
+        self._build_callback = build_callback
 
         self.node_map = FlatNodeMap()
         self.set_search(search)
 
         self._reverse = (order == Gtk.SortType.DESCENDING)
 
-        self.rebuild_data()
+        if (build_callback and self.sort_column is None and self.obj_class
+                and self.db.is_open()):
+            self._builder = self._build()
+            self._build_id = GLib.idle_add(self._build_step)
+        else:
+            self.rebuild_data()
         _LOG.debug(self.__class__.__name__ + ' __init__ ' +
                     str(perf_counter() - cput) + ' sec')
 
@@ -491,6 +535,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         Unset all elements that prevent garbage collection
         """
+        self.cancel_build()
         BaseModel.destroy(self)
         self.db = None
         self.sort_func = None
@@ -509,6 +554,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         # you reattach the model to the treeview so that the treeview updates
           with the new entries
         """
+        self.finish_build()
         if search:
             if search[0]:
                 #following is None if no data given in filter sidebar
@@ -548,6 +594,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         reverse the sort order of the sort column
         """
+        self.finish_build()
         self._reverse = not self._reverse
         self.node_map.reverse_order()
 
@@ -563,6 +610,10 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         be shown.
         This list is sorted ascending, via localized string sort.
         """
+        if self.sort_column is not None and self.obj_class:
+            srt_keys = self._column_sort_keys()
+            if srt_keys is not None:
+                return srt_keys
         # use cursor as a context manager
         with self.gen_cursor() as cursor:
             #loop over database and store the sort field, and the handle
@@ -571,10 +622,147 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             srt_keys.sort()
             return srt_keys
 
+    def _column_sort_keys(self):
+        """
+        Return the (sort_key, handle) list of all data, computed from the
+        column of the database table shown in the sort column, or None if
+        the database cannot return the values of a column.
+        """
+        column, func = self.sort_column
+        cache = _COLUMN_SORT_KEYS.get(self.db, {})
+        stamp, srt_keys = cache.get((self.obj_class, column), (None, None))
+        if srt_keys is None or stamp != self.db.has_changed:
+            values = self.db.get_column_values(self.obj_class, column)
+            if values is None:
+                return None
+            srt_keys = [(glocale.sort_key(func(value)), handle)
+                        for handle, value in values]
+            srt_keys.sort()
+            cache[(self.obj_class, column)] = (self.db.has_changed, srt_keys)
+            _COLUMN_SORT_KEYS[self.db] = cache
+        # the node map changes the list as rows are added and deleted
+        return list(srt_keys)
+
+    def _build(self):
+        """
+        Generator computing the sort keys of all data in chunks, one chunk
+        at each step.
+
+        The handles are read first, and the data of each chunk is read at
+        its own step, so that no database cursor is left open between the
+        steps, while the database may be changed.  The objects deleted since
+        the handles were read are skipped; those added are added as rows by
+        the view.
+
+        Unless a filter of the sidebar is used, the rows of the first chunk,
+        which is small, are shown as soon as their sort keys are known, so
+        that the view is not empty while the other rows are read.
+        """
+        allkeys = []
+        handles = self.db.method('get_%s_handles', self.obj_class)()
+        map_many = self.db.method('get_raw_%s_data_many', self.obj_class)
+        start = 0
+        size = FIRST_CHUNK_SIZE
+        while True:
+            chunk = handles[start:start + size]
+            self._in_build = True
+            for handle, data in zip(chunk, map_many(chunk)):
+                if data is not None:
+                    allkeys.append((self.sort_func(data), handle))
+            self._in_build = False
+            start += size
+            if start >= len(handles):
+                break
+            if (size == FIRST_CHUNK_SIZE and
+                    self.rebuild_data == self._rebuild_search):
+                dlist = sorted(key for key in allkeys
+                               if self._match_search(key[1]))
+                self.node_map.set_path_map(dlist, allkeys,
+                                           identical=False,
+                                           reverse=self._reverse)
+                self._rows_inserted()
+            size = CHUNK_SIZE
+            yield True
+        allkeys.sort()
+        for path in reversed(range(len(self.node_map))):
+            self.row_deleted(Gtk.TreePath((path,)))
+        self.node_map.set_path_map([], allkeys, identical=False,
+                                   reverse=self._reverse)
+
+    def _match_search(self, handle):
+        """
+        Return True if the object is shown given the search text in the top
+        search bar.
+        """
+        if handle in self.skip:
+            return False
+        return not (self.search and self.search.text) or \
+            self.search.match(handle, self.db)
+
+    def _rows_inserted(self):
+        """
+        Tell the view about all the rows of the node map.
+        """
+        self.clear_path_cache()
+        for path in range(len(self.node_map)):
+            path = Gtk.TreePath((path,))
+            self.row_inserted(path, self.do_get_iter(path)[1])
+
+    def _build_step(self):
+        """
+        Compute the next chunk of sort keys of a model built in the
+        background.
+        """
+        if self.db is None or not self.db.is_open():
+            self._builder = None
+            self._build_id = 0
+            return False
+        try:
+            next(self._builder)
+            return True
+        except StopIteration:
+            self._build_id = 0
+            self._build_done()
+            self._build_callback()
+            return False
+
+    def _build_done(self):
+        """
+        Determine the rows to show once all the sort keys of a model built
+        in the background are known.
+        """
+        self._builder = None
+        self.rebuild_data()
+
+    def finish_build(self):
+        """
+        Compute at once the sort keys that are not known yet, if the model
+        is built in the background, and tell the view about all the rows.
+        """
+        if self._builder is not None:
+            GLib.source_remove(self._build_id)
+            self._build_id = 0
+            for dummy in self._builder:
+                pass
+            self._build_done()
+            self._rows_inserted()
+
+    def cancel_build(self):
+        """
+        Stop building the model in the background.
+        """
+        if self._build_id:
+            GLib.source_remove(self._build_id)
+            self._build_id = 0
+        if self._builder is not None:
+            self._builder.close()
+            self._builder = None
+
     def _rebuild_search(self, ignore=None):
         """ function called when view must be build, given a search text
             in the top search bar
         """
+        self.finish_build()
         self.clear_cache()
         self._in_build = True
         if (self.db is not None) and self.db.is_open():
@@ -604,6 +792,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """ function called when view must be build, given filter options
             in the filter sidebar
         """
+        self.finish_build()
         self.clear_cache()
         self._in_build = True
         if (self.db is not None) and self.db.is_open():
@@ -638,6 +827,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         Row is only added if search/filter data is such that it must be shown
         """
         assert isinstance(handle, str)
+        self.finish_build()
         if self.node_map.get_path_from_handle(handle) is not None:
             return # row is already displayed
         data = self.map(handle)
@@ -657,6 +847,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         Delete a row, called after the object with handle is deleted
         """
+        self.finish_build()
         delete_path = self.node_map.delete(handle)
         #delete_path is an integer from 0 to n-1
         if delete_path is not None:
@@ -667,6 +858,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         Update a row, called after the object with handle is changed
         """
+        self.finish_build()
         if self.node_map.get_path_from_handle(handle) is None:
             return # row is not currently displayed
         self.clear_cache(handle)
@@ -43,7 +43,7 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.gettext
 from gramps.gen.datehandler import displayer, format_time
 from gramps.gen.lib import Date, Media
-from .flatbasemodel import FlatBaseModel
+from .flatbasemodel import FlatBaseModel, change_sort_value
 
 #-------------------------------------------------------------------------
 #
@@ -51,9 +51,17 @@ from .flatbasemodel import FlatBaseModel
 #
 #-------------------------------------------------------------------------
 class MediaModel(FlatBaseModel):
+    obj_class = 'Media'
+    sort_columns = {
+        0: ('desc', str),
+        1: ('gramps_id', str),
+        3: ('path', str),
+        7: ('change', change_sort_value),
+        }
 
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
-                 search=None, skip=set(), sort_map=None):
+                 search=None, skip=set(), sort_map=None,
+                 build_callback=None):
         self.gen_cursor = db.get_media_cursor
         self.map = db.get_raw_media_data
 
@@ -81,7 +89,8 @@ class MediaModel(FlatBaseModel):
             self.column_tag_color,
             ]
         FlatBaseModel.__init__(self, db, uistate, scol, order, search=search,
-                               skip=skip, sort_map=sort_map)
+                               skip=skip, sort_map=sort_map,
+                               build_callback=build_callback)
 
     def destroy(self):
         """
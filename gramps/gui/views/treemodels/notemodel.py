@@ -41,7 +41,7 @@ from gi.repository import Gtk
 #-------------------------------------------------------------------------
 from gramps.gen.datehandler import format_time
 from gramps.gen.const import GRAMPS_LOCALE as glocale
-from .flatbasemodel import FlatBaseModel
+from .flatbasemodel import FlatBaseModel, change_sort_value
 from gramps.gen.lib import (Note, NoteType, StyledText)
 
 #-------------------------------------------------------------------------
@@ -52,8 +52,15 @@ from gramps.gen.lib import (Note, NoteType, StyledText)
 class NoteModel(FlatBaseModel):
     """
     """
+    obj_class = 'Note'
+    sort_columns = {
+        1: ('gramps_id', str),
+        5: ('change', change_sort_value),
+        }
+
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
-                 search=None, skip=set(), sort_map=None):
+                 search=None, skip=set(), sort_map=None,
+                 build_callback=None):
         """Setup initial values for instance variables."""
         self.gen_cursor = db.get_note_cursor
         self.map = db.get_raw_note_data
@@ -76,7 +83,8 @@ class NoteModel(FlatBaseModel):
             self.column_tag_color
         ]
         FlatBaseModel.__init__(self, db, uistate, scol, order, search=search,
-                               skip=skip, sort_map=sort_map)
+                               skip=skip, sort_map=sort_map,
+                               build_callback=build_callback)
 
     def destroy(self):
         """
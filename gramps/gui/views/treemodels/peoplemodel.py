@@ -60,7 +60,7 @@ from gramps.gen.lib import (Name, EventRef, EventType, EventRoleType,
 from gramps.gen.display.name import displayer as name_displayer
 from gramps.gen.display.place import displayer as place_displayer
 from gramps.gen.datehandler import format_time, get_date, get_date_valid
-from .flatbasemodel import FlatBaseModel
+from .flatbasemodel import FlatBaseModel, change_sort_value
 from .treebasemodel import TreeBaseModel
 from .basemodel import BaseModel
 from gramps.gen.config import config
@@ -83,6 +83,9 @@ COLUMN_CHANGE = 17
 COLUMN_TAGS = 18
 COLUMN_PRIV = 19
 
+# Columns of the person table which decide the group of a person
+GROUP_COLUMNS = ('group_as', 'primary_surname', 'lone_patronymic')
+
 invalid_date_format = config.get('preferences.invalid-date-format')
 
 #-------------------------------------------------------------------------
@@ -104,6 +107,7 @@ class PeopleBaseModel(BaseModel):
         self.db = db
         self.gen_cursor = db.get_person_cursor
         self.map = db.get_raw_person_data
+        self.map_many = db.get_raw_person_data_many
 
         self.fmap = [
             self.column_name,
@@ -150,6 +154,7 @@ class PeopleBaseModel(BaseModel):
         self.db = None
         self.gen_cursor = None
         self.map = None
+        self.map_many = None
         self.fmap = None
         self.smap = None
 
@@ -571,11 +576,19 @@ class PersonListModel(PeopleBaseModel, FlatBaseModel):
     """
     Listed people model.
     """
+    obj_class = 'Person'
+    sort_columns = {
+        1: ('gramps_id', str),
+        14: ('change', change_sort_value),
+        }
+
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
-                 search=None, skip=set(), sort_map=None):
+                 search=None, skip=set(), sort_map=None,
+                 build_callback=None):
         PeopleBaseModel.__init__(self, db)
         FlatBaseModel.__init__(self, db, uistate, search=search, skip=skip,
-                               scol=scol, order=order, sort_map=sort_map)
+                               scol=scol, order=order, sort_map=sort_map,
+                               build_callback=build_callback)
 
     def destroy(self):
         """
@@ -591,6 +604,8 @@ class PersonTreeModel(PeopleBaseModel, TreeBaseModel):
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
                  search=None, skip=set(), sort_map=None):
         PeopleBaseModel.__init__(self, db)
+        # group name: values of the group columns of its people
+        self.groups = {}
         TreeBaseModel.__init__(self, db, uistate, search=search, skip=skip,
                                scol=scol, order=order, sort_map=sort_map)
 
@@ -600,6 +615,7 @@ class PersonTreeModel(PeopleBaseModel, TreeBaseModel):
         """
         PeopleBaseModel.destroy(self)
         self.number_items = None
+        self.groups = None
         TreeBaseModel.destroy(self)
 
     def _set_base_data(self):
@@ -636,3 +652,70 @@ class PersonTreeModel(PeopleBaseModel, TreeBaseModel):
         # add as node: parent, child, sortkey, handle; parent and child are
         # nodes in the treebasemodel, and will be used as iters
         self.add_node(group_name, handle, sort_key, handle)
+
+    def _get_groups(self):
+        """
+        Return the groups of the people, counted by the database, as a
+        dictionary {group name: list of values of the group columns}, or
+        None if the database cannot count them.
+        """
+        counts = self.db.get_column_counts('Person', GROUP_COLUMNS)
+        if counts is None:
+            return None
+        ngc = name_displayer.name_grouping_columns
+        groups = {}
+        for row in counts:
+            key = row[:len(GROUP_COLUMNS)]
+            groups.setdefault(ngc(self.db, *key), []).append(key)
+        return groups
+
+    def _build_lazy(self):
+        """
+        Add the group nodes, whose people are loaded when they are expanded.
+        """
+        groups = self._get_groups()
+        if groups is None:
+            return False
+        self.groups = groups
+        for group_name in groups:
+            self.add_node(None, group_name, group_name, None,
+                          add_parent=False)
+            self._unloaded.add(group_name)
+        return True
+
+    def _load_lazy(self, ref):
+        """
+        Add the people of a group.
+        """
+        for key in self.groups.get(ref, []):
+            data_list = self.db.get_raw_data_by_columns(
+                'Person', dict(zip(GROUP_COLUMNS, key)))
+            for handle, data in data_list:
+                self.add_node(ref, handle, self.sort_func(data), handle,
+                              add_parent=False)
+
+    def _lazy_parents(self, handle):
+        """
+        Return the group of a person.
+        """
+        data = self.map(handle)
+        if not data:
+            return []
+        return [name_displayer.name_grouping_data(self.db, data[COLUMN_NAME])]
+
+    def _refresh_lazy(self):
+        """
+        Add the groups of new people, and remove the groups that are empty.
+        """
+        groups = self._get_groups()
+        for group_name in list(self.groups):
+            node = self.tree.get(group_name)
+            if (group_name not in groups and node is not None and
+                    group_name in self._unloaded):
+                self.remove_node(node)
+        for group_name in groups:
+            if group_name not in self.tree:
+                self._unloaded.add(group_name)
+                self.add_node(None, group_name, group_name, None,
+                              add_parent=False)
+        self.groups = groups
@@ -49,7 +49,7 @@ from gramps.gen.datehandler import format_time
 from gramps.gen.utils.place import conv_lat_lon
 from gramps.gen.display.place import displayer as place_displayer
 from gramps.gen.config import config
-from .flatbasemodel import FlatBaseModel
+from .flatbasemodel import FlatBaseModel, change_sort_value
 from .treebasemodel import TreeBaseModel
 
 #-------------------------------------------------------------------------
@@ -70,6 +70,7 @@ class PlaceBaseModel:
     def __init__(self, db):
         self.gen_cursor = db.get_place_cursor
         self.map = db.get_raw_place_data
+        self.map_many = db.get_raw_place_data_many
         self.fmap = [
             self.column_name,
             self.column_id,
@@ -106,6 +107,7 @@ class PlaceBaseModel:
         self.db = None
         self.gen_cursor = None
         self.map = None
+        self.map_many = None
         self.fmap = None
         self.smap = None
 
@@ -258,12 +260,21 @@ class PlaceListModel(PlaceBaseModel, FlatBaseModel):
     """
     Flat place model.  (Original code in PlaceBaseModel).
     """
+    obj_class = 'Place'
+    sort_columns = {
+        1: ('gramps_id', str),
+        4: ('code', str),
+        9: ('change', change_sort_value),
+        }
+
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
-                 search=None, skip=set(), sort_map=None):
+                 search=None, skip=set(), sort_map=None,
+                 build_callback=None):
 
         PlaceBaseModel.__init__(self, db)
         FlatBaseModel.__init__(self, db, uistate, scol, order, search=search,
-                               skip=skip, sort_map=sort_map)
+                               skip=skip, sort_map=sort_map,
+                               build_callback=build_callback)
 
     def destroy(self):
         """
@@ -285,6 +296,8 @@ class PlaceTreeModel(PlaceBaseModel, TreeBaseModel):
                  search=None, skip=set(), sort_map=None):
 
         PlaceBaseModel.__init__(self, db)
+        # handle of a place: number of places it encloses
+        self.child_counts = {}
         TreeBaseModel.__init__(self, db, uistate, scol=scol, order=order,
                                search=search, skip=skip, sort_map=sort_map,
                                nrgroups=3,
@@ -296,6 +309,7 @@ class PlaceTreeModel(PlaceBaseModel, TreeBaseModel):
         """
         PlaceBaseModel.destroy(self)
         self.number_items = None
+        self.child_counts = None
         TreeBaseModel.destroy(self)
 
     def _set_base_data(self):
@@ -327,10 +341,121 @@ class PlaceTreeModel(PlaceBaseModel, TreeBaseModel):
         # Add the node as a root node if the parent is not in the tree.  This
         # will happen when the view is filtered.
         if not self._get_node(parent):
+            if (self._lazy_build and parent and
+                    self.db.has_place_handle(parent)):
+                # added when the children of its parent are loaded
+                return
             parent = None
 
         self.add_node(parent, handle, sort_key, handle, add_parent=False)
 
+    def _get_child_counts(self):
+        """
+        Return the number of places enclosed by each place, counted by the
+        database, or None if the database cannot count them.
+        """
+        counts = self.db.get_column_counts('Place', ['enclosed_by'])
+        if counts is None:
+            return None
+        return dict(counts)
+
+    def _build_lazy(self):
+        """
+        Add the places which are not enclosed by another place.  The places
+        enclosed by a place are loaded when it is expanded.
+        """
+        child_counts = self._get_child_counts()
+        if child_counts is None:
+            return False
+        self.child_counts = child_counts
+        # places enclosed by a missing place are shown at the top level
+        for parent in child_counts:
+            if not parent or not self.db.has_place_handle(parent):
+                self._add_children(None, parent)
+        # as is a place of each cycle of the hierarchy
+        for handle in self._cycle_places(child_counts):
+            self.add_node(None, handle, self.sort_func(self.map(handle)),
+                          handle, add_parent=False)
+            self._unloaded.add(handle)
+        return True
+
+    def _cycle_places(self, child_counts):
+        """
+        Return a place of each cycle of the hierarchy, whose places cannot
+        be reached from the top level.
+        """
+        places = []
+        visited = set()
+        for handle in child_counts:
+            chain = []
+            while handle and handle not in visited:
+                if handle in chain:
+                    places.append(min(chain[chain.index(handle):]))
+                    break
+                chain.append(handle)
+                data = self.map(handle)
+                handle = data[5][0][0] if data and data[5] else None
+            visited.update(chain)
+        return places
+
+    def _load_lazy(self, ref):
+        """
+        Add the places enclosed by a place.
+        """
+        self._add_children(ref, ref)
+
+    def _add_children(self, ref, parent):
+        """
+        Add the places enclosed by the place parent under the node ref.
+        """
+        data_list = self.db.get_raw_data_by_columns('Place',
+                                                    {'enclosed_by': parent})
+        for handle, data in data_list:
+            if handle in self.tree:
+                # the hierarchy has a cycle
+                continue
+            self.add_node(ref, handle, self.sort_func(data), handle,
+                          add_parent=False)
+            if self.child_counts.get(handle):
+                self._unloaded.add(handle)
+
+    def _lazy_parents(self, handle):
+        """
+        Return the places enclosing a place, from the top level down.
+        """
+        parents = []
+        data = self.map(handle)
+        while data and data[5]:
+            parent = data[5][0][0]
+            if parent in parents or parent == handle:
+                break
+            parents.append(parent)
+            if parent in self.tree:
+                # the places above it are not needed to show it
+                break
+            data = self.map(parent)
+        parents.reverse()
+        return parents
+
+    def _refresh_lazy(self):
+        """
+        Show the expanders of the places which enclose places since their
+        last change, and hide those of the places which no longer do.
+        """
+        self.child_counts = self._get_child_counts()
+        for handle, node in list(self.tree.items()):
+            if handle is None:
+                continue
+            has_children = bool(self.child_counts.get(handle))
+            if node.children or has_children == (handle in self._unloaded):
+                continue
+            if has_children:
+                self._unloaded.add(handle)
+            else:
+                self._unloaded.discard(handle)
+            iternode = self._get_iter(node)
+            self.row_has_child_toggled(self.do_get_path(iternode), iternode)
+
     def column_header(self, data):
         # should not get here!
         return '????'
@@ -40,7 +40,7 @@ from gi.repository import Gtk
 #-------------------------------------------------------------------------
 from gramps.gen.lib import Address, RepositoryType, Url, UrlType
 from gramps.gen.datehandler import format_time
-from .flatbasemodel import FlatBaseModel
+from .flatbasemodel import FlatBaseModel, change_sort_value
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 #-------------------------------------------------------------------------
 #
@@ -48,9 +48,16 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale
 #
 #-------------------------------------------------------------------------
 class RepositoryModel(FlatBaseModel):
+    obj_class = 'Repository'
+    sort_columns = {
+        0: ('name', str),
+        1: ('gramps_id', str),
+        14: ('change', change_sort_value),
+        }
 
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
-                 search=None, skip=set(), sort_map=None):
+                 search=None, skip=set(), sort_map=None,
+                 build_callback=None):
         self.gen_cursor = db.get_repository_cursor
         self.get_handles = db.get_repository_handles
         self.map = db.get_raw_repository_data
@@ -93,7 +100,8 @@ class RepositoryModel(FlatBaseModel):
             ]
 
         FlatBaseModel.__init__(self, db, uistate, scol, order, search=search,
-                               skip=skip, sort_map=sort_map)
+                               skip=skip, sort_map=sort_map,
+                               build_callback=build_callback)
 
     def destroy(self):
         """
@@ -39,7 +39,7 @@ from gi.repository import Gtk
 #
 #-------------------------------------------------------------------------
 from gramps.gen.datehandler import format_time
-from .flatbasemodel import FlatBaseModel
+from .flatbasemodel import FlatBaseModel, change_sort_value
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 
 #-------------------------------------------------------------------------
@@ -48,9 +48,19 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale
 #
 #-------------------------------------------------------------------------
 class SourceModel(FlatBaseModel):
+    obj_class = 'Source'
+    sort_columns = {
+        0: ('title', lambda title: title.replace('\n', ' ')),
+        1: ('gramps_id', str),
+        2: ('author', str),
+        3: ('abbrev', str),
+        4: ('pubinfo', str),
+        7: ('change', change_sort_value),
+        }
 
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
-                 search=None, skip=set(), sort_map=None):
+                 search=None, skip=set(), sort_map=None,
+                 build_callback=None):
         self.map = db.get_raw_source_data
         self.gen_cursor = db.get_source_cursor
         self.fmap = [
@@ -76,7 +86,8 @@ class SourceModel(FlatBaseModel):
             self.column_tag_color
             ]
         FlatBaseModel.__init__(self, db, uistate, scol, order, search=search,
-                               skip=skip, sort_map=sort_map)
+                               skip=skip, sort_map=sort_map,
+                               build_callback=build_callback)
 
     def destroy(self):
         """
@@ -42,6 +42,34 @@ class NodeTest(unittest.TestCase):
         nm.del_node(n2)
         self.assertEqual(len(n.children), 0)
 
+    def test_childindex(self):
+        nm = NodeMap()
+        n = Node('1', None, 'key', None, None)
+        nm.add_node(n)
+        children = [Node(str(i), n.nodeid, key, None, None)
+                    for i, key in enumerate(['b', 'a', 'b', 'c'])]
+        for child in children:
+            n.add_child(child, nm)
+        self.assertEqual([n.child_index(child) for child in children],
+                         [1, 0, 2, 3])
+        n.remove_child(children[0], nm)
+        self.assertIsNone(n.child_index(children[0]))
+        self.assertEqual(n.child_index(children[2]), 1)
+
+    def test_nodeids(self):
+        nm = NodeMap()
+        n = Node('1', None, 'key', None, None)
+        n2 = Node('2', None, 'key', None, None)
+        self.assertEqual(nm.add_node(n), 1)
+        self.assertEqual(nm.add_node(n), 1)
+        self.assertEqual(nm.add_node(n2), 2)
+        nm.del_node(n)
+        self.assertIsNone(n.nodeid)
+        n3 = Node('3', None, 'key', None, None)
+        self.assertEqual(nm.add_node(n3), 1)
+        self.assertIs(nm.node(1), n3)
+        self.assertIs(nm.node(2), n2)
+
 
 if __name__ == "__main__":
     unittest.main()
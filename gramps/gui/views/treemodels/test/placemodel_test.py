@@ -0,0 +1,74 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for the place tree model built lazily """
+
+import unittest
+
+from gramps.gen.lib import Place, PlaceName, PlaceRef
+from gramps.gen.db.utils import make_database
+from gramps.gen.db import DbTxn
+from ..placemodel import PlaceTreeModel
+
+class PlaceTreeModelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+
+    def tearDown(self):
+        self.db.close()
+
+    def add_place(self, name, parent, trans):
+        place = Place()
+        place.set_name(PlaceName(value=name))
+        if parent:
+            placeref = PlaceRef()
+            placeref.ref = parent.handle
+            place.add_placeref(placeref)
+        self.db.add_place(place, trans)
+        return place
+
+    def top_level(self, model):
+        return set(model.nodemap.node(nodeid).handle
+                   for sortkey, nodeid in model.tree[None].children)
+
+    def test_cycle(self):
+        with DbTxn('Add', self.db) as trans:
+            country = self.add_place("Country", None, trans)
+            town = self.add_place("Town", country, trans)
+            first = self.add_place("First", None, trans)
+            second = self.add_place("Second", first, trans)
+            street = self.add_place("Street", second, trans)
+            # first and second enclose each other
+            placeref = PlaceRef()
+            placeref.ref = second.handle
+            first.add_placeref(placeref)
+            self.db.commit_place(first, trans)
+        model = PlaceTreeModel(self.db, None)
+        self.assertTrue(model._lazy_build)
+        self.assertEqual(self.top_level(model),
+                         {country.handle, min(first.handle, second.handle)})
+        for place in (country, town, first, second, street):
+            self.assertIsNotNone(model.get_iter_from_handle(place.handle))
+        model.destroy()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -25,6 +25,11 @@
 
 """
 This module provides the model that is used for all hierarchical treeviews.
+
+Models that can tell from the database which nodes have children, without
+reading all the objects, build the top of the tree only.  The children of a
+node are loaded when the view first asks for them, usually because the node
+is expanded, and are removed from the map again when the node is collapsed.
 """
 
 #-------------------------------------------------------------------------
@@ -42,6 +47,7 @@ _LOG = logging.getLogger(".gui.treebasemodel")
 # GTK modules
 #
 #-------------------------------------------------------------------------
+from gi.repository import GLib
 from gi.repository import GObject
 from gi.repository import Gtk
 
@@ -54,10 +60,11 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.gettext
 import gramps.gui.widgets.progressdialog as progressdlg
 from ...user import User
-from bisect import bisect_right
+from bisect import bisect_left, bisect_right
 from gramps.gen.filters import SearchFilter, ExactSearchFilter
 from .basemodel import BaseModel
 from gramps.gen.proxy.cache import CacheProxyDb
+from gramps.gen.db.dbconst import CHUNKSIZE
 
 #-------------------------------------------------------------------------
 #
@@ -75,14 +82,17 @@ class Node:
     handle      A Gramps handle.  Can be None if no Gramps object is
                 associated with the node.
     parent      id of the parent node.
-    prev        Link to the previous sibling via id.
-    next        Link to the next sibling via id.
+    nodeid      id of the node in the NodeMap, None until it is added.
 
     children    A list of (sortkey, nodeid) tuples for the children of the node.
-                This list is always kept sorted.
+                This list is always kept sorted.  None if the node never had
+                children, which saves an empty list for each leaf.
+
+    The siblings of a node are found by bisecting the children of its
+    parent, so that nodes do not keep links to their siblings.
     """
     __slots__ = ('name', 'sortkey', 'ref', 'handle', 'secondary', 'parent',
-                 'prev', 'next', 'children')#, '__weakref__')
+                 'nodeid', 'children')
 
     def __init__(self, ref, parent, sortkey, handle, secondary):
         if sortkey:
@@ -98,9 +108,8 @@ class Node:
         self.handle = handle
         self.secondary = secondary
         self.parent = parent
-        self.prev = None
-        self.next = None
-        self.children = []
+        self.nodeid = None
+        self.children = None
 
     def set_handle(self, handle, secondary=False):
         """
@@ -115,62 +124,40 @@ class Node:
 
     def add_child(self, node, nodemap):
         """
-        Add a node to the list of children for this node using the id's in
-        nodemap.
+        Add a node to the list of children for this node, adding it to
+        nodemap if needed.
         """
-        nodeid = id(node)
-        if len(self.children):
+        nodeid = nodemap.add_node(node)
+        if self.children:
             index = bisect_right(self.children, (node.sortkey, nodeid))
-            if index == 0:
-                node.prev = None
-                next_nodeid = self.children[0][1]
-                next_node = nodemap.node(next_nodeid)
-                next_node.prev = nodeid
-                node.next = next_nodeid
-            elif index == len(self.children):
-                prev_nodeid = self.children[-1][1]
-                prev_node = nodemap.node(prev_nodeid)
-                prev_node.next = nodeid
-                node.prev = prev_nodeid
-                node.next = None
-            else:
-                prev_nodeid = self.children[index - 1][1]
-                next_nodeid = self.children[index][1]
-                prev_node = nodemap.node(prev_nodeid)
-                next_node = nodemap.node(next_nodeid)
-                prev_node.next = nodeid
-                next_node.prev = nodeid
-                node.prev = prev_nodeid
-                node.next = next_nodeid
-
             self.children.insert(index, (node.sortkey, nodeid))
-
         else:
-            self.children.append((node.sortkey, nodeid))
+            self.children = [(node.sortkey, nodeid)]
 
     def remove_child(self, node, nodemap):
         """
         Remove a node from the list of children for this node, using nodemap.
         """
-        nodeid = id(node)
-        index = bisect_right(self.children, (node.sortkey, nodeid)) - 1
-        if not (self.children[index] == (node.sortkey, nodeid)):
+        index = self.child_index(node)
+        if index is None:
             raise ValueError(str(node.name) + \
                         ' not present in self.children: ' + str(self.children)\
                         + ' at index ' + str(index))
-        if index == 0:
-            if len(self.children) > 1:
-                nodemap.node(self.children[index+1][1]).prev = None
-        elif index == len(self.children)-1:
-            nodemap.node(self.children[index - 1][1]).next = None
-        else:
-            nodemap.node(self.children[index - 1][1]).next = \
-                        self.children[index + 1][1]
-            nodemap.node(self.children[index + 1][1]).prev = \
-                        self.children[index - 1][1]
-
         self.children.pop(index)
 
+    def child_index(self, node):
+        """
+        Return the index of a node in the list of children for this node, or
+        None if it is not a child of this node.
+        """
+        if not self.children:
+            return None
+        child = (node.sortkey, node.nodeid)
+        index = bisect_left(self.children, child)
+        if index < len(self.children) and self.children[index] == child:
+            return index
+        return None
+
 #-------------------------------------------------------------------------
 #
 # NodeMap
@@ -179,54 +166,62 @@ class Node:
 class NodeMap:
     """
     Map of id of Node classes to real object
+
+    The ids are small integers, indices in a list of the nodes, which are
+    reused once their node is removed.  The id 0 is never used, as an iter
+    without user data is not valid.
     """
     def __init__(self):
-        self.id2node = {}
+        self.nodes = [None]
+        self.free_ids = []
 
     def destroy(self):
         """
         Unset all elements that can prevent garbage collection
         """
-##        for key, item in self.id2node.iteritems():
-##            item.prev = None
-##            item.next = None
-##            item.parent = None
-##            item.children = []
-        self.id2node.clear()
+        self.clear()
 
     def add_node(self, node):
         """
         Add a Node object to the map and return id of this node
         """
-        nodeid = id(node)
-        self.id2node[nodeid] = node
-        return nodeid
+        if node.nodeid is None:
+            if self.free_ids:
+                node.nodeid = self.free_ids.pop()
+                self.nodes[node.nodeid] = node
+            else:
+                node.nodeid = len(self.nodes)
+                self.nodes.append(node)
+        return node.nodeid
 
     def del_node(self, node):
         """
         Remove a Node object from the map and return nodeid
         """
-        nodeid = id(node)
-        del self.id2node[nodeid]
+        nodeid = node.nodeid
+        self.del_nodeid(nodeid)
+        node.nodeid = None
         return nodeid
 
     def del_nodeid(self, nodeid):
         """
         Remove Node with id nodeid from the map
         """
-        del self.id2node[nodeid]
+        self.nodes[nodeid] = None
+        self.free_ids.append(nodeid)
 
     def node(self, nodeid):
         """
         Obtain the node object from it's id
         """
-        return self.id2node[nodeid]
+        return self.nodes[nodeid]
 
     def clear(self):
         """
         clear the map
         """
-        self.id2node.clear()
+        self.nodes = [None]
+        self.free_ids = []
 
 #-------------------------------------------------------------------------
 #
@@ -247,8 +242,9 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
     tree        A dictionary of unique identifiers which correspond to nodes in
                 the hierarchy.  Each entry is a node object.
     handle2node A dictionary of gramps handles.  Each entry is a node object.
+                Nodes whose ref is their handle are only kept in tree.
     nodemap     A NodeMap, mapping id's of the nodes to the node objects. Node
-                refer to other nodes via id's in a linked list form.
+                refer to their parent and children via id's.
 
     The model obtains data from database as needed and holds a cache of most
     recently used data.
@@ -274,6 +270,11 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
     has_secondary  :  If True, the model contains two Gramps object types.
                       The suffix '2' is appended to variables relating to the
                       secondary object type.
+
+    Without search or filter, inheriting classes can build the tree lazily by
+    implementing _build_lazy, _load_lazy, _lazy_parents and _refresh_lazy.
+    The refs of the nodes whose children are not loaded yet are kept in
+    _unloaded.
     """
 
     def __init__(self, db, uistate, search=None, skip=set(), scol=0,
@@ -331,6 +332,9 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             self.sort_col = scol
 
         self._in_build = False
+        self._lazy_build = False
+        self._unloaded = set()
+        self._refresh_id = 0
 
         self.__total = 0
         self.__displayed = 0
@@ -348,6 +352,9 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         Unset all elements that prevent garbage collection
         """
+        if self._refresh_id:
+            GLib.source_remove(self._refresh_id)
+            self._refresh_id = 0
         BaseModel.destroy(self)
         self.db = None
         self.sort_func = None
@@ -373,12 +380,14 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         number_items : func to obtain number of items that are shown if all
                         shown
         map     : function to obtain the raw bsddb object datamap
+        map_many: function to obtain a list of raw datamaps from handles
         smap    : the map with functions to obtain sort value based on sort col
         fmap    : the map with functions to obtain value of a row with handle
         """
         self.gen_cursor = None
         self.number_items = None   # function
         self.map = None
+        self.map_many = None
         self.smap = None
         self.fmap = None
 
@@ -386,6 +395,7 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             self.gen_cursor2 = None
             self.number_items2 = None   # function
             self.map2 = None
+            self.map2_many = None
             self.smap2 = None
             self.fmap2 = None
 
@@ -393,12 +403,16 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         Return the number of rows displayed.
         """
+        if self._lazy_build:
+            return self.number_items()
         return self.__displayed
 
     def total(self):
         """
         Return the total number of rows without a filter or search condition.
         """
+        if self._lazy_build:
+            return self.number_items()
         return self.__total
 
     def color_column(self):
@@ -416,6 +430,8 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         self.handle2node.clear()
         self.stamp += 1
         self.nodemap.clear()
+        self._lazy_build = False
+        self._unloaded.clear()
         #start with creating the new iters
         topnode = Node(None, None, None, None, False)
         self.nodemap.add_node(topnode)
@@ -514,6 +530,11 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         self.__total = 0
         self.__displayed = 0
 
+        if not (dfilter or skip or self.has_secondary) and self._build_lazy():
+            _LOG.debug("rebuild search lazily")
+            self._lazy_build = True
+            return
+
         items = self.number_items()
         _LOG.debug("rebuild search primary")
         self.__rebuild_search(dfilter, skip, items,
@@ -559,7 +580,8 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             items = self.number_items()
             _LOG.debug("rebuild filter primary")
             self.__rebuild_filter(dfilter, skip, items,
-                                  self.gen_cursor, self.map, self.add_row)
+                                  self.gen_cursor, self.map_many,
+                                  self.add_row)
         else:
             # The tree has both primary and secondary data. The navigation type
             # (navtype) which governs the filters that are offered, is for the
@@ -567,9 +589,10 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             items = self.number_items2()
             _LOG.debug("rebuild filter secondary")
             self.__rebuild_filter(dfilter2, skip, items,
-                                    self.gen_cursor2, self.map2, self.add_row2)
+                                    self.gen_cursor2, self.map2_many,
+                                    self.add_row2)
 
-    def __rebuild_filter(self, dfilter, skip, items, gen_cursor, data_map,
+    def __rebuild_filter(self, dfilter, skip, items, gen_cursor, data_map_many,
                          add_func):
         """
         Rebuild the data map for a single Gramps object type, where a filter
@@ -586,13 +609,15 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         assert not skip
         if dfilter:
             cdb = CacheProxyDb(self.db)
-            for handle in dfilter.apply(cdb, tree=True,
-                                        user=User(parent=self.uistate.window,
-                                                  uistate=self.uistate)):
-                status_ppl.heartbeat()
-                data = data_map(handle)
-                add_func(handle, data)
-                self.__displayed += 1
+            handles = dfilter.apply(cdb, tree=True,
+                                    user=User(parent=self.uistate.window,
+                                              uistate=self.uistate))
+            for start in range(0, len(handles), CHUNKSIZE):
+                chunk = handles[start:start + CHUNKSIZE]
+                for handle, data in zip(chunk, data_map_many(chunk)):
+                    status_ppl.heartbeat()
+                    add_func(handle, data)
+                    self.__displayed += 1
         else:
             with gen_cursor() as cursor:
                 for handle, data in cursor:
@@ -620,6 +645,9 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
                     parent as a top group with no handle
         """
         self.clear_path_cache()
+        if parent in self._unloaded:
+            # the child is added when the children of its parent are loaded
+            return
         if add_parent and not (parent in self.tree):
             #add parent to self.tree as a node with no handle, as the first
             #group level
@@ -631,11 +659,10 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
                                secondary)
         else:
             parent_node = self.tree[parent]
-            child_node = Node(child, id(parent_node), sortkey, handle,
+            child_node = Node(child, parent_node.nodeid, sortkey, handle,
                               secondary)
             parent_node.add_child(child_node, self.nodemap)
             self.tree[child] = child_node
-            self.nodemap.add_node(child_node)
 
             if not self._in_build:
                 # emit row_inserted signal
@@ -646,7 +673,7 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
                     self.__total += 1
                     self.__displayed += 1
 
-        if handle:
+        if handle and handle != child_node.ref:
             self.handle2node[handle] = child_node
 
     def _add_dup_node(self, node, parent, child, sortkey, handle, secondary):
@@ -672,7 +699,7 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         self.clear_path_cache()
         if node.children:
-            del self.handle2node[node.handle]
+            self.handle2node.pop(node.handle, None)
             node.set_handle(None)
             self.__displayed -= 1
             self.__total -= 1
@@ -681,8 +708,9 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             path = self.do_get_path(iternode)
             self.nodemap.node(node.parent).remove_child(node, self.nodemap)
             del self.tree[node.ref]
+            self._unloaded.discard(node.ref)
             if node.handle is not None:
-                del self.handle2node[node.handle]
+                self.handle2node.pop(node.handle, None)
                 self.__displayed -= 1
                 self.__total -= 1
             self.nodemap.del_node(node)
@@ -691,6 +719,101 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             # emit row_deleted signal
             self.row_deleted(path)
 
+    def _build_lazy(self):
+        """
+        Add the top level nodes to the map, and the refs of the nodes with
+        children to _unloaded, if the database can tell which nodes have
+        children without reading all the objects.
+
+        Return True if the tree is built lazily, False to build it fully.
+        """
+        return False
+
+    def _load_lazy(self, ref):
+        """
+        Add the children of the node ref to the map, and the refs of those
+        with children to _unloaded.
+        """
+        raise NotImplementedError
+
+    def _lazy_parents(self, handle):
+        """
+        Return the refs of the nodes which must be loaded to show the object
+        with the given handle, from the top level down.
+        """
+        return []
+
+    def _refresh_lazy(self):
+        """
+        Update the nodes whose children are not loaded, after objects which
+        are not in the map were added, changed or deleted.
+        """
+
+    def _load_children(self, node):
+        """
+        Load the children of a node, if they are not loaded yet.
+        """
+        if node.ref not in self._unloaded:
+            return
+        cput = perf_counter()
+        self._unloaded.discard(node.ref)
+        in_build = self._in_build
+        self._in_build = True
+        self._load_lazy(node.ref)
+        self._in_build = in_build
+        self.clear_path_cache()
+        _LOG.debug(self.__class__.__name__ + ' _load_children ' +
+                    str(perf_counter() - cput) + ' sec')
+
+    def unload_children(self, iter):
+        """
+        Remove the children of a collapsed node from the map, in a tree built
+        lazily.  They are loaded again when the node is expanded.
+        """
+        node = self.get_node_from_iter(iter)
+        if not self._lazy_build or node is None or not node.children:
+            return
+        cput = perf_counter()
+        path = self.do_get_path(iter)
+        indices = tuple(path.get_indices()) if path else ()
+        # the node keeps its expander while its children are removed
+        self._unloaded.add(node.ref)
+        while node.children:
+            child = self.nodemap.node(node.children[-1][1])
+            index = 0 if self.__reverse else len(node.children) - 1
+            node.remove_child(child, self.nodemap)
+            self._unload_node(child)
+            self.clear_path_cache()
+            self.row_deleted(Gtk.TreePath(indices + (index,)))
+        _LOG.debug(self.__class__.__name__ + ' unload_children ' +
+                    str(perf_counter() - cput) + ' sec')
+
+    def _unload_node(self, node):
+        """
+        Remove a node and all the nodes below it from the map.
+        """
+        for sortkey, nodeid in node.children or ():
+            self._unload_node(self.nodemap.node(nodeid))
+        self._unloaded.discard(node.ref)
+        del self.tree[node.ref]
+        if node.handle is not None:
+            self.handle2node.pop(node.handle, None)
+        self.nodemap.del_node(node)
+
+    def _queue_refresh(self):
+        """
+        Refresh the nodes whose children are not loaded once all the pending
+        changes are handled.
+        """
+        if not self._refresh_id:
+            self._refresh_id = GLib.idle_add(self._refresh_step)
+
+    def _refresh_step(self):
+        self._refresh_id = 0
+        if self.db is not None and self.db.is_open() and self._lazy_build:
+            self._refresh_lazy()
+        return False
+
     def reverse_order(self):
         """
         Reverse the order of the map. Only for Gtk 3.9+ does this signal
@@ -746,6 +869,8 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         self.clear_path_cache()
         if self._get_node(handle) is not None:
             return # row already exists
+        if self._lazy_build:
+            self._queue_refresh()
         cput = perf_counter()
         data = self.map(handle)
         if data:
@@ -771,6 +896,8 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         self.clear_cache(handle)
         node = self._get_node(handle)
         if node is None:
+            if self._lazy_build:
+                self._queue_refresh()
             return # row not currently displayed
 
         parent = self.nodemap.node(node.parent)
@@ -809,6 +936,9 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         assert isinstance(handle, str)
         self.clear_cache(handle)
         if self._get_node(handle) is None:
+            if self._lazy_build:
+                # the row may move to a loaded node
+                self.add_row_by_handle(handle)
             return  # row not currently displayed
 
         self.dont_change_active = True
@@ -840,14 +970,19 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         if node is None:
             raise Exception('Not allowed to add None as node')
-        iter = self._new_iter(id(node))
+        iter = self._new_iter(node.nodeid)
         return iter
 
     def _get_node(self, handle):
         """
         Get the node for a handle.
         """
-        return self.handle2node.get(handle)
+        node = self.handle2node.get(handle)
+        if node is None:
+            node = self.tree.get(handle)
+            if node is not None and node.handle != handle:
+                return None
+        return node
 
     def get_iter_from_handle(self, handle):
         """
@@ -855,6 +990,13 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         visible
         """
         node = self._get_node(handle)
+        if node is None and self._unloaded:
+            for ref in self._lazy_parents(handle):
+                parent = self.tree.get(ref)
+                if parent is None:
+                    break
+                self._load_children(parent)
+            node = self._get_node(handle)
         if node is None:
             return None
         return self._get_iter(node)
@@ -963,12 +1105,11 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             pathlist = path.get_indices()
         for index in pathlist:
             _index = (-index - 1) if self.__reverse else index
+            self._load_children(node)
             try:
-                if len(node.children[_index]) > 0:
-                    node = self.nodemap.node(node.children[_index][1])
-                else:
-                    return False, Gtk.TreeIter()
-            except IndexError:
+                node = self.nodemap.node(node.children[_index][1])
+            except (IndexError, TypeError):
+                # TypeError: the node has no children
                 return False, Gtk.TreeIter()
         return True, self._get_iter(node)
 
@@ -983,45 +1124,19 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         Returns a path from a given node.
         """
-        cached, path = self.get_cached_path(iter.user_data)
-        if cached:
-            (treepath, pathtup) = path
-            return treepath
         node = self.get_node_from_iter(iter)
         pathlist = []
         while node.parent is not None:
             parent = self.nodemap.node(node.parent)
-            index = -1
-            while node is not None:
-                # Step backwards
-                nodeid = node.next if self.__reverse else node.prev
-                # Let's see if sibling is cached:
-                cached,  sib_path = self.get_cached_path(nodeid)
-                if cached:
-                    (sib_treepath, sib_pathtup) = sib_path
-                    # Does it have an actual path?
-                    if sib_pathtup:
-                        # Compute path to here from sibling:
-                        # parent_path + sib_path + offset
-                        newtup = (sib_pathtup[:-1] +
-                                  (sib_pathtup[-1] + index + 2, ) +
-                                  tuple(reversed(pathlist)))
-                        #print("computed path:", iter.user_data, newtup)
-                        retval = Gtk.TreePath(newtup)
-                        self.set_cached_path(iter.user_data, (retval, newtup))
-                        return retval
-                node = nodeid and self.nodemap.node(nodeid)
-                index += 1
+            index = parent.child_index(node)
+            if self.__reverse:
+                index = len(parent.children) - index - 1
             pathlist.append(index)
             node = parent
         if pathlist:
             pathlist.reverse()
-            #print("actual path :", iter.user_data, tuple(pathlist))
-            retval = Gtk.TreePath(tuple(pathlist))
-        else:
-            retval = None
-        self.set_cached_path(iter.user_data, (retval, tuple(pathlist) if pathlist else None))
-        return retval
+            return Gtk.TreePath(tuple(pathlist))
+        return None
 
     def do_iter_next(self, iter):
         """
@@ -1030,10 +1145,13 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         Get the next node with the same parent as the given node.
         """
         node = self.get_node_from_iter(iter)
-        val = node.prev if self.__reverse else node.next
-        if val:
+        if node.parent is None:
+            return False
+        parent = self.nodemap.node(node.parent)
+        index = parent.child_index(node) + (-1 if self.__reverse else 1)
+        if 0 <= index < len(parent.children):
             #user_data contains the nodeid
-            iter.user_data = val
+            iter.user_data = parent.children[index][1]
             return True
         else:
             return False
@@ -1043,9 +1161,10 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         Get the first child of the given node.
         """
         if iterparent is None:
-            nodeid = id(self.tree[None])
+            nodeid = self.tree[None].nodeid
         else:
             nodeparent = self.get_node_from_iter(iterparent)
+            self._load_children(nodeparent)
             if nodeparent.children:
                 nodeid = nodeparent.children[-1 if self.__reverse else 0][1]
             else:
@@ -1057,7 +1176,7 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         Find if the given node has any children.
         """
         node = self.get_node_from_iter(iter)
-        return True if node.children else False
+        return True if node.children or node.ref in self._unloaded else False
 
     def do_iter_n_children(self, iter):
         """
@@ -1067,7 +1186,8 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             node = self.tree[None]
         else:
             node = self.get_node_from_iter(iter)
-        return len(node.children)
+            self._load_children(node)
+        return len(node.children) if node.children else 0
 
     def do_iter_nth_child(self, iterparent, index):
         """
@@ -1077,6 +1197,7 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             node = self.tree[None]
         else:
             node = self.get_node_from_iter(iterparent)
+            self._load_children(node)
         if node.children:
             if len(node.children) > index:
                 _index = (-index - 1) if self.__reverse else index
@@ -669,9 +669,14 @@ class GuiGramplet:
                 elif link_type == 'Surname':
                     if event.button == 1: # left mouse
                         if event.type == Gdk.EventType.DOUBLE_BUTTON_PRESS:
+                            # The surname of a person, or the surname itself
+                            if self.dbstate.db.has_person_handle(handle):
+                                report_name = 'samesurnames'
+                            else:
+                                report_name = 'samesurnames_misc'
                             run_quick_report_by_name(self.dbstate,
                                                      self.uistate,
-                                                     'samesurnames',
+                                                     report_name,
                                                      handle)
                     return True
                 elif link_type == 'Given':
@@ -30,7 +30,8 @@ from gi.repository import Gtk
 # Gramps modules
 #
 #-------------------------------------------------------------------------
-from gramps.gen.utils.thumbnails import get_thumbnail_image, SIZE_NORMAL, SIZE_LARGE
+from gramps.gen.utils.thumbnails import (request_thumbnail_images,
+                                         SIZE_NORMAL, SIZE_LARGE)
 from ..utils import is_right_click, open_file_with_default_application
 from ..widgets.menuitem import add_menuitem
 from gramps.gen.const import GRAMPS_LOCALE as glocale
@@ -59,20 +60,32 @@ class Photo(Gtk.EventBox):
         self.__size = SIZE_LARGE
         if use_small_size:
             self.__size = SIZE_NORMAL
+        self.__request = 0
 
     def set_image(self, full_path, mime_type=None, rectangle=None):
         """
-        Set the image to be displayed.
+        Set the image to be displayed.  The thumbnail is shown when it is
+        ready, unless another image was set in the meantime.
         """
         self.full_path = full_path
+        self.__request += 1
         if full_path:
-            pixbuf = get_thumbnail_image(full_path, mime_type, rectangle,
-                                         self.__size)
-            self.photo.set_from_pixbuf(pixbuf)
-            self.photo.show()
+            request = self.__request
+            request_thumbnail_images(
+                [(full_path, mime_type, rectangle)],
+                lambda index, pixbuf: self.__show_thumbnail(request, pixbuf),
+                self.__size)
         else:
             self.photo.hide()
 
+    def __show_thumbnail(self, request, pixbuf):
+        """
+        Show a thumbnail requested by set_image.
+        """
+        if request == self.__request:
+            self.photo.set_from_pixbuf(pixbuf)
+            self.photo.show()
+
     def handle_button_press(self, widget, event):
         """
         Display the image with the default external viewer.
@@ -103,6 +116,7 @@ class Photo(Gtk.EventBox):
         Set the image to be displayed from a pixbuf.
         """
         self.full_path = full_path
+        self.__request += 1
         if full_path:
             self.photo.set_from_pixbuf(pixbuf)
             self.photo.show()
@@ -0,0 +1,176 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Codecs for the blob_data column of the DB-API tables.
+
+A codec converts the serialized data of a primary object to bytes and back.
+Every blob starts with a tag byte identifying its codec, followed, except for
+pickles which carry their own protocol number, by the version of the codec
+format.  Blobs can therefore always be decoded, whichever codec is currently
+used to write them.
+
+Pickle is the default codec.  The JSON codec is chosen with the
+'database.blob-codec' setting.  It does not depend on the version of Python,
+but it is slower to decode than a pickle, since the objects are rebuilt from
+their JSON representation, and the objects written with it cannot be read by
+earlier versions of Gramps.
+
+There is no compact binary codec yet.  The marshal format is not stable
+across Python versions, and a decoder written in Python is slower than the
+pickle module, which is written in C (see test/codec_benchmark.py).  A codec
+decoding faster than pickle can be added with register_codec.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import pickle
+import logging
+
+#------------------------------------------------------------------------
+#
+# Gramps Modules
+#
+#------------------------------------------------------------------------
+import gramps.gen.lib as lib
+from gramps.gen.errors import DbError
+from gramps.gen.lib.serialize import to_json, from_json
+from gramps.gen.const import GRAMPS_LOCALE as glocale
+_ = glocale.translation.gettext
+
+LOG = logging.getLogger(".dbapi")
+
+DEFAULT_CODEC = 'pickle'
+
+#-------------------------------------------------------------------------
+#
+# BlobCodec class
+#
+#-------------------------------------------------------------------------
+class BlobCodec:
+    """
+    Base class for blob codecs.
+    """
+    name = None     # name used in the 'database.blob-codec' setting
+    tag = None      # first byte of the encoded blobs
+    version = 0     # version of the format, second byte of the blobs
+
+    def header(self):
+        """
+        Return the bytes prepended to the encoded blobs.
+        """
+        return bytes((self.tag, self.version))
+
+    def encode(self, obj_class, data):
+        """
+        Encode the serialized data of an object of the given class name.
+        """
+        raise NotImplementedError
+
+    def decode(self, blob):
+        """
+        Decode a blob into the serialized data of an object.
+        """
+        raise NotImplementedError
+
+#-------------------------------------------------------------------------
+#
+# PickleCodec class
+#
+#-------------------------------------------------------------------------
+class PickleCodec(BlobCodec):
+    """
+    Pickled data, as written by all previous versions of Gramps.
+    """
+    name = 'pickle'
+    tag = pickle.PROTO[0]
+
+    def encode(self, obj_class, data):
+        return pickle.dumps(data)
+
+    def decode(self, blob):
+        return pickle.loads(blob)
+
+#-------------------------------------------------------------------------
+#
+# JsonCodec class
+#
+#-------------------------------------------------------------------------
+class JsonCodec(BlobCodec):
+    """
+    JSON representation of the object, as produced by
+    :func:`~gramps.gen.lib.serialize.to_json`.  Unlike a pickle, it does not
+    depend on the version of Python.
+    """
+    name = 'json'
+    tag = ord('J')
+    version = 1
+
+    def encode(self, obj_class, data):
+        obj = getattr(lib, obj_class).create(data)
+        return self.header() + to_json(obj).encode('utf-8')
+
+    def decode(self, blob):
+        return from_json(bytes(blob[2:]).decode('utf-8')).serialize()
+
+#-------------------------------------------------------------------------
+#
+# Codec registry
+#
+#-------------------------------------------------------------------------
+CODECS = {}
+_TAGS = {}
+
+def register_codec(codec):
+    """
+    Register a blob codec, so that it can be selected by name and its blobs
+    can be decoded.
+    """
+    CODECS[codec.name] = codec
+    _TAGS[codec.tag] = codec
+
+for _codec in (PickleCodec(), JsonCodec()):
+    register_codec(_codec)
+
+def get_codec(name):
+    """
+    Return the codec with the given name, or the default codec if there is
+    no such codec.
+    """
+    if name not in CODECS:
+        LOG.warning("Unknown blob codec '%s', using '%s'", name, DEFAULT_CODEC)
+        name = DEFAULT_CODEC
+    return CODECS[name]
+
+def decode_blob(blob):
+    """
+    Decode a blob, written by any of the registered codecs.
+    """
+    try:
+        codec = _TAGS[blob[0]]
+    except KeyError:
+        raise DbError(_("Unknown blob format %d") % blob[0])
+    if codec.version and blob[1] > codec.version:
+        raise DbError(_("Unsupported %(codec)s blob version %(version)d") %
+                      {'codec': codec.name, 'version': blob[1]})
+    return codec.decode(blob)
@@ -39,21 +39,80 @@ from gramps.gen.db.dbconst import (DBLOGNAME, DBBACKEND, KEY_TO_NAME_MAP,
                                    PERSON_KEY, FAMILY_KEY, SOURCE_KEY,
                                    EVENT_KEY, MEDIA_KEY, PLACE_KEY, NOTE_KEY,
                                    TAG_KEY, CITATION_KEY, REPOSITORY_KEY,
-                                   REFERENCE_KEY)
+                                   REFERENCE_KEY, ARRAYSIZE, CHUNKSIZE)
 from gramps.gen.db.generic import DbGeneric
+from gramps.gen.db.graph import IndexedFamilyGraph
 from gramps.gen.updatecallback import UpdateCallback
 from gramps.gen.lib import (Tag, Media, Person, Family, Source,
-                            Citation, Event, Place, Repository, Note)
+                            Citation, Event, Place, Repository, Note,
+                            EventType)
 from gramps.gen.lib.genderstats import GenderStats
+from gramps.gen.config import config
 from gramps.gen.const import GRAMPS_LOCALE as glocale
+from gramps.plugins.db.dbapi.codec import get_codec, decode_blob
 
 LOG = logging.getLogger(".dbapi")
 _LOG = logging.getLogger(DBLOGNAME)
 
+# Roles of the rows of the family_link table
+LINK_PARENT_FAMILY = 0  # family in which the person is a child
+LINK_SPOUSE_FAMILY = 1  # family in which the person is a spouse
+LINK_CHILD = 2          # child of the family
+
+# The backlinks of the objects committed in a batch transaction are updated
+# whenever this number of objects is reached, rather than only at the end,
+# so that the memory used by large imports stays bounded.
+BATCH_BACKLINKS = 50000
+
+# Once a batch transaction has committed this number of objects of a type,
+# the handles of its table are read at once, so that the new objects
+# committed afterwards are not looked up one by one.
+BATCH_LOOKUPS = 1000
+
 class DBAPI(DbGeneric):
     """
     Database backends class for DB-API 2.0 databases
     """
+    def __init__(self, directory=None):
+        # New objects committed in a batch transaction are buffered here,
+        # and inserted together by _flush_batch:
+        #   _pending[obj_key] = {handle: row}
+        #   _pending_ids[obj_key] = {gramps_id: handle}
+        #   _pending_columns[obj_key] = list of column names for row
+        self._pending = {}
+        self._pending_ids = {}
+        self._pending_columns = {}
+        self._secondary_fields = {}
+        # Handles committed in a batch transaction, whose backlinks are
+        # updated by _update_batch_backlinks: _touched[obj_key] = set()
+        self._touched = {}
+        # Handles of the tables, read during a batch transaction once
+        # BATCH_LOOKUPS objects were committed, and kept up to date:
+        #   _existing[obj_key] = set()
+        #   _lookups[obj_key] = number of objects looked up one by one
+        self._existing = {}
+        self._lookups = {}
+        # In-memory family graph, loaded from the family_link table when
+        # first needed, and kept up to date by _update_family_links
+        self._family_graph = None
+        self._codec = get_codec(config.get('database.blob-codec'))
+        super().__init__(directory)
+
+    def set_blob_codec(self, name):
+        """
+        Set the codec used to encode the data of primary objects.
+
+        Existing data is still readable, and is converted to the new
+        format when the objects are next written.
+        """
+        self._codec = get_codec(name)
+
+    def _encode(self, obj_key, data):
+        """
+        Encode the serialized data of a primary object for storage.
+        """
+        return self._codec.encode(KEY_TO_CLASS_MAP[obj_key], data)
+
     def _initialize(self, directory, username, password):
         raise NotImplementedError
 
@@ -78,6 +137,9 @@ class DBAPI(DbGeneric):
                            'handle VARCHAR(50) PRIMARY KEY NOT NULL, '
                            'given_name TEXT, '
                            'surname TEXT, '
+                           'group_as TEXT, '
+                           'primary_surname TEXT, '
+                           'lone_patronymic INTEGER, '
                            'blob_data BLOB'
                            ')')
         self.dbapi.execute('CREATE TABLE family '
@@ -98,6 +160,8 @@ class DBAPI(DbGeneric):
         self.dbapi.execute('CREATE TABLE event '
                            '('
                            'handle VARCHAR(50) PRIMARY KEY NOT NULL, '
+                           'sortval INTEGER, '
+                           'event_type INTEGER, '
                            'blob_data BLOB'
                            ')')
         self.dbapi.execute('CREATE TABLE media '
@@ -134,6 +198,7 @@ class DBAPI(DbGeneric):
                            'ref_handle VARCHAR(50), '
                            'ref_class TEXT'
                            ')')
+        self._create_family_link_table()
         self.dbapi.execute('CREATE TABLE name_group '
                            '('
                            'name VARCHAR(50) PRIMARY KEY NOT NULL, '
@@ -161,6 +226,7 @@ class DBAPI(DbGeneric):
                            'ON person(surname)')
         self.dbapi.execute('CREATE INDEX person_given_name '
                            'ON person(given_name)')
+        self._create_name_group_index()
         self.dbapi.execute('CREATE INDEX source_title '
                            'ON source(title)')
         self.dbapi.execute('CREATE INDEX source_gramps_id '
@@ -187,6 +253,7 @@ class DBAPI(DbGeneric):
                            'ON family(gramps_id)')
         self.dbapi.execute('CREATE INDEX event_gramps_id '
                            'ON event(gramps_id)')
+        self._create_event_indexes()
         self.dbapi.execute('CREATE INDEX repository_gramps_id '
                            'ON repository(gramps_id)')
         self.dbapi.execute('CREATE INDEX note_gramps_id '
@@ -196,7 +263,51 @@ class DBAPI(DbGeneric):
 
         self.dbapi.commit()
 
+    def _create_family_link_table(self):
+        """
+        Create the table of the links between people and families.
+
+        The rows of a person are its parent and spouse families, in order;
+        the rows of a family are its children, in order.  The parents of a
+        family are in the father_handle and mother_handle columns of the
+        family table.
+        """
+        self.dbapi.execute('CREATE TABLE family_link '
+                           '('
+                           'person_handle VARCHAR(50), '
+                           'family_handle VARCHAR(50), '
+                           'role INTEGER, '
+                           'position INTEGER'
+                           ')')
+        self.dbapi.execute('CREATE INDEX family_link_person_handle '
+                           'ON family_link(person_handle)')
+        self.dbapi.execute('CREATE INDEX family_link_family_handle '
+                           'ON family_link(family_handle)')
+
+    def _create_name_group_index(self):
+        """
+        Create the index of the columns of the person table which decide the
+        group of a person in the person tree view.
+        """
+        self.dbapi.execute('CREATE INDEX person_name_group '
+                           'ON person(group_as, primary_surname, '
+                           'lone_patronymic)')
+
+    def _create_event_indexes(self):
+        """
+        Create the indexes of the date, type and place columns of the event
+        table, used by get_event_handles_by_date.  The place column is the
+        secondary column of the place handle.
+        """
+        self.dbapi.execute('CREATE INDEX event_sortval '
+                           'ON event(sortval)')
+        self.dbapi.execute('CREATE INDEX event_type_sortval '
+                           'ON event(event_type, sortval)')
+        self.dbapi.execute('CREATE INDEX event_place '
+                           'ON event(place)')
+
     def _close(self):
+        self._family_graph = None
         self.dbapi.close()
 
     def _txn_begin(self):
@@ -224,6 +335,8 @@ class DBAPI(DbGeneric):
         """
         if self.transaction == None:
             self.dbapi.rollback()
+            self._cache_clear()
+            self._statistics = None
 
     def transaction_begin(self, transaction):
         """
@@ -253,8 +366,10 @@ class DBAPI(DbGeneric):
                   TXNDEL: "-delete",
                   None: "-delete"}
         if txn.batch:
-            # FIXME: need a User GUI update callback here:
-            self.reindex_reference_map(lambda percent: percent)
+            self._flush_batch()
+            self._update_batch_backlinks()
+            self._existing = {}
+            self._lookups = {}
         self.dbapi.commit()
         if not txn.batch:
             # Now, emit signals:
@@ -286,7 +401,16 @@ class DBAPI(DbGeneric):
         """
         Executed after a batch operation abort.
         """
+        self._clear_batch()
+        self._touched = {}
+        self._existing = {}
+        self._lookups = {}
+        self._family_graph = None
+        self._id_allocators = {}
+        self._statistics = None
         self.dbapi.rollback()
+        # Rolled back objects may have been written through to the cache
+        self._cache_clear()
         self.transaction = None
         txn.clear()
         txn.first = None
@@ -364,6 +488,7 @@ class DBAPI(DbGeneric):
         :param locale: The locale to use for collation.
         :type locale: A GrampsLocale object.
         """
+        self._flush_batch()
         if sort_handles:
             if locale != glocale:
                 self.dbapi.check_collation(locale)
@@ -386,6 +511,7 @@ class DBAPI(DbGeneric):
         :param locale: The locale to use for collation.
         :type locale: A GrampsLocale object.
         """
+        self._flush_batch()
         if sort_handles:
             if locale != glocale:
                 self.dbapi.check_collation(locale)
@@ -416,6 +542,7 @@ class DBAPI(DbGeneric):
         Return a list of database handles, one handle for each Event in the
         database.
         """
+        self._flush_batch()
         self.dbapi.execute("SELECT handle FROM event")
         rows = self.dbapi.fetchall()
         return [row[0] for row in rows]
@@ -430,6 +557,7 @@ class DBAPI(DbGeneric):
         :param locale: The locale to use for collation.
         :type locale: A GrampsLocale object.
         """
+        self._flush_batch()
         if sort_handles:
             if locale != glocale:
                 self.dbapi.check_collation(locale)
@@ -452,6 +580,7 @@ class DBAPI(DbGeneric):
         :param locale: The locale to use for collation.
         :type locale: A GrampsLocale object.
         """
+        self._flush_batch()
         if sort_handles:
             if locale != glocale:
                 self.dbapi.check_collation(locale)
@@ -474,6 +603,7 @@ class DBAPI(DbGeneric):
         :param locale: The locale to use for collation.
         :type locale: A GrampsLocale object.
         """
+        self._flush_batch()
         if sort_handles:
             if locale != glocale:
                 self.dbapi.check_collation(locale)
@@ -491,6 +621,7 @@ class DBAPI(DbGeneric):
         Return a list of database handles, one handle for each Repository in
         the database.
         """
+        self._flush_batch()
         self.dbapi.execute("SELECT handle FROM repository")
         rows = self.dbapi.fetchall()
         return [row[0] for row in rows]
@@ -505,6 +636,7 @@ class DBAPI(DbGeneric):
         :param locale: The locale to use for collation.
         :type locale: A GrampsLocale object.
         """
+        self._flush_batch()
         if sort_handles:
             if locale != glocale:
                 self.dbapi.check_collation(locale)
@@ -522,6 +654,7 @@ class DBAPI(DbGeneric):
         Return a list of database handles, one handle for each Note in the
         database.
         """
+        self._flush_batch()
         self.dbapi.execute("SELECT handle FROM note")
         rows = self.dbapi.fetchall()
         return [row[0] for row in rows]
@@ -536,6 +669,7 @@ class DBAPI(DbGeneric):
         :param locale: The locale to use for collation.
         :type locale: A GrampsLocale object.
         """
+        self._flush_batch()
         if sort_handles:
             if locale != glocale:
                 self.dbapi.check_collation(locale)
@@ -548,19 +682,111 @@ class DBAPI(DbGeneric):
         rows = self.dbapi.fetchall()
         return [row[0] for row in rows]
 
+    def select_handles(self, obj_class, where, values):
+        """
+        Return the handles of the objects of the given class matching an SQL
+        condition on the columns of their table.
+        """
+        self._flush_batch()
+        self.dbapi.execute("SELECT handle FROM %s WHERE %s"
+                           % (obj_class.lower(), where), values)
+        return [row[0] for row in self.dbapi.fetchall()]
+
+    def get_column_values(self, obj_class, column):
+        """
+        Return a list of (handle, value) pairs, with the value of a column of
+        the table of the given object class for each of its objects.
+        """
+        self._flush_batch()
+        self.dbapi.execute("SELECT handle, %s FROM %s"
+                           % (column, obj_class.lower()))
+        return self.dbapi.fetchall()
+
+    def get_column_counts(self, obj_class, columns):
+        """
+        Return a list of tuples, with the values of the given columns of the
+        table of the given object class followed by the number of objects
+        with these values, for each distinct combination of values.
+        """
+        self._flush_batch()
+        columns = ", ".join(columns)
+        self.dbapi.execute("SELECT %s, COUNT(*) FROM %s GROUP BY %s"
+                           % (columns, obj_class.lower(), columns))
+        return self.dbapi.fetchall()
+
+    def get_raw_data_by_columns(self, obj_class, values):
+        """
+        Return a list of (handle, raw data) pairs, for the objects of the
+        given class whose table columns have the values of the dictionary
+        values, {column: value}.
+        """
+        self._flush_batch()
+        where = " AND ".join("%s = ?" % column for column in values)
+        self.dbapi.execute("SELECT handle, blob_data FROM %s WHERE %s"
+                           % (obj_class.lower(), where),
+                           self._sql_cast_list(list(values.values())))
+        return [(row[0], decode_blob(row[1]))
+                for row in self.dbapi.fetchall()]
+
+    def get_event_handles_by_date(self, start=None, stop=None,
+                                  event_types=None, place_handle=None):
+        self._flush_batch()
+        where = []
+        values = []
+        if start is not None:
+            where.append("sortval >= ?")
+            values.append(start.get_sort_value())
+        if stop is not None:
+            where.append("sortval <= ?")
+            values.append(stop.get_sort_value())
+        custom = None
+        if event_types is not None:
+            event_types = [EventType(event_type) for event_type in event_types]
+            # Custom types all have the same value, and are told apart by
+            # their string
+            custom = set(str(event_type) for event_type in event_types
+                         if event_type.is_custom())
+            type_values = set(event_type.value for event_type in event_types)
+            if not type_values:
+                return []
+            where.append("event_type IN (%s)"
+                         % ", ".join("?" * len(type_values)))
+            values.extend(type_values)
+        if place_handle:
+            where.append("place = ?")
+            values.append(place_handle)
+        sql = "SELECT handle, event_type FROM event"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        self.dbapi.execute(sql, values)
+        rows = self.dbapi.fetchall()
+        if not custom:
+            return [row[0] for row in rows]
+        handles = []
+        for handle, type_value in rows:
+            if type_value == EventType.CUSTOM:
+                # data[2] is the type, a tuple (value, string)
+                data = self._get_raw_data(EVENT_KEY, handle)
+                if data[2][1] not in custom:
+                    continue
+            handles.append(handle)
+        return handles
+
     def get_tag_from_name(self, name):
         """
         Find a Tag in the database from the passed Tag name.
 
         If no such Tag exists, None is returned.
         """
+        self._flush_batch()
         self.dbapi.execute("SELECT blob_data FROM tag WHERE name = ?", [name])
         row = self.dbapi.fetchone()
         if row:
-            return Tag.create(pickle.loads(row[0]))
+            return Tag.create(decode_blob(row[0]))
         return None
 
     def _get_number_of(self, obj_key):
+        self._flush_batch()
         table = KEY_TO_NAME_MAP[obj_key]
         sql = "SELECT count(1) FROM %s" % table
         self.dbapi.execute(sql)
@@ -602,26 +828,38 @@ class DBAPI(DbGeneric):
         Commit the specified object to the database, storing the changes as
         part of the transaction.
         """
-        old_data = None
         obj.change = int(change_time or time.time())
         table = KEY_TO_NAME_MAP[obj_key]
-
-        if self._has_handle(obj_key, obj.handle):
-            old_data = self._get_raw_data(obj_key, obj.handle)
+        blob = self._encode(obj_key, obj.serialize())
+
+        if trans.batch:
+            self._touched.setdefault(obj_key, set()).add(obj.handle)
+            if self.get_feature("batch-write-buffer") is not False:
+                old_data = self._commit_batch(obj, obj_key, blob)
+                self._update_id_allocator(obj_key, old_data, obj)
+                self._update_statistics(obj_key, old_data, obj, trans)
+                self._limit_batch()
+                return old_data
+
+        old_data = self._get_raw_data(obj_key, obj.handle)
+        if old_data:
             # update the object:
             sql = "UPDATE %s SET blob_data = ? WHERE handle = ?" % table
-            self.dbapi.execute(sql,
-                               [pickle.dumps(obj.serialize()),
-                                obj.handle])
+            self.dbapi.execute(sql, [blob, obj.handle])
         else:
             # Insert the object:
             sql = ("INSERT INTO %s (handle, blob_data) VALUES (?, ?)") % table
-            self.dbapi.execute(sql,
-                               [obj.handle,
-                                pickle.dumps(obj.serialize())])
+            self.dbapi.execute(sql, [obj.handle, blob])
+        self._cache_put(obj_key, obj.handle, blob)
         self._update_secondary_values(obj)
-        if not trans.batch:
+        self._update_id_allocator(obj_key, old_data, obj)
+        self._update_statistics(obj_key, old_data, obj, trans)
+        if trans.batch:
+            self._limit_batch()
+        else:
             self._update_backlinks(obj, trans)
+            if obj_key in (PERSON_KEY, FAMILY_KEY):
+                self._update_family_links(obj_key, [obj.handle], [obj])
             if old_data:
                 trans.add(obj_key, TXNUPD, obj.handle,
                           old_data,
@@ -638,24 +876,110 @@ class DBAPI(DbGeneric):
         Commit a serialized primary object to the database, storing the
         changes as part of the transaction.
         """
+        self._flush_batch()
+        self._existing.pop(obj_key, None)
         table = KEY_TO_NAME_MAP[obj_key]
         handle = data[0]
+        blob = self._encode(obj_key, data)
 
         if self._has_handle(obj_key, handle):
             # update the object:
             sql = "UPDATE %s SET blob_data = ? WHERE handle = ?" % table
-            self.dbapi.execute(sql,
-                               [pickle.dumps(data),
-                                handle])
+            self.dbapi.execute(sql, [blob, handle])
         else:
             # Insert the object:
             sql = ("INSERT INTO %s (handle, blob_data) VALUES (?, ?)") % table
-            self.dbapi.execute(sql,
-                               [handle,
-                                pickle.dumps(data)])
+            self.dbapi.execute(sql, [handle, blob])
+        self._cache_put(obj_key, handle, blob)
+        self._id_allocators.pop(obj_key, None)
+        self._statistics = None
 
         return
 
+    def _commit_batch(self, obj, obj_key, blob):
+        """
+        Commit an object in a batch transaction.
+
+        Existing objects are updated, together with their secondary columns,
+        in a single statement.  New objects are buffered, and inserted in
+        bulk by _flush_batch.
+        """
+        table = KEY_TO_NAME_MAP[obj_key]
+        handle = obj.handle
+        pending = self._pending.setdefault(obj_key, {})
+        pending_ids = self._pending_ids.setdefault(obj_key, {})
+        columns, values = self._secondary_columns(obj)
+
+        old_data = self._get_batch_data(obj_key, handle)
+        if old_data and handle not in pending:
+            sets = ", ".join("%s = ?" % column
+                             for column in ['blob_data'] + columns)
+            self.dbapi.execute("UPDATE %s SET %s WHERE handle = ?"
+                               % (table, sets),
+                               [blob] + values + [handle])
+        else:
+            if old_data:
+                old_gid = old_data[1]
+                if pending_ids.get(old_gid) == handle:
+                    del pending_ids[old_gid]
+            self._pending_columns[obj_key] = ['handle', 'blob_data'] + columns
+            pending[handle] = [handle, blob] + values
+            gramps_id = getattr(obj, 'gramps_id', None)
+            if gramps_id is not None:
+                pending_ids[gramps_id] = handle
+            if len(pending) >= CHUNKSIZE:
+                self._flush_batch()
+        self._cache_put(obj_key, handle, blob)
+        return old_data
+
+    def _get_batch_data(self, obj_key, handle):
+        """
+        Return the data of an object committed in a batch transaction, or
+        None if it is a new object.
+
+        The first BATCH_LOOKUPS objects of a type are looked up one by one.
+        The handles of its table are then read in one query, and only the
+        objects found there are looked up.
+        """
+        existing = self._existing.get(obj_key)
+        if existing is None:
+            lookups = self._lookups.get(obj_key, 0) + 1
+            self._lookups[obj_key] = lookups
+            if lookups <= BATCH_LOOKUPS:
+                return self._get_raw_data(obj_key, handle)
+            self.dbapi.execute("SELECT handle FROM %s"
+                               % KEY_TO_NAME_MAP[obj_key])
+            existing = set(row[0] for row in self.dbapi.fetchall())
+            existing.update(self._pending.get(obj_key, ()))
+            self._existing[obj_key] = existing
+        if handle in existing:
+            return self._get_raw_data(obj_key, handle)
+        existing.add(handle)
+        return None
+
+    def _flush_batch(self):
+        """
+        Insert the objects buffered during a batch transaction.
+        """
+        if not self._pending:
+            return
+        for obj_key, pending in self._pending.items():
+            if pending:
+                table = KEY_TO_NAME_MAP[obj_key]
+                columns = self._pending_columns[obj_key]
+                sql = ("INSERT INTO %s (%s) VALUES (%s)"
+                       % (table, ", ".join(columns),
+                          ", ".join("?" * len(columns))))
+                self.dbapi.executemany(sql, list(pending.values()))
+        self._clear_batch()
+
+    def _clear_batch(self):
+        """
+        Discard the objects buffered during a batch transaction.
+        """
+        self._pending = {}
+        self._pending_ids = {}
+
     def _update_backlinks(self, obj, transaction):
 
         # Find existing references
@@ -709,9 +1033,82 @@ class DBAPI(DbGeneric):
             table = KEY_TO_NAME_MAP[obj_key]
             sql = "DELETE FROM %s WHERE handle = ?" % table
             self.dbapi.execute(sql, [handle])
-            if not transaction.batch:
+            self._cache_invalidate(obj_key, handle)
+            if obj_key in (PERSON_KEY, FAMILY_KEY):
+                self._update_family_links(obj_key, [handle], [None])
+            pending = self._pending.get(obj_key)
+            if pending and handle in pending:
+                del pending[handle]
+                pending_ids = self._pending_ids[obj_key]
+                if pending_ids.get(data[1]) == handle:
+                    del pending_ids[data[1]]
+            self._update_id_allocator(obj_key, data, None)
+            self._update_statistics(obj_key, data, None, transaction)
+            if transaction.batch:
+                self._touched.get(obj_key, set()).discard(handle)
+                self._existing.get(obj_key, set()).discard(handle)
+            else:
                 transaction.add(obj_key, TXNDEL, handle, data, None)
 
+    def _limit_batch(self):
+        """
+        Update the backlinks of the objects committed so far in a batch
+        transaction once there are BATCH_BACKLINKS of them.
+        """
+        if (sum(len(handles) for handles in self._touched.values())
+                >= BATCH_BACKLINKS):
+            self._flush_batch()
+            self._update_batch_backlinks()
+
+    def _update_batch_backlinks(self):
+        """
+        Update the backlinks of the objects committed in a batch transaction.
+
+        Only the references of the touched objects are compared with the
+        reference table, so that the cost depends on the size of the batch
+        rather than on the size of the database.
+        """
+        touched, self._touched = self._touched, {}
+        for obj_key, handles in touched.items():
+            obj_class = KEY_TO_CLASS_MAP[obj_key]
+            class_func = self._get_table_func(obj_class, "class_func")
+            handles = list(handles)
+            for start in range(0, len(handles), CHUNKSIZE):
+                chunk = handles[start:start + CHUNKSIZE]
+                existing = {handle: set() for handle in chunk}
+                sql = ("SELECT obj_handle, ref_class, ref_handle "
+                       "FROM reference WHERE obj_handle IN (%s)"
+                       % ", ".join("?" * len(chunk)))
+                self.dbapi.execute(sql, chunk)
+                for obj_handle, ref_class, ref_handle in self.dbapi.fetchall():
+                    existing[obj_handle].add((ref_class, ref_handle))
+
+                new_rows = []
+                old_rows = []
+                objs = []
+                raw_data = self._get_raw_data_many(obj_key, chunk)
+                for handle, data in zip(chunk, raw_data):
+                    if data is None:
+                        obj = None
+                        current = set()
+                    else:
+                        obj = class_func.create(data)
+                        current = set(obj.get_referenced_handles_recursively())
+                    objs.append(obj)
+                    for (ref_class, ref_handle) in current - existing[handle]:
+                        new_rows.append((handle, obj_class,
+                                         ref_handle, ref_class))
+                    for (ref_class, ref_handle) in existing[handle] - current:
+                        old_rows.append((handle, ref_class, ref_handle))
+                if old_rows:
+                    self.dbapi.executemany("DELETE FROM reference "
+                                           "WHERE obj_handle = ? "
+                                           "AND ref_class = ? "
+                                           "AND ref_handle = ?", old_rows)
+                self._insert_references(new_rows)
+                if obj_key in (PERSON_KEY, FAMILY_KEY):
+                    self._update_family_links(obj_key, chunk, objs)
+
     def _remove_backlinks(self, obj_class, obj_handle, transaction):
         """
         Removes all references from this object (backlinks).
@@ -766,6 +1163,7 @@ class DBAPI(DbGeneric):
             person = self.get_person_from_handle(handle)
             if person:
                 return person
+        self._flush_batch()
         self.dbapi.execute("SELECT handle FROM person")
         row = self.dbapi.fetchone()
         if row:
@@ -775,6 +1173,7 @@ class DBAPI(DbGeneric):
         """
         Return an iterator over handles in the database
         """
+        self._flush_batch()
         table = KEY_TO_NAME_MAP[obj_key]
         sql = "SELECT handle FROM %s" % table
         self.dbapi.execute(sql)
@@ -786,6 +1185,7 @@ class DBAPI(DbGeneric):
         """
         Return an iterator over raw data in the database.
         """
+        self._flush_batch()
         table = KEY_TO_NAME_MAP[obj_key]
         sql = "SELECT handle, blob_data FROM %s" % table
         with self.dbapi.cursor() as cursor:
@@ -793,13 +1193,14 @@ class DBAPI(DbGeneric):
             rows = cursor.fetchmany()
             while rows:
                 for row in rows:
-                    yield (row[0], pickle.loads(row[1]))
+                    yield (row[0], decode_blob(row[1]))
                 rows = cursor.fetchmany()
 
     def _iter_raw_place_tree_data(self):
         """
         Return an iterator over raw data in the place hierarchy.
         """
+        self._flush_batch()
         to_do = ['']
         sql = 'SELECT handle, blob_data FROM place WHERE enclosed_by = ?'
         while to_do:
@@ -808,12 +1209,13 @@ class DBAPI(DbGeneric):
             rows = self.dbapi.fetchall()
             for row in rows:
                 to_do.append(row[0])
-                yield (row[0], pickle.loads(row[1]))
+                yield (row[0], decode_blob(row[1]))
 
     def reindex_reference_map(self, callback):
         """
         Reindex all primary records in the database.
         """
+        self._flush_batch()
         self._txn_begin()
         self.dbapi.execute("DELETE FROM reference")
         total = 0
@@ -838,23 +1240,127 @@ class DBAPI(DbGeneric):
         # to loop through each of the primary object tables.
         for cursor_func, class_func in primary_table:
             logging.info("Rebuilding %s reference map", class_func.__name__)
+            rows = []
             with cursor_func() as cursor:
                 for found_handle, val in cursor:
                     obj = class_func.create(val)
                     references = set(obj.get_referenced_handles_recursively())
                     # handle addition of new references
                     for (ref_class_name, ref_handle) in references:
-                        self.dbapi.execute(
-                            "INSERT INTO reference "
-                            "(obj_handle, obj_class, ref_handle, ref_class) "
-                            "VALUES (?, ?, ?, ?)",
-                            [obj.handle,
-                             obj.__class__.__name__,
-                             ref_handle,
-                             ref_class_name])
+                        rows.append((obj.handle, class_func.__name__,
+                                     ref_handle, ref_class_name))
+                    if len(rows) >= ARRAYSIZE:
+                        self._insert_references(rows)
+                        rows = []
                     self.update()
+            self._insert_references(rows)
         self._txn_commit()
 
+    def _insert_references(self, rows):
+        """
+        Insert a list of (obj_handle, obj_class, ref_handle, ref_class) rows
+        into the reference table.
+        """
+        if rows:
+            self.dbapi.executemany("INSERT INTO reference "
+                                   "(obj_handle, obj_class, "
+                                   "ref_handle, ref_class) "
+                                   "VALUES (?, ?, ?, ?)", rows)
+
+    def _insert_family_links(self, obj):
+        """
+        Insert the family_link rows of a person or family.
+        """
+        if isinstance(obj, Person):
+            rows = [(obj.handle, family_handle, LINK_PARENT_FAMILY, position)
+                    for position, family_handle
+                    in enumerate(obj.get_parent_family_handle_list())]
+            rows += [(obj.handle, family_handle, LINK_SPOUSE_FAMILY, position)
+                     for position, family_handle
+                     in enumerate(obj.get_family_handle_list())]
+        else:
+            rows = [(child_ref.ref, obj.handle, LINK_CHILD, position)
+                    for position, child_ref
+                    in enumerate(obj.get_child_ref_list())]
+        if rows:
+            self.dbapi.executemany("INSERT INTO family_link "
+                                   "(person_handle, family_handle, "
+                                   "role, position) "
+                                   "VALUES (?, ?, ?, ?)", rows)
+
+    def _update_family_links(self, obj_key, handles, objs):
+        """
+        Replace the family_link rows of people or families, and update the
+        family graph if it is loaded.  None in objs stands for a removed
+        object.
+        """
+        if obj_key == PERSON_KEY:
+            sql = ("DELETE FROM family_link "
+                   "WHERE person_handle = ? AND role <> %d" % LINK_CHILD)
+        else:
+            sql = ("DELETE FROM family_link "
+                   "WHERE family_handle = ? AND role = %d" % LINK_CHILD)
+        self.dbapi.executemany(sql, [[handle] for handle in handles])
+        graph = self._family_graph
+        for handle, obj in zip(handles, objs):
+            if obj is None:
+                if graph is not None:
+                    graph.remove(handle)
+                continue
+            self._insert_family_links(obj)
+            if graph is None:
+                continue
+            if obj_key == PERSON_KEY:
+                graph.set_person(handle, obj.get_parent_family_handle_list(),
+                                 obj.get_family_handle_list())
+            else:
+                graph.set_family(handle, obj.get_father_handle(),
+                                 obj.get_mother_handle(),
+                                 [child_ref.ref for child_ref
+                                  in obj.get_child_ref_list()])
+
+    def get_family_graph(self):
+        """
+        Return the family graph of the database, loaded from the family_link
+        table.
+        """
+        self._flush_batch()
+        if self._touched.get(PERSON_KEY) or self._touched.get(FAMILY_KEY):
+            # The links of a running batch transaction are not indexed yet
+            return super().get_family_graph()
+        if self._family_graph is None:
+            self._family_graph = self._load_family_graph()
+        return self._family_graph
+
+    def _load_family_graph(self):
+        """
+        Build the in-memory family graph from the family_link table.
+        """
+        parent_families = {}
+        spouse_families = {}
+        children = {}
+        self.dbapi.execute("SELECT person_handle, family_handle, role "
+                           "FROM family_link ORDER BY position")
+        for person_handle, family_handle, role in self.dbapi.fetchall():
+            if role == LINK_PARENT_FAMILY:
+                parent_families.setdefault(person_handle, []).append(
+                    family_handle)
+            elif role == LINK_SPOUSE_FAMILY:
+                spouse_families.setdefault(person_handle, []).append(
+                    family_handle)
+            else:
+                children.setdefault(family_handle, []).append(person_handle)
+        graph = IndexedFamilyGraph()
+        self.dbapi.execute("SELECT handle, father_handle, mother_handle "
+                           "FROM family")
+        for handle, father_handle, mother_handle in self.dbapi.fetchall():
+            graph.set_family(handle, father_handle, mother_handle,
+                             children.get(handle, ()))
+        for handle in set(parent_families).union(spouse_families):
+            graph.set_person(handle, parent_families.get(handle, ()),
+                             spouse_families.get(handle, ()))
+        return graph
+
     def rebuild_secondary(self, callback=None):
         """
         Rebuild secondary indices
@@ -871,11 +1377,15 @@ class DBAPI(DbGeneric):
 
         # First, expand blob to individual fields:
         self._txn_begin()
+        self.dbapi.execute("DELETE FROM family_link")
+        self._family_graph = None
         for obj_type in ('Person', 'Family', 'Event', 'Place', 'Repository',
                          'Source', 'Citation', 'Media', 'Note', 'Tag'):
             for handle in self.method('get_%s_handles', obj_type)():
                 obj = self.method('get_%s_from_handle', obj_type)(handle)
                 self._update_secondary_values(obj)
+                if obj_type in ('Person', 'Family'):
+                    self._insert_family_links(obj)
                 self.update()
         self._txn_commit()
 
@@ -884,18 +1394,23 @@ class DBAPI(DbGeneric):
         self.genderStats = GenderStats(gstats)
 
     def _has_handle(self, obj_key, handle):
+        if handle in self._pending.get(obj_key, ()):
+            return True
         table = KEY_TO_NAME_MAP[obj_key]
         sql = "SELECT 1 FROM %s WHERE handle = ?" % table
         self.dbapi.execute(sql, [handle])
         return self.dbapi.fetchone() is not None
 
     def _has_gramps_id(self, obj_key, gramps_id):
+        if gramps_id in self._pending_ids.get(obj_key, ()):
+            return True
         table = KEY_TO_NAME_MAP[obj_key]
         sql = "SELECT 1 FROM %s WHERE gramps_id = ?" % table
         self.dbapi.execute(sql, [gramps_id])
         return self.dbapi.fetchone() != None
 
     def _get_gramps_ids(self, obj_key):
+        self._flush_batch()
         table = KEY_TO_NAME_MAP[obj_key]
         sql = "SELECT gramps_id FROM %s" % table
         self.dbapi.execute(sql)
@@ -903,20 +1418,59 @@ class DBAPI(DbGeneric):
         return [row[0] for row in rows]
 
     def _get_raw_data(self, obj_key, handle):
+        pending = self._pending.get(obj_key)
+        if pending and handle in pending:
+            return decode_blob(pending[handle][1])
+        # The cache holds the encoded data, so that every caller gets its own
+        # copy of the (mutable) decoded lists.
+        blob = self._cache_get(obj_key, handle)
+        if blob is None:
+            table = KEY_TO_NAME_MAP[obj_key]
+            sql = "SELECT blob_data FROM %s WHERE handle = ?" % table
+            self.dbapi.execute(sql, [handle])
+            row = self.dbapi.fetchone()
+            if not row:
+                return None
+            blob = row[0]
+            self._cache_put(obj_key, handle, blob)
+        return decode_blob(blob)
+
+    def _get_raw_data_many(self, obj_key, handles):
         table = KEY_TO_NAME_MAP[obj_key]
-        sql = "SELECT blob_data FROM %s WHERE handle = ?" % table
-        self.dbapi.execute(sql, [handle])
-        row = self.dbapi.fetchone()
-        if row:
-            return pickle.loads(row[0])
+        handles = list(handles)
+        pending = self._pending.get(obj_key, {})
+        blobs = {}
+        missing = []
+        for handle in handles:
+            if handle in pending:
+                blobs[handle] = pending[handle][1]
+                continue
+            blob = self._cache_get(obj_key, handle)
+            if blob is None:
+                missing.append(handle)
+            else:
+                blobs[handle] = blob
+        for start in range(0, len(missing), CHUNKSIZE):
+            chunk = missing[start:start + CHUNKSIZE]
+            sql = ("SELECT handle, blob_data FROM %s WHERE handle IN (%s)"
+                   % (table, ", ".join("?" * len(chunk))))
+            self.dbapi.execute(sql, chunk)
+            for handle, blob in self.dbapi.fetchall():
+                blobs[handle] = blob
+                self._cache_put(obj_key, handle, blob)
+        return [decode_blob(blobs[handle]) if handle in blobs else None
+                for handle in handles]
 
     def _get_raw_from_id_data(self, obj_key, gramps_id):
+        handle = self._pending_ids.get(obj_key, {}).get(gramps_id)
+        if handle is not None:
+            return decode_blob(self._pending[obj_key][handle][1])
         table = KEY_TO_NAME_MAP[obj_key]
         sql = "SELECT blob_data FROM %s WHERE gramps_id = ?" % table
         self.dbapi.execute(sql, [gramps_id])
         row = self.dbapi.fetchone()
         if row:
-            return pickle.loads(row[0])
+            return decode_blob(row[0])
 
     def get_gender_stats(self):
         """
@@ -959,25 +1513,37 @@ class DBAPI(DbGeneric):
         """
         Helper method to undo/redo the changes made
         """
+        self._flush_batch()
+        self._existing.pop(obj_key, None)
+        self._id_allocators.pop(obj_key, None)
+        self._statistics = None
         cls = KEY_TO_CLASS_MAP[obj_key]
         table = cls.lower()
         if data is None:
             sql = "DELETE FROM %s WHERE handle = ?" % table
             self.dbapi.execute(sql, [handle])
+            self._cache_invalidate(obj_key, handle)
+            if obj_key in (PERSON_KEY, FAMILY_KEY):
+                self._update_family_links(obj_key, [handle], [None])
         else:
+            blob = self._encode(obj_key, data)
             if self._has_handle(obj_key, handle):
                 sql = "UPDATE %s SET blob_data = ? WHERE handle = ?" % table
-                self.dbapi.execute(sql, [pickle.dumps(data), handle])
+                self.dbapi.execute(sql, [blob, handle])
             else:
                 sql = "INSERT INTO %s (handle, blob_data) VALUES (?, ?)" % table
-                self.dbapi.execute(sql, [handle, pickle.dumps(data)])
+                self.dbapi.execute(sql, [handle, blob])
+            self._cache_put(obj_key, handle, blob)
             obj = self._get_table_func(cls)["class_func"].create(data)
             self._update_secondary_values(obj)
+            if obj_key in (PERSON_KEY, FAMILY_KEY):
+                self._update_family_links(obj_key, [handle], [obj])
 
     def get_surname_list(self):
         """
         Return the list of locale-sorted surnames contained in the database.
         """
+        self._flush_batch()
         self.dbapi.execute("SELECT DISTINCT surname "
                            "FROM person "
                            "ORDER BY surname")
@@ -1023,32 +1589,46 @@ class DBAPI(DbGeneric):
         in the database.
         Does not commit.
         """
+        columns, values = self._secondary_columns(obj)
+        if len(values) > 0:
+            table_name = obj.__class__.__name__.lower()
+            sets = ["%s = ?" % column for column in columns]
+            self.dbapi.execute("UPDATE %s SET %s where handle = ?"
+                               % (table_name, ", ".join(sets)),
+                               values + [obj.handle])
+
+    def _secondary_columns(self, obj):
+        """
+        Given a primary object return the names of its secondary columns,
+        other than the handle, and their values.
+        """
         table = obj.__class__.__name__
-        fields = [field[0] for field in obj.get_secondary_fields()]
-        sets = []
-        values = []
-        for field in fields:
-            sets.append("%s = ?" % field)
-            values.append(getattr(obj, field))
+        fields = self._secondary_fields.get(table)
+        if fields is None:
+            fields = [field[0] for field in obj.get_secondary_fields()
+                      if field[0] != 'handle']
+            self._secondary_fields[table] = fields
+        columns = list(fields)
+        values = [getattr(obj, field) for field in fields]
 
         # Derived fields
         if table == 'Person':
             given_name, surname = self._get_person_data(obj)
-            sets.append("given_name = ?")
-            values.append(given_name)
-            sets.append("surname = ?")
-            values.append(surname)
+            columns += ['given_name', 'surname']
+            values += [given_name, surname]
+            columns += ['group_as', 'primary_surname', 'lone_patronymic']
+            values += self._get_person_group_data(obj)
         if table == 'Place':
             handle = self._get_place_data(obj)
-            sets.append("enclosed_by = ?")
+            columns.append('enclosed_by')
             values.append(handle)
+        if table == 'Event':
+            # Events without a regular date are left out of date ranges
+            columns += ['sortval', 'event_type']
+            values += [obj.get_date_object().get_sort_value() or None,
+                       obj.get_type().value]
 
-        if len(values) > 0:
-            table_name = table.lower()
-            self.dbapi.execute("UPDATE %s SET %s where handle = ?"
-                               % (table_name, ", ".join(sets)),
-                               self._sql_cast_list(values)
-                               + [obj.handle])
+        return columns, self._sql_cast_list(values)
 
     def _sql_cast_list(self, values):
         """
@@ -0,0 +1,140 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for the DB-API blob codecs """
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import pickle
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.const import DATA_DIR
+from gramps.gen.db import DbTxn
+from gramps.gen.db.utils import make_database, import_as_dict
+from gramps.gen.errors import DbError
+from gramps.gen.lib import Person, Surname
+from gramps.gen.user import User
+from ..codec import CODECS, get_codec, decode_blob
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+#-------------------------------------------------------------------------
+#
+# CodecTest class
+#
+#-------------------------------------------------------------------------
+class CodecTest(unittest.TestCase):
+    '''
+    Round trip the example database through every codec.
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        db = import_as_dict(EXAMPLE, User())
+        cls.objects = []
+        for obj_class in ('Person', 'Family', 'Event', 'Place', 'Repository',
+                          'Source', 'Citation', 'Media', 'Note', 'Tag'):
+            for handle in db.method('get_%s_handles', obj_class)():
+                data = db.method('get_raw_%s_data', obj_class)(handle)
+                cls.objects.append((obj_class, data))
+
+    def __round_trip(self, name):
+        codec = get_codec(name)
+        for obj_class, data in self.objects:
+            blob = codec.encode(obj_class, data)
+            self.assertEqual(decode_blob(blob), data)
+
+    def test_pickle(self):
+        self.__round_trip('pickle')
+
+    def test_json(self):
+        self.__round_trip('json')
+
+    def test_legacy_pickle(self):
+        obj_class, data = self.objects[0]
+        for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+            self.assertEqual(decode_blob(pickle.dumps(data, protocol)), data)
+
+    def test_unknown(self):
+        self.assertEqual(get_codec('unknown').name, 'pickle')
+        with self.assertRaises(DbError):
+            decode_blob(b'Xdata')
+        with self.assertRaises(DbError):
+            decode_blob(b'J\xff')
+
+#-------------------------------------------------------------------------
+#
+# DbCodecTest class
+#
+#-------------------------------------------------------------------------
+class DbCodecTest(unittest.TestCase):
+    '''
+    Read and write a database with mixed blob codecs.
+    '''
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+
+    def tearDown(self):
+        self.db.close()
+
+    def __add_person(self, name):
+        person = Person()
+        surname = Surname()
+        surname.set_surname(name)
+        person.primary_name.set_surname_list([surname])
+        with DbTxn('Add person', self.db) as trans:
+            return self.db.add_person(person, trans)
+
+    def test_mixed(self):
+        handles = {}
+        for name in CODECS:
+            self.db.set_blob_codec(name)
+            handles[name] = self.__add_person(name)
+        self.db._cache_clear()
+        for name, handle in handles.items():
+            person = self.db.get_person_from_handle(handle)
+            self.assertEqual(person.get_primary_name().get_surname(), name)
+        self.assertEqual(len(list(self.db.iter_people())), len(CODECS))
+
+    def test_rewrite(self):
+        self.db.set_blob_codec('pickle')
+        handle = self.__add_person('Smith')
+        self.db.set_blob_codec('json')
+        person = self.db.get_person_from_handle(handle)
+        with DbTxn('Edit person', self.db) as trans:
+            self.db.commit_person(person, trans)
+        self.db.dbapi.execute("SELECT blob_data FROM person")
+        self.assertEqual(self.db.dbapi.fetchone()[0][:1], b'J')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,17 +23,31 @@
 # Standard python modules
 #
 #-------------------------------------------------------------------------
+import os
+import tempfile
 import unittest
+from unittest.mock import patch
 
 #-------------------------------------------------------------------------
 #
 # Gramps modules
 #
 #-------------------------------------------------------------------------
-from gramps.gen.db import DbTxn
-from gramps.gen.db.utils import make_database
+from gramps.cli.user import User
+from gramps.gen.const import DATA_DIR
+from gramps.gen.db import DbTxn, DbReadBase
+from gramps.gen.db.graph import ObjectFamilyGraph
+from gramps.gen.db.idalloc import GrampsIdAllocator
+from gramps.gen.db.treestats import TreeStatistics
+from gramps.gen.db.utils import make_database, import_as_dict
+from gramps.gen.errors import HandleError
 from gramps.gen.lib import (Person, Family, Event, Place, Repository, Source,
-                            Citation, Media, Note, Tag, Researcher, Surname)
+                            Citation, Media, Note, Tag, Researcher, Surname,
+                            ChildRef, Date, EventType, EventRef, MediaRef,
+                            Name, NameOriginType)
+from gramps.plugins.db.dbapi import dbapi
+
+EXAMPLE = os.path.join(DATA_DIR, "tests", "example.gramps")
 
 #-------------------------------------------------------------------------
 #
@@ -364,6 +378,87 @@ class DbRandomTest(unittest.TestCase):
                                     self.db.get_tag_handles,
                                     self.db.get_tag_from_handle)
 
+    ################################################################
+    #
+    # Test get_*_from_handles methods
+    #
+    ################################################################
+
+    def __get_from_handles_test(self, obj_class, handles_func, get_func,
+                                raw_func):
+        handles = list(reversed(handles_func()))
+        objs = get_func(handles)
+        self.assertEqual([obj.handle for obj in objs], handles)
+        for obj in objs:
+            self.assertIsInstance(obj, obj_class)
+        raw = raw_func(handles + ['missing'])
+        self.assertEqual([data[0] for data in raw[:-1]], handles)
+        self.assertIsNone(raw[-1])
+
+    def test_get_people_from_handles(self):
+        self.__get_from_handles_test(Person,
+                                     self.db.get_person_handles,
+                                     self.db.get_people_from_handles,
+                                     self.db.get_raw_person_data_many)
+
+    def test_get_families_from_handles(self):
+        self.__get_from_handles_test(Family,
+                                     self.db.get_family_handles,
+                                     self.db.get_families_from_handles,
+                                     self.db.get_raw_family_data_many)
+
+    def test_get_events_from_handles(self):
+        self.__get_from_handles_test(Event,
+                                     self.db.get_event_handles,
+                                     self.db.get_events_from_handles,
+                                     self.db.get_raw_event_data_many)
+
+    def test_get_places_from_handles(self):
+        self.__get_from_handles_test(Place,
+                                     self.db.get_place_handles,
+                                     self.db.get_places_from_handles,
+                                     self.db.get_raw_place_data_many)
+
+    def test_get_repositories_from_handles(self):
+        self.__get_from_handles_test(Repository,
+                                     self.db.get_repository_handles,
+                                     self.db.get_repositories_from_handles,
+                                     self.db.get_raw_repository_data_many)
+
+    def test_get_sources_from_handles(self):
+        self.__get_from_handles_test(Source,
+                                     self.db.get_source_handles,
+                                     self.db.get_sources_from_handles,
+                                     self.db.get_raw_source_data_many)
+
+    def test_get_citations_from_handles(self):
+        self.__get_from_handles_test(Citation,
+                                     self.db.get_citation_handles,
+                                     self.db.get_citations_from_handles,
+                                     self.db.get_raw_citation_data_many)
+
+    def test_get_media_from_handles(self):
+        self.__get_from_handles_test(Media,
+                                     self.db.get_media_handles,
+                                     self.db.get_media_from_handles,
+                                     self.db.get_raw_media_data_many)
+
+    def test_get_notes_from_handles(self):
+        self.__get_from_handles_test(Note,
+                                     self.db.get_note_handles,
+                                     self.db.get_notes_from_handles,
+                                     self.db.get_raw_note_data_many)
+
+    def test_get_tags_from_handles(self):
+        self.__get_from_handles_test(Tag,
+                                     self.db.get_tag_handles,
+                                     self.db.get_tags_from_handles,
+                                     self.db.get_raw_tag_data_many)
+
+    def test_get_from_handles_missing(self):
+        with self.assertRaises(HandleError):
+            self.db.get_people_from_handles(['missing'])
+
     ################################################################
     #
     # Test get_*_from_gramps_id methods
@@ -865,6 +960,805 @@ class DbPersonTest(unittest.TestCase):
         self.assertEqual(saved['John'], (3, 1, 1))
         self.assertEqual(saved['Mary'], (1, 4, 0))
 
+#-------------------------------------------------------------------------
+#
+# DbCacheTest class
+#
+#-------------------------------------------------------------------------
+class DbCacheTest(unittest.TestCase):
+    '''
+    Tests for the object cache.
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = make_database("sqlite")
+        cls.db.load(":memory:")
+
+    def setUp(self):
+        person = Person()
+        person.primary_name.first_name = 'John'
+        with DbTxn('Add test person', self.db) as trans:
+            self.handle = self.db.add_person(person, trans)
+
+    def tearDown(self):
+        with DbTxn('Remove test person', self.db) as trans:
+            self.db.remove_person(self.handle, trans)
+
+    def __first_name(self):
+        person = self.db.get_person_from_handle(self.handle)
+        return person.primary_name.first_name
+
+    def test_cache_hit(self):
+        hits = self.db._cache_hits
+        self.db.get_person_from_handle(self.handle)
+        self.db.get_person_from_handle(self.handle)
+        self.assertEqual(self.db._cache_hits, hits + 2)
+
+    def test_cached_copy(self):
+        person = self.db.get_person_from_handle(self.handle)
+        person.family_list.append('F0001')
+        person = self.db.get_person_from_handle(self.handle)
+        self.assertEqual(person.family_list, [])
+
+    def test_commit(self):
+        person = self.db.get_person_from_handle(self.handle)
+        person.primary_name.first_name = 'Mary'
+        with DbTxn('Edit test person', self.db) as trans:
+            self.db.commit_person(person, trans)
+        self.assertEqual(self.__first_name(), 'Mary')
+
+    def test_undo_redo(self):
+        person = self.db.get_person_from_handle(self.handle)
+        person.primary_name.first_name = 'Mary'
+        with DbTxn('Edit test person', self.db) as trans:
+            self.db.commit_person(person, trans)
+        self.db.undo()
+        self.assertEqual(self.__first_name(), 'John')
+        self.db.redo()
+        self.assertEqual(self.__first_name(), 'Mary')
+
+    def test_abort(self):
+        person = self.db.get_person_from_handle(self.handle)
+        person.primary_name.first_name = 'Mary'
+        with self.assertRaises(RuntimeError):
+            with DbTxn('Edit test person', self.db) as trans:
+                self.db.commit_person(person, trans)
+                raise RuntimeError
+        self.assertEqual(self.__first_name(), 'John')
+
+    def test_remove(self):
+        with DbTxn('Remove test person', self.db) as trans:
+            self.db.remove_person(self.handle, trans)
+        self.assertIsNone(self.db.get_raw_person_data(self.handle))
+        self.db.undo()
+        self.assertEqual(self.__first_name(), 'John')
+
+    def test_summary(self):
+        summary = self.db.get_summary()
+        self.assertIn('Cache hits', summary)
+        self.assertIn('Cache misses', summary)
+
+
+#-------------------------------------------------------------------------
+#
+# DbBatchTest class
+#
+#-------------------------------------------------------------------------
+class DbBatchTest(unittest.TestCase):
+    '''
+    Tests for commits buffered in a batch transaction.
+    '''
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+
+    def tearDown(self):
+        self.db.close()
+
+    def __add_people(self, trans, count):
+        handles = []
+        for i in range(count):
+            person = Person()
+            person.set_gramps_id('I%04d' % i)
+            person.primary_name.first_name = 'John'
+            person.primary_name.get_primary_surname().set_surname('Smith')
+            handles.append(self.db.add_person(person, trans))
+        return handles
+
+    def test_read_in_batch(self):
+        with DbTxn('Batch', self.db, batch=True) as trans:
+            handle = self.__add_people(trans, 1)[0]
+            self.assertTrue(self.db.has_person_handle(handle))
+            self.assertTrue(self.db.has_person_gramps_id('I0000'))
+            person = self.db.get_person_from_gramps_id('I0000')
+            self.assertEqual(person.handle, handle)
+            self.assertEqual(self.db.get_number_of_people(), 1)
+        person = self.db.get_person_from_handle(handle)
+        self.assertEqual(person.gramps_id, 'I0000')
+
+    def test_update_in_batch(self):
+        with DbTxn('Batch', self.db, batch=True) as trans:
+            handle = self.__add_people(trans, 1)[0]
+            person = self.db.get_person_from_handle(handle)
+            person.set_gramps_id('I1000')
+            self.db.commit_person(person, trans)
+            self.assertFalse(self.db.has_person_gramps_id('I0000'))
+            self.assertTrue(self.db.has_person_gramps_id('I1000'))
+        self.assertEqual(self.db.get_person_gramps_ids(), ['I1000'])
+
+    def test_secondary_columns(self):
+        with DbTxn('Batch', self.db, batch=True) as trans:
+            self.__add_people(trans, 3)
+        self.assertEqual(self.db.get_surname_list(), ['Smith'])
+        self.db.dbapi.execute("SELECT gramps_id, given_name, surname "
+                              "FROM person ORDER BY gramps_id")
+        self.assertEqual(self.db.dbapi.fetchall(),
+                         [('I0000', 'John', 'Smith'),
+                          ('I0001', 'John', 'Smith'),
+                          ('I0002', 'John', 'Smith')])
+
+    def test_many(self):
+        with DbTxn('Batch', self.db, batch=True) as trans:
+            handles = self.__add_people(trans, 1234)
+        self.assertEqual(sorted(self.db.get_person_handles()), sorted(handles))
+
+    def test_references(self):
+        with DbTxn('Batch', self.db, batch=True) as trans:
+            handle = self.__add_people(trans, 1)[0]
+            family = Family()
+            family.set_father_handle(handle)
+            self.db.add_family(family, trans)
+        refs = list(self.db.find_backlink_handles(handle))
+        self.assertEqual(refs, [('Family', family.handle)])
+
+    def test_references_update(self):
+        with DbTxn('Add', self.db) as trans:
+            handle1, handle2 = self.__add_people(trans, 2)
+            family = Family()
+            family.set_father_handle(handle1)
+            self.db.add_family(family, trans)
+            other = Family()
+            other.set_father_handle(handle1)
+            self.db.add_family(other, trans)
+        with DbTxn('Batch', self.db, batch=True) as trans:
+            family.set_father_handle(handle2)
+            self.db.commit_family(family, trans)
+        refs = list(self.db.find_backlink_handles(handle1))
+        self.assertEqual(refs, [('Family', other.handle)])
+        refs = list(self.db.find_backlink_handles(handle2))
+        self.assertEqual(refs, [('Family', family.handle)])
+        with DbTxn('Batch', self.db, batch=True) as trans:
+            self.db.remove_family(family.handle, trans)
+        self.assertEqual(list(self.db.find_backlink_handles(handle2)), [])
+
+    def test_remove_in_batch(self):
+        with DbTxn('Batch', self.db, batch=True) as trans:
+            handle = self.__add_people(trans, 1)[0]
+            self.db.remove_person(handle, trans)
+            self.assertFalse(self.db.has_person_gramps_id('I0000'))
+        self.assertEqual(self.db.get_number_of_people(), 0)
+
+    def test_abort(self):
+        with self.assertRaises(RuntimeError):
+            with DbTxn('Batch', self.db, batch=True) as trans:
+                self.__add_people(trans, 1)
+                raise RuntimeError
+        self.assertEqual(self.db.get_number_of_people(), 0)
+        self.assertFalse(self.db.has_person_gramps_id('I0000'))
+
+    def test_unbuffered(self):
+        self.db.set_feature("batch-write-buffer", False)
+        with DbTxn('Batch', self.db, batch=True) as trans:
+            self.__add_people(trans, 2)
+        self.assertEqual(self.db.get_number_of_people(), 2)
+
+    def test_long_batch(self):
+        # The backlinks are updated in the middle of the transaction
+        with patch.object(dbapi, 'BATCH_BACKLINKS', 3):
+            with DbTxn('Batch', self.db, batch=True) as trans:
+                handle1, handle2 = self.__add_people(trans, 2)
+                family = Family()
+                family.set_father_handle(handle1)
+                self.db.add_family(family, trans)
+                self.assertEqual(self.db._touched, {})
+                self.__add_people(trans, 4)
+                family.set_father_handle(handle2)
+                self.db.commit_family(family, trans)
+        self.assertEqual(list(self.db.find_backlink_handles(handle1)), [])
+        self.assertEqual(list(self.db.find_backlink_handles(handle2)),
+                         [('Family', family.handle)])
+
+    def test_lookups(self):
+        # After BATCH_LOOKUPS objects, only the existing ones are looked up
+        with DbTxn('Add', self.db) as trans:
+            old1, old2 = self.__add_people(trans, 2)
+        with patch.object(dbapi, 'BATCH_LOOKUPS', 3), \
+                patch.object(self.db, '_get_raw_data',
+                             wraps=self.db._get_raw_data) as get_raw_data:
+            with DbTxn('Batch', self.db, batch=True) as trans:
+                new = self.__add_people(trans, 4)
+                self.assertEqual(get_raw_data.call_count, 3)
+                person = self.db.get_person_from_handle(old1)
+                person.set_gramps_id('I1000')
+                self.db.commit_person(person, trans)
+                person = self.db.get_person_from_handle(new[3])
+                person.set_gramps_id('I1001')
+                self.db.commit_person(person, trans)
+                person = self.db.get_person_from_handle(old2)
+                self.db.remove_person(old2, trans)
+                self.db.commit_person(person, trans)
+                get_raw_data.reset_mock()
+                self.__add_people(trans, 1)
+                self.assertEqual(get_raw_data.call_count, 0)
+        self.assertEqual(self.db.get_number_of_people(), 7)
+        self.assertEqual(sorted(self.db.get_person_gramps_ids()),
+                         ['I0000', 'I0000', 'I0001', 'I0001', 'I0002',
+                          'I1000', 'I1001'])
+
+
+#-------------------------------------------------------------------------
+#
+# DbFamilyGraphTest class
+#
+#-------------------------------------------------------------------------
+class DbFamilyGraphTest(unittest.TestCase):
+    '''
+    Tests for the family graph index.
+    '''
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        with DbTxn('Add', self.db) as trans:
+            self.father = self.__add_person(trans)
+            self.mother = self.__add_person(trans)
+            self.child = self.__add_person(trans)
+            self.family = self.__add_family(self.father, self.mother,
+                                            [self.child], trans)
+
+    def tearDown(self):
+        self.db.close()
+
+    def __add_person(self, trans):
+        person = Person()
+        self.db.add_person(person, trans)
+        return person
+
+    def __add_family(self, father, mother, children, trans):
+        family = Family()
+        family.set_father_handle(father.handle)
+        family.set_mother_handle(mother.handle)
+        self.db.add_family(family, trans)
+        for person in (father, mother):
+            person.add_family_handle(family.handle)
+            self.db.commit_person(person, trans)
+        for child in children:
+            child_ref = ChildRef()
+            child_ref.ref = child.handle
+            family.add_child_ref(child_ref)
+            child.add_parent_family_handle(family.handle)
+            self.db.commit_person(child, trans)
+        self.db.commit_family(family, trans)
+        return family
+
+    def test_graph(self):
+        graph = self.db.get_family_graph()
+        self.assertTrue(graph.indexed)
+        self.assertEqual(graph.get_parent_families(self.child.handle),
+                         [self.family.handle])
+        self.assertEqual(graph.get_spouse_families(self.father.handle),
+                         [self.family.handle])
+        self.assertEqual(graph.get_parents(self.family.handle),
+                         (self.father.handle, self.mother.handle))
+        self.assertEqual(graph.get_children(self.family.handle),
+                         [self.child.handle])
+        self.assertEqual(graph.get_ancestors(self.child.handle),
+                         {self.child.handle: 0, self.father.handle: 1,
+                          self.mother.handle: 1})
+        self.assertEqual(graph.get_descendants(self.mother.handle),
+                         {self.mother.handle: 0, self.child.handle: 1})
+        self.assertEqual(graph.get_common_ancestors(self.child.handle,
+                                                    self.father.handle),
+                         {self.father.handle})
+
+    def test_commit(self):
+        graph = self.db.get_family_graph()
+        with DbTxn('Add', self.db) as trans:
+            grandchild = self.__add_person(trans)
+            spouse = self.__add_person(trans)
+            self.__add_family(self.child, spouse, [grandchild], trans)
+        self.assertIs(self.db.get_family_graph(), graph)
+        self.assertEqual(graph.get_descendants(self.father.handle, 1),
+                         {self.father.handle: 0, self.child.handle: 1})
+        self.assertEqual(graph.get_ancestors(grandchild.handle)
+                         [self.mother.handle], 2)
+        # the table gives the same graph
+        self.db._family_graph = None
+        self.assertEqual(self.db.get_family_graph().get_ancestors(
+            grandchild.handle), graph.get_ancestors(grandchild.handle))
+
+    def test_remove(self):
+        self.db.get_family_graph()
+        with DbTxn('Remove', self.db) as trans:
+            self.db.remove_family(self.family.handle, trans)
+        graph = self.db.get_family_graph()
+        self.assertEqual(graph.get_parents(self.family.handle), (None, None))
+        self.assertEqual(graph.get_children(self.family.handle), [])
+
+    def test_undo(self):
+        graph = self.db.get_family_graph()
+        with DbTxn('Remove child', self.db) as trans:
+            self.family.set_child_ref_list([])
+            self.db.commit_family(self.family, trans)
+        self.assertEqual(graph.get_children(self.family.handle), [])
+        self.db.undo()
+        self.assertEqual(graph.get_children(self.family.handle),
+                         [self.child.handle])
+
+    def test_batch(self):
+        self.db.get_family_graph()
+        with DbTxn('Batch', self.db, batch=True) as trans:
+            child = self.__add_person(trans)
+            child_ref = ChildRef()
+            child_ref.ref = child.handle
+            self.family.add_child_ref(child_ref)
+            self.db.commit_family(self.family, trans)
+            # not indexed until the end of the transaction
+            graph = self.db.get_family_graph()
+            self.assertFalse(graph.indexed)
+            self.assertEqual(graph.get_children(self.family.handle),
+                             [self.child.handle, child.handle])
+        graph = self.db.get_family_graph()
+        self.assertTrue(graph.indexed)
+        self.assertEqual(graph.get_children(self.family.handle),
+                         [self.child.handle, child.handle])
+
+    def test_rebuild(self):
+        self.db.rebuild_secondary()
+        graph = self.db.get_family_graph()
+        self.assertEqual(graph.get_children(self.family.handle),
+                         [self.child.handle])
+
+    def test_example(self):
+        db = import_as_dict(EXAMPLE, User())
+        graph = db.get_family_graph()
+        objects = ObjectFamilyGraph(db)
+        self.assertTrue(graph.indexed)
+        for handle in db.get_person_handles():
+            for main_only in (True, False):
+                self.assertEqual(graph.get_ancestors(handle,
+                                                     main_only=main_only),
+                                 objects.get_ancestors(handle,
+                                                       main_only=main_only))
+            self.assertEqual(graph.get_descendants(handle, 3),
+                             objects.get_descendants(handle, 3))
+        db.close()
+
+
+class DbIdAllocatorTest(unittest.TestCase):
+    '''
+    Tests for the allocation of Gramps IDs.
+    '''
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+
+    def tearDown(self):
+        self.db.close()
+
+    def __add_person(self, gramps_id, trans):
+        person = Person()
+        person.gramps_id = gramps_id
+        self.db.add_person(person, trans, set_gid=False)
+        return person
+
+    def test_allocator(self):
+        allocator = GrampsIdAllocator("I%04d", ["I0000", "I0001", "I0003",
+                                                "I01", "X1", "I99999999"])
+        self.assertEqual(allocator.find_next(0), (3, "I0002"))
+        self.assertEqual(allocator.find_next(3), (5, "I0004"))
+        self.assertIn("I01", allocator)
+        self.assertNotIn("I0002", allocator)
+        allocator.discard("I0001")
+        self.assertEqual(allocator.find_next(0), (2, "I0001"))
+        self.assertEqual(allocator.find_next(99999999), (100000001, "I100000000"))
+        for number in range(4, 100):
+            allocator.add("I%04d" % number)
+        self.assertEqual(allocator.find_next(2), (3, "I0002"))
+        self.assertEqual(allocator.find_next(3), (101, "I0100"))
+
+    def test_allocator_pattern(self):
+        allocator = GrampsIdAllocator("I%d-x", ["I0-x", "I1-x", "I1"])
+        self.assertEqual(allocator.find_next(0), (3, "I2-x"))
+        allocator = GrampsIdAllocator("I%s", ["I0", "I1"])
+        self.assertEqual(allocator.find_next(0), (3, "I2"))
+
+    def test_find_next(self):
+        with DbTxn('Add', self.db) as trans:
+            for number in (0, 1, 3):
+                self.__add_person("I%04d" % number, trans)
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0002")
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0004")
+        with DbTxn('Add', self.db) as trans:
+            self.__add_person("I0005", trans)
+            person = self.__add_person("I0006", trans)
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0007")
+
+        # A removed ID is free again
+        with DbTxn('Remove', self.db) as trans:
+            self.db.remove_person(person.handle, trans)
+        self.db.pmap_index = 0
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0002")
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0004")
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0006")
+
+        # but not when another object still uses it
+        with DbTxn('Add', self.db) as trans:
+            self.__add_person("I0002", trans)
+            person = self.__add_person("I0002", trans)
+        with DbTxn('Remove', self.db) as trans:
+            self.db.remove_person(person.handle, trans)
+        self.db.pmap_index = 0
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0004")
+
+    def test_commit_changes_id(self):
+        with DbTxn('Add', self.db) as trans:
+            person = self.__add_person("I0000", trans)
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0001")
+        person.gramps_id = "I0001"
+        with DbTxn('Edit', self.db) as trans:
+            self.db.commit_person(person, trans)
+        self.db.pmap_index = 0
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0000")
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0002")
+
+    def test_undo(self):
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0000")
+        with DbTxn('Add', self.db) as trans:
+            self.__add_person("I0001", trans)
+        self.db.undo()
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0001")
+        self.db.redo()
+        self.db.pmap_index = 1
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0002")
+
+    def test_batch(self):
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0000")
+        with DbTxn('Add', self.db, batch=True) as trans:
+            for number in range(1, 4):
+                self.__add_person("I%04d" % number, trans)
+            self.assertEqual(self.db.find_next_person_gramps_id(), "I0004")
+            self.db.pmap_index = 0
+            self.assertEqual(self.db.find_next_person_gramps_id(), "I0000")
+            self.assertEqual(self.db.find_next_person_gramps_id(), "I0004")
+
+    def test_prefix(self):
+        with DbTxn('Add', self.db) as trans:
+            self.__add_person("P1", trans)
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0000")
+        self.db.set_person_id_prefix("P%d")
+        self.db.pmap_index = 0
+        self.assertEqual(self.db.find_next_person_gramps_id(), "P0")
+        self.assertEqual(self.db.find_next_person_gramps_id(), "P2")
+
+
+class DbEventQueryTest(unittest.TestCase):
+    '''
+    Tests for the queries of events by date, type and place.
+    '''
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        with DbTxn('Add', self.db) as trans:
+            self.place = Place()
+            self.db.add_place(self.place, trans)
+            self.birth1850 = self.__add_event(EventType.BIRTH, 1850, trans,
+                                              self.place.handle)
+            self.birth1870 = self.__add_event(EventType.BIRTH, 1870, trans)
+            self.death1860 = self.__add_event(EventType.DEATH, 1860, trans,
+                                              self.place.handle)
+            self.custom1855 = self.__add_event("Custom", 1855, trans)
+            self.undated = self.__add_event(EventType.BIRTH, None, trans)
+
+    def tearDown(self):
+        self.db.close()
+
+    def __add_event(self, event_type, year, trans, place_handle=None):
+        event = Event()
+        event.set_type(EventType(event_type))
+        if year:
+            event.set_date_object(Date(year))
+        if place_handle:
+            event.set_place_handle(place_handle)
+        self.db.add_event(event, trans)
+        return event.handle
+
+    def __check(self, expected, *args, **kwargs):
+        self.assertEqual(set(self.db.get_event_handles_by_date(
+            *args, **kwargs)), expected)
+        # The default implementation, which loads every event
+        self.assertEqual(set(DbReadBase.get_event_handles_by_date(
+            self.db, *args, **kwargs)), expected)
+
+    def test_date_range(self):
+        self.__check({self.birth1850, self.death1860, self.custom1855},
+                     Date(1850), Date(1860))
+        self.__check({self.birth1870, self.death1860}, start=Date(1856))
+        self.__check({self.birth1850}, stop=Date(1854))
+        self.__check({self.birth1850, self.birth1870, self.death1860,
+                      self.custom1855, self.undated})
+
+    def test_types(self):
+        self.__check({self.birth1850, self.birth1870, self.undated},
+                     event_types=[EventType.BIRTH])
+        self.__check({self.birth1850}, Date(1800), Date(1860),
+                     event_types=[EventType.BIRTH])
+        self.__check({self.custom1855, self.death1860}, Date(1800),
+                     event_types=[EventType("Custom"), EventType.DEATH])
+        self.__check(set(), event_types=[EventType("Other")])
+        self.__check(set(), event_types=[])
+
+    def test_place(self):
+        self.__check({self.birth1850, self.death1860},
+                     place_handle=self.place.handle)
+        self.__check({self.death1860}, event_types=[EventType.DEATH],
+                     place_handle=self.place.handle)
+        # the place column of the place handle is indexed
+        self.db.dbapi.execute("EXPLAIN QUERY PLAN SELECT handle FROM event "
+                              "WHERE place = ?", [self.place.handle])
+        self.assertIn('event_place', str(self.db.dbapi.fetchall()))
+
+    def test_commit(self):
+        event = self.db.get_event_from_handle(self.birth1870)
+        event.set_date_object(Date(1855))
+        event.set_place_handle(self.place.handle)
+        with DbTxn('Edit', self.db) as trans:
+            self.db.commit_event(event, trans)
+            self.db.remove_event(self.birth1850, trans)
+        self.__check({self.birth1870}, Date(1850), Date(1860),
+                     event_types=[EventType.BIRTH],
+                     place_handle=self.place.handle)
+        self.db.undo()
+        self.__check({self.birth1850}, Date(1850), Date(1860),
+                     event_types=[EventType.BIRTH])
+
+    def test_batch(self):
+        with DbTxn('Add', self.db, batch=True) as trans:
+            handle = self.__add_event(EventType.BIRTH, 1852, trans)
+            self.__check({self.birth1850, handle}, Date(1850), Date(1854))
+
+
+class DbColumnValuesTest(unittest.TestCase):
+    '''
+    Tests for the values of the columns of the tables.
+    '''
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        with DbTxn('Add', self.db) as trans:
+            self.source = Source()
+            self.source.set_title("Census")
+            self.db.add_source(self.source, trans)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_values(self):
+        self.assertEqual(self.db.get_column_values('Source', 'title'),
+                         [(self.source.handle, "Census")])
+        self.assertEqual(self.db.get_column_values('Source', 'gramps_id'),
+                         [(self.source.handle, self.source.gramps_id)])
+        self.assertEqual(self.db.get_column_values('Person', 'surname'), [])
+        self.assertIsNone(DbReadBase.get_column_values(self.db, 'Source',
+                                                       'title'))
+
+    def test_batch(self):
+        with DbTxn('Add', self.db, batch=True) as trans:
+            source = Source()
+            source.set_title("Register")
+            self.db.add_source(source, trans)
+            self.assertEqual(
+                sorted(self.db.get_column_values('Source', 'title')),
+                sorted([(self.source.handle, "Census"),
+                        (source.handle, "Register")]))
+
+    def test_changed(self):
+        changed = self.db.has_changed
+        self.source.set_title("Parish register")
+        with DbTxn('Edit', self.db) as trans:
+            self.db.commit_source(self.source, trans)
+        self.assertGreater(self.db.has_changed, changed)
+        changed = self.db.has_changed
+        self.db.undo()
+        self.assertGreater(self.db.has_changed, changed)
+        self.assertEqual(self.db.get_column_values('Source', 'title'),
+                         [(self.source.handle, "Census")])
+        changed = self.db.has_changed
+        self.db.redo()
+        self.assertGreater(self.db.has_changed, changed)
+
+    def __add_person(self, surnames, group_as, trans):
+        person = Person()
+        name = Name()
+        for value, origin in surnames:
+            surname = Surname()
+            surname.set_surname(value)
+            surname.set_origintype(NameOriginType(origin))
+            name.add_surname(surname)
+        name.set_primary_surname(0)
+        name.set_group_as(group_as)
+        person.set_primary_name(name)
+        self.db.add_person(person, trans)
+        return person
+
+    def test_counts(self):
+        with DbTxn('Add', self.db) as trans:
+            smith = self.__add_person([("Smith", NameOriginType.GIVEN)], "",
+                                      trans)
+            self.__add_person([("Smith", NameOriginType.TAKEN),
+                               ("Jones", NameOriginType.GIVEN)], "", trans)
+            self.__add_person([("Smith", NameOriginType.GIVEN)], "Smyth",
+                              trans)
+            self.__add_person([("Olsen", NameOriginType.PATRONYMIC)], "",
+                              trans)
+        self.assertEqual(
+            sorted(self.db.get_column_counts(
+                'Person', ['group_as', 'primary_surname', 'lone_patronymic'])),
+            [("", "Olsen", 1, 1), ("", "Smith", 0, 2), ("Smyth", "Smith", 0, 1)])
+        self.assertEqual(self.db.get_column_counts('Source', ['title']),
+                         [("Census", 1)])
+        self.assertIsNone(DbReadBase.get_column_counts(self.db, 'Source',
+                                                       ['title']))
+        data = self.db.get_raw_data_by_columns(
+            'Person', {'group_as': "", 'primary_surname': "Smith",
+                       'lone_patronymic': False})
+        self.assertEqual(len(data), 2)
+        self.assertIn((smith.handle, smith.serialize()), data)
+        self.assertIsNone(DbReadBase.get_raw_data_by_columns(
+            self.db, 'Source', {'title': "Census"}))
+
+
+class DbStatisticsTest(unittest.TestCase):
+    '''
+    Tests for the statistics kept up to date by the database.
+    '''
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = make_database("sqlite")
+        self.db.load(self.tmpdir.name)
+        with DbTxn('Add', self.db) as trans:
+            self.birth = self.__add_birth(1850, trans)
+            self.person = self.__add_person("Anna Maria", "Smith",
+                                            Person.FEMALE, self.birth, trans)
+            self.__add_person("John", "", Person.MALE, None, trans)
+        self.stats = self.db.get_statistics()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def __add_birth(self, year, trans):
+        event = Event()
+        event.set_type(EventType.BIRTH)
+        if year:
+            event.set_date_object(Date(year))
+        self.db.add_event(event, trans)
+        return event
+
+    def __add_person(self, first_name, surname, gender, birth, trans):
+        person = Person()
+        name = Name()
+        name.set_first_name(first_name)
+        name.add_surname(Surname())
+        name.get_primary_surname().set_surname(surname)
+        person.set_primary_name(name)
+        person.set_gender(gender)
+        if birth:
+            event_ref = EventRef()
+            event_ref.set_reference_handle(birth.handle)
+            person.add_event_ref(event_ref)
+            person.set_birth_ref(event_ref)
+        self.db.add_person(person, trans)
+        return person
+
+    def __check(self, counted=True):
+        stats = self.db.get_statistics()
+        if counted:
+            # Kept up to date rather than counted again
+            self.assertIs(stats, self.stats)
+        self.assertEqual(stats.serialize(),
+                         TreeStatistics.build(self.db).serialize())
+        return stats
+
+    def test_counts(self):
+        stats = self.__check()
+        self.assertEqual((stats.people, stats.males, stats.females,
+                          stats.incomplete_names, stats.disconnected,
+                          stats.missing_births), (2, 1, 1, 1, 2, 1))
+        self.assertEqual(stats.surnames, {"Smith": 1, "": 1})
+        self.assertEqual(stats.all_surnames, {"Smith": 1})
+        self.assertEqual(stats.given_names, {"Anna": 1, "Maria": 1,
+                                             "John": 1})
+
+    def test_commit_person(self):
+        self.person.get_primary_name().set_first_name("Anna")
+        self.person.set_gender(Person.UNKNOWN)
+        self.person.add_media_reference(MediaRef())
+        with DbTxn('Edit', self.db) as trans:
+            self.db.commit_person(self.person, trans)
+            self.__add_person("Anna", "Jones", Person.FEMALE, self.birth,
+                              trans)
+        stats = self.__check()
+        self.assertEqual(stats.given_names["Anna"], 2)
+        self.assertEqual((stats.with_media, stats.media_refs), (1, 1))
+        with DbTxn('Remove', self.db) as trans:
+            self.db.remove_person(self.person.handle, trans)
+        stats = self.__check()
+        self.assertEqual(stats.people, 2)
+        self.assertNotIn("Smith", stats.surnames)
+
+    def test_commit_event(self):
+        self.birth.set_date_object(Date())
+        with DbTxn('Edit', self.db) as trans:
+            self.db.commit_event(self.birth, trans)
+        self.assertEqual(self.__check().missing_births, 2)
+        self.birth.set_date_object(Date(1851))
+        with DbTxn('Edit', self.db) as trans:
+            self.db.commit_event(self.birth, trans)
+        self.assertEqual(self.__check().missing_births, 1)
+        with DbTxn('Remove', self.db) as trans:
+            self.db.remove_event(self.birth.handle, trans)
+        self.assertEqual(self.__check().missing_births, 2)
+
+    def test_media(self):
+        path = os.path.join(self.tmpdir.name, "media.txt")
+        with open(path, "w") as media_file:
+            media_file.write("1234")
+        with DbTxn('Add', self.db) as trans:
+            media = Media()
+            media.set_path(path)
+            self.db.add_media(media, trans)
+            missing = Media()
+            missing.set_path("missing.jpg")
+            self.db.add_media(missing, trans)
+        stats = self.__check()
+        self.assertEqual(stats.get_media_size(), 4)
+        self.assertEqual(stats.get_missing_media(), ["missing.jpg"])
+        with DbTxn('Remove', self.db) as trans:
+            self.db.remove_media(missing.handle, trans)
+        self.assertEqual(self.__check().get_missing_media(), [])
+
+    def test_undo(self):
+        with DbTxn('Add', self.db) as trans:
+            self.__add_person("Eve", "Smith", Person.FEMALE, None, trans)
+        self.db.undo()
+        self.assertEqual(self.__check(counted=False).people, 2)
+        self.db.redo()
+        self.assertEqual(self.__check(counted=False).people, 3)
+
+    def test_batch(self):
+        with DbTxn('Add', self.db, batch=True) as trans:
+            self.__add_person("Eve", "Smith", Person.FEMALE, None, trans)
+            self.assertEqual(self.db.get_statistics().people, 3)
+        self.assertEqual(self.__check(counted=False).surnames["Smith"], 2)
+
+    def test_reload(self):
+        expected = self.stats.serialize()
+        self.db.close()
+        self.db.load(self.tmpdir.name)
+        self.assertEqual(self.db._statistics.serialize(), expected)
+        # A tree which is not closed properly counts them again
+        self.db._statistics = None
+        self.db.close()
+        self.db.load(self.tmpdir.name)
+        self.assertIsNone(self.db._statistics)
+
 
 if __name__ == "__main__":
     unittest.main()
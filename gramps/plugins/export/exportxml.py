@@ -38,8 +38,8 @@ Gramps' XML file format.
 import time
 import shutil
 import os
-import codecs
-from xml.sax.saxutils import escape
+import multiprocessing
+from io import BytesIO
 
 #------------------------------------------------------------------------
 #
@@ -57,9 +57,14 @@ LOG = logging.getLogger(".WriteXML")
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.gettext
 from gramps.gen.const import URL_HOMEPAGE
-from gramps.gen.lib import Date, Person
+from gramps.gen.config import config
+from gramps.gen.lib import (Citation, Date, Event, Family, Media, Note, Person,
+                            Place, Repository, Source, Tag)
 from gramps.gen.updatecallback import UpdateCallback
+from gramps.gen.db.dbconst import DBMODE_R
 from gramps.gen.db.exceptions import DbWriteFailure
+from gramps.gen.db.generic import DbGeneric
+from gramps.gen.db.utils import get_dbid_from_path, make_database
 from gramps.version import VERSION
 from gramps.gen.constfunc import win
 from gramps.gui.plug.export import WriterOptionBox, WriterOptionBoxWithCompression
@@ -81,11 +86,78 @@ except:
 strip_dict = dict.fromkeys(list(range(9))+list(range(11,13))+list(range(14, 32)))
 
 def escxml(d):
-    return escape(d,
-                  {'"' : '&quot;',
-                   '<' : '&lt;',
-                   '>' : '&gt;',
-                   }) if d else ""
+    return d.replace("&", "&amp;").replace(">", "&gt;").replace(
+        "<", "&lt;").replace('"', "&quot;") if d else ""
+
+# Sections of the primary and table objects, in the order of the schema:
+# object type, tag of the section, and method writing an object
+SECTIONS = [
+    ('Tag', 'tags', 'write_tag'),
+    ('Event', 'events', 'write_event'),
+    ('Person', 'people', 'write_person'),
+    ('Family', 'families', 'write_family'),
+    ('Citation', 'citations', 'write_citation'),
+    ('Source', 'sources', 'write_source'),
+    ('Place', 'places', 'write_place_obj'),
+    ('Media', 'objects', 'write_object'),
+    ('Repository', 'repositories', 'write_repository'),
+    ('Note', 'notes', 'write_note'),
+    ]
+
+CLASSES = {cls.__name__: cls
+           for cls in (Citation, Event, Family, Media, Note, Person, Place,
+                       Repository, Source, Tag)}
+
+# Number of strings collected by a BlockWriter before writing them
+BLOCK_SIZE = 65536
+
+# Number of objects read from the database at once
+CHUNK_SIZE = 1000
+
+# Number of objects written by a task of a worker process
+TASK_SIZE = 5000
+
+# Minimum number of objects for the objects to be written by worker processes
+PARALLEL_THRESHOLD = 20000
+
+#-------------------------------------------------------------------------
+#
+# BlockWriter
+#
+#-------------------------------------------------------------------------
+class BlockWriter:
+    """
+    Collect the text written by the exporter, and write it encoded in UTF-8
+    to a binary file in large blocks, rather than each line on its own.
+    """
+
+    def __init__(self, ofile, size=BLOCK_SIZE):
+        self.ofile = ofile
+        self.size = size
+        self.parts = []
+        self.write = self.parts.append
+
+    def check(self):
+        """
+        Write the collected text if there is enough of it.
+        """
+        if len(self.parts) >= self.size:
+            self.flush()
+
+    def write_bytes(self, data):
+        """
+        Write text already encoded in UTF-8.
+        """
+        self.flush()
+        self.ofile.write(data)
+
+    def flush(self):
+        """
+        Write the collected text.
+        """
+        if self.parts:
+            self.ofile.write("".join(self.parts).encode("utf-8"))
+            self.parts.clear()
 
 #-------------------------------------------------------------------------
 #
@@ -98,7 +170,7 @@ class GrampsXmlWriter(UpdateCallback):
     """
 
     def __init__(self, db, strip_photos=0, compress=1, version="unknown",
-                 user=None):
+                 user=None, compresslevel=None):
         """
         Initialize, but does not write, an XML file.
 
@@ -108,10 +180,16 @@ class GrampsXmlWriter(UpdateCallback):
         >              1: remove everything expect the filename (eg gpkg)
         >              2: remove leading slash (quick write)
         compress - attempt to compress the database
+        compresslevel - gzip compression level, from 1 (fastest) to 9
+        >               (smallest), by default the
+        >               'behavior.export-compresslevel' option
         """
-        UpdateCallback.__init__(self, user.callback)
+        UpdateCallback.__init__(self, user.callback if user else None)
         self.user = user
         self.compress = compress
+        if compresslevel is None:
+            compresslevel = config.get('behavior.export-compresslevel')
+        self.compresslevel = compresslevel
         if not _gzip_ok:
             self.compress = False
         self.db = db
@@ -163,7 +241,8 @@ class GrampsXmlWriter(UpdateCallback):
             try:
                 if self.compress and _gzip_ok:
                     try:
-                        g = gzip.open(filename,"wb")
+                        g = gzip.open(filename, "wb",
+                                      compresslevel=self.compresslevel)
                     except:
                         g = open(filename,"wb")
                 else:
@@ -174,9 +253,10 @@ class GrampsXmlWriter(UpdateCallback):
                                         str(msg))
                 return 0
 
-        self.g = codecs.getwriter("utf8")(g)
+        self.g = BlockWriter(g)
 
         self.write_xml_data()
+        self.g.flush()
         if filename != '-':
             g.close()
         return 1
@@ -188,15 +268,17 @@ class GrampsXmlWriter(UpdateCallback):
 
         if self.compress and _gzip_ok:
             try:
-                g = gzip.GzipFile(mode="wb", fileobj=handle)
+                g = gzip.GzipFile(mode="wb", fileobj=handle,
+                                  compresslevel=self.compresslevel)
             except:
                 g = handle
         else:
             g = handle
 
-        self.g = codecs.getwriter("utf8")(g)
+        self.g = BlockWriter(g)
 
         self.write_xml_data()
+        self.g.flush()
         g.close()
         return 1
 
@@ -253,103 +335,19 @@ class GrampsXmlWriter(UpdateCallback):
         # by the time we get to person's names
         self.write_name_formats()
 
-        # Write table objects
-        if tag_len > 0:
-            self.g.write("  <tags>\n")
-            for key in sorted(self.db.get_tag_handles()):
-                tag = self.db.get_tag_from_handle(key)
-                if tag:
-                    self.write_tag(tag, 2)
-                self.update()
-            self.g.write("  </tags>\n")
-
-        # Write primary objects
-        if event_len > 0:
-            self.g.write("  <events>\n")
-            for handle in sorted(self.db.get_event_handles()):
-                event = self.db.get_event_from_handle(handle)
-                if event:
-                    self.write_event(event,2)
-                self.update()
-            self.g.write("  </events>\n")
-
-        if person_len > 0:
-            self.g.write("  <people")
-            person = self.db.get_default_person()
-            if person:
-                self.g.write(' home="_%s"' % person.handle)
-            self.g.write('>\n')
-
-            for handle in sorted(self.db.get_person_handles()):
-                person = self.db.get_person_from_handle(handle)
-                if person:
-                    self.write_person(person, 2)
-                self.update()
-            self.g.write("  </people>\n")
-
-        if family_len > 0:
-            self.g.write("  <families>\n")
-            for handle in sorted(self.db.iter_family_handles()):
-                family = self.db.get_family_from_handle(handle)
-                if family:
-                    self.write_family(family,2)
-                self.update()
-            self.g.write("  </families>\n")
-
-        if citation_len > 0:
-            self.g.write("  <citations>\n")
-            for handle in sorted(self.db.get_citation_handles()):
-                citation = self.db.get_citation_from_handle(handle)
-                if citation:
-                    self.write_citation(citation,2)
-                self.update()
-            self.g.write("  </citations>\n")
-
-        if source_len > 0:
-            self.g.write("  <sources>\n")
-            for handle in sorted(self.db.get_source_handles()):
-                source = self.db.get_source_from_handle(handle)
-                if source:
-                    self.write_source(source,2)
-                self.update()
-            self.g.write("  </sources>\n")
-
-        if place_len > 0:
-            self.g.write("  <places>\n")
-            for key in sorted(self.db.get_place_handles()):
-                # try:
-                place = self.db.get_place_from_handle(key)
-                if place:
-                    self.write_place_obj(place,2)
-                self.update()
-            self.g.write("  </places>\n")
-
-        if obj_len > 0:
-            self.g.write("  <objects>\n")
-            for handle in sorted(self.db.get_media_handles()):
-                obj = self.db.get_media_from_handle(handle)
-                if obj:
-                    self.write_object(obj,2)
-                self.update()
-            self.g.write("  </objects>\n")
-
-        if repo_len > 0:
-            self.g.write("  <repositories>\n")
-            for key in sorted(self.db.get_repository_handles()):
-                repo = self.db.get_repository_from_handle(key)
-                if repo:
-                    self.write_repository(repo,2)
-                self.update()
-            self.g.write("  </repositories>\n")
-
-        if note_len > 0:
-            self.g.write("  <notes>\n")
-            for key in sorted(self.db.get_note_handles()):
-                note = self.db.get_note_from_handle(key)
-                if note:
-                    self.write_note(note, 2)
-                self.update()
-            self.g.write("  </notes>\n")
+        # Write table and primary objects
+        sections = [(name, tag, method,
+                     sorted(self.db.method('get_%s_handles', name)()))
+                    for name, tag, method in SECTIONS]
+        processes = self.get_processes(total_steps)
+        if processes:
+            self.write_parallel(sections, processes)
+        else:
+            for name, tag, method, handles in sections:
+                if handles:
+                    self.write_section_start(name, tag)
+                    self.write_objects(name, method, handles)
+                    self.g.write("  </%s>\n" % tag)
 
         # Data is written, now write bookmarks.
         self.write_bookmarks()
@@ -360,6 +358,89 @@ class GrampsXmlWriter(UpdateCallback):
 #        self.status.end()
 #        self.status = None
 
+    def write_section_start(self, name, tag):
+        """
+        Write the start tag of the section of an object type.
+        """
+        self.g.write("  <%s" % tag)
+        if name == 'Person':
+            person = self.db.get_default_person()
+            if person:
+                self.g.write(' home="_%s"' % person.handle)
+        self.g.write('>\n')
+
+    def write_objects(self, name, method, handles):
+        """
+        Write the objects of a type with the given handles, in that order.
+
+        The objects of a family tree are created from the raw data read in
+        chunks, while those of other databases, like the proxies of a
+        filtered export, are read one at a time.
+        """
+        write = getattr(self, method)
+        if isinstance(self.db, DbGeneric):
+            obj_class = CLASSES[name]
+            get_raw_data = self.db.method('get_raw_%s_data_many', name)
+            for start in range(0, len(handles), CHUNK_SIZE):
+                for data in get_raw_data(handles[start:start + CHUNK_SIZE]):
+                    if data:
+                        write(obj_class.create(data), 2)
+                    self.update()
+                self.g.check()
+        else:
+            get_object = self.db.method('get_%s_from_handle', name)
+            for handle in handles:
+                obj = get_object(handle)
+                if obj:
+                    write(obj, 2)
+                self.update()
+                self.g.check()
+
+    def get_processes(self, count):
+        """
+        Return the number of worker processes writing the objects, set by
+        the 'behavior.export-processes' option, or 0 if the objects should be
+        written by this process: the option is not set, the database is not
+        a SQLite family tree, or it is too small to benefit.
+        """
+        processes = config.get('behavior.export-processes')
+        if (processes < 2 or count < PARALLEL_THRESHOLD or
+                not isinstance(self.db, DbGeneric)):
+            return 0
+        directory = self.db.get_save_path()
+        if (not directory or directory == ':memory:' or
+                get_dbid_from_path(directory) != 'sqlite'):
+            return 0
+        return processes
+
+    def write_parallel(self, sections, processes):
+        """
+        Write the sections of objects, with the objects written in worker
+        processes, each opening its own read-only connection to the family
+        tree.  The text of the tasks is written in their order, so that the
+        file is the same as the one written by this process alone.  The
+        workers are started with the 'spawn' method, so that they do not
+        inherit the state of this process, like the threads of the user
+        interface.
+        """
+        tasks = [(name, method, handles[start:start + TASK_SIZE])
+                 for name, tag, method, handles in sections
+                 for start in range(0, len(handles), TASK_SIZE)]
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(processes, _init_worker,
+                          (self.db.get_save_path(),
+                           self.strip_photos)) as pool:
+            results = pool.imap(_write_objects, tasks)
+            for name, tag, method, handles in sections:
+                if not handles:
+                    continue
+                self.write_section_start(name, tag)
+                for start in range(0, len(handles), TASK_SIZE):
+                    self.g.write_bytes(next(results))
+                    for dummy in handles[start:start + TASK_SIZE]:
+                        self.update()
+                self.g.write("  </%s>\n" % tag)
+
     def write_metadata(self):
         """ Method to write out metadata of the database
         """
@@ -1298,6 +1379,32 @@ class GrampsXmlWriter(UpdateCallback):
 
         self.g.write("%s</object>\n" % ("  "*index))
 
+#-------------------------------------------------------------------------
+#
+# Worker processes
+#
+#-------------------------------------------------------------------------
+
+# Writer of a worker process, None in the main process
+_WRITER = None
+
+def _init_worker(directory, strip_photos):
+    global _WRITER
+    db = make_database('sqlite')
+    db.load(directory, mode=DBMODE_R, update=False)
+    _WRITER = GrampsXmlWriter(db, strip_photos)
+
+def _write_objects(task):
+    """
+    Return the text of the objects of a task, encoded in UTF-8.
+    """
+    name, method, handles = task
+    with BytesIO() as ofile:
+        _WRITER.g = BlockWriter(ofile)
+        _WRITER.write_objects(name, method, handles)
+        _WRITER.g.flush()
+        return ofile.getvalue()
+
 #-------------------------------------------------------------------------
 #
 #
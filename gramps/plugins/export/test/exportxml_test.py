@@ -0,0 +1,131 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest for the export to Gramps XML
+"""
+import gzip
+import os
+import tempfile
+import unittest
+from io import BytesIO
+from unittest.mock import patch
+
+from gramps.cli.user import User
+from gramps.gen.config import config
+from gramps.gen.const import DATA_DIR
+from gramps.gen.db.dbconst import DBBACKEND
+from gramps.gen.db.utils import make_database
+from gramps.plugins.importer.importxml import importData
+from .. import exportxml
+from ..exportxml import BlockWriter, GrampsXmlWriter
+
+EXAMPLE = os.path.join(DATA_DIR, "tests", "example.gramps")
+
+
+def export(db, filename, compress=0):
+    """
+    Return the content of the Gramps XML file written from the database.
+    """
+    writer = GrampsXmlWriter(db, compress=compress, version="test",
+                             user=User(quiet=True))
+    writer.write(filename)
+    with open(filename, "rb") as ifile:
+        return ifile.read()
+
+def load_tree(directory, filename):
+    """
+    Return a SQLite family tree with a Gramps XML file imported into it.
+    """
+    os.mkdir(directory)
+    with open(os.path.join(directory, DBBACKEND), "w") as backend:
+        backend.write("sqlite")
+    db = make_database("sqlite")
+    db.load(directory)
+    importData(db, filename, User(quiet=True))
+    return db
+
+
+class BlockWriterTest(unittest.TestCase):
+
+    def test_blocks(self):
+        with BytesIO() as ofile:
+            writer = BlockWriter(ofile, size=3)
+            writer.write("a")
+            writer.write("é")
+            writer.check()
+            self.assertEqual(ofile.getvalue(), b"")
+            writer.write("c")
+            writer.check()
+            self.assertEqual(ofile.getvalue(), b"a\xc3\xa9c")
+            writer.write("d")
+            writer.write_bytes(b"e")
+            writer.write("f")
+            writer.flush()
+            self.assertEqual(ofile.getvalue(), b"a\xc3\xa9cdef")
+
+
+class RoundTripTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = load_tree(os.path.join(self.tmpdir.name, "example"),
+                            EXAMPLE)
+
+    def export(self, db, compress=0):
+        return export(db, os.path.join(self.tmpdir.name, "export.gramps"),
+                      compress)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        data = self.export(self.db)
+        db = load_tree(os.path.join(self.tmpdir.name, "round-trip"),
+                       os.path.join(self.tmpdir.name, "export.gramps"))
+        try:
+            self.assertEqual(self.export(db), data)
+        finally:
+            db.close()
+
+    def test_compressed(self):
+        self.assertEqual(gzip.decompress(self.export(self.db, compress=1)),
+                         self.export(self.db))
+
+    def test_parallel(self):
+        expected = self.export(self.db)
+        saved = config.get('behavior.export-processes')
+        config.set('behavior.export-processes', 2)
+        try:
+            with patch.object(exportxml, 'PARALLEL_THRESHOLD', 1), \
+                    patch.object(exportxml, 'TASK_SIZE', 7), \
+                    patch.object(GrampsXmlWriter, 'write_parallel',
+                                 autospec=True,
+                                 side_effect=GrampsXmlWriter.write_parallel
+                                 ) as write_parallel:
+                self.assertEqual(self.export(self.db), expected)
+            write_parallel.assert_called_once()
+        finally:
+            config.set('behavior.export-processes', saved)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -36,8 +36,6 @@ from gramps.gen.config import config
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.gettext
 
-_YIELD_INTERVAL = 350
-
 def make_tag_size(n, counts, mins=8, maxs=20):
     # return font sizes mins to maxs
     diff = maxs - mins
@@ -67,42 +65,11 @@ class GivenNameCloudGramplet(Gramplet):
         self.gui.data = [self.top_size]
 
     def main(self):
-        self.set_text(_("Processing...") + "\n")
-        yield True
-        givensubnames = defaultdict(int)
-        representative_handle = {}
-
-        cnt = 0
-        for person in self.dbstate.db.iter_people():
-            allnames = [person.get_primary_name()] + person.get_alternate_names()
-            allnames = set(name.get_first_name().strip() for name in allnames)
-            for givenname in allnames:
-                nbsp = givenname.split('\u00A0')
-                if len(nbsp) > 1: # there was an NBSP, a non-breaking space
-                    first_two = nbsp[0] + '\u00A0' + nbsp[1].split()[0]
-                    givensubnames[first_two] += 1
-                    representative_handle[first_two] = person.handle
-                    givenname = ' '.join(nbsp[1].split()[1:])
-                for givensubname in givenname.split():
-                    givensubnames[givensubname] += 1
-                    representative_handle[givensubname] = person.handle
-            cnt += 1
-            if not cnt % _YIELD_INTERVAL:
-                yield True
-
-        total_people = cnt
-        givensubname_sort = []
-
-        total = cnt = 0
-        for givensubname in givensubnames:
-            givensubname_sort.append((givensubnames[givensubname],
-                                      givensubname))
-            total += givensubnames[givensubname]
-            cnt += 1
-            if not cnt % _YIELD_INTERVAL:
-                yield True
-
-        total_givensubnames = cnt
+        stats = self.dbstate.db.get_statistics()
+        total_people = stats.people
+        total_givensubnames = len(stats.given_names)
+        givensubname_sort = [(count, givensubname) for givensubname, count
+                             in stats.given_names.items()]
         givensubname_sort.sort(reverse=True)
         cloud_names = []
         cloud_values = []
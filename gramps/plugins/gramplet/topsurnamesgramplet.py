@@ -16,13 +16,6 @@
 # along with this program; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 
-#------------------------------------------------------------------------
-#
-# Python modules
-#
-#------------------------------------------------------------------------
-from collections import defaultdict
-
 #------------------------------------------------------------------------
 #
 # Gramps modules
@@ -33,13 +26,6 @@ from gramps.gen.config import config
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.sgettext
 
-#------------------------------------------------------------------------
-#
-# Constants
-#
-#------------------------------------------------------------------------
-_YIELD_INTERVAL = 350
-
 #------------------------------------------------------------------------
 #
 # TopSurnamesGramplet class
@@ -67,35 +53,12 @@ class TopSurnamesGramplet(Gramplet):
         self.gui.data = [self.top_size]
 
     def main(self):
-        self.set_text(_("Processing...") + "\n")
-        surnames = defaultdict(int)
-        representative_handle = {}
-
-        cnt = 0
-        for person in self.dbstate.db.iter_people():
-            allnames = [person.get_primary_name()] + person.get_alternate_names()
-            allnames = set([name.get_group_name().strip() for name in allnames])
-            for surname in allnames:
-                surnames[surname] += 1
-                representative_handle[surname] = person.handle
-            cnt += 1
-            if not cnt % _YIELD_INTERVAL:
-                yield True
-
-        total_people = cnt
-        surname_sort = []
-        total = 0
-
-        cnt = 0
-        for surname in surnames:
-            surname_sort.append((surnames[surname], surname))
-            total += surnames[surname]
-            cnt += 1
-            if not cnt % _YIELD_INTERVAL:
-                yield True
-
-        total_surnames = cnt
-        surname_sort.sort(reverse=True)
+        stats = self.dbstate.db.get_statistics()
+        total_people = stats.people
+        total_surnames = len(stats.surnames)
+        total = sum(stats.surnames.values())
+        surname_sort = sorted(((count, surname) for surname, count
+                               in stats.surnames.items()), reverse=True)
         line = 0
         ### All done!
         self.set_text("")
@@ -104,7 +67,10 @@ class TopSurnamesGramplet(Gramplet):
             text = "%s, " % (surname if surname else nosurname)
             text += "%d%% (%d)\n" % (int((float(count)/total) * 100), count)
             self.append_text(" %d. " % (line + 1))
-            self.link(text, 'Surname', representative_handle[surname])
+            if surname:
+                self.link(text, 'Surname', surname)
+            else:
+                self.link(text, 'Filter', 'incomplete names')
             line += 1
             if line >= self.top_size:
                 break
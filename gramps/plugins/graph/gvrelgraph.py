@@ -203,6 +203,17 @@ class RelGraphReport(Report):
 
         person_handles = self.sort_persons(person_handles)
 
+        if self.increlname:
+            # look up the ancestors of the center person only once
+            people = [person for person in
+                      map(self._db.get_person_from_handle, person_handles)
+                      if person is not None]
+            self.relationships = dict(zip(
+                [person.handle for person in people],
+                self.rel_calc.get_relationships(
+                    self._db, self.center_person, people, extra_info=True,
+                    olocale=self._locale)))
+
         if len(person_handles) > 1:
             if self._user:
                 self._user.begin_progress(_("Relationship Graph"),
@@ -662,17 +673,12 @@ class RelGraphReport(Report):
 
         if self.increlname and self.center_person != person:
             # display relationship info
+            (relationship, _ga, _gb) = self.relationships[person.handle]
             if self.advrelinfo:
-                (relationship, _ga, _gb) = self.rel_calc.get_one_relationship(
-                    self._db, self.center_person, person,
-                    extra_info=True, olocale=self._locale)
                 if relationship:
                     label += "%s(%s Ga=%d Gb=%d)" % (line_delimiter,
                                                      relationship, _ga, _gb)
             else:
-                relationship = self.rel_calc.get_one_relationship(
-                    self._db, self.center_person, person,
-                    olocale=self._locale)
                 if relationship:
                     label += "%s(%s)" % (line_delimiter, relationship)
 
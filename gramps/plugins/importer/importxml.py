@@ -31,6 +31,7 @@
 import os
 import sys
 import time
+import sqlite3
 from xml.parsers.expat import ExpatError, ParserCreate
 from xml.sax.saxutils import escape
 from gramps.gen.const import URL_WIKISTRING
@@ -39,6 +40,7 @@ _ = glocale.translation.gettext
 import re
 import logging
 from collections import abc
+from collections.abc import MutableMapping
 LOG = logging.getLogger(".ImportXML")
 
 #-------------------------------------------------------------------------
@@ -88,7 +90,8 @@ try:
 except:
     GZIP_OK = False
 
-PERSON_RE = re.compile(r"\s*\<person\s(.*)$")
+# Number of items of a SpillDict kept in memory
+SPILL_SIZE = 50000
 
 CHILD_REL_MAP = {
     "Birth"     : ChildRefType(ChildRefType.BIRTH),
@@ -104,9 +107,6 @@ EVENT_FAMILY_STR = _("%(event_name)s of %(family)s")
 # feature requests 2356, 1658: avoid genitive form
 EVENT_PERSON_STR = _("%(event_name)s of %(person)s")
 
-HANDLE = 0
-INSTANTIATED = 1
-
 #-------------------------------------------------------------------------
 #
 # Importing data into the currently open database.
@@ -119,8 +119,7 @@ def importData(database, filename, user):
     database.smap = {}
     database.pmap = {}
     database.fmap = {}
-    line_cnt = 1
-    person_cnt = 0
+    size = 1
 
     with ImportOpenFileContextManager(filename, user) as xml_file:
         if xml_file is None:
@@ -138,15 +137,13 @@ def importData(database, filename, user):
                                    config.get('preferences.tag-on-import') else None))
 
         if filename != '-':
-            linecounter = LineParser(filename)
-            line_cnt = linecounter.get_count()
-            person_cnt = linecounter.get_person_count()
+            size = os.path.getsize(filename)
 
         read_only = database.readonly
         database.readonly = False
 
         try:
-            info = parser.parse(xml_file, line_cnt, person_cnt)
+            info = parser.parse(xml_file, size)
         except GrampsImportError as err: # version error
             user.notify_error(*err.messages())
             return
@@ -330,58 +327,155 @@ class ImportInfo:
 
         return txt
 
-class LineParser:
-    def __init__(self, filename):
-
-        self.count = 0
-        self.person_count = 0
+class SpillDict(MutableMapping):
+    """
+    A dictionary of strings, kept in memory until it holds SPILL_SIZE items,
+    and then moved to a temporary SQLite database, so that the memory used
+    by an import does not grow with the size of the file.
 
-        if GZIP_OK:
-            use_gzip = 1
-            try:
-                with gzip.open(filename, "r") as f:
-                    f.read(1)
-            except IOError as msg:
-                use_gzip = 0
-            except ValueError as msg:
-                use_gzip = 1
+    Keys that are not strings, such as None for a missing ID, are always
+    kept in memory.
+    """
+    def __init__(self):
+        self._dict = {}
+        self._db = None
+
+    def _spill(self):
+        # An empty name opens a private database in a temporary file
+        self._db = sqlite3.connect("")
+        self._db.execute("CREATE TABLE map "
+                         "(key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID")
+        items = [(key, value) for (key, value) in self._dict.items()
+                 if isinstance(key, str)]
+        self._db.executemany("INSERT INTO map VALUES (?, ?)", items)
+        self._dict = {key: value for (key, value) in self._dict.items()
+                      if not isinstance(key, str)}
+
+    def __getitem__(self, key):
+        if self._db is None or not isinstance(key, str):
+            return self._dict[key]
+        row = self._db.execute("SELECT value FROM map WHERE key = ?",
+                               (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return row[0]
+
+    def __setitem__(self, key, value):
+        if self._db is None or not isinstance(key, str):
+            self._dict[key] = value
+            if self._db is None and len(self._dict) >= SPILL_SIZE:
+                self._spill()
         else:
-            use_gzip = 0
+            self._db.execute("INSERT OR REPLACE INTO map VALUES (?, ?)",
+                             (key, value))
+
+    def __delitem__(self, key):
+        if self._db is None or not isinstance(key, str):
+            del self._dict[key]
+        elif self._db.execute("DELETE FROM map WHERE key = ?",
+                              (key,)).rowcount == 0:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if self._db is None or not isinstance(key, str):
+            return key in self._dict
+        return self._db.execute("SELECT 1 FROM map WHERE key = ?",
+                                (key,)).fetchone() is not None
+
+    def __iter__(self):
+        yield from self._dict
+        if self._db is not None:
+            for (key,) in self._db.execute("SELECT key FROM map"):
+                yield key
+
+    def __len__(self):
+        if self._db is None:
+            return len(self._dict)
+        return (len(self._dict) +
+                self._db.execute("SELECT COUNT(*) FROM map").fetchone()[0])
+
+    def close(self):
+        """
+        Release the memory and the temporary database.
+        """
+        self._dict = {}
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+class ImportHandles:
+    """
+    The handles given to the imported objects, by their handle in the file
+    and their target: 'person', 'family', etc.
 
-        try:
-            if use_gzip:
-                import io
-                # Bug 6255. TextIOWrapper is required for python3 to
-                #           present file contents as text, otherwise they
-                #           are read as binary. However due to a missing
-                #           method (read1) in early python3 versions this
-                #           try block will fail.
-                #           Gramps will still import XML files using python
-                #           versions < 3.3.0 but the file progress meter
-                #           will not work properly, going immediately to
-                #           100%.
-                #           It should work correctly from version 3.3.
-                ofile = io.TextIOWrapper(gzip.open(filename, "rb"),
-                                         encoding='utf8', errors='replace')
-            else:
-                ofile = open(filename, "r", encoding='utf8', errors='replace')
+    An object is instantiated once its own element has been read; objects
+    that are only referenced are created as unknown objects at the end of
+    the import.
+    """
+    def __init__(self):
+        self._handles = {}
+        self._uninstantiated = {}
 
-            for line in ofile:
-                self.count += 1
-                if PERSON_RE.match(line):
-                    self.person_count += 1
-        except:
-            self.count = 0
-            self.person_count = 0
-        finally:
-            # Ensure the file handle is always closed
-            ofile.close()
+    def __contains__(self, orig_handle):
+        return any(orig_handle in handles
+                   for handles in self._handles.values())
+
+    def __getitem__(self, key):
+        orig_handle, target = key
+        if target not in self._handles:
+            raise KeyError(key)
+        return self._handles[target][orig_handle]
+
+    def get(self, orig_handle, target):
+        """
+        Return the handle given to an object, or None.
+        """
+        handles = self._handles.get(target)
+        if handles is None:
+            return None
+        return handles.get(orig_handle)
+
+    def add(self, orig_handle, target, handle):
+        """
+        Record the handle given to an object, not instantiated yet.
+        """
+        if target not in self._handles:
+            self._handles[target] = SpillDict()
+            self._uninstantiated[target] = SpillDict()
+        self._handles[target][orig_handle] = handle
+        self._uninstantiated[target][orig_handle] = handle
+
+    def instantiate(self, orig_handle, target):
+        """
+        Record that the element of an object has been read.
+        """
+        self._uninstantiated[target].pop(orig_handle, None)
+
+    def uninstantiated(self):
+        """
+        Return a list of the (original handle, target) of the objects that
+        are referenced but not instantiated.
+        """
+        return [(orig_handle, target)
+                for target, handles in self._uninstantiated.items()
+                for orig_handle in handles]
 
-    def get_count(self):
-        return self.count
+    def handles(self, target):
+        """
+        Iterate over the handles given to the objects of a target.
+        """
+        return iter(self._handles.get(target, {}).values())
 
-    def get_person_count(self):
-        return self.person_count
+    def close(self):
+        """
+        Release the maps.
+        """
+        for handles in self._handles.values():
+            handles.close()
+        for handles in self._uninstantiated.values():
+            handles.close()
+        self._handles = {}
+        self._uninstantiated = {}
 
 #-------------------------------------------------------------------------
 #
@@ -462,15 +556,17 @@ class GrampsParser(UpdateCallback):
         self.note_list = []
         self.tlist = []
         self.conf = 2
-        self.gid2id = {}
-        self.gid2fid = {}
-        self.gid2eid = {}
-        self.gid2pid = {}
-        self.gid2oid = {}
-        self.gid2sid = {}
-        self.gid2rid = {}
-        self.gid2nid = {}
-        self.childref_map = {}
+        self.gid2id = SpillDict()
+        self.gid2fid = SpillDict()
+        self.gid2eid = SpillDict()
+        self.gid2pid = SpillDict()
+        self.gid2oid = SpillDict()
+        self.gid2sid = SpillDict()
+        self.gid2rid = SpillDict()
+        self.gid2nid = SpillDict()
+        # relations of the child references read from the persons, by
+        # "family_handle person_handle", for the old XML
+        self.childref_map = SpillDict()
         self.change = change
         self.dp = parser
         self.info = ImportInfo()
@@ -556,17 +652,18 @@ class GrampsParser(UpdateCallback):
         self.func_index = 0
         self.func = None
         self.witness_comment = ""
-        self.idswap = {}
-        self.fidswap = {}
-        self.eidswap = {}
-        self.cidswap = {}
-        self.sidswap = {}
-        self.pidswap = {}
-        self.oidswap = {}
-        self.ridswap = {}
-        self.nidswap = {}
-        self.eidswap = {}
-        self.import_handles = {}
+        self.idswap = SpillDict()
+        self.fidswap = SpillDict()
+        self.eidswap = SpillDict()
+        self.cidswap = SpillDict()
+        self.sidswap = SpillDict()
+        self.pidswap = SpillDict()
+        self.oidswap = SpillDict()
+        self.ridswap = SpillDict()
+        self.nidswap = SpillDict()
+        self.import_handles = ImportHandles()
+        self.progress_file = None
+        self.person_count = 0
 
         if default_tag_format:
             name = time.strftime(default_tag_format)
@@ -734,9 +831,9 @@ class GrampsParser(UpdateCallback):
         """
         handle = str(handle.replace('_', ''))
         orig_handle = handle
-        if (orig_handle in self.import_handles and
-                target in self.import_handles[orig_handle]):
-            handle = self.import_handles[handle][target][HANDLE]
+        new_handle = self.import_handles.get(orig_handle, target)
+        if new_handle is not None:
+            handle = new_handle
             if not isinstance(prim_obj, abc.Callable):
                 # This method is called by a start_<primary_object> method.
                 get_raw_obj_data = {"person": self.db.get_raw_person_data,
@@ -751,7 +848,7 @@ class GrampsParser(UpdateCallback):
                                     "tag": self.db.get_raw_tag_data}[target]
                 raw = get_raw_obj_data(handle)
                 prim_obj.unserialize(raw)
-                self.import_handles[orig_handle][target][INSTANTIATED] = True
+                self.import_handles.instantiate(orig_handle, target)
             return handle
         elif handle in self.import_handles:
             LOG.warning("The file you import contains duplicate handles "
@@ -759,7 +856,7 @@ class GrampsParser(UpdateCallback):
             handle = create_id()
             while handle in self.import_handles:
                 handle = create_id()
-            self.import_handles[orig_handle][target] = [handle, False]
+            self.import_handles.add(orig_handle, target, handle)
         else:
             orig_handle = handle
             if self.replace_import_handle:
@@ -779,12 +876,12 @@ class GrampsParser(UpdateCallback):
                                    "tag": self.db.has_tag_handle}[target]
                 while has_handle_func(handle):
                     handle = create_id()
-            self.import_handles[orig_handle] = {target: [handle, False]}
+            self.import_handles.add(orig_handle, target, handle)
         # method is called by a reference
         if isinstance(prim_obj, abc.Callable):
             prim_obj = prim_obj()
         else:
-            self.import_handles[orig_handle][target][INSTANTIATED] = True
+            self.import_handles.instantiate(orig_handle, target)
         prim_obj.set_handle(handle)
         if target == "tag":
             self.db.add_tag(prim_obj, self.trans)
@@ -910,19 +1007,23 @@ class GrampsParser(UpdateCallback):
                 gramps_ids[id_] = gramps_id
         return gramps_ids[id_]
 
-    def parse(self, ifile, linecount=1, personcount=0):
+    def parse(self, ifile, size=1):
         """
         Parse the xml file
         :param ifile: must be a file handle that is already open, with position
                       at the start of the file
+        :param size: the size of the file, which is compressed if the file
+                     is gzipped, for the progress
         """
-        if personcount < 1000:
-            no_magic = True
-        else:
-            no_magic = False
-        with DbTxn(_("Gramps XML import"), self.db, batch=True,
-                   no_magic=no_magic) as self.trans:
-            self.set_total(linecount)
+        # The progress is the position in the file, compressed if the file is
+        # gzipped: the expat parser reads the file in blocks as it goes.
+        self.progress_file = getattr(ifile, 'fileobj', ifile)
+        try:
+            self.progress_file.tell()
+        except (AttributeError, OSError, ValueError):
+            self.progress_file = None
+        with DbTxn(_("Gramps XML import"), self.db, batch=True) as self.trans:
+            self.set_total(size)
 
             self.db.disable_signals()
 
@@ -963,8 +1064,10 @@ class GrampsParser(UpdateCallback):
                           "path in the Preferences."
                          ) % self.mediapath )
 
+            self.trans.no_magic = self.person_count < 1000
             self.fix_not_instantiated()
             self.fix_families()
+            self.close_maps()
             for key in list(self.func_map.keys()):
                 del self.func_map[key]
             del self.func_map
@@ -975,6 +1078,25 @@ class GrampsParser(UpdateCallback):
         self.db.request_rebuild()
         return self.info
 
+    def update_progress(self):
+        """
+        Report the position in the file to the progress callback.
+        """
+        if self.progress_file is not None:
+            self.update(self.progress_file.tell())
+
+    def close_maps(self):
+        """
+        Release the maps of the handles and IDs of the imported objects.
+        """
+        self.import_handles.close()
+        for id_map in (self.gid2id, self.gid2fid, self.gid2eid, self.gid2pid,
+                       self.gid2oid, self.gid2sid, self.gid2rid, self.gid2nid,
+                       self.childref_map, self.idswap, self.fidswap,
+                       self.eidswap, self.cidswap, self.sidswap, self.pidswap,
+                       self.oidswap, self.ridswap, self.nidswap):
+            id_map.close()
+
     def start_database(self, attrs):
         """
         Get the xml version of the file.
@@ -1149,7 +1271,7 @@ class GrampsParser(UpdateCallback):
         # Gramps LEGACY: title in the placeobj tag
         self.placeobj.title = attrs.get('title', '')
         self.locations = 0
-        self.update(self.p.CurrentLineNumber)
+        self.update_progress()
         if self.default_tag:
             self.placeobj.add_tag(self.default_tag.handle)
         return self.placeobj
@@ -1258,7 +1380,7 @@ class GrampsParser(UpdateCallback):
             self.info.add('new-object', EVENT_KEY, self.event)
         else:
             # This is new event, with ID and handle already existing
-            self.update(self.p.CurrentLineNumber)
+            self.update_progress()
             self.event = Event()
             if 'handle' in attrs:
                 orig_handle = attrs['handle'].replace('_', '')
@@ -1385,7 +1507,7 @@ class GrampsParser(UpdateCallback):
 
         # This is new XML, so we are guaranteed to have a handle ref
         handle = attrs['hlink'].replace('_', '')
-        handle = self.import_handles[handle][target][HANDLE]
+        handle = self.import_handles[handle, target]
         # Due to pre 2.2.9 bug, bookmarks might be handle of other object
         # Make sure those are filtered out.
         # Bookmarks are at end, so all handle must exist before we do bookmrks
@@ -1456,7 +1578,8 @@ class GrampsParser(UpdateCallback):
         Add a person to db if it doesn't exist yet and assign
         id, privacy and changetime.
         """
-        self.update(self.p.CurrentLineNumber)
+        self.update_progress()
+        self.person_count += 1
         self.person = Person()
         if 'handle' in attrs:
             orig_handle = attrs['handle'].replace('_', '')
@@ -1525,10 +1648,15 @@ class GrampsParser(UpdateCallback):
             handle = self.inaugurate_id(attrs.get('ref'), PERSON_KEY,
                                         Person)
 
-        # If that were the case then childref_map has the childref ready
-        if (self.family.handle, handle) in self.childref_map:
-            self.family.add_child_ref(
-                self.childref_map[(self.family.handle, handle)])
+        # If that were the case then childref_map has the relations ready
+        rels = self.childref_map.get("%s %s" % (self.family.handle, handle))
+        if rels is not None:
+            childref = ChildRef()
+            childref.ref = handle
+            mrel, frel = rels.split('\t')
+            childref.get_mother_relation().set_from_xml_str(mrel)
+            childref.get_father_relation().set_from_xml_str(frel)
+            self.family.add_child_ref(childref)
 
     def start_childref(self, attrs):
         """
@@ -1591,7 +1719,7 @@ class GrampsParser(UpdateCallback):
         Add a family object to db if it doesn't exist yet and assign
         id, privacy and changetime.
         """
-        self.update(self.p.CurrentLineNumber)
+        self.update_progress()
         self.family = Family()
         if 'handle' in attrs:
             orig_handle = attrs['handle'].replace('_', '')
@@ -1667,13 +1795,8 @@ class GrampsParser(UpdateCallback):
         if 'frel' in attrs:
             frel.set_from_xml_str(attrs['frel'])
 
-        childref = ChildRef()
-        childref.ref = self.person.handle
-        if not mrel.is_default():
-            childref.set_mother_relation(mrel)
-        if not frel.is_default():
-            childref.set_father_relation(frel)
-        self.childref_map[(handle, self.person.handle)] = childref
+        self.childref_map["%s %s" % (handle, self.person.handle)] = \
+            "%s\t%s" % (mrel.xml_str(), frel.xml_str())
         self.person.add_parent_family_handle(handle)
 
     def start_parentin(self, attrs):
@@ -1787,12 +1910,11 @@ class GrampsParser(UpdateCallback):
                           "Source" : "source", "Citation" : "citation",
                           "Repository" : "repository", "Media" : "media",
                           "Note" : "note"}[str(match.group('object_class'))]
-                if match.group('handle') in self.import_handles:
-                    if target in self.import_handles[match.group('handle')]:
-                        val = "gramps://%s/handle/%s" % (
-                                match.group('object_class'),
-                                self.import_handles[match.group('handle')]
-                                                   [target][HANDLE])
+                handle = self.import_handles.get(match.group('handle'),
+                                                 target)
+                if handle is not None:
+                    val = "gramps://%s/handle/%s" % (
+                            match.group('object_class'), handle)
             tagvalue = StyledTextTagType.STYLE_TYPE[int(tagtype)](val)
         except KeyError:
             tagvalue = None
@@ -1872,7 +1994,7 @@ class GrampsParser(UpdateCallback):
         self.in_note = 0
         if 'handle' in attrs:
             # This is new note, with ID and handle already existing
-            self.update(self.p.CurrentLineNumber)
+            self.update_progress()
             self.note = Note()
             if 'handle' in attrs:
                 orig_handle = attrs['handle'].replace('_', '')
@@ -2071,7 +2193,7 @@ class GrampsParser(UpdateCallback):
         Add a citation object to db if it doesn't exist yet and assign
         id, privacy and changetime.
         """
-        self.update(self.p.CurrentLineNumber)
+        self.update_progress()
         self.citation = Citation()
         orig_handle = attrs['handle'].replace('_', '')
         is_merge_candidate = (self.replace_import_handle and
@@ -2127,7 +2249,7 @@ class GrampsParser(UpdateCallback):
         Add a source object to db if it doesn't exist yet and assign
         id, privacy and changetime.
         """
-        self.update(self.p.CurrentLineNumber)
+        self.update_progress()
         self.source = Source()
         if 'handle' in attrs:
             orig_handle = attrs['handle'].replace('_', '')
@@ -2276,7 +2398,7 @@ class GrampsParser(UpdateCallback):
         pass
 
     def stop_database(self, *tag):
-        self.update(self.p.CurrentLineNumber)
+        self.update_progress()
 
     def stop_media(self, *tag):
         self.db.commit_media(self.object, self.trans,
@@ -3173,12 +3295,7 @@ class GrampsParser(UpdateCallback):
             obj.add_tag(tag_handle)
 
     def fix_not_instantiated(self):
-        uninstantiated = []
-        for orig_handle in self.import_handles.keys():
-            tglist = [target for target in self.import_handles[orig_handle].keys() if
-                    not self.import_handles[orig_handle][target][INSTANTIATED]]
-            for target in tglist:
-                uninstantiated += [(orig_handle, target)]
+        uninstantiated = self.import_handles.uninstantiated()
         if uninstantiated:
             expl_note = create_explanation_note(self.db)
             self.db.commit_note(expl_note, self.trans, time.time())
@@ -3216,67 +3333,64 @@ class GrampsParser(UpdateCallback):
         # Fix any imported families where there is a link from the family to an
         # individual, but no corresponding link from the individual to the
         # family.
-        for orig_handle in list(self.import_handles.keys()):
-            for target in list(self.import_handles[orig_handle].keys()):
-                if target == 'family':
-                    family_handle = self.import_handles[orig_handle][target][HANDLE]
-                    family = self.db.get_family_from_handle(family_handle)
-                    father_handle = family.get_father_handle()
-                    mother_handle = family.get_mother_handle()
-
-                    if father_handle:
-                        father = self.db.get_person_from_handle(father_handle)
-                        if father and \
-                            family_handle not in father.get_family_handle_list():
-                            father.add_family_handle(family_handle)
-                            self.db.commit_person(father, self.trans)
-                            txt = _("Error: family '%(family)s'"
-                                           " father '%(father)s'"
-                                           " does not refer"
-                                           " back to the family."
-                                           " Reference added." %
-                                           {'family' : family.gramps_id,
-                                            'father' : father.gramps_id})
-                            self.info.add('unlinked-family', txt, None)
-                            LOG.warning(txt)
-
-                    if mother_handle:
-                        mother = self.db.get_person_from_handle(mother_handle)
-                        if mother and \
-                            family_handle not in mother.get_family_handle_list():
-                            mother.add_family_handle(family_handle)
-                            self.db.commit_person(mother, self.trans)
-                            txt = _("Error: family '%(family)s'"
-                                           " mother '%(mother)s'"
-                                           " does not refer"
-                                           " back to the family."
-                                           " Reference added." %
-                                           {'family' : family.gramps_id,
-                                            'mother' : mother.gramps_id})
-                            self.info.add('unlinked-family', txt, None)
-                            LOG.warning(txt)
-
-                    for child_ref in family.get_child_ref_list():
-                        child_handle = child_ref.ref
-                        child = self.db.get_person_from_handle(child_handle)
-                        if child:
-                            if family_handle not in \
-                                child.get_parent_family_handle_list():
-                                # The referenced child has no reference to the
-                                # family. There was a link from the FAM record
-                                # to the child, but no FAMC link from the child
-                                # to the FAM.
-                                child.add_parent_family_handle(family_handle)
-                                self.db.commit_person(child, self.trans)
-                                txt = _("Error: family '%(family)s'"
-                                               " child '%(child)s'"
-                                               " does not "
-                                               "refer back to the family. "
-                                               "Reference added." %
-                                               {'family' : family.gramps_id,
-                                                'child' : child.gramps_id})
-                                self.info.add('unlinked-family', txt, None)
-                                LOG.warning(txt)
+        for family_handle in self.import_handles.handles('family'):
+            family = self.db.get_family_from_handle(family_handle)
+            father_handle = family.get_father_handle()
+            mother_handle = family.get_mother_handle()
+
+            if father_handle:
+                father = self.db.get_person_from_handle(father_handle)
+                if father and \
+                    family_handle not in father.get_family_handle_list():
+                    father.add_family_handle(family_handle)
+                    self.db.commit_person(father, self.trans)
+                    txt = _("Error: family '%(family)s'"
+                                   " father '%(father)s'"
+                                   " does not refer"
+                                   " back to the family."
+                                   " Reference added." %
+                                   {'family' : family.gramps_id,
+                                    'father' : father.gramps_id})
+                    self.info.add('unlinked-family', txt, None)
+                    LOG.warning(txt)
+
+            if mother_handle:
+                mother = self.db.get_person_from_handle(mother_handle)
+                if mother and \
+                    family_handle not in mother.get_family_handle_list():
+                    mother.add_family_handle(family_handle)
+                    self.db.commit_person(mother, self.trans)
+                    txt = _("Error: family '%(family)s'"
+                                   " mother '%(mother)s'"
+                                   " does not refer"
+                                   " back to the family."
+                                   " Reference added." %
+                                   {'family' : family.gramps_id,
+                                    'mother' : mother.gramps_id})
+                    self.info.add('unlinked-family', txt, None)
+                    LOG.warning(txt)
+
+            for child_ref in family.get_child_ref_list():
+                child_handle = child_ref.ref
+                child = self.db.get_person_from_handle(child_handle)
+                if child:
+                    if family_handle not in \
+                        child.get_parent_family_handle_list():
+                        # The referenced child has no reference to the
+                        # family. There was a link from the FAM record
+                        # to the child, but no FAMC link from the child
+                        # to the FAM.
+                        child.add_parent_family_handle(family_handle)
+                        self.db.commit_person(child, self.trans)
+                        txt = _("Error: family '%(family)s'"
+                                       " child '%(child)s'"
+                                       " does not "
+                                       "refer back to the family. "
+                                       "Reference added." %
+                                       {'family' : family.gramps_id,
+                                        'child' : child.gramps_id})
+                        self.info.add('unlinked-family', txt, None)
+                        LOG.warning(txt)
 
 def append_value(orig, val):
     if orig:
@@ -0,0 +1,104 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest of the maps used by the import of Gramps XML
+"""
+
+import os
+import unittest
+from unittest.mock import patch
+
+from gramps.cli.user import User
+from gramps.gen.const import DATA_DIR
+from gramps.gen.db.utils import import_as_dict
+from gramps.plugins.importer import importxml
+from gramps.plugins.importer.importxml import SpillDict, ImportHandles
+
+EXAMPLE = os.path.join(DATA_DIR, "tests", "example.gramps")
+
+
+class SpillDictTest(unittest.TestCase):
+
+    def check(self, spill_size):
+        with patch.object(importxml, 'SPILL_SIZE', spill_size):
+            spill = SpillDict()
+            for i in range(10):
+                spill['I%d' % i] = 'H%d' % i
+            spill[None] = 'None'
+            spill['I3'] = 'X3'
+            del spill['I4']
+            with self.assertRaises(KeyError):
+                del spill['I4']
+            self.assertEqual(len(spill), 10)
+            self.assertEqual(spill['I3'], 'X3')
+            self.assertEqual(spill.get('I4'), None)
+            self.assertEqual(spill[None], 'None')
+            self.assertIn('I9', spill)
+            self.assertNotIn('I4', spill)
+            self.assertEqual(spill.pop('I9'), 'H9')
+            self.assertEqual(sorted(spill, key=str),
+                             sorted(['I0', 'I1', 'I2', 'I3', 'I5', 'I6', 'I7',
+                                     'I8', None], key=str))
+            spill.close()
+
+    def test_memory(self):
+        self.check(100)
+
+    def test_spilled(self):
+        self.check(3)
+
+    def test_import_handles(self):
+        handles = ImportHandles()
+        handles.add('a', 'person', 'A')
+        handles.add('b', 'family', 'B')
+        handles.add('c', 'family', 'C')
+        handles.instantiate('b', 'family')
+        self.assertIn('a', handles)
+        self.assertNotIn('A', handles)
+        self.assertEqual(handles['c', 'family'], 'C')
+        self.assertEqual(handles.get('a', 'family'), None)
+        self.assertEqual(handles.uninstantiated(),
+                         [('a', 'person'), ('c', 'family')])
+        self.assertEqual(sorted(handles.handles('family')), ['B', 'C'])
+        handles.close()
+
+
+class ImportSpillTest(unittest.TestCase):
+
+    def test_example(self):
+        expected = import_as_dict(EXAMPLE, User())
+        with patch.object(importxml, 'SPILL_SIZE', 10):
+            db = import_as_dict(EXAMPLE, User())
+        for name in ('Person', 'Family', 'Event', 'Place', 'Citation',
+                     'Note', 'Media'):
+            self.assertEqual(
+                sorted(db.method('get_%s_handles', name)()),
+                sorted(expected.method('get_%s_handles', name)()))
+        for person in expected.iter_people():
+            self.assertEqual(
+                db.get_person_from_handle(person.handle).serialize(),
+                person.serialize())
+        db.close()
+        expected.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -91,6 +91,7 @@ all lines until the next level 2 token is found (in this case, skipping the
 import os
 import re
 import time
+import multiprocessing
 # from xml.parsers.expat import ParserCreate
 from collections import defaultdict, OrderedDict
 import string
@@ -113,6 +114,7 @@ LOG = logging.getLogger(".libgedcom")
 #-------------------------------------------------------------------------
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.gettext
+from gramps.gen.config import config
 from gramps.gen.errors import GedcomError
 from gramps.gen.lib import (
     Address, Attribute, AttributeType, ChildRef,
@@ -123,6 +125,7 @@ from gramps.gen.lib import (
     Source, SourceMediaType, SrcAttribute,
     Surname, Tag, Url, UrlType, PlaceType, PlaceRef, PlaceName)
 from gramps.gen.db import DbTxn
+from gramps.gen.db.idalloc import GrampsIdAllocator
 from gramps.gen.updatecallback import UpdateCallback
 from gramps.gen.utils.file import media_path
 from gramps.gen.utils.id import create_id
@@ -850,13 +853,15 @@ class Lexer:
         self.func_map = {TOKEN_CONT : self.__fix_token_cont,
                          TOKEN_CONC : self.__fix_token_conc}
         self.__add_msg = __add_msg
+        # serialized dates, by GEDCOM date text
+        self.dates = {}
 
     def readline(self):
         """ read a line from file with possibility of putting it back """
         if len(self.current_list) <= 1 and not self.eof:
             self.__readahead()
         try:
-            return GedLine(self.current_list.pop())
+            return GedLine(self.current_list.pop(), self.dates)
         except:
             LOG.debug('Error in reading Gedcom line', exc_info=True)
             return None
@@ -1086,7 +1091,7 @@ class GedLine:
         dateobj.set_quality(qual)
         return dateobj
 
-    def __init__(self, data):
+    def __init__(self, data, dates=None):
         """
         If the level is 0, then this is a top level instance. In this case,
         we may find items in the form of:
@@ -1095,7 +1100,11 @@ class GedLine:
 
         If this is not the top level, we check the MAP_DATA array to see if
         there is a conversion function for the data.
+
+        dates is an optional dictionary of the dates already parsed,
+        serialized, by their text.
         """
+        self.dates = dates
         self.line = data[4]
         self.level = data[0]
         self.token = data[1]
@@ -1127,7 +1136,16 @@ class GedLine:
         """
         Converts the data field to a Date object
         """
-        self.data = self.__extract_date(self.data)
+        if self.dates is None:
+            self.data = self.__extract_date(self.data)
+        else:
+            # The same date texts appear many times in a file: parse each
+            # one once, and give every line its own copy of the date.
+            date = self.dates.get(self.data)
+            if date is None:
+                date = self.__extract_date(self.data).serialize()
+                self.dates[self.data] = date
+            self.data = Date().unserialize(date)
         self.token = TOKEN_DATE
 
     def calc_unknown(self):
@@ -1191,6 +1209,18 @@ _MAP_DATA = {
     TOKEN_AFN     : GedLine.calc_attr,
     TOKEN__FSFTID : GedLine.calc_attr, }
 
+# Do not start worker processes for fewer distinct dates than this
+_PARALLEL_DATES = 2000
+
+
+def _parse_dates(texts):
+    """
+    Parse GEDCOM date texts, in a worker process.  Return a list of (text,
+    serialized date) tuples.
+    """
+    return [(text, GedLine((1, TOKEN_DATE, text, 'DATE', 0)).data.serialize())
+            for text in texts]
+
 
 #-------------------------------------------------------------------------
 #
@@ -1727,7 +1757,7 @@ class IdFinder:
         """
         Initialize the object.
         """
-        self.ids = set(keys)
+        self.ids = GrampsIdAllocator(prefix, keys)
         self.index = 0
         self.prefix = prefix
 
@@ -1739,12 +1769,8 @@ class IdFinder:
         @return: Returns the next available index
         @rtype: str
         """
-        index = self.prefix % self.index
-        while index in self.ids:
-            self.index += 1
-            index = self.prefix % self.index
+        self.index, index = self.ids.find_next(self.index)
         self.ids.add(index)
-        self.index += 1
         return index
 
 
@@ -1761,13 +1787,15 @@ class IdMapper:
         self.find_next = find_next
         self.id2user_format = id2user_format
         self.swap = {}
+        # reverse map of self.swap, from Gramps IDs to xrefs
+        self.xrefs = {}
 
     def __getitem__(self, gid):
         if gid == "":
             # We need to find the next gramps ID provided it is not already
             # the target of a swap
             new_val = self.find_next()
-            while new_val in list(self.swap.values()):
+            while new_val in self.xrefs:
                 new_val = self.find_next()
         else:
             # remove any @ signs
@@ -1783,17 +1811,22 @@ class IdMapper:
                 # now looking for I1, it wouldn't be in self.swap, and we now
                 # find that I0001 is in use, so we have to create a new id.
                 if self.has_gid(formatted_gid) or \
-                        (formatted_gid in list(self.swap.values())):
+                        (formatted_gid in self.xrefs):
                     new_val = self.find_next()
-                    while new_val in list(self.swap.values()):
+                    while new_val in self.xrefs:
                         new_val = self.find_next()
                 else:
                     new_val = formatted_gid
             # we need to distinguish between I1 and I0001, so we record the map
             # from the original format
             self.swap[gid] = new_val
+            self.xrefs.setdefault(new_val, gid)
         return new_val
 
+    def xref(self, gramps_id):
+        """ return the xref mapped to a Gramps ID, or None """
+        return self.xrefs.get(gramps_id)
+
     def clean(self, gid):
         """ remove '@' from start and end of xref """
         temp = gid.strip()
@@ -1875,6 +1908,7 @@ class GedcomParser(UpdateCallback):
         UpdateCallback.__init__(self, user.callback)
         self.user = user
         self.set_total(stage_one.get_line_count())
+        self.date_texts = stage_one.get_date_texts()
         self.repo2id = {}
         self.trans = None
         self.errors = []
@@ -2750,7 +2784,13 @@ class GedcomParser(UpdateCallback):
                 self.dbase.add_source(self.def_src, self.trans)
             if self.default_tag and self.default_tag.handle is None:
                 self.dbase.add_tag(self.default_tag, self.trans)
-            self.__parse_record()
+            pool = self.__start_date_workers()
+            try:
+                self.__parse_record()
+            finally:
+                if pool:
+                    pool.terminate()
+                    pool.join()
             self.__parse_trailer()
             for title, handle in self.inline_srcs.items():
                 src = Source()
@@ -2777,6 +2817,34 @@ class GedcomParser(UpdateCallback):
         self.user.info(message, "".join(self.errors),
                        parent=parent_window, monospaced=True)
 
+    def __start_date_workers(self):
+        """
+        Start parsing the distinct dates found by the first stage in worker
+        processes, while the records are parsed in this one.  The parsed
+        dates are added to the date cache of the lexer as they arrive; a date
+        not parsed yet when its line is read is parsed by the lexer.  The
+        number of processes is set by the 'behavior.import-processes' option.
+        They are started with the 'spawn' method, so that they do not inherit
+        the state of this process, like the threads of the user interface.
+
+        Returns the pool of worker processes, or None if the dates are
+        parsed in this process.
+        """
+        processes = config.get('behavior.import-processes')
+        if processes < 2 or len(self.date_texts) < _PARALLEL_DATES:
+            return None
+        texts = list(self.date_texts)
+        # smaller tasks than the processes, so that the first dates are
+        # available early
+        size = -(-len(texts) // (processes * 8))
+        context = multiprocessing.get_context('spawn')
+        pool = context.Pool(processes)
+        for start in range(0, len(texts), size):
+            pool.apply_async(_parse_dates, (texts[start:start + size],),
+                             callback=self.lexer.dates.update)
+        pool.close()
+        return pool
+
     def __clean_up(self):
         """
         Break circular references to parsing methods stored in dictionaries
@@ -3262,11 +3330,6 @@ class GedcomParser(UpdateCallback):
                 self.nid2id, "NOTE")
 
         # Check persons membership in referenced families
-        def __input_fid(gramps_id):
-            for (key, val) in self.fid_map.map().items():
-                if val == gramps_id:
-                    return key
-
         for input_id, gramps_id in self.pid_map.map().items():
             person_handle = self.__find_from_handle(gramps_id, self.gid2id)
             person = self.dbase.get_person_from_handle(person_handle)
@@ -3283,15 +3346,10 @@ class GedcomParser(UpdateCallback):
                                      " Family reference removed from person") %
                                    {'family' : family.gramps_id,
                                     'orig_family' :
-                                        __input_fid(family.gramps_id),
+                                        self.fid_map.xref(family.gramps_id),
                                     'person' : person.gramps_id,
                                     'orig_person' : input_id})
 
-        def __input_pid(gramps_id):
-            for (key, val) in self.pid_map.map().items():
-                if val == gramps_id:
-                    return key
-
         for input_id, gramps_id in self.fid_map.map().items():
             family_handle = self.__find_from_handle(gramps_id, self.fid2id)
             family = self.dbase.get_family_from_handle(family_handle)
@@ -3312,7 +3370,7 @@ class GedcomParser(UpdateCallback):
                                       'orig_family' : input_id,
                                       'father' : father.gramps_id,
                                       'orig_father' :
-                                          __input_pid(father.gramps_id)})
+                                          self.pid_map.xref(father.gramps_id)})
 
             if mother_handle:
                 mother = self.dbase.get_person_from_handle(mother_handle)
@@ -3328,7 +3386,7 @@ class GedcomParser(UpdateCallback):
                                       'orig_family' : input_id,
                                       'mother' : mother.gramps_id,
                                       'orig_mother' :
-                                          __input_pid(mother.gramps_id)})
+                                          self.pid_map.xref(mother.gramps_id)})
 
             for child_ref in family.get_child_ref_list():
                 child_handle = child_ref.ref
@@ -3350,7 +3408,7 @@ class GedcomParser(UpdateCallback):
                                         'orig_family' : input_id,
                                         'child' : child.gramps_id,
                                         'orig_child' :
-                                            __input_pid(child.gramps_id)})
+                                            self.pid_map.xref(child.gramps_id)})
 
         if self.missing_references:
             self.dbase.commit_note(self.explanation, self.trans, time.time())
@@ -8091,6 +8149,8 @@ class GedcomStageOne:
     2. Number of people and families in the list
     3. Child to family references, since Ancestry.com creates GEDCOM files
        without the FAMC references.
+    4. The distinct date texts, so that they can be parsed in parallel with
+       the rest of the import.
     """
     __BAD_UTF16 = _("Your GEDCOM file is corrupted. "
                     "The file appears to be encoded using the UTF16 "
@@ -8109,6 +8169,7 @@ class GedcomStageOne:
         self.ifile = ifile
         self.famc = defaultdict(list)
         self.fams = defaultdict(list)
+        self.dates = set()
         self.enc = ""
         self.pcnt = 0
         self.lcnt = 0
@@ -8179,6 +8240,8 @@ class GedcomStageOne:
                 self.fams[value[1:-1]].append(current_family_id)
             elif key in ("CHIL", "CHILD") and self.__is_xref_value(value):
                 self.famc[value[1:-1]].append(current_family_id)
+            elif key in ("DATE", "_DATE") and value:
+                self.dates.add(line.split(None, 2)[2].replace('@@', '@'))
             elif key == 'CHAR' and not self.enc:
                 assert isinstance(value, str)
                 self.enc = value
@@ -8199,6 +8262,12 @@ class GedcomStageOne:
         """
         return self.fams
 
+    def get_date_texts(self):
+        """
+        Return the set of the distinct date texts
+        """
+        return self.dates
+
     def get_encoding(self):
         """
         Return the detected encoding
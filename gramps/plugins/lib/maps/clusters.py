@@ -0,0 +1,257 @@
+# -*- python -*-
+# -*- coding: utf-8 -*-
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Clusters of the markers which are too close to be told apart at a zoom
+level of the map.
+
+The markers are grouped by the cells of a grid of CELL_SIZE pixels over
+the map of the world.  A cell at a zoom level covers four cells at the next
+level, so the clusters of a level are made from those of a more detailed
+level when it is known.  The clusters of each level are kept.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Python modules
+#
+#-------------------------------------------------------------------------
+import math
+
+#-------------------------------------------------------------------------
+#
+# Gramps Modules
+#
+#-------------------------------------------------------------------------
+from .spatialindex import normalize_longitude
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+# the size of the tiles of the map, in pixels
+TILE_SIZE = 256
+
+# the size of the cells of the grid, in pixels
+CELL_SIZE = 64
+
+# the radius of the circle of a cluster of two markers, in pixels
+CLUSTER_RADIUS = 12
+
+# the latitudes shown on the maps
+MAX_LATITUDE = 85.0511287798
+
+def world_position(lat, lon):
+    """
+    Return the position of a point on the map of the world, from (0, 0)
+    at the top left corner to (1, 1) at the bottom right corner.
+    """
+    lat = math.radians(max(-MAX_LATITUDE, min(MAX_LATITUDE, lat)))
+    pos_x = normalize_longitude(lon) / 360.0 + 0.5
+    pos_y = 0.5 - math.atanh(math.sin(lat)) / (2 * math.pi)
+    return pos_x, pos_y
+
+def world_degrees(pos_x, pos_y):
+    """
+    Return the latitude and the longitude of a position on the map of the
+    world, as given by world_position.
+    """
+    lat = math.degrees(math.atan(math.sinh((0.5 - pos_y) * 2 * math.pi)))
+    lon = (pos_x - 0.5) * 360.0
+    return lat, lon
+
+def world_size(zoom):
+    """
+    Return the size of the map of the world at a zoom level, in pixels.
+    """
+    return TILE_SIZE * 2 ** zoom
+
+#-------------------------------------------------------------------------
+#
+# Cluster
+#
+#-------------------------------------------------------------------------
+class Cluster:
+    """
+    Markers in a cell of the grid of a zoom level.
+    """
+    __slots__ = ('markers', 'count', 'first', 'pos_x', 'pos_y', 'bounds',
+                 'radius', 'label')
+
+    def __init__(self, markers, count, pos_x, pos_y, bounds):
+        """
+        :param markers: the indexes of the markers
+        :param count: the number of markers
+        :param pos_x: the horizontal position of their center on the map
+          of the world
+        :param pos_y: the vertical position of their center
+        :param bounds: the (left, top, right, bottom) of the box of their
+          positions
+        """
+        self.markers = markers
+        self.count = count
+        self.first = min(markers)
+        self.pos_x = pos_x
+        self.pos_y = pos_y
+        self.bounds = bounds
+        self.radius = CLUSTER_RADIUS + int(4 * math.log10(count))
+        self.label = str(count)
+
+    @classmethod
+    def merge(cls, clusters):
+        """
+        Return the cluster of the markers of several clusters.
+        """
+        if len(clusters) == 1:
+            return clusters[0]
+        markers = []
+        count = 0
+        pos_x = pos_y = 0.0
+        for cluster in clusters:
+            markers.extend(cluster.markers)
+            count += cluster.count
+            pos_x += cluster.pos_x * cluster.count
+            pos_y += cluster.pos_y * cluster.count
+        bounds = (min(cluster.bounds[0] for cluster in clusters),
+                  min(cluster.bounds[1] for cluster in clusters),
+                  max(cluster.bounds[2] for cluster in clusters),
+                  max(cluster.bounds[3] for cluster in clusters))
+        return cls(markers, count, pos_x / count, pos_y / count, bounds)
+
+    def center(self):
+        """
+        Return the latitude and the longitude of the center of the box of
+        the markers.
+        """
+        return world_degrees((self.bounds[0] + self.bounds[2]) / 2,
+                             (self.bounds[1] + self.bounds[3]) / 2)
+
+#-------------------------------------------------------------------------
+#
+# MarkerClusters
+#
+#-------------------------------------------------------------------------
+class MarkerClusters:
+    """
+    The clusters of markers at each zoom level, made when first needed.
+    """
+    def __init__(self, points, cell_size=CELL_SIZE):
+        """
+        :param points: the (latitude, longitude) of the markers
+        :type points: iterable
+        :param cell_size: the size of the cells of the grid, in pixels
+        :type cell_size: int
+        """
+        self.positions = [world_position(float(lat), float(lon))
+                          for lat, lon in points]
+        self.cell_size = cell_size
+        self.levels = {}        # zoom: {(column, row): Cluster}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __scale(self, zoom):
+        """
+        Return the number of cells across the map of the world.
+        """
+        return world_size(zoom) / self.cell_size
+
+    def level(self, zoom):
+        """
+        Return the clusters of a zoom level, by their cell.
+        """
+        level = self.levels.get(zoom)
+        if level is not None:
+            return level
+        finer = [known for known in self.levels if known > zoom]
+        cells = {}
+        if finer:
+            known = min(finer)
+            shift = known - zoom
+            for (column, row), cluster in self.levels[known].items():
+                cells.setdefault((column >> shift, row >> shift),
+                                 []).append(cluster)
+            level = dict((key, Cluster.merge(clusters))
+                         for key, clusters in cells.items())
+        else:
+            scale = self.__scale(zoom)
+            for index, (pos_x, pos_y) in enumerate(self.positions):
+                cells.setdefault((int(pos_x * scale), int(pos_y * scale)),
+                                 []).append(index)
+            level = {}
+            for key, markers in cells.items():
+                points = [self.positions[index] for index in markers]
+                xs = [point[0] for point in points]
+                ys = [point[1] for point in points]
+                level[key] = Cluster(markers, len(markers),
+                                     sum(xs) / len(xs), sum(ys) / len(ys),
+                                     (min(xs), min(ys), max(xs), max(ys)))
+        self.levels[zoom] = level
+        return level
+
+    def in_view(self, zoom, left, top, right, bottom):
+        """
+        Return the clusters of a zoom level in the cells which intersect a
+        view, ordered by their first marker.  Each cluster is returned with
+        the horizontal offset of the copy of the world it is seen in.
+
+        :param zoom: the zoom level
+        :param left, top, right, bottom: the box of the view, in pixels
+          from the top left corner of the map of the world; the map repeats
+          on both sides
+        :returns: a list of (cluster, offset in pixels)
+        """
+        level = self.level(zoom)
+        world = world_size(zoom)
+        last_cell = int(math.ceil(self.__scale(zoom))) - 1
+        cell = self.cell_size
+        first_row = max(int(math.floor(top / cell)), 0)
+        last_row = min(int(math.floor(bottom / cell)), last_cell)
+        clusters = []
+        for copy in range(int(math.floor(left / world)),
+                          int(math.floor(right / world)) + 1):
+            offset = copy * world
+            first_column = max(int(math.floor((left - offset) / cell)), 0)
+            last_column = min(int(math.floor((right - offset) / cell)),
+                              last_cell)
+            for column in range(first_column, last_column + 1):
+                for row in range(first_row, last_row + 1):
+                    cluster = level.get((column, row))
+                    if cluster is not None:
+                        clusters.append((cluster, offset))
+        clusters.sort(key=lambda item: item[0].first)
+        return clusters
+
+    def expansion_zoom(self, cluster, zoom, max_zoom):
+        """
+        Return the lowest zoom level above the given one, and not above
+        max_zoom, at which the markers of a cluster are in several
+        clusters, or None if there is none.
+        """
+        left, top, right, bottom = cluster.bounds
+        for level in range(zoom + 1, max_zoom + 1):
+            scale = self.__scale(level)
+            if (int(left * scale) != int(right * scale) or
+                    int(top * scale) != int(bottom * scale)):
+                return level
+        return None
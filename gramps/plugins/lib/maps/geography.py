@@ -65,6 +65,7 @@ from . import constants
 from .osmgps import OsmGps
 from .selectionlayer import SelectionLayer
 from .placeselection import PlaceSelection
+from .spatialindex import SpatialIndex, PlaceIndex
 from .cairoprint import CairoPrintSave
 from .libkml import Kml
 gi.require_version('OsmGpsMap', '1.0')
@@ -166,6 +167,8 @@ class GeoGraphyView(OsmGps, NavigationView):
         self.geo_altmap = theme.load_surface('gramps-geo-altmap', 48, 1,
                                              None, 0)
         self.sort = []
+        self.marker_index = None
+        self.place_index = None
         self.geo_othermap = {}
         for ident in (EventType.BIRTH,
                       EventType.DEATH,
@@ -275,6 +278,7 @@ class GeoGraphyView(OsmGps, NavigationView):
         Clear the map: places, markers, tracks, messages...
         """
         self.place_list = []
+        self.place_index = None
         self.remove_all_markers()
         self.remove_all_gps()
         self.remove_all_tracks()
@@ -288,7 +292,12 @@ class GeoGraphyView(OsmGps, NavigationView):
         is no need to store the database, since we will get the value
         from self.state.db
         """
-        dummy_dbse = dbse
+        self.place_index = None
+        if self.dbstate.is_open():
+            dbse.connect('place-add', self.update_place_index)
+            dbse.connect('place-update', self.update_place_index)
+            dbse.connect('place-delete', self.remove_from_place_index)
+            dbse.connect('place-rebuild', self.reset_place_index)
         if self.active:
             self.bookmarks.redraw()
         self.build_tree()
@@ -484,48 +493,87 @@ class GeoGraphyView(OsmGps, NavigationView):
         """
         Is there a marker at this position ?
         """
-        found = False
         mark_selected = []
         self.uistate.set_busy_cursor(True)
-        for mark in self.sort:
-            # as we are not precise with our hand, reduce the precision
-            # depending on the zoom.
-            precision = {1 : '%3.0f', 2 : '%3.1f', 3 : '%3.1f', 4 : '%3.1f',
-                         5 : '%3.2f', 6 : '%3.2f', 7 : '%3.2f', 8 : '%3.3f',
-                         9 : '%3.3f', 10 : '%3.3f', 11 : '%3.3f', 12 : '%3.3f',
-                         13 : '%3.3f', 14 : '%3.4f', 15 : '%3.4f', 16 : '%3.4f',
-                         17 : '%3.4f', 18 : '%3.4f'
-                        }.get(config.get("geography.zoom"), '%3.1f')
-            shift = {1 : 5.0, 2 : 5.0, 3 : 3.0,
-                     4 : 1.0, 5 : 0.5, 6 : 0.3, 7 : 0.15,
-                     8 : 0.06, 9 : 0.03, 10 : 0.015,
-                     11 : 0.005, 12 : 0.003, 13 : 0.001,
-                     14 : 0.0005, 15 : 0.0003, 16 : 0.0001,
-                     17 : 0.0001, 18 : 0.0001
-                    }.get(config.get("geography.zoom"), 5.0)
-            latp = precision % lat
-            lonp = precision % lon
-            mlatp = precision % float(mark[3])
-            mlonp = precision % float(mark[4])
-            latok = lonok = False
+        # as we are not precise with our hand, reduce the precision
+        # depending on the zoom.
+        digits = {1 : 0, 2 : 1, 3 : 1, 4 : 1, 5 : 2, 6 : 2, 7 : 2, 8 : 3,
+                  9 : 3, 10 : 3, 11 : 3, 12 : 3, 13 : 3, 14 : 4, 15 : 4,
+                  16 : 4, 17 : 4, 18 : 4
+                 }.get(config.get("geography.zoom"), 1)
+        precision = '%%3.%df' % digits
+        shift = {1 : 5.0, 2 : 5.0, 3 : 3.0,
+                 4 : 1.0, 5 : 0.5, 6 : 0.3, 7 : 0.15,
+                 8 : 0.06, 9 : 0.03, 10 : 0.015,
+                 11 : 0.005, 12 : 0.003, 13 : 0.001,
+                 14 : 0.0005, 15 : 0.0003, 16 : 0.0001,
+                 17 : 0.0001, 18 : 0.0001
+                }.get(config.get("geography.zoom"), 5.0)
+        latp = float(precision % lat)
+        lonp = float(precision % lon)
+        # the markers are compared once rounded: look a bit further
+        margin = shift + 10.0 ** -digits
+        for index in sorted(self.get_marker_index().in_box(
+                latp - margin, lonp - margin, latp + margin, lonp + margin)):
+            mark = self.sort[index]
+            mlatp = float(precision % float(mark[3]))
+            mlonp = float(precision % float(mark[4]))
             _LOG.debug(" compare latitude : %s with %s (precision = %s)"
                        " place='%s'", float(mark[3]), lat, precision, mark[0])
             _LOG.debug("compare longitude : %s with %s (precision = %s)"
                        " zoom=%d", float(mark[4]), lon, precision,
                        config.get("geography.zoom"))
-            if (float(mlatp) >= (float(latp) - shift)) and \
-               (float(mlatp) <= (float(latp) + shift)):
-                latok = True
-            if (float(mlonp) >= (float(lonp) - shift)) and \
-               (float(mlonp) <= (float(lonp) + shift)):
-                lonok = True
-            if latok and lonok:
+            if (latp - shift <= mlatp <= latp + shift and
+                    lonp - shift <= mlonp <= lonp + shift):
                 mark_selected.append(mark)
-                found = True
-        if found:
+        if mark_selected:
             self.bubble_message(event, lat, lon, mark_selected)
         self.uistate.set_busy_cursor(False)
 
+    def get_marker_index(self):
+        """
+        Return the spatial index of the positions of the markers in the
+        sorted list of places, built again when the list changes.
+        """
+        if (self.marker_index is None or
+                self.marker_index[0] is not self.sort or
+                len(self.marker_index[1]) != len(self.sort)):
+            self.marker_index = (
+                self.sort,
+                SpatialIndex((mark[3], mark[4], index)
+                             for index, mark in enumerate(self.sort)))
+        return self.marker_index[1]
+
+    def get_place_index(self):
+        """
+        Return the spatial index of the places of the database with
+        coordinates, read once and then kept up to date.
+        """
+        if self.place_index is None:
+            self.place_index = PlaceIndex(self.dbstate.db)
+        return self.place_index
+
+    def update_place_index(self, handle_list):
+        """
+        Places were added or changed.
+        """
+        if self.place_index is not None:
+            self.place_index.update_places(self.dbstate.db, handle_list)
+
+    def remove_from_place_index(self, handle_list):
+        """
+        Places were removed.
+        """
+        if self.place_index is not None:
+            self.place_index.remove_places(handle_list)
+
+    def reset_place_index(self):
+        """
+        The places were changed by an import or a batch tool, without
+        telling which ones: the index is read again when next needed.
+        """
+        self.place_index = None
+
     def bubble_message(self, event, lat, lon, mark):
         """
         Display the bubble message. depends on the view.
@@ -916,7 +964,8 @@ class GeoGraphyView(OsmGps, NavigationView):
             parent = None
         self.select_fct = PlaceSelection(self.uistate, self.dbstate, self.osm,
                                          self.selection_layer, self.place_list,
-                                         lat, lon, self.__edit_place, parent)
+                                         lat, lon, self.__edit_place, parent,
+                                         self.get_place_index())
 
     def edit_person(self, menu, event, lat, lon, mark):
         """
@@ -972,7 +1021,8 @@ class GeoGraphyView(OsmGps, NavigationView):
         dummy_event = event
         self.select_fct = PlaceSelection(self.uistate, self.dbstate, self.osm,
                                          self.selection_layer, self.place_list,
-                                         lat, lon, self.__add_place)
+                                         lat, lon, self.__add_place,
+                                         place_index=self.get_place_index())
 
     def add_place_from_kml(self, menu, event, lat, lon):
         """
@@ -1093,7 +1143,8 @@ class GeoGraphyView(OsmGps, NavigationView):
                                                  lat,
                                                  lon,
                                                  self.__edit_place,
-                                                 parent)
+                                                 parent,
+                                                 self.get_place_index())
 
     def __add_place(self, parent, plat, plon):
         """
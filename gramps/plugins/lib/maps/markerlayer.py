@@ -27,8 +27,9 @@
 #-------------------------------------------------------------------------
 from gi.repository import GObject
 from gi.repository import Gdk
+import cairo
 import time
-from math import pi as PI
+from math import hypot, pi as PI
 
 
 #------------------------------------------------------------------------
@@ -50,6 +51,16 @@ _LOG = logging.getLogger("maps.markerlayer")
 # Gramps Modules
 #
 #-------------------------------------------------------------------------
+from .spatialindex import SpatialIndex
+from .clusters import MarkerClusters, world_size
+
+# the markers are drawn above their position, and may be seen when their
+# position is up to this number of pixels out of the map.
+MARGIN = 100
+
+# the markers are grouped in clusters when there are at least this number
+# of them.
+CLUSTER_MIN_MARKERS = 500
 
 #-------------------------------------------------------------------------
 #
@@ -76,6 +87,10 @@ class MarkerLayer(GObject.GObject, osmgpsmap.MapLayer):
         """
         GObject.GObject.__init__(self)
         self.markers = []
+        self.index = None
+        self.clusters = None
+        self.drawn = []
+        self.images = {}
         self.max_references = 0
         self.max_places = 0
         self.nb_ref_by_places = 0
@@ -87,6 +102,10 @@ class MarkerLayer(GObject.GObject, osmgpsmap.MapLayer):
         reset the layer attributes.
         """
         self.markers = []
+        self.index = None
+        self.clusters = None
+        self.drawn = []
+        self.images = {}
         self.max_references = 0
         self.max_places = 0
         self.nb_ref_by_places = 0
@@ -101,6 +120,8 @@ class MarkerLayer(GObject.GObject, osmgpsmap.MapLayer):
         We calculate that here, to minimize the overhead at markers drawing
         """
         self.markers.append((points, image, count, color))
+        self.index = None
+        self.clusters = None
         self.max_references += count
         self.max_places += 1
         if count > self.max_value:
@@ -114,6 +135,8 @@ class MarkerLayer(GObject.GObject, osmgpsmap.MapLayer):
         Draw all markers here. Calculate where to draw the marker.
         Depending of the average, minimum and maximum value, resize the marker.
         We use cairo to resize the marker.
+        When there are many markers, those which are close at this zoom
+        level are drawn as a cluster showing their number.
         """
         max_interval = self.max_value - self.nb_ref_by_places
         min_interval = self.nb_ref_by_places - self.min_value
@@ -123,44 +146,147 @@ class MarkerLayer(GObject.GObject, osmgpsmap.MapLayer):
             min_interval = 0.01
         _LOG.debug("%s", time.strftime("start drawing   : "
                    "%a %d %b %Y %H:%M:%S", time.gmtime()))
-        for marker in self.markers:
-            # the icon size in 48, so the standard icon size is 0.6 * 48 = 28.8
-            size = 0.6
-            mark = float(marker[2])
-            if mark > self.nb_ref_by_places or max_interval > 3:
-                # at maximum, we'll have an icon size = (0.6 + 0.2) * 48 = 38.4
-                size += (0.2 * ((mark - self.nb_ref_by_places)
-                                 / max_interval))
-            else:
-                # at minimum, we'll have an icon size = (0.6 - 0.2) * 48 = 19.2
-                size -= (0.2 * ((self.nb_ref_by_places - mark)
-                                 / min_interval))
-
-            conv_pt = osmgpsmap.MapPoint.new_degrees(float(marker[0][0]),
-                                                     float(marker[0][1]))
-            coord_x, coord_y = gpsmap.convert_geographic_to_screen(conv_pt)
-            if marker[3] == None:
-                # We use the standard icons.
-                ctx.save()
-                ctx.translate(coord_x, coord_y)
-                ctx.scale(size, size)
-                # below, we try to place exactly the marker depending on its
-                # size. The left top corner of the image is set to the
-                # coordinates. The tip of the pin which should be at the marker
-                # position is at 3/18 of the width and to the height of the
-                # image. So we shift the image position.
-                pos_y = - int(48 * size + 0.5) - 10
-                pos_x = - int((48 * size) / 6 + 0.5) - 10
-                ctx.set_source_surface(marker[1], pos_x, pos_y)
-                ctx.paint()
-                ctx.restore()
-            else:
-                # We use colored icons.
-                draw_marker(ctx, float(coord_x), float(coord_y),
-                            size, marker[3][1])
+        self.drawn = []
+        if len(self.markers) < CLUSTER_MIN_MARKERS:
+            for marker in self.visible_markers(gpsmap):
+                conv_pt = osmgpsmap.MapPoint.new_degrees(float(marker[0][0]),
+                                                         float(marker[0][1]))
+                coord_x, coord_y = gpsmap.convert_geographic_to_screen(
+                    conv_pt)
+                self.draw_one_marker(ctx, marker, coord_x, coord_y,
+                                     max_interval, min_interval)
+        else:
+            for cluster, coord_x, coord_y in self.visible_clusters(gpsmap):
+                if cluster.count == 1:
+                    self.draw_one_marker(ctx, self.markers[cluster.first],
+                                         coord_x, coord_y,
+                                         max_interval, min_interval)
+                else:
+                    self.draw_cluster(ctx, cluster, coord_x, coord_y)
+                    self.drawn.append((coord_x, coord_y, cluster))
         _LOG.debug("%s", time.strftime("end drawing     : "
                    "%a %d %b %Y %H:%M:%S", time.gmtime()))
 
+    def draw_one_marker(self, ctx, marker, coord_x, coord_y,
+                        max_interval, min_interval):
+        """
+        Draw a marker at a position of the screen.
+        """
+        # the icon size in 48, so the standard icon size is 0.6 * 48 = 28.8
+        size = 0.6
+        mark = float(marker[2])
+        if mark > self.nb_ref_by_places or max_interval > 3:
+            # at maximum, we'll have an icon size = (0.6 + 0.2) * 48 = 38.4
+            size += (0.2 * ((mark - self.nb_ref_by_places)
+                             / max_interval))
+        else:
+            # at minimum, we'll have an icon size = (0.6 - 0.2) * 48 = 19.2
+            size -= (0.2 * ((self.nb_ref_by_places - mark)
+                             / min_interval))
+
+        if marker[3] == None:
+            # We use the standard icons.
+            ctx.save()
+            ctx.translate(coord_x, coord_y)
+            ctx.scale(size, size)
+            # below, we try to place exactly the marker depending on its
+            # size. The left top corner of the image is set to the
+            # coordinates. The tip of the pin which should be at the marker
+            # position is at 3/18 of the width and to the height of the
+            # image. So we shift the image position.
+            pos_y = - int(48 * size + 0.5) - 10
+            pos_x = - int((48 * size) / 6 + 0.5) - 10
+            ctx.set_source_surface(marker[1], pos_x, pos_y)
+            ctx.paint()
+            ctx.restore()
+        else:
+            # We use colored icons.
+            draw_marker(ctx, float(coord_x), float(coord_y),
+                        size, marker[3][1])
+
+    def draw_cluster(self, ctx, cluster, coord_x, coord_y):
+        """
+        Draw a cluster centered at a position of the screen.  The image of
+        a cluster is drawn once for each size and number of markers.
+        """
+        key = (cluster.radius, cluster.label)
+        image = self.images.get(key)
+        if image is None:
+            image = self.images[key] = draw_cluster_image(cluster.radius,
+                                                          cluster.label)
+        side = image.get_width()
+        ctx.set_source_surface(image, coord_x - side / 2.0,
+                               coord_y - side / 2.0)
+        ctx.paint()
+
+    def visible_clusters(self, gpsmap):
+        """
+        Return the clusters of markers which may be seen at the zoom level
+        of the map, with the position of their center on the screen, in the
+        order of their first marker.
+        """
+        if self.clusters is None:
+            self.clusters = MarkerClusters(marker[0]
+                                           for marker in self.markers)
+        zoom = gpsmap.props.zoom
+        world = world_size(zoom)
+        # the screen position of the center of the map of the world gives
+        # the part of the map which is seen
+        conv_pt = osmgpsmap.MapPoint.new_degrees(0.0, 0.0)
+        center_x, center_y = gpsmap.convert_geographic_to_screen(conv_pt)
+        left = world / 2 - center_x
+        top = world / 2 - center_y
+        right = left + gpsmap.get_allocated_width()
+        bottom = top + gpsmap.get_allocated_height()
+        return [(cluster, cluster.pos_x * world + offset - left,
+                 cluster.pos_y * world - top)
+                for cluster, offset in self.clusters.in_view(
+                    zoom, left - MARGIN, top - MARGIN,
+                    right + MARGIN, bottom + MARGIN)]
+
+    def expand_cluster(self, gpsmap, coord_x, coord_y):
+        """
+        If a cluster of markers is drawn at a position of the screen, zoom
+        in until its markers are in several clusters, and return True.
+        """
+        for pos_x, pos_y, cluster in reversed(self.drawn):
+            if hypot(coord_x - pos_x, coord_y - pos_y) <= cluster.radius:
+                zoom = self.clusters.expansion_zoom(cluster,
+                                                    gpsmap.props.zoom,
+                                                    gpsmap.props.max_zoom)
+                if zoom is None:
+                    # the markers are too close: show them in a message
+                    return False
+                lat, lon = cluster.center()
+                gpsmap.set_center_and_zoom(lat, lon, zoom)
+                return True
+        return False
+
+    def visible_markers(self, gpsmap):
+        """
+        Return the markers which may be seen on the map, in the order they
+        were added.
+        """
+        width = gpsmap.get_allocated_width()
+        height = max(gpsmap.get_allocated_height(), 1)
+        world = 256.0 * 2 ** gpsmap.props.zoom
+        if width + 2 * MARGIN >= world:
+            # all the longitudes are seen
+            return self.markers
+        if self.index is None:
+            self.index = SpatialIndex((marker[0][0], marker[0][1], index)
+                                      for index, marker
+                                      in enumerate(self.markers))
+        pt1, pt2 = gpsmap.get_bbox()
+        lat1, lon1 = pt1.get_degrees()
+        lat2, lon2 = pt2.get_degrees()
+        margin_lat = abs(lat1 - lat2) * MARGIN / height
+        margin_lon = 360.0 * MARGIN / world
+        return [self.markers[index]
+                for index in sorted(self.index.in_box(
+                    min(lat1, lat2) - margin_lat, lon1 - margin_lon,
+                    max(lat1, lat2) + margin_lat, lon2 + margin_lon))]
+
     def do_render(self, gpsmap):
         """
         render the layer
@@ -181,6 +307,29 @@ class MarkerLayer(GObject.GObject, osmgpsmap.MapLayer):
 
 GObject.type_register(MarkerLayer)
 
+def draw_cluster_image(radius, label):
+    """
+    Return the image of a cluster: a circle with the number of its markers.
+    """
+    side = 2 * radius + 4
+    image = cairo.ImageSurface(cairo.FORMAT_ARGB32, side, side)
+    ctx = cairo.Context(image)
+    ctx.arc(side / 2.0, side / 2.0, radius, 0., 2 * PI)
+    ctx.set_source_rgba(0.9, 0.4, 0.1, 0.8)
+    ctx.fill_preserve()
+    ctx.set_source_rgba(0.6, 0.2, 0.0, 1.0)
+    ctx.set_line_width(2.0)
+    ctx.stroke()
+    ctx.select_font_face("Sans", cairo.FONT_SLANT_NORMAL,
+                         cairo.FONT_WEIGHT_BOLD)
+    ctx.set_font_size(radius * 0.8)
+    x_bearing, y_bearing, width, height = ctx.text_extents(label)[:4]
+    ctx.move_to(side / 2.0 - x_bearing - width / 2,
+                side / 2.0 - y_bearing - height / 2)
+    ctx.set_source_rgba(1.0, 1.0, 1.0, 1.0)
+    ctx.show_text(label)
+    return image
+
 def draw_marker(ctx, x1, y1, size, color):
     width = 48.0 * size
     height = width / 2
@@ -520,7 +520,8 @@ class OsmGps:
             if self.end_selection is not None:
                 self.activate_selection_zoom(osm, event)
                 self.end_selection = None
-            else:
+            elif not self.marker_layer.expand_cluster(osm, event.x,
+                                                      event.y):
                 # do we click on a marker ?
                 self.is_there_a_marker_here(event, lat, lon)
         elif event.button == 2 and event.type == Gdk.EventType.BUTTON_PRESS:
@@ -28,7 +28,6 @@
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.sgettext
 import re
-import math
 
 #------------------------------------------------------------------------
 #
@@ -61,9 +60,9 @@ from gramps.gen.errors import WindowActiveError
 from gramps.gui.managedwindow import ManagedWindow
 from gramps.gui.dialog import WarningDialog
 from .osmgps import OsmGps
+from .spatialindex import SpatialIndex, PlaceIndex
 from gramps.gen.utils.location import get_main_location
 from gramps.gen.lib import PlaceType
-from gramps.gen.utils.place import conv_lat_lon
 from gramps.gen.display.place import displayer as _pd
 
 #-------------------------------------------------------------------------
@@ -92,9 +91,12 @@ class PlaceSelection(ManagedWindow, OsmGps):
     We select the value depending of our need which open the EditPlace box.
     """
     def __init__(self, uistate, dbstate, maps, layer, places, lat, lon,
-                 function, oldvalue=None):
+                 function, oldvalue=None, place_index=None):
         """
         Place Selection initialization
+
+        The places of the database are found with the place_index of the
+        view if it is given, otherwise they are read once here.
         """
         try:
             ManagedWindow.__init__(self, uistate, [], PlaceSelection)
@@ -111,6 +113,8 @@ class PlaceSelection(ManagedWindow, OsmGps):
         self.circle = None
         self.oldvalue = oldvalue
         self.place_list = places
+        self.place_list_index = None
+        self.place_index = place_index
         self.function = function
         self.selection_layer = layer
         self.layer = layer
@@ -276,49 +280,41 @@ class PlaceSelection(ManagedWindow, OsmGps):
         """
         rds = float(self.radius)
         self.places = []
+        if self.place_list_index is None:
+            self.place_list_index = SpatialIndex(
+                (entry[3], entry[4], entry[9]) for entry in self.place_list)
+        if self.place_index is None:
+            self.place_index = PlaceIndex(self.dbstate.db)
 
         # place
-        for entry in self.place_list:
-            if (math.hypot(lat-float(entry[3]),
-                           lon-float(entry[4])) <= rds) == True:
-                # Do we already have this place ? avoid duplicates
-                (country, state, county,
-                 place, other) = self.get_location(entry[9])
-                if not [country, state, county, place, other] in self.places:
-                    self.places.append([country, state, county, place, other])
+        for gramps_id in self.place_list_index.near(lat, lon, rds):
+            # Do we already have this place ? avoid duplicates
+            (country, state, county,
+             place, other) = self.get_location(gramps_id)
+            if not [country, state, county, place, other] in self.places:
+                self.places.append([country, state, county, place, other])
         self.warning = False
-        for place in self.dbstate.db.iter_places():
-            latn = place.get_latitude()
-            lonn = place.get_longitude()
-            if latn and lonn:
-                latn, ignore = conv_lat_lon(latn, "0", "D.D8")
-                if not latn:
-                    if not self.warning:
-                        self.close()
-                    warn1 = _("you have a wrong latitude for:")
-                    warn2 = _pd.display(self.dbstate.db, place) + "\n\n<b>"
-                    warn2 += _("Please, correct this before linking") + "</b>"
-                    WarningDialog(warn1, warn2, parent=self.uistate.window)
-                    self.warning = True
-                    continue
-                ignore, lonn = conv_lat_lon("0", lonn, "D.D8")
-                if not lonn:
-                    if not self.warning:
-                        self.close()
-                    warn1 = _("you have a wrong longitude for:") + "\n"
-                    warn2 = _pd.display(self.dbstate.db, place) + "\n\n<b>"
-                    warn2 += _("Please, correct this before linking") + "</b>"
-                    WarningDialog(warn1, warn2, parent=self.uistate.window)
-                    self.warning = True
-                    continue
-                if (math.hypot(lat-float(latn),
-                               lon-float(lonn)) <= rds) == True:
-                    (country, state, county,
-                     place, other) = self.get_location(place.get_gramps_id())
-                    if not [country, state, county,
-                            place, other] in self.places:
-                        self.places.append([country, state, county,
-                                            place, other])
+        for handle_list, warn1 in (
+                (self.place_index.wrong_latitude,
+                 _("you have a wrong latitude for:")),
+                (self.place_index.wrong_longitude,
+                 _("you have a wrong longitude for:") + "\n")):
+            for handle in sorted(handle_list):
+                if not self.warning:
+                    self.close()
+                place = self.dbstate.db.get_place_from_handle(handle)
+                warn2 = _pd.display(self.dbstate.db, place) + "\n\n<b>"
+                warn2 += _("Please, correct this before linking") + "</b>"
+                WarningDialog(warn1, warn2, parent=self.uistate.window)
+                self.warning = True
+        for handle in self.place_index.near(lat, lon, rds):
+            place = self.dbstate.db.get_place_from_handle(handle)
+            (country, state, county,
+             place, other) = self.get_location(place.get_gramps_id())
+            if not [country, state, county,
+                    place, other] in self.places:
+                self.places.append([country, state, county,
+                                    place, other])
 
     def selection(self, obj, index, column, function):
         """
@@ -0,0 +1,274 @@
+# -*- python -*-
+# -*- coding: utf-8 -*-
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Spatial indexes of the markers and places shown on the maps, to find those
+near a point or in the visible area without looking at all of them.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Python modules
+#
+#-------------------------------------------------------------------------
+import math
+
+#-------------------------------------------------------------------------
+#
+# Gramps Modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.utils.place import conv_lat_lon
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+# average number of points in a cell of the grid
+POINTS_BY_CELL = 16
+
+# the cells are never smaller than this, in degrees
+MIN_CELL_SIZE = 0.0001
+
+def normalize_longitude(lon):
+    """
+    Return the longitude in the range [-180, 180[.
+    """
+    return (lon + 180.0) % 360.0 - 180.0
+
+#-------------------------------------------------------------------------
+#
+# SpatialIndex
+#
+#-------------------------------------------------------------------------
+class SpatialIndex:
+    """
+    A grid of square cells over the latitude and the normalized longitude,
+    holding items at points of the map.
+    """
+    def __init__(self, points=(), cell_size=None):
+        """
+        Create the index.
+
+        :param points: the (latitude, longitude, item) to add
+        :type points: iterable
+        :param cell_size: the size of the cells in degrees, by default
+          chosen for about POINTS_BY_CELL points by cell
+        :type cell_size: float
+        """
+        points = [(float(lat), normalize_longitude(float(lon)), item)
+                  for lat, lon, item in points]
+        if cell_size is None:
+            cell_size = self.__cell_size(points)
+        self.cell_size = cell_size
+        self.cells = {}
+        self.count = 0
+        for point in points:
+            self.__add(point)
+
+    @staticmethod
+    def __cell_size(points):
+        """
+        Return a cell size for about POINTS_BY_CELL points by cell, if the
+        points were spread evenly over their bounding box.
+        """
+        if len(points) < 2:
+            return 1.0
+        lats = [point[0] for point in points]
+        lons = [point[1] for point in points]
+        area = ((max(lats) - min(lats) + MIN_CELL_SIZE) *
+                (max(lons) - min(lons) + MIN_CELL_SIZE))
+        return max(math.sqrt(area * POINTS_BY_CELL / len(points)),
+                   MIN_CELL_SIZE)
+
+    def __len__(self):
+        return self.count
+
+    def __key(self, lat, lon):
+        """
+        Return the cell of a point.
+        """
+        return (int(math.floor(lat / self.cell_size)),
+                int(math.floor(lon / self.cell_size)))
+
+    def __add(self, point):
+        """
+        Add a normalized point to its cell.
+        """
+        self.cells.setdefault(self.__key(point[0], point[1]),
+                              []).append(point)
+        self.count += 1
+
+    def add(self, lat, lon, item):
+        """
+        Add an item at the given point.
+        """
+        self.__add((float(lat), normalize_longitude(float(lon)), item))
+
+    def remove(self, lat, lon, item):
+        """
+        Remove an item added at the given point.  Return False if it was
+        not found.
+        """
+        lat = float(lat)
+        lon = normalize_longitude(float(lon))
+        key = self.__key(lat, lon)
+        cell = self.cells.get(key, [])
+        for index, point in enumerate(cell):
+            if point[2] == item:
+                del cell[index]
+                if not cell:
+                    del self.cells[key]
+                self.count -= 1
+                return True
+        return False
+
+    def __in_box(self, lat1, lon1, lat2, lon2):
+        """
+        Return the (latitude, longitude, item) in a box which does not cross
+        the antimeridian.
+        """
+        min_x, min_y = self.__key(lat1, lon1)
+        max_x, max_y = self.__key(lat2, lon2)
+        if (max_x - min_x + 1) * (max_y - min_y + 1) <= len(self.cells):
+            cells = (self.cells.get((key_x, key_y), ())
+                     for key_x in range(min_x, max_x + 1)
+                     for key_y in range(min_y, max_y + 1))
+        else:
+            # a large box: fewer cells are used than there are in the box
+            cells = (cell for (key_x, key_y), cell in self.cells.items()
+                     if min_x <= key_x <= max_x and min_y <= key_y <= max_y)
+        return [point for cell in cells for point in cell
+                if lat1 <= point[0] <= lat2 and lon1 <= point[1] <= lon2]
+
+    def points_in_box(self, lat1, lon1, lat2, lon2):
+        """
+        Return the (latitude, longitude, item) of the points in a box,
+        with the normalized longitude.
+
+        :param lat1: the minimum latitude
+        :param lon1: the longitude of the west side
+        :param lat2: the maximum latitude
+        :param lon2: the longitude of the east side, which is lower than
+          the one of the west side if the box crosses the antimeridian
+        """
+        if lon2 - lon1 >= 360.0:
+            lon1, lon2 = -180.0, 180.0
+        else:
+            lon1 = normalize_longitude(lon1)
+            lon2 = normalize_longitude(lon2)
+        if lon1 <= lon2:
+            return self.__in_box(lat1, lon1, lat2, lon2)
+        return (self.__in_box(lat1, lon1, lat2, 180.0) +
+                self.__in_box(lat1, -180.0, lat2, lon2))
+
+    def in_box(self, lat1, lon1, lat2, lon2):
+        """
+        Return the items in a box, like points_in_box.
+        """
+        return [point[2]
+                for point in self.points_in_box(lat1, lon1, lat2, lon2)]
+
+    def near(self, lat, lon, radius):
+        """
+        Return the items at a distance of the given point lower or equal to
+        the radius, in degrees.
+        """
+        lon = normalize_longitude(lon)
+        items = []
+        for point in self.points_in_box(lat - radius, lon - radius,
+                                        lat + radius, lon + radius):
+            dlon = abs(point[1] - lon)
+            if math.hypot(lat - point[0], min(dlon, 360.0 - dlon)) <= radius:
+                items.append(point[2])
+        return items
+
+#-------------------------------------------------------------------------
+#
+# PlaceIndex
+#
+#-------------------------------------------------------------------------
+class PlaceIndex(SpatialIndex):
+    """
+    The places of a database with coordinates, by their handle.  The
+    places with coordinates which cannot be converted are kept apart.
+    """
+    def __init__(self, db):
+        """
+        Read the coordinates of all the places of the database.
+        """
+        self.coords = {}        # handle: (latitude, longitude)
+        self.wrong_latitude = set()
+        self.wrong_longitude = set()
+        points = []
+        for place in db.iter_places():
+            point = self.__read_place(place)
+            if point:
+                points.append(point)
+        SpatialIndex.__init__(self, points)
+
+    def __read_place(self, place):
+        """
+        Return the (latitude, longitude, handle) of a place with valid
+        coordinates.
+        """
+        self.wrong_latitude.discard(place.handle)
+        self.wrong_longitude.discard(place.handle)
+        latn = place.get_latitude()
+        lonn = place.get_longitude()
+        if not (latn and lonn):
+            return None
+        latn, ignore = conv_lat_lon(latn, "0", "D.D8")
+        if not latn:
+            self.wrong_latitude.add(place.handle)
+            return None
+        ignore, lonn = conv_lat_lon("0", lonn, "D.D8")
+        if not lonn:
+            self.wrong_longitude.add(place.handle)
+            return None
+        self.coords[place.handle] = (float(latn), float(lonn))
+        return (latn, lonn, place.handle)
+
+    def update_places(self, db, handle_list):
+        """
+        Read the coordinates of places again, after they are added or
+        changed.
+        """
+        self.remove_places(handle_list)
+        for handle in handle_list:
+            place = db.get_place_from_handle(handle)
+            if place is not None:
+                point = self.__read_place(place)
+                if point:
+                    self.add(*point)
+
+    def remove_places(self, handle_list):
+        """
+        Remove places from the index.
+        """
+        for handle in handle_list:
+            self.wrong_latitude.discard(handle)
+            self.wrong_longitude.discard(handle)
+            coords = self.coords.pop(handle, None)
+            if coords:
+                self.remove(coords[0], coords[1], handle)
@@ -0,0 +1,157 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest for the clusters of markers of the geography views.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import random
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.plugins.lib.maps.clusters import (MarkerClusters, CELL_SIZE,
+                                              world_position, world_degrees,
+                                              world_size)
+
+
+class MarkerClustersTest(unittest.TestCase):
+    """
+    Check the clusters of random markers at each zoom level.
+    """
+
+    def setUp(self):
+        rand = random.Random(11)
+        self.points = [(rand.uniform(-60, 60), rand.uniform(-180, 180))
+                       for dummy in range(3000)]
+        # a town with many places
+        self.points += [(rand.uniform(48.80, 48.90), rand.uniform(2.30, 2.40))
+                        for dummy in range(500)]
+
+    @staticmethod
+    def groups(level):
+        """
+        Return the sets of markers of the clusters of a level.
+        """
+        return set(frozenset(cluster.markers) for cluster in level.values())
+
+    def test_world_position(self):
+        for lat, lon in self.points[:100]:
+            pos_x, pos_y = world_position(lat, lon)
+            self.assertTrue(0 <= pos_x < 1 and 0 < pos_y < 1)
+            lat2, lon2 = world_degrees(pos_x, pos_y)
+            self.assertAlmostEqual(lat, lat2)
+            self.assertAlmostEqual(lon, lon2)
+        self.assertEqual(world_position(0, 0), (0.5, 0.5))
+
+    def test_levels(self):
+        clusters = MarkerClusters(self.points)
+        for zoom in range(19):
+            level = clusters.level(zoom)
+            markers = sorted(index for cluster in level.values()
+                             for index in cluster.markers)
+            self.assertEqual(markers, list(range(len(self.points))))
+            self.assertEqual(sum(cluster.count for cluster in level.values()),
+                             len(self.points))
+            scale = world_size(zoom) / CELL_SIZE
+            for (column, row), cluster in level.items():
+                for index in cluster.markers:
+                    pos_x, pos_y = world_position(*self.points[index])
+                    self.assertEqual((int(pos_x * scale), int(pos_y * scale)),
+                                     (column, row))
+        self.assertLessEqual(len(clusters.level(0)), 16)
+        self.assertGreater(len(clusters.level(18)), 3400)
+
+    def test_hierarchy(self):
+        """
+        The clusters made from those of a more detailed level are those
+        made from the markers.
+        """
+        merged = MarkerClusters(self.points)
+        merged.level(12)
+        merged.level(7)
+        for zoom in (10, 5, 2):
+            direct = MarkerClusters(self.points)
+            self.assertEqual(self.groups(merged.level(zoom)),
+                             self.groups(direct.level(zoom)))
+            cluster = max(merged.level(zoom).values(),
+                          key=lambda cluster: cluster.count)
+            other = direct.level(zoom)[
+                next(key for key, value in merged.level(zoom).items()
+                     if value is cluster)]
+            self.assertAlmostEqual(cluster.pos_x, other.pos_x)
+            self.assertAlmostEqual(cluster.pos_y, other.pos_y)
+            self.assertEqual(cluster.bounds, other.bounds)
+
+    def test_in_view(self):
+        clusters = MarkerClusters(self.points)
+        zoom = 5
+        world = world_size(zoom)
+        for left, top in ((1000, 2000), (world - 300, 3000), (-300, 3000)):
+            right, bottom = left + 800, top + 600
+            found = set()
+            for cluster, offset in clusters.in_view(zoom, left, top,
+                                                    right, bottom):
+                found.add(cluster.first)
+                pos_x = cluster.pos_x * world + offset
+                pos_y = cluster.pos_y * world
+                self.assertTrue(left - CELL_SIZE <= pos_x <= right + CELL_SIZE)
+                self.assertTrue(top - CELL_SIZE <= pos_y <= bottom + CELL_SIZE)
+            for cluster in clusters.level(zoom).values():
+                pos_x = cluster.pos_x * world
+                pos_y = cluster.pos_y * world
+                if (top <= pos_y <= bottom and
+                        any(left <= pos_x + copy * world <= right
+                            for copy in (-1, 0, 1))):
+                    self.assertIn(cluster.first, found)
+        # the whole world, seen twice
+        seen = clusters.in_view(0, -256, 0, 255, 255)
+        level = clusters.level(0)
+        self.assertEqual(len(seen), 2 * len(level))
+        self.assertEqual(sorted(offset for dummy, offset in seen),
+                         [-256] * len(level) + [0] * len(level))
+
+    def test_expansion_zoom(self):
+        clusters = MarkerClusters([(48.85, 2.35), (48.851, 2.351),
+                                   (48.85, 2.35), (10.0, 10.0)])
+        cluster = next(cluster for cluster in clusters.level(3).values()
+                       if cluster.count == 3)
+        zoom = clusters.expansion_zoom(cluster, 3, 18)
+        self.assertIsNotNone(zoom)
+        self.assertEqual(len(clusters.level(zoom - 1)), 2)
+        self.assertEqual(len(clusters.level(zoom)), 3)
+        lat, lon = cluster.center()
+        self.assertAlmostEqual(lat, 48.8505, 3)
+        self.assertAlmostEqual(lon, 2.3505, 3)
+        self.assertIsNone(clusters.expansion_zoom(cluster, 3, zoom - 1))
+        same = next(cluster for cluster in clusters.level(18).values()
+                    if cluster.count == 2)
+        self.assertIsNone(clusters.expansion_zoom(same, 18, 20))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest for the place index of the geography views.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import unittest
+from types import SimpleNamespace
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.const import DATA_DIR
+from gramps.gen.db import DbTxn
+from gramps.gen.db.utils import import_as_dict
+from gramps.gen.lib import Place, PlaceName
+from gramps.cli.user import User
+from gramps.plugins.lib.maps.geography import GeoGraphyView
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+
+class PlaceIndexView:
+    """
+    The parts of a geography view which keep its place index.
+    """
+    change_db = GeoGraphyView.change_db
+    get_place_index = GeoGraphyView.get_place_index
+    update_place_index = GeoGraphyView.update_place_index
+    remove_from_place_index = GeoGraphyView.remove_from_place_index
+    reset_place_index = GeoGraphyView.reset_place_index
+
+    active = False
+    osm = None
+
+    def __init__(self, db):
+        self.dbstate = SimpleNamespace(db=db, is_open=lambda: True)
+        self.change_db(db)
+
+    def build_tree(self):
+        pass
+
+
+class PlaceIndexSignalsTest(unittest.TestCase):
+    """
+    Check that the place index of a view follows the changes of the
+    places.
+    """
+
+    def setUp(self):
+        self.db = import_as_dict(EXAMPLE, User())
+        self.view = PlaceIndexView(self.db)
+
+    def tearDown(self):
+        self.db.close()
+
+    def add_place(self, name, trans):
+        place = Place()
+        place.set_name(PlaceName(value=name))
+        place.set_latitude("50.5")
+        place.set_longitude("-40.5")
+        self.db.add_place(place, trans)
+        return place
+
+    def test_update(self):
+        index = self.view.get_place_index()
+        with DbTxn('Add', self.db) as trans:
+            place = self.add_place("Added", trans)
+        self.assertIs(self.view.get_place_index(), index)
+        self.assertEqual(index.near(50.5, -40.5, 0.1), [place.handle])
+
+    def test_rebuild(self):
+        index = self.view.get_place_index()
+        with DbTxn('Import', self.db, batch=True) as trans:
+            place = self.add_place("Imported", trans)
+        self.db.request_rebuild()
+        self.assertIsNot(self.view.get_place_index(), index)
+        self.assertEqual(self.view.get_place_index().near(50.5, -40.5, 0.1),
+                         [place.handle])
+
+if __name__ == "__main__":
+    unittest.main()
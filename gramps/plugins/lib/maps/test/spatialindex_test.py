@@ -0,0 +1,160 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest for the spatial indexes of the geography views.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import math
+import os
+import random
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.const import DATA_DIR
+from gramps.gen.db import DbTxn
+from gramps.gen.db.utils import import_as_dict
+from gramps.gen.utils.place import conv_lat_lon
+from gramps.cli.user import User
+from gramps.plugins.lib.maps.spatialindex import SpatialIndex, PlaceIndex
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+
+class SpatialIndexTest(unittest.TestCase):
+    """
+    Compare the points found in the index with those found by looking at
+    all of them.
+    """
+
+    def setUp(self):
+        rand = random.Random(7)
+        self.points = [(rand.uniform(-80, 80), rand.uniform(-180, 180), idx)
+                       for idx in range(2000)]
+        # a dense cluster, as in the places of a single country
+        self.points += [(rand.uniform(45, 46), rand.uniform(2, 3), idx)
+                        for idx in range(2000, 4000)]
+        self.index = SpatialIndex(self.points)
+
+    def test_in_box(self):
+        self.assertEqual(len(self.index), 4000)
+        for box in ((45.2, 2.1, 45.3, 2.2), (-10, -20, 30, 40),
+                    (-90, -180, 90, 180)):
+            expected = [idx for lat, lon, idx in self.points
+                        if box[0] <= lat <= box[2] and
+                        box[1] <= lon <= box[3]]
+            self.assertEqual(sorted(self.index.in_box(*box)), expected)
+
+    def test_antimeridian(self):
+        expected = [idx for lat, lon, idx in self.points
+                    if 0 <= lat <= 50 and (lon >= 170 or lon <= -160)]
+        self.assertEqual(sorted(self.index.in_box(0, 170, 50, 200)),
+                         expected)
+        self.assertEqual(sorted(self.index.in_box(0, 170, 50, -160)),
+                         expected)
+
+    def test_near(self):
+        for lat, lon, radius in ((45.5, 2.5, 0.1), (10, 20, 3.0),
+                                 (0, 179.5, 2.0)):
+            expected = []
+            for plat, plon, idx in self.points:
+                dlon = abs(plon - lon)
+                if math.hypot(plat - lat, min(dlon, 360 - dlon)) <= radius:
+                    expected.append(idx)
+            self.assertEqual(sorted(self.index.near(lat, lon, radius)),
+                             expected)
+
+    def test_remove(self):
+        lat, lon, idx = self.points[2500]
+        self.assertTrue(self.index.remove(lat, lon, idx))
+        self.assertFalse(self.index.remove(lat, lon, idx))
+        self.assertNotIn(idx, self.index.near(lat, lon, 0.001))
+        self.index.add(lat, lon, idx)
+        self.assertIn(idx, self.index.near(lat, lon, 0.001))
+        self.assertEqual(len(self.index), 4000)
+
+
+class PlaceIndexTest(unittest.TestCase):
+    """
+    Find the places of the example database near a point, and keep the
+    index up to date when they change.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+
+    def near(self, lat, lon, radius):
+        """
+        Return the handles of the places near a point, looking at all of
+        them.
+        """
+        handles = []
+        for place in self.db.iter_places():
+            latn, lonn = conv_lat_lon(place.get_latitude(),
+                                      place.get_longitude(), "D.D8")
+            if (latn and lonn and
+                    math.hypot(float(latn) - lat,
+                               float(lonn) - lon) <= radius):
+                handles.append(place.handle)
+        return sorted(handles)
+
+    def test_near(self):
+        index = PlaceIndex(self.db)
+        self.assertTrue(len(index) > 300)
+        for lat, lon, radius in ((35, -90, 3.0), (40, -100, 10.0)):
+            self.assertEqual(sorted(index.near(lat, lon, radius)),
+                             self.near(lat, lon, radius))
+
+    def test_update(self):
+        index = PlaceIndex(self.db)
+        place = self.db.get_place_from_handle(index.near(35, -90, 3.0)[0])
+        latitude = place.get_latitude()
+        try:
+            place.set_latitude("wrong")
+            with DbTxn("Change the place", self.db) as trans:
+                self.db.commit_place(place, trans)
+            index.update_places(self.db, [place.handle])
+            self.assertNotIn(place.handle, index.near(35, -90, 3.0))
+            self.assertEqual(index.wrong_latitude, {place.handle})
+            index.remove_places([place.handle])
+            self.assertEqual(index.wrong_latitude, set())
+        finally:
+            self.db.undo()
+        index.update_places(self.db, [place.handle])
+        self.assertEqual(sorted(index.near(35, -90, 3.0)),
+                         self.near(35, -90, 3.0))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -25,13 +25,6 @@
 Reports/Text Reports/Database Summary Report.
 """
 
-#------------------------------------------------------------------------
-#
-# standard python modules
-#
-#------------------------------------------------------------------------
-import os
-
 #------------------------------------------------------------------------
 #
 # Gramps modules
@@ -39,7 +32,6 @@ import os
 #------------------------------------------------------------------------
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.gettext
-from gramps.gen.lib import Person
 from gramps.gen.plug.report import Report
 from gramps.gen.plug.report import utils
 from gramps.gen.plug.report import MenuReportOptions
@@ -47,8 +39,6 @@ from gramps.gen.plug.report import stdoptions
 from gramps.gen.plug.docgen import (IndexMark, FontStyle, ParagraphStyle,
                                     FONT_SANS_SERIF, INDEX_TYPE_TOC,
                                     PARA_ALIGN_CENTER)
-from gramps.gen.utils.file import media_path_full
-from gramps.gen.datehandler import get_date
 from gramps.gen.proxy import CacheProxyDb
 
 #------------------------------------------------------------------------
@@ -81,6 +71,7 @@ class SummaryReport(Report):
         stdoptions.run_living_people_option(self, options.menu, self._locale)
         self.database = CacheProxyDb(self.database)
         self.__db = self.database
+        self.__stats = None
 
     def write_report(self):
         """
@@ -92,6 +83,7 @@ class SummaryReport(Report):
         self.doc.write_text(title, mark)
         self.doc.end_paragraph()
 
+        self.__stats = self.__db.get_statistics()
         self.summarize_people()
         self.summarize_families()
         self.summarize_media()
@@ -100,107 +92,53 @@ class SummaryReport(Report):
         """
         Write a summary of all the people in the database.
         """
-        with_media = 0
-        incomp_names = 0
-        disconnected = 0
-        missing_bday = 0
-        males = 0
-        females = 0
-        unknowns = 0
-        namelist = []
+        stats = self.__stats
 
         self.doc.start_paragraph("SR-Heading")
         self.doc.write_text(self._("Individuals"))
         self.doc.end_paragraph()
 
-        num_people = 0
-        for person in self.__db.iter_people():
-            num_people += 1
-            primary_names = [person.get_primary_name()]
-
-            # Count people with media.
-            length = len(person.get_media_list())
-            if length > 0:
-                with_media += 1
-
-            # Count people with incomplete names.
-            for name in primary_names + person.get_alternate_names():
-                if name.get_first_name().strip() == "":
-                    incomp_names += 1
-                else:
-                    if name.get_surname_list():
-                        for surname in name.get_surname_list():
-                            if surname.get_surname().strip() == "":
-                                incomp_names += 1
-                    else:
-                        incomp_names += 1
-
-            # Count people without families.
-            if (not person.get_main_parents_family_handle() and
-                    not len(person.get_family_handle_list())):
-                disconnected += 1
-
-            # Count missing birthdays.
-            birth_ref = person.get_birth_ref()
-            if birth_ref:
-                birth = self.__db.get_event_from_handle(birth_ref.ref)
-                if not get_date(birth):
-                    missing_bday += 1
-            else:
-                missing_bday += 1
-
-            # Count genders.
-            if person.get_gender() == Person.FEMALE:
-                females += 1
-            elif person.get_gender() == Person.MALE:
-                males += 1
-            else:
-                unknowns += 1
-
-            # Count unique surnames
-            for name in primary_names + person.get_alternate_names():
-                if (not name.get_surname().strip() in namelist
-                        and not name.get_surname().strip() == ""):
-                    namelist.append(name.get_surname().strip())
-
         self.doc.start_paragraph("SR-Normal")
-        self.doc.write_text(self._("Number of individuals: %d") % num_people)
+        self.doc.write_text(self._("Number of individuals: %d"
+                                  ) % stats.people)
         self.doc.end_paragraph()
 
         self.doc.start_paragraph("SR-Normal")
-        self.doc.write_text(self._("Males: %d") % males)
+        self.doc.write_text(self._("Males: %d") % stats.males)
         self.doc.end_paragraph()
 
         self.doc.start_paragraph("SR-Normal")
-        self.doc.write_text(self._("Females: %d") % females)
+        self.doc.write_text(self._("Females: %d") % stats.females)
         self.doc.end_paragraph()
 
         self.doc.start_paragraph("SR-Normal")
         self.doc.write_text(self._("Individuals with unknown gender: %d"
-                                  ) % unknowns)
+                                  ) % stats.unknowns)
         self.doc.end_paragraph()
 
         self.doc.start_paragraph("SR-Normal")
-        self.doc.write_text(self._("Incomplete names: %d") % incomp_names)
+        self.doc.write_text(self._("Incomplete names: %d"
+                                  ) % stats.incomplete_names)
         self.doc.end_paragraph()
 
         self.doc.start_paragraph("SR-Normal")
         self.doc.write_text(self._("Individuals missing birth dates: %d"
-                                  ) % missing_bday)
+                                  ) % stats.missing_births)
         self.doc.end_paragraph()
 
         self.doc.start_paragraph("SR-Normal")
         self.doc.write_text(self._("Disconnected individuals: %d"
-                                  ) % disconnected)
+                                  ) % stats.disconnected)
         self.doc.end_paragraph()
 
         self.doc.start_paragraph("SR-Normal")
-        self.doc.write_text(self._("Unique surnames: %d") % len(namelist))
+        self.doc.write_text(self._("Unique surnames: %d"
+                                  ) % len(stats.all_surnames))
         self.doc.end_paragraph()
 
         self.doc.start_paragraph("SR-Normal")
         self.doc.write_text(self._("Individuals with media objects: %d"
-                                  ) % with_media)
+                                  ) % stats.with_media)
         self.doc.end_paragraph()
 
     def summarize_families(self):
@@ -220,29 +158,21 @@ class SummaryReport(Report):
         """
         Write a summary of all the media in the database.
         """
-        total_media = 0
-        size_in_bytes = 0
-        notfound = []
+        stats = self.__stats
+        total_media = len(stats.media)
+        notfound = stats.get_missing_media()
+        mbytes = "0"
+        size_in_bytes = stats.get_media_size()
+        if size_in_bytes:
+            if size_in_bytes <= 999999:
+                mbytes = self._("less than 1")
+            else:
+                mbytes = str(size_in_bytes)[:-6]
 
         self.doc.start_paragraph("SR-Heading")
         self.doc.write_text(self._("Media Objects"))
         self.doc.end_paragraph()
 
-        total_media = len(self.__db.get_media_handles())
-        mbytes = "0"
-        for media_id in self.__db.get_media_handles():
-            media = self.__db.get_media_from_handle(media_id)
-            try:
-                size_in_bytes += os.path.getsize(
-                    media_path_full(self.__db, media.get_path()))
-                length = len(str(size_in_bytes))
-                if size_in_bytes <= 999999:
-                    mbytes = self._("less than 1")
-                else:
-                    mbytes = str(size_in_bytes)[:(length-6)]
-            except:
-                notfound.append(media.get_path())
-
         self.doc.start_paragraph("SR-Normal")
         self.doc.write_text(self._("Number of unique media objects: %d"
                                   ) % total_media)
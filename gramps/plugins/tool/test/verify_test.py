@@ -0,0 +1,440 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest that compares the Verify rules, checked on the facts of the
+database, with the same rules checked on each person and family
+"""
+import unittest
+import os
+
+from gramps.gen.db.utils import import_as_dict
+from gramps.gen.const import DATA_DIR
+from gramps.gen.user import User
+from gramps.gen.lib import (ChildRefType, EventRoleType, EventType,
+                            FamilyRelType, NameType, Person)
+from gramps.gen.lib.date import Today
+from ..verify import (VerifyFacts, VerifyOptions, TooManyChildren,
+                      get_rules, find_broken_rules)
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+#-------------------------------------------------------------------------
+#
+# The rules checked on each person and family, as they were before the
+# facts were read in one pass
+#
+#-------------------------------------------------------------------------
+class ObjectRules:
+    """
+    The broken() methods of the former rules, each returning the name of the
+    method giving the message of a broken rule, or None.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def event_date(self, event_handle, estimate=False):
+        """ get a date from an event handle """
+        event = self.db.get_event_from_handle(event_handle)
+        date_obj = event.get_date_object()
+        if (not estimate
+                and (date_obj.get_day() == 0 or date_obj.get_month() == 0)):
+            return 0
+        return date_obj.get_sort_value()
+
+    def type_date(self, person, event_type, estimate=False):
+        """ get the date of a person's first event of a type """
+        for event_ref in person.get_event_ref_list():
+            event = self.db.get_event_from_handle(event_ref.ref)
+            if (event_ref.get_role() != EventRoleType.PRIMARY
+                    and event.get_type() == EventType.BURIAL):
+                continue
+            if event.get_type() == event_type:
+                return self.event_date(event_ref.ref, estimate)
+        return 0
+
+    def birth(self, person, estimate=False):
+        """ get a person's birth date (or baptism date if estimated) """
+        if not person:
+            return 0
+        birth_ref = person.get_birth_ref()
+        ret = self.event_date(birth_ref.ref, estimate) if birth_ref else 0
+        if estimate and ret == 0:
+            ret = self.type_date(person, EventType.BAPTISM, estimate)
+        return ret
+
+    def death(self, person, estimate=False):
+        """ get a person's death date (or burial date if estimated) """
+        if not person:
+            return 0
+        death_ref = person.get_death_ref()
+        ret = self.event_date(death_ref.ref, estimate) if death_ref else 0
+        if estimate and ret == 0:
+            ret = self.type_date(person, EventType.BURIAL, estimate)
+        return ret
+
+    def age_at_death(self, person, estimate):
+        """ get a person's age at death """
+        birth_date = self.birth(person, estimate)
+        death_date = self.death(person, estimate)
+        if birth_date > 0 and death_date > 0:
+            return death_date - birth_date
+        return 0
+
+    def parents(self, family):
+        """ get a family's father and mother """
+        return tuple(self.db.get_person_from_handle(handle) if handle
+                     else None
+                     for handle in (family.get_father_handle(),
+                                    family.get_mother_handle()))
+
+    def child_birth_dates(self, family, estimate):
+        """ get the known birth dates of a family's children """
+        dates = (self.birth(self.db.get_person_from_handle(child_ref.ref),
+                            estimate)
+                 for child_ref in family.get_child_ref_list())
+        return [date for date in dates if date > 0]
+
+    def marriage(self, family):
+        """ get a family's marriage date """
+        for event_ref in family.get_event_ref_list():
+            event = self.db.get_event_from_handle(event_ref.ref)
+            if (event.get_type() == EventType.MARRIAGE
+                    and event_ref.get_role() in (EventRoleType.FAMILY,
+                                                 EventRoleType.PRIMARY)):
+                return event.get_date_object().get_sort_value()
+        return 0
+
+    def first_marriage(self, person):
+        """ get the marriage date of a person's first family """
+        for handle in person.get_family_handle_list():
+            return self.marriage(self.db.get_family_from_handle(handle))
+        return 0
+
+    def invalid(self, event_ref):
+        """ whether the date of a referenced event is invalid """
+        if not event_ref:
+            return False
+        event = self.db.get_event_from_handle(event_ref.ref)
+        return not event.get_date_object().get_valid()
+
+    @staticmethod
+    def before(first, second):
+        """ whether two dates are known and the second is before the first """
+        return first > 0 and second > 0 and first > second
+
+    # person rules
+
+    def BirthAfterBapt(self, person):
+        return self.before(self.birth(person),
+                           self.type_date(person, EventType.BAPTISM))
+
+    def DeathBeforeBapt(self, person):
+        return self.before(self.type_date(person, EventType.BAPTISM),
+                           self.death(person))
+
+    def BirthAfterBury(self, person):
+        return self.before(self.birth(person),
+                           self.type_date(person, EventType.BURIAL))
+
+    def DeathAfterBury(self, person):
+        return self.before(self.death(person),
+                           self.type_date(person, EventType.BURIAL))
+
+    def BirthAfterDeath(self, person):
+        return self.before(self.birth(person), self.death(person))
+
+    def BaptAfterBury(self, person):
+        return self.before(self.type_date(person, EventType.BAPTISM),
+                           self.type_date(person, EventType.BURIAL))
+
+    def OldAge(self, person, old_age, est):
+        return self.age_at_death(person, est) / 365 > old_age
+
+    def OldAgeButNoDeath(self, person, old_age, est):
+        birth_date = self.birth(person, est)
+        if (person.get_death_ref() or self.death(person, True)
+                or not birth_date):
+            return False
+        return (Today().get_sort_value() - birth_date) / 365 > old_age
+
+    def UnknownGender(self, person):
+        return person.get_gender() not in (Person.MALE, Person.FEMALE)
+
+    def MultipleParents(self, person):
+        return len(person.get_parent_family_handle_list()) > 1
+
+    def MarriedOften(self, person, wedder):
+        return len(person.get_family_handle_list()) > wedder
+
+    def OldUnmarried(self, person, old_unm, est):
+        return (self.age_at_death(person, est) / 365 > old_unm
+                and not person.get_family_handle_list())
+
+    def TooManyChildren(self, person, mx_child_dad, mx_child_mom):
+        # the former rule compared the bound method get_gender with the
+        # genders, so it never fired
+        n_child = sum(
+            len(self.db.get_family_from_handle(handle).get_child_ref_list())
+            for handle in person.get_family_handle_list())
+        if person.get_gender() == Person.MALE:
+            return n_child > mx_child_dad
+        if person.get_gender() == Person.FEMALE:
+            return n_child > mx_child_mom
+        return False
+
+    def Disconnected(self, person):
+        return not (person.get_parent_family_handle_list()
+                    or person.get_family_handle_list())
+
+    def InvalidBirthDate(self, person, invdate):
+        return invdate and self.invalid(person.get_birth_ref())
+
+    def InvalidDeathDate(self, person, invdate):
+        return invdate and self.invalid(person.get_death_ref())
+
+    def BirthEqualsDeath(self, person):
+        return 0 < self.birth(person) == self.death(person)
+
+    def BirthEqualsMarriage(self, person):
+        return 0 < self.birth(person) == self.first_marriage(person)
+
+    def DeathEqualsMarriage(self, person):
+        return 0 < self.death(person) == self.first_marriage(person)
+
+    # family rules
+
+    def SameSexFamily(self, family):
+        father, mother = self.parents(family)
+        return (father and mother
+                and mother.get_gender() == father.get_gender()
+                and mother.get_gender() != Person.UNKNOWN)
+
+    def FemaleHusband(self, family):
+        father = self.parents(family)[0]
+        return father and father.get_gender() == Person.FEMALE
+
+    def MaleWife(self, family):
+        mother = self.parents(family)[1]
+        return mother and mother.get_gender() == Person.MALE
+
+    def SameSurnameFamily(self, family):
+        father, mother = self.parents(family)
+        if not (mother and father):
+            return False
+        mname = mother.get_primary_name()
+        fname = father.get_primary_name()
+        return (mname.get_type() == NameType.BIRTH
+                and fname.get_type() == NameType.BIRTH
+                and mname.get_surname() != ""
+                and mname.get_surname() == fname.get_surname())
+
+    def LargeAgeGapFamily(self, family, hw_diff, est):
+        father, mother = self.parents(family)
+        father_birth_date = self.birth(father, est)
+        mother_birth_date = self.birth(mother, est)
+        return (father_birth_date > 0 and mother_birth_date > 0
+                and abs(father_birth_date - mother_birth_date) / 365
+                > hw_diff)
+
+    def MarriageBeforeBirth(self, family, est):
+        marr_date = self.marriage(family)
+        return any(self.before(self.birth(parent, est), marr_date)
+                   for parent in self.parents(family))
+
+    def MarriageAfterDeath(self, family, est):
+        marr_date = self.marriage(family)
+        return any(self.before(marr_date, self.death(parent, est))
+                   for parent in self.parents(family))
+
+    def EarlyMarriage(self, family, yng_mar, est):
+        marr_date = self.marriage(family)
+        return any(self.before(marr_date, birth_date)
+                   and (marr_date - birth_date) / 365 < yng_mar
+                   for birth_date in (self.birth(parent, est)
+                                      for parent in self.parents(family)))
+
+    def LateMarriage(self, family, old_mar, est):
+        marr_date = self.marriage(family)
+        return any(birth_date > 0 and marr_date > 0
+                   and (marr_date - birth_date) / 365 > old_mar
+                   for birth_date in (self.birth(parent, est)
+                                      for parent in self.parents(family)))
+
+    def check_children(self, family, est, father_broken, mother_broken):
+        """ check the parents at the birth of each child, in turn """
+        father, mother = self.parents(family)
+        father_birth_date = self.birth(father, est)
+        mother_birth_date = self.birth(mother, est)
+        for child_birth_date in self.child_birth_dates(family, est):
+            if (father_birth_date > 0 and
+                    father_broken(child_birth_date - father_birth_date)):
+                return 'father_message'
+            if (mother_birth_date > 0 and
+                    mother_broken(child_birth_date - mother_birth_date)):
+                return 'mother_message'
+        return None
+
+    def OldParent(self, family, old_mom, old_dad, est):
+        return self.check_children(family, est,
+                                   lambda age: age / 365 > old_dad,
+                                   lambda age: age / 365 > old_mom)
+
+    def YoungParent(self, family, yng_mom, yng_dad, est):
+        return self.check_children(family, est,
+                                   lambda age: age / 365 < yng_dad,
+                                   lambda age: age / 365 < yng_mom)
+
+    def UnbornParent(self, family, est):
+        return self.check_children(family, est,
+                                   lambda age: age < 0, lambda age: age < 0)
+
+    def DeadParent(self, family, est):
+        father, mother = self.parents(family)
+        father_death_date = self.death(father, est)
+        mother_death_date = self.death(mother, est)
+        for child_ref in family.get_child_ref_list():
+            child = self.db.get_person_from_handle(child_ref.ref)
+            child_birth_date = self.birth(child, est)
+            if child_birth_date <= 0:
+                continue
+            if (child_ref.frel == ChildRefType.BIRTH
+                    and father_death_date > 0
+                    and father_death_date + 294 < child_birth_date):
+                return 'father_message'
+            if (child_ref.mrel == ChildRefType.BIRTH
+                    and 0 < mother_death_date < child_birth_date):
+                return 'mother_message'
+        return None
+
+    def LargeChildrenSpan(self, family, cb_span, est):
+        dates = self.child_birth_dates(family, est)
+        return bool(dates) and (max(dates) - min(dates)) / 365 > cb_span
+
+    def LargeChildrenAgeDiff(self, family, c_space, est):
+        dates = self.child_birth_dates(family, est)
+        return any((dates[i+1] - dates[i]) / 365 > c_space
+                   for i in range(len(dates)-1))
+
+    def MarriedRelation(self, family):
+        return (family.get_relationship() != FamilyRelType.MARRIED
+                and self.marriage(family) > 0)
+
+    def find(self, rule_class, objects, params):
+        """
+        return the handles of the objects breaking a rule, with the name of
+        the method giving the message
+        """
+        broken = set()
+        for obj in objects:
+            result = getattr(self, rule_class.__name__)(obj, *params)
+            if result:
+                broken.add((obj.handle, result if result is not True
+                            else 'get_message'))
+        return broken
+
+#-------------------------------------------------------------------------
+#
+# VerifyTest
+#
+#-------------------------------------------------------------------------
+class VerifyTest(unittest.TestCase):
+    """
+    Verify rule tests.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Import example database.
+        """
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    def get_options(self, estimate):
+        """ the default options of the tool, with estimate_age set """
+        options = dict(VerifyOptions('verify').options_dict)
+        options['estimate_age'] = estimate
+        return options
+
+    def compare(self, estimate):
+        """ compare each rule with the rule checked on each object """
+        options = self.get_options(estimate)
+        facts = VerifyFacts(self.db, estimate)
+        people = list(self.db.iter_people())
+        families = list(self.db.iter_families())
+        object_rules = ObjectRules(self.db)
+        person_rules, family_rules = get_rules(options)
+        for rules, objects, handles in (
+                (person_rules, people, facts.person_handles),
+                (family_rules, families, facts.family_handles)):
+            for rule_class, params in rules:
+                with self.subTest(rule=rule_class.__name__):
+                    broken = set(
+                        (handles[index], message) for index, message
+                        in rule_class.find(facts, 0, len(handles), *params))
+                    self.assertEqual(
+                        broken,
+                        object_rules.find(rule_class, objects, params))
+
+    def test_rules(self):
+        """
+        Test the rules with exact dates.
+        """
+        self.compare(0)
+
+    def test_rules_estimate(self):
+        """
+        Test the rules with estimated dates.
+        """
+        self.compare(1)
+
+    def test_blocks(self):
+        """
+        Test that checking the rules on blocks finds the same objects.
+        """
+        facts = VerifyFacts(self.db, 1)
+        for rules in get_rules(self.get_options(1)):
+            for rule_class, params in rules:
+                total = len(facts.person_handles
+                            if rules[0][0].TYPE == 'Person'
+                            else facts.family_handles)
+                blocks = []
+                for start in range(0, total, 7):
+                    blocks.extend(rule_class.find(
+                        facts, start, min(start + 7, total), *params))
+                self.assertEqual(
+                    blocks, list(rule_class.find(facts, 0, total, *params)))
+
+    def test_too_many_children(self):
+        """
+        Test TooManyChildren, which never fired before it compared the
+        genders.
+        """
+        results = find_broken_rules(self.db, self.get_options(0))
+        self.assertEqual(
+            sorted(gramps_id for (msg, gramps_id, name, the_type, rule_id,
+                                  severity, handle) in results
+                   if rule_id[0] == TooManyChildren.ID),
+            ['I0024', 'I0031', 'I0032'])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -33,7 +33,6 @@ options are defined (and read in) is not done the way it would be now.
 
 # pylint: disable=not-callable
 # pylint: disable=no-self-use
-# pylint: disable=undefined-variable
 
 #------------------------------------------------------------------------
 #
@@ -43,6 +42,7 @@ options are defined (and read in) is not done the way it would be now.
 
 import os
 import pickle
+from array import array
 from hashlib import md5
 
 #------------------------------------------------------------------------
@@ -63,8 +63,9 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.sgettext
 from gramps.gen.errors import WindowActiveError
 from gramps.gen.const import URL_MANUAL_PAGE, VERSION_DIR
-from gramps.gen.lib import (ChildRefType, EventRoleType, EventType,
+from gramps.gen.lib import (ChildRefType, Date, EventRoleType, EventType,
                             FamilyRelType, NameType, Person)
+from gramps.gen.lib.surnamebase import SurnameBase
 from gramps.gen.lib.date import Today
 from gramps.gui.editors import EditPerson, EditFamily
 from gramps.gen.utils.db import family_name
@@ -84,199 +85,218 @@ WIKI_HELP_SEC = _('Verify_the_Data', 'manual')
 
 #-------------------------------------------------------------------------
 #
-# temp storage and related functions
+# Facts of the people and families
 #
 #-------------------------------------------------------------------------
-_person_cache = {}
-_family_cache = {}
-_event_cache = {}
 _today = Today().get_sort_value()
 
-def find_event(db, handle):
-    """ find an event, given a handle """
-    if handle in _event_cache:
-        obj = _event_cache[handle]
-    else:
-        obj = db.get_event_from_handle(handle)
-        _event_cache[handle] = obj
-    return obj
-
-def find_person(db, handle):
-    """ find a person, given a handle """
-    if handle in _person_cache:
-        obj = _person_cache[handle]
-    else:
-        obj = db.get_person_from_handle(handle)
-        _person_cache[handle] = obj
-    return obj
-
-def find_family(db, handle):
-    """ find a family, given a handle """
-    if handle in _family_cache:
-        obj = _family_cache[handle]
-    else:
-        obj = db.get_family_from_handle(handle)
-        _family_cache[handle] = obj
-    return obj
-
-def clear_cache():
-    """ clear the cache """
-    _person_cache.clear()
-    _family_cache.clear()
-    _event_cache.clear()
+# Number of people or families checked together
+_BLOCK_SIZE = 1000
 
-#-------------------------------------------------------------------------
-#
-# helper functions
-#
-#-------------------------------------------------------------------------
-def get_date_from_event_handle(db, event_handle, estimate=False):
-    """ get a date from an event handle """
-    if not event_handle:
-        return 0
-    event = find_event(db, event_handle)
-    if event:
-        date_obj = event.get_date_object()
-        if (not estimate
-                and (date_obj.get_day() == 0 or date_obj.get_month() == 0)):
-            return 0
-        return date_obj.get_sort_value()
-    else:
-        return 0
+# flags of the events
+_EXACT = 1      # the date has a day and a month
+_VALID = 2      # the date is not a text-only date
 
-def get_date_from_event_type(db, person, event_type, estimate=False):
-    """ get a date from a person's specific event type """
-    if not person:
-        return 0
-    for event_ref in person.get_event_ref_list():
-        event = find_event(db, event_ref.ref)
-        if event:
-            if (event_ref.get_role() != EventRoleType.PRIMARY
-                    and event.get_type() == EventType.BURIAL):
-                continue
-            if event.get_type() == event_type:
-                date_obj = event.get_date_object()
-                if (not estimate
-                        and (date_obj.get_day() == 0
-                             or date_obj.get_month() == 0)):
-                    return 0
-                return date_obj.get_sort_value()
-    return 0
-
-def get_bapt_date(db, person, estimate=False):
-    """ get a person's baptism date """
-    return get_date_from_event_type(db, person,
-                                    EventType.BAPTISM, estimate)
-
-def get_bury_date(db, person, estimate=False):
-    """ get a person's burial date """
-    # check role on burial event
-    for event_ref in person.get_event_ref_list():
-        event = find_event(db, event_ref.ref)
-        if (event
-                and event.get_type() == EventType.BURIAL
-                and event_ref.get_role() == EventRoleType.PRIMARY):
-            return get_date_from_event_type(db, person,
-                                            EventType.BURIAL, estimate)
-
-def get_birth_date(db, person, estimate=False):
-    """ get a person's birth date (or baptism date if 'estimated') """
-    if not person:
-        return 0
-    birth_ref = person.get_birth_ref()
-    if not birth_ref:
-        ret = 0
-    else:
-        ret = get_date_from_event_handle(db, birth_ref.ref, estimate)
-    if estimate and (ret == 0):
-        ret = get_bapt_date(db, person, estimate)
-        ret = 0 if ret is None else ret
-    return ret
-
-def get_death(db, person):
+class VerifyFacts:
     """
-    boolean whether there is a death event or not
-    (if a user claims a person is dead, we will believe it even with no date)
+    The dates and other facts of all the people and families of a database,
+    used by the rules.
+
+    The events, people and families are each read once, as serialized data,
+    into compact arrays indexed by integers.  A person or a family is then
+    referred to by its index, and -1 is used for a missing person, family or
+    event.  Dates are sort values, with 0 for no date.
     """
-    if not person:
-        return False
-    death_ref = person.get_death_ref()
-    if death_ref:
-        return True
-    else:
-        return False
-
-def get_death_date(db, person, estimate=False):
-    """ get a person's death date (or burial date if 'estimated') """
-    if not person:
+
+    def __init__(self, db, estimate):
+        """
+        Read the events, people and families of the database.
+
+        estimate - whether the estimated dates use inexact dates, and the
+        baptism and burial dates for missing birth and death dates
+        """
+        self.db = db
+
+        # events: type, sort value and flags
+        event_ids = {}
+        ev_type = array('i')
+        ev_sort = array('i')
+        ev_flags = array('B')
+        with db.get_event_cursor() as cursor:
+            for handle, data in cursor:
+                # data[2] is the type, data[3] the date
+                event_ids[handle] = len(ev_type)
+                date = Date()
+                if data[3]:
+                    date.unserialize(data[3])
+                flags = 0
+                if date.get_day() != 0 and date.get_month() != 0:
+                    flags |= _EXACT
+                if date.get_valid():
+                    flags |= _VALID
+                ev_type.append(data[2][0])
+                ev_sort.append(date.get_sort_value())
+                ev_flags.append(flags)
+
+        def get_date(event, estimate):
+            """ get the date of an event, 0 for inexact ones if estimate """
+            if event < 0 or not (estimate or ev_flags[event] & _EXACT):
+                return 0
+            return ev_sort[event]
+
+        def ref_event(event_ref_list, index):
+            """ get the event of the reference at index """
+            if 0 <= index < len(event_ref_list):
+                return event_ids.get(event_ref_list[index][3], -1)
+            return -1
+
+        # people
+        self.person_handles = []
+        self.gender = array('b')
+        self.birth = array('i')         # without estimate
+        self.death = array('i')
+        self.bapt = array('i')
+        self.bury = array('i')
+        self.est_birth = array('i')     # with the estimate option
+        self.est_death = array('i')
+        self.any_bury = array('i')      # with estimate
+        self.has_death = array('B')
+        self.invalid_birth = array('B')
+        self.invalid_death = array('B')
+        self.n_parents = array('i')
+        self.surnames = []              # birth surnames, or None
+        family_lists = []
+        person_ids = {}
+        with db.get_person_cursor() as cursor:
+            for handle, data in cursor:
+                # data[2] is the gender, data[3] the primary name, data[5]
+                # the death reference index, data[6] the birth reference
+                # index, data[7] the event references, data[8] the families
+                # and data[9] the parent families
+                person_ids[handle] = len(self.person_handles)
+                self.person_handles.append(handle)
+                self.gender.append(data[2])
+                event_ref_list = data[7]
+                birth = ref_event(event_ref_list, data[6])
+                death = ref_event(event_ref_list, data[5])
+                # the first baptism, and the first burial as primary
+                bapt = bury = -1
+                for ref in event_ref_list:
+                    # ref[3] is the handle, ref[4] the role
+                    event = event_ids.get(ref[3], -1)
+                    if event < 0:
+                        continue
+                    if bapt < 0 and ev_type[event] == EventType.BAPTISM:
+                        bapt = event
+                    if (bury < 0 and ev_type[event] == EventType.BURIAL
+                            and ref[4][0] == EventRoleType.PRIMARY):
+                        bury = event
+                self.birth.append(get_date(birth, False))
+                self.death.append(get_date(death, False))
+                self.bapt.append(get_date(bapt, False))
+                self.bury.append(get_date(bury, False))
+                self.est_birth.append(get_date(birth, estimate) or
+                                      (get_date(bapt, True) if estimate
+                                       else 0))
+                self.est_death.append(get_date(death, estimate) or
+                                      (get_date(bury, True) if estimate
+                                       else 0))
+                self.any_bury.append(get_date(bury, True))
+                self.has_death.append(0 <= data[5] < len(event_ref_list))
+                self.invalid_birth.append(
+                    birth >= 0 and not ev_flags[birth] & _VALID)
+                self.invalid_death.append(
+                    death >= 0 and not ev_flags[death] & _VALID)
+                self.n_parents.append(len(data[9]))
+                # name[5] is the surname list, name[8] the type
+                name = data[3]
+                self.surnames.append(name[5] if name[8][0] == NameType.BIRTH
+                                     else None)
+                family_lists.append(data[8])
+
+        # families
+        family_ids = {}
+        self.family_handles = []
+        self.father = array('i')
+        self.mother = array('i')
+        self.children = []      # (person, father relation, mother relation)
+        self.marriage = array('i')
+        self.married = array('B')
+        with db.get_family_cursor() as cursor:
+            for handle, data in cursor:
+                # data[2] is the father, data[3] the mother, data[4] the
+                # child references, data[5] the type and data[6] the event
+                # references
+                family_ids[handle] = len(self.family_handles)
+                self.family_handles.append(handle)
+                self.father.append(person_ids.get(data[2], -1))
+                self.mother.append(person_ids.get(data[3], -1))
+                # ref[3] is the handle, ref[4] the father relation and
+                # ref[5] the mother relation
+                self.children.append(tuple(
+                    (person_ids.get(ref[3], -1), ref[4][0], ref[5][0])
+                    for ref in data[4]))
+                marriage = 0
+                for ref in data[6]:
+                    # ref[3] is the handle, ref[4] the role
+                    event = event_ids.get(ref[3], -1)
+                    if (event >= 0 and ev_type[event] == EventType.MARRIAGE
+                            and ref[4][0] in (EventRoleType.FAMILY,
+                                              EventRoleType.PRIMARY)):
+                        marriage = ev_sort[event]
+                        break
+                self.marriage.append(marriage)
+                self.married.append(data[5][0] == FamilyRelType.MARRIED)
+
+        # the families and numbers of children of the people
+        self.families = []
+        self.n_children = array('i')
+        for family_list in family_lists:
+            families = tuple(family_ids.get(handle, -1)
+                             for handle in family_list)
+            self.families.append(families)
+            self.n_children.append(sum(len(self.children[family])
+                                       for family in families
+                                       if family >= 0))
+
+    def get_birth(self, person):
+        """ get the estimated birth date of a person """
+        return self.est_birth[person] if person >= 0 else 0
+
+    def get_death(self, person):
+        """ get the estimated death date of a person """
+        return self.est_death[person] if person >= 0 else 0
+
+    def get_age_at_death(self, person):
+        """ get a person's estimated age at death, in days """
+        birth_date = self.est_birth[person]
+        death_date = self.est_death[person]
+        if (birth_date > 0) and (death_date > 0):
+            return death_date - birth_date
         return 0
-    death_ref = person.get_death_ref()
-    if not death_ref:
-        ret = 0
-    else:
-        ret = get_date_from_event_handle(db, death_ref.ref, estimate)
-    if estimate and (ret == 0):
-        ret = get_bury_date(db, person, estimate)
-        ret = 0 if ret is None else ret
-    return ret
-
-def get_age_at_death(db, person, estimate):
-    """ get a person's age at death """
-    birth_date = get_birth_date(db, person, estimate)
-    death_date = get_death_date(db, person, estimate)
-    if (birth_date > 0) and (death_date > 0):
-        return death_date - birth_date
-    return 0
-
-def get_father(db, family):
-    """ get a family's father """
-    if not family:
-        return None
-    father_handle = family.get_father_handle()
-    if father_handle:
-        return find_person(db, father_handle)
-    return None
-
-def get_mother(db, family):
-    """ get a family's mother """
-    if not family:
-        return None
-    mother_handle = family.get_mother_handle()
-    if mother_handle:
-        return find_person(db, mother_handle)
-    return None
-
-def get_child_birth_dates(db, family, estimate):
-    """ get a family's children's birth dates """
-    dates = []
-    for child_ref in family.get_child_ref_list():
-        child = find_person(db, child_ref.ref)
-        child_birth_date = get_birth_date(db, child, estimate)
-        if child_birth_date > 0:
-            dates.append(child_birth_date)
-    return dates
-
-def get_n_children(db, person):
-    """ get the number of a family's children """
-    number = 0
-    for family_handle in person.get_family_handle_list():
-        family = find_family(db, family_handle)
-        if family:
-            number += len(family.get_child_ref_list())
-    return number
-
-def get_marriage_date(db, family):
-    """ get a family's marriage date """
-    if not family:
+
+    def get_first_marriage(self, person):
+        """ get the marriage date of a person's first family """
+        families = self.families[person]
+        if families and families[0] >= 0:
+            return self.marriage[families[0]]
         return 0
-    for event_ref in family.get_event_ref_list():
-        event = find_event(db, event_ref.ref)
-        if (event.get_type() == EventType.MARRIAGE
-                and (event_ref.get_role() == EventRoleType.FAMILY
-                     or event_ref.get_role() == EventRoleType.PRIMARY)):
-            date_obj = event.get_date_object()
-            return date_obj.get_sort_value()
-    return 0
+
+    def get_child_birth_dates(self, family):
+        """ get the known estimated birth dates of a family's children """
+        return [date for date in (self.get_birth(child)
+                                  for child, frel, mrel
+                                  in self.children[family])
+                if date > 0]
+
+    def get_surname(self, person):
+        """ get the birth surname of a person, or an empty string """
+        surname_list = self.surnames[person] if person >= 0 else None
+        if not surname_list:
+            return ""
+        surnames = SurnameBase()
+        surnames.unserialize(surname_list)
+        return surnames.get_surname()
 
 #-------------------------------------------------------------------------
 #
@@ -401,83 +421,102 @@ class Verify(tool.Tool, ManagedWindow, UpdateCallback):
 
     def run_the_tool(self, cli=False):
         """ run the tool """
-
-        person_handles = self.db.iter_person_handles()
-
-        for option, value in self.options.handler.options_dict.items():
-            exec('%s = %s' % (option, value), globals())
-            # TODO my pylint doesn't seem to understand these variables really
-            # are defined here, so I have disabled the undefined-variable error
-
         if self.v_r:
             self.v_r.real_model.clear()
 
         self.set_total(self.db.get_number_of_people() +
                        self.db.get_number_of_families())
 
-        for person_handle in person_handles:
-            person = find_person(self.db, person_handle)
-
-            rule_list = [
-                BirthAfterBapt(self.db, person),
-                DeathBeforeBapt(self.db, person),
-                BirthAfterBury(self.db, person),
-                DeathAfterBury(self.db, person),
-                BirthAfterDeath(self.db, person),
-                BaptAfterBury(self.db, person),
-                OldAge(self.db, person, oldage, estimate_age),
-                OldAgeButNoDeath(self.db, person, oldage, estimate_age),
-                UnknownGender(self.db, person),
-                MultipleParents(self.db, person),
-                MarriedOften(self.db, person, wedder),
-                OldUnmarried(self.db, person, oldunm, estimate_age),
-                TooManyChildren(self.db, person, mxchilddad, mxchildmom),
-                Disconnected(self.db, person),
-                InvalidBirthDate(self.db, person, invdate),
-                InvalidDeathDate(self.db, person, invdate),
-                BirthEqualsDeath(self.db, person),
-                BirthEqualsMarriage(self.db, person),
-                DeathEqualsMarriage(self.db, person),
-                ]
-
-            for rule in rule_list:
-                if rule.broken():
-                    self.add_results(rule.report_itself())
-
-            clear_cache()
-            if not cli:
-                self.update()
-
-        # Family-based rules
-        for family_handle in self.db.iter_family_handles():
-            family = find_family(self.db, family_handle)
-
-            rule_list = [
-                SameSexFamily(self.db, family),
-                FemaleHusband(self.db, family),
-                MaleWife(self.db, family),
-                SameSurnameFamily(self.db, family),
-                LargeAgeGapFamily(self.db, family, hwdif, estimate_age),
-                MarriageBeforeBirth(self.db, family, estimate_age),
-                MarriageAfterDeath(self.db, family, estimate_age),
-                EarlyMarriage(self.db, family, yngmar, estimate_age),
-                LateMarriage(self.db, family, oldmar, estimate_age),
-                OldParent(self.db, family, oldmom, olddad, estimate_age),
-                YoungParent(self.db, family, yngmom, yngdad, estimate_age),
-                UnbornParent(self.db, family, estimate_age),
-                DeadParent(self.db, family, estimate_age),
-                LargeChildrenSpan(self.db, family, cbspan, estimate_age),
-                LargeChildrenAgeDiff(self.db, family, cspace, estimate_age),
-                MarriedRelation(self.db, family),
-                ]
-
-            for rule in rule_list:
-                if rule.broken():
-                    self.add_results(rule.report_itself())
-
-            clear_cache()
-            if not cli:
-                self.update()
+        for results in find_broken_rules(self.db,
+                                         self.options.handler.options_dict,
+                                         None if cli else self.update):
+            self.add_results(results)
+
+def get_rules(options):
+    """
+    return the person rules and the family rules, with their parameters
+    from the options of the tool
+    """
+    est = options['estimate_age']
+    person_rules = [
+        (BirthAfterBapt, ()),
+        (DeathBeforeBapt, ()),
+        (BirthAfterBury, ()),
+        (DeathAfterBury, ()),
+        (BirthAfterDeath, ()),
+        (BaptAfterBury, ()),
+        (OldAge, (options['oldage'], est)),
+        (OldAgeButNoDeath, (options['oldage'], est)),
+        (UnknownGender, ()),
+        (MultipleParents, ()),
+        (MarriedOften, (options['wedder'],)),
+        (OldUnmarried, (options['oldunm'], est)),
+        (TooManyChildren, (options['mxchilddad'], options['mxchildmom'])),
+        (Disconnected, ()),
+        (InvalidBirthDate, (options['invdate'],)),
+        (InvalidDeathDate, (options['invdate'],)),
+        (BirthEqualsDeath, ()),
+        (BirthEqualsMarriage, ()),
+        (DeathEqualsMarriage, ()),
+        ]
+    family_rules = [
+        (SameSexFamily, ()),
+        (FemaleHusband, ()),
+        (MaleWife, ()),
+        (SameSurnameFamily, ()),
+        (LargeAgeGapFamily, (options['hwdif'], est)),
+        (MarriageBeforeBirth, (est,)),
+        (MarriageAfterDeath, (est,)),
+        (EarlyMarriage, (options['yngmar'], est)),
+        (LateMarriage, (options['oldmar'], est)),
+        (OldParent, (options['oldmom'], options['olddad'], est)),
+        (YoungParent, (options['yngmom'], options['yngdad'], est)),
+        (UnbornParent, (est,)),
+        (DeadParent, (est,)),
+        (LargeChildrenSpan, (options['cbspan'], est)),
+        (LargeChildrenAgeDiff, (options['cspace'], est)),
+        (MarriedRelation, ()),
+        ]
+    return person_rules, family_rules
+
+def find_broken_rules(db, options, update=None):
+    """
+    Check the rules on all the people and then all the families of the
+    database, and generate the details of each broken rule, as returned by
+    Rule.report_itself.
+
+    The facts of the database are read once, and the rules are checked on
+    blocks of people or families, so that the results of a block are
+    generated before the next block is checked.  Update is called after each
+    person and family, if given.
+    """
+    facts = VerifyFacts(db, options['estimate_age'])
+    person_rules, family_rules = get_rules(options)
+    for rules, handles, get_object in (
+            (person_rules, facts.person_handles, db.get_person_from_handle),
+            (family_rules, facts.family_handles, db.get_family_from_handle)):
+        for start in range(0, len(handles), _BLOCK_SIZE):
+            stop = min(start + _BLOCK_SIZE, len(handles))
+            broken = []
+            for position, (rule_class, params) in enumerate(rules):
+                broken.extend((index, position, message) for index, message
+                              in rule_class.find(facts, start, stop,
+                                                 *params))
+            # in the order of the objects, and of the rules of each
+            broken.sort()
+            obj = None
+            for index, position, message in broken:
+                rule_class, params = rules[position]
+                if obj is None or obj.handle != handles[index]:
+                    obj = get_object(handles[index])
+                    name = rule_class(db, obj, *params).get_name()
+                rule = rule_class(db, obj, *params)
+                if message != 'get_message':
+                    rule.get_message = getattr(rule, message)
+                yield rule.report_itself(name)
+            if update:
+                for dummy in range(start, stop):
+                    update()
 
 #-------------------------------------------------------------------------
 #
@@ -867,11 +906,23 @@ class Rule:
         self.db = db
         self.obj = obj
 
-    def broken(self):
+    @classmethod
+    def find(cls, facts, start, stop, *params):
         """
-        Return boolean indicating whether this rule is violated.
+        Return the people or families, by their index in the facts from start
+        to stop, for which this rule is violated, each with the name of the
+        method returning its message.
         """
-        return False
+        return [(index, 'get_message')
+                for index in cls.find_broken(facts, start, stop, *params)]
+
+    @classmethod
+    def find_broken(cls, facts, start, stop, *params):
+        """
+        Return the people or families, by their index in the facts from start
+        to stop, for which this rule is violated.
+        """
+        return ()
 
     def get_message(self):
         """ return the rule's error message """
@@ -898,13 +949,17 @@ class Rule:
         """ return the rule's parameters """
         return tuple()
 
-    def report_itself(self):
-        """ return the details about a rule """
+    def report_itself(self, name=None):
+        """
+        return the details about a rule, with the given name of the object
+        if it is already known
+        """
         handle = self.get_handle()
         the_type = self.TYPE
         rule_id = self.get_rule_id()
         severity = self.SEVERITY
-        name = self.get_name()
+        if name is None:
+            name = self.get_name()
         gramps_id = self.get_id()
         msg = self.get_message()
         return (msg, gramps_id, name, the_type, rule_id, severity, handle)
@@ -936,13 +991,11 @@ class BirthAfterBapt(PersonRule):
     """ test if a person was baptised before their birth """
     ID = 1
     SEVERITY = Rule.ERROR
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        birth_date = get_birth_date(self.db, self.obj)
-        bapt_date = get_bapt_date(self.db, self.obj)
-        birth_ok = birth_date > 0 if birth_date is not None else False
-        bapt_ok = bapt_date > 0 if bapt_date is not None else False
-        return birth_ok and bapt_ok and birth_date > bapt_date
+    @classmethod
+    def find_broken(cls, facts, start, stop):
+        """ return the people for whom this rule is violated """
+        return (person for person in range(start, stop)
+                if 0 < facts.bapt[person] < facts.birth[person])
 
     def get_message(self):
         """ return the rule's error message """
@@ -952,13 +1005,11 @@ class DeathBeforeBapt(PersonRule):
     """ test if a person died before their baptism """
     ID = 2
     SEVERITY = Rule.ERROR
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        death_date = get_death_date(self.db, self.obj)
-        bapt_date = get_bapt_date(self.db, self.obj)
-        bapt_ok = bapt_date > 0 if bapt_date is not None else False
-        death_ok = death_date > 0 if death_date is not None else False
-        return death_ok and bapt_ok and bapt_date > death_date
+    @classmethod
+    def find_broken(cls, facts, start, stop):
+        """ return the people for whom this rule is violated """
+        return (person for person in range(start, stop)
+                if 0 < facts.death[person] < facts.bapt[person])
 
     def get_message(self):
         """ return the rule's error message """
@@ -968,13 +1019,11 @@ class BirthAfterBury(PersonRule):
     """ test if a person was buried before their birth """
     ID = 3
     SEVERITY = Rule.ERROR
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        birth_date = get_birth_date(self.db, self.obj)
-        bury_date = get_bury_date(self.db, self.obj)
-        birth_ok = birth_date > 0 if birth_date is not None else False
-        bury_ok = bury_date > 0 if bury_date is not None else False
-        return birth_ok and bury_ok and birth_date > bury_date
+    @classmethod
+    def find_broken(cls, facts, start, stop):
+        """ return the people for whom this rule is violated """
+        return (person for person in range(start, stop)
+                if 0 < facts.bury[person] < facts.birth[person])
 
     def get_message(self):
         """ return the rule's error message """
@@ -984,13 +1033,11 @@ class DeathAfterBury(PersonRule):
     """ test if a person was buried before their death """
     ID = 4
     SEVERITY = Rule.ERROR
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        death_date = get_death_date(self.db, self.obj)
-        bury_date = get_bury_date(self.db, self.obj)
-        death_ok = death_date > 0 if death_date is not None else False
-        bury_ok = bury_date > 0 if bury_date is not None else False
-        return death_ok and bury_ok and death_date > bury_date
+    @classmethod
+    def find_broken(cls, facts, start, stop):
+        """ return the people for whom this rule is violated """
+        return (person for person in range(start, stop)
+                if 0 < facts.bury[person] < facts.death[person])
 
     def get_message(self):
         """ return the rule's error message """
@@ -1000,13 +1047,11 @@ class BirthAfterDeath(PersonRule):
     """ test if a person died before their birth """
     ID = 5
     SEVERITY = Rule.ERROR
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        birth_date = get_birth_date(self.db, self.obj)
-        death_date = get_death_date(self.db, self.obj)
-        birth_ok = birth_date > 0 if birth_date is not None else False
-        death_ok = death_date > 0 if death_date is not None else False
-        return birth_ok and death_ok and birth_date > death_date
+    @classmethod
+    def find_broken(cls, facts, start, stop):
+        """ return the people for whom this rule is violated """
+        return (person for person in range(start, stop)
+                if 0 < facts.death[person] < facts.birth[person])
 
     def get_message(self):
         """ return the rule's error message """
@@ -1016,13 +1061,11 @@ class BaptAfterBury(PersonRule):
     """ test if a person was buried before their baptism """
     ID = 6
     SEVERITY = Rule.ERROR
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        bapt_date = get_bapt_date(self.db, self.obj)
-        bury_date = get_bury_date(self.db, self.obj)
-        bapt_ok = bapt_date > 0 if bapt_date is not None else False
-        bury_ok = bury_date > 0 if bury_date is not None else False
-        return bapt_ok and bury_ok and bapt_date > bury_date
+    @classmethod
+    def find_broken(cls, facts, start, stop):
+        """ return the people for whom this rule is violated """
+        return (person for person in range(start, stop)
+                if 0 < facts.bury[person] < facts.bapt[person])
 
     def get_message(self):
         """ return the rule's error message """
@@ -1042,10 +1085,11 @@ class OldAge(PersonRule):
         """ return the rule's parameters """
         return (self.old_age, self.est)
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        age_at_death = get_age_at_death(self.db, self.obj, self.est)
-        return age_at_death / 365 > self.old_age
+    @classmethod
+    def find_broken(cls, facts, start, stop, old_age, est):
+        """ return the people for whom this rule is violated """
+        return (person for person in range(start, stop)
+                if facts.get_age_at_death(person) / 365 > old_age)
 
     def get_message(self):
         """ return the rule's error message """
@@ -1055,11 +1099,11 @@ class UnknownGender(PersonRule):
     """ test if a person is neither a male nor a female """
     ID = 8
     SEVERITY = Rule.WARNING
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        female = self.obj.get_gender() == Person.FEMALE
-        male = self.obj.get_gender() == Person.MALE
-        return not (male or female)
+    @classmethod
+    def find_broken(cls, facts, start, stop):
+        """ return the people for whom this rule is violated """
+        return (person for person in range(start, stop)
+                if facts.gender[person] not in (Person.MALE, Person.FEMALE))
 
     def get_message(self):
         """ return the rule's error message """
@@ -1069,10 +1113,11 @@ class MultipleParents(PersonRule):
     """ test if a person belongs to multiple families """
     ID = 9
     SEVERITY = Rule.WARNING
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        n_parent_sets = len(self.obj.get_parent_family_handle_list())
-        return n_parent_sets > 1
+    @classmethod
+    def find_broken(cls, facts, start, stop):
+        """ return the people for whom this rule is violated """
+        return (person for person in range(start, stop)
+                if facts.n_parents[person] > 1)
 
     def get_message(self):
         """ return the rule's error message """
@@ -1091,10 +1136,11 @@ class MarriedOften(PersonRule):
         """ return the rule's parameters """
         return (self.wedder,)
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        n_spouses = len(self.obj.get_family_handle_list())
-        return n_spouses > self.wedder
+    @classmethod
+    def find_broken(cls, facts, start, stop, wedder):
+        """ return the people for whom this rule is violated """
+        return (person for person in range(start, stop)
+                if len(facts.families[person]) > wedder)
 
     def get_message(self):
         """ return the rule's error message """
@@ -1114,11 +1160,12 @@ class OldUnmarried(PersonRule):
         """ return the rule's parameters """
         return (self.old_unm, self.est)
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        age_at_death = get_age_at_death(self.db, self.obj, self.est)
-        n_spouses = len(self.obj.get_family_handle_list())
-        return age_at_death / 365 > self.old_unm and n_spouses == 0
+    @classmethod
+    def find_broken(cls, facts, start, stop, old_unm, est):
+        """ return the people for whom this rule is violated """
+        return (person for person in range(start, stop)
+                if not facts.families[person]
+                and facts.get_age_at_death(person) / 365 > old_unm)
 
     def get_message(self):
         """ return the rule's error message """
@@ -1138,19 +1185,13 @@ class TooManyChildren(PersonRule):
         """ return the rule's parameters """
         return (self.mx_child_dad, self.mx_child_mom)
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        n_child = get_n_children(self.db, self.obj)
-
-        if (self.obj.get_gender == Person.MALE
-                and n_child > self.mx_child_dad):
-            return True
-
-        if (self.obj.get_gender == Person.FEMALE
-                and n_child > self.mx_child_mom):
-            return True
-
-        return False
+    @classmethod
+    def find_broken(cls, facts, start, stop, mx_child_dad, mx_child_mom):
+        """ return the people for whom this rule is violated """
+        maximum = {Person.MALE: mx_child_dad, Person.FEMALE: mx_child_mom}
+        return (person for person in range(start, stop)
+                if facts.gender[person] in maximum
+                and facts.n_children[person] > maximum[facts.gender[person]])
 
     def get_message(self):
         """ return the rule's error message """
@@ -1160,15 +1201,17 @@ class SameSexFamily(FamilyRule):
     """ test if a family's parents are both male or both female """
     ID = 13
     SEVERITY = Rule.WARNING
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        mother = get_mother(self.db, self.obj)
-        father = get_father(self.db, self.obj)
-        same_sex = (mother and father and
-                    (mother.get_gender() == father.get_gender()))
-        unknown_sex = (mother and
-                       (mother.get_gender() == Person.UNKNOWN))
-        return same_sex and not unknown_sex
+    @classmethod
+    def find_broken(cls, facts, start, stop):
+        """ return the families for which this rule is violated """
+        gender = facts.gender
+        for family in range(start, stop):
+            father = facts.father[family]
+            mother = facts.mother[family]
+            if (father >= 0 and mother >= 0
+                    and gender[mother] == gender[father]
+                    and gender[mother] != Person.UNKNOWN):
+                yield family
 
     def get_message(self):
         """ return the rule's error message """
@@ -1178,10 +1221,12 @@ class FemaleHusband(FamilyRule):
     """ test if a family's 'husband' is female """
     ID = 14
     SEVERITY = Rule.WARNING
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        father = get_father(self.db, self.obj)
-        return father and (father.get_gender() == Person.FEMALE)
+    @classmethod
+    def find_broken(cls, facts, start, stop):
+        """ return the families for which this rule is violated """
+        return (family for family in range(start, stop)
+                if facts.father[family] >= 0
+                and facts.gender[facts.father[family]] == Person.FEMALE)
 
     def get_message(self):
         """ return the rule's error message """
@@ -1191,10 +1236,12 @@ class MaleWife(FamilyRule):
     """ test if a family's 'wife' is male """
     ID = 15
     SEVERITY = Rule.WARNING
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        mother = get_mother(self.db, self.obj)
-        return mother and (mother.get_gender() == Person.MALE)
+    @classmethod
+    def find_broken(cls, facts, start, stop):
+        """ return the families for which this rule is violated """
+        return (family for family in range(start, stop)
+                if facts.mother[family] >= 0
+                and facts.gender[facts.mother[family]] == Person.MALE)
 
     def get_message(self):
         """ return the rule's error message """
@@ -1204,27 +1251,15 @@ class SameSurnameFamily(FamilyRule):
     """ test if a family's parents were born with the same surname """
     ID = 16
     SEVERITY = Rule.WARNING
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        mother = get_mother(self.db, self.obj)
-        father = get_father(self.db, self.obj)
-        _broken = False
-
-        # Make sure both mother and father exist.
-        if mother and father:
-            mname = mother.get_primary_name()
-            fname = father.get_primary_name()
-            # Only compare birth names (not married names).
-            if (mname.get_type() == NameType.BIRTH
-                    and fname.get_type() == NameType.BIRTH):
-                # Empty names don't count.
-                if (len(mname.get_surname()) != 0
-                        and len(fname.get_surname()) != 0):
-                    # Finally, check if the names are the same.
-                    if mname.get_surname() == fname.get_surname():
-                        _broken = True
-
-        return _broken
+    @classmethod
+    def find_broken(cls, facts, start, stop):
+        """ return the families for which this rule is violated """
+        for family in range(start, stop):
+            # Only compare birth names (not married names), and empty
+            # names don't count.
+            fname = facts.get_surname(facts.father[family])
+            if fname and fname == facts.get_surname(facts.mother[family]):
+                yield family
 
     def get_message(self):
         """ return the rule's error message """
@@ -1244,17 +1279,16 @@ class LargeAgeGapFamily(FamilyRule):
         """ return the rule's parameters """
         return (self.hw_diff, self.est)
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        mother = get_mother(self.db, self.obj)
-        father = get_father(self.db, self.obj)
-        mother_birth_date = get_birth_date(self.db, mother, self.est)
-        father_birth_date = get_birth_date(self.db, father, self.est)
-        mother_birth_date_ok = mother_birth_date > 0
-        father_birth_date_ok = father_birth_date > 0
-        large_diff = abs(
-            father_birth_date-mother_birth_date) / 365 > self.hw_diff
-        return mother_birth_date_ok and father_birth_date_ok and large_diff
+    @classmethod
+    def find_broken(cls, facts, start, stop, hw_diff, est):
+        """ return the families for which this rule is violated """
+        for family in range(start, stop):
+            mother_birth_date = facts.get_birth(facts.mother[family])
+            father_birth_date = facts.get_birth(facts.father[family])
+            if (mother_birth_date > 0 and father_birth_date > 0 and
+                    abs(father_birth_date - mother_birth_date) / 365
+                    > hw_diff):
+                yield family
 
     def get_message(self):
         """ return the rule's error message """
@@ -1273,24 +1307,16 @@ class MarriageBeforeBirth(FamilyRule):
         """ return the rule's parameters """
         return (self.est,)
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        marr_date = get_marriage_date(self.db, self.obj)
-        marr_date_ok = marr_date > 0
-
-        mother = get_mother(self.db, self.obj)
-        father = get_father(self.db, self.obj)
-        mother_birth_date = get_birth_date(self.db, mother, self.est)
-        father_birth_date = get_birth_date(self.db, father, self.est)
-        mother_birth_date_ok = mother_birth_date > 0
-        father_birth_date_ok = father_birth_date > 0
-
-        father_broken = (father_birth_date_ok and marr_date_ok
-                         and (father_birth_date > marr_date))
-        mother_broken = (mother_birth_date_ok and marr_date_ok
-                         and (mother_birth_date > marr_date))
-
-        return father_broken or mother_broken
+    @classmethod
+    def find_broken(cls, facts, start, stop, est):
+        """ return the families for which this rule is violated """
+        for family in range(start, stop):
+            marr_date = facts.marriage[family]
+            if marr_date <= 0:
+                continue
+            if (facts.get_birth(facts.father[family]) > marr_date
+                    or facts.get_birth(facts.mother[family]) > marr_date):
+                yield family
 
     def get_message(self):
         """ return the rule's error message """
@@ -1309,24 +1335,16 @@ class MarriageAfterDeath(FamilyRule):
         """ return the rule's parameters """
         return (self.est,)
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        marr_date = get_marriage_date(self.db, self.obj)
-        marr_date_ok = marr_date > 0
-
-        mother = get_mother(self.db, self.obj)
-        father = get_father(self.db, self.obj)
-        mother_death_date = get_death_date(self.db, mother, self.est)
-        father_death_date = get_death_date(self.db, father, self.est)
-        mother_death_date_ok = mother_death_date > 0
-        father_death_date_ok = father_death_date > 0
-
-        father_broken = (father_death_date_ok and marr_date_ok
-                         and (father_death_date < marr_date))
-        mother_broken = (mother_death_date_ok and marr_date_ok
-                         and (mother_death_date < marr_date))
-
-        return father_broken or mother_broken
+    @classmethod
+    def find_broken(cls, facts, start, stop, est):
+        """ return the families for which this rule is violated """
+        for family in range(start, stop):
+            marr_date = facts.marriage[family]
+            if marr_date <= 0:
+                continue
+            if (0 < facts.get_death(facts.father[family]) < marr_date
+                    or 0 < facts.get_death(facts.mother[family]) < marr_date):
+                yield family
 
     def get_message(self):
         """ return the rule's error message """
@@ -1346,28 +1364,19 @@ class EarlyMarriage(FamilyRule):
         """ return the rule's parameters """
         return (self.yng_mar, self.est,)
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        marr_date = get_marriage_date(self.db, self.obj)
-        marr_date_ok = marr_date > 0
-
-        mother = get_mother(self.db, self.obj)
-        father = get_father(self.db, self.obj)
-        mother_birth_date = get_birth_date(self.db, mother, self.est)
-        father_birth_date = get_birth_date(self.db, father, self.est)
-        mother_birth_date_ok = mother_birth_date > 0
-        father_birth_date_ok = father_birth_date > 0
-
-        father_broken = (
-            father_birth_date_ok and marr_date_ok and
-            father_birth_date < marr_date and
-            ((marr_date - father_birth_date) / 365 < self.yng_mar))
-        mother_broken = (
-            mother_birth_date_ok and marr_date_ok and
-            mother_birth_date < marr_date and
-            ((marr_date - mother_birth_date) / 365 < self.yng_mar))
-
-        return father_broken or mother_broken
+    @classmethod
+    def find_broken(cls, facts, start, stop, yng_mar, est):
+        """ return the families for which this rule is violated """
+        for family in range(start, stop):
+            marr_date = facts.marriage[family]
+            if marr_date <= 0:
+                continue
+            for parent in (facts.father[family], facts.mother[family]):
+                birth_date = facts.get_birth(parent)
+                if (0 < birth_date < marr_date and
+                        (marr_date - birth_date) / 365 < yng_mar):
+                    yield family
+                    break
 
     def get_message(self):
         """ return the rule's error message """
@@ -1387,26 +1396,19 @@ class LateMarriage(FamilyRule):
         """ return the rule's parameters """
         return (self.old_mar, self.est)
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        marr_date = get_marriage_date(self.db, self.obj)
-        marr_date_ok = marr_date > 0
-
-        mother = get_mother(self.db, self.obj)
-        father = get_father(self.db, self.obj)
-        mother_birth_date = get_birth_date(self.db, mother, self.est)
-        father_birth_date = get_birth_date(self.db, father, self.est)
-        mother_birth_date_ok = mother_birth_date > 0
-        father_birth_date_ok = father_birth_date > 0
-
-        father_broken = (
-            father_birth_date_ok and marr_date_ok and
-            ((marr_date - father_birth_date) / 365 > self.old_mar))
-        mother_broken = (
-            mother_birth_date_ok and marr_date_ok and
-            ((marr_date - mother_birth_date) / 365 > self.old_mar))
-
-        return father_broken or mother_broken
+    @classmethod
+    def find_broken(cls, facts, start, stop, old_mar, est):
+        """ return the families for which this rule is violated """
+        for family in range(start, stop):
+            marr_date = facts.marriage[family]
+            if marr_date <= 0:
+                continue
+            for parent in (facts.father[family], facts.mother[family]):
+                birth_date = facts.get_birth(parent)
+                if (birth_date > 0 and
+                        (marr_date - birth_date) / 365 > old_mar):
+                    yield family
+                    break
 
     def get_message(self):
         """ return the rule's error message """
@@ -1427,35 +1429,23 @@ class OldParent(FamilyRule):
         """ return the rule's parameters """
         return (self.old_mom, self.old_dad, self.est)
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        mother = get_mother(self.db, self.obj)
-        father = get_father(self.db, self.obj)
-        mother_birth_date = get_birth_date(self.db, mother, self.est)
-        father_birth_date = get_birth_date(self.db, father, self.est)
-        mother_birth_date_ok = mother_birth_date > 0
-        father_birth_date_ok = father_birth_date > 0
-
-        for child_ref in self.obj.get_child_ref_list():
-            child = find_person(self.db, child_ref.ref)
-            child_birth_date = get_birth_date(self.db, child, self.est)
-            child_birth_date_ok = child_birth_date > 0
-            if not child_birth_date_ok:
-                continue
-            father_broken = (
-                father_birth_date_ok and
-                ((child_birth_date - father_birth_date) / 365 > self.old_dad))
-            if father_broken:
-                self.get_message = self.father_message
-                return True
-
-            mother_broken = (
-                mother_birth_date_ok and
-                ((child_birth_date - mother_birth_date) / 365 > self.old_mom))
-            if mother_broken:
-                self.get_message = self.mother_message
-                return True
-        return False
+    @classmethod
+    def find(cls, facts, start, stop, old_mom, old_dad, est):
+        """ return the families for which this rule is violated """
+        for family in range(start, stop):
+            mother_birth_date = facts.get_birth(facts.mother[family])
+            father_birth_date = facts.get_birth(facts.father[family])
+            for child_birth_date in facts.get_child_birth_dates(family):
+                if (father_birth_date > 0 and
+                        (child_birth_date - father_birth_date) / 365
+                        > old_dad):
+                    yield family, 'father_message'
+                    break
+                if (mother_birth_date > 0 and
+                        (child_birth_date - mother_birth_date) / 365
+                        > old_mom):
+                    yield family, 'mother_message'
+                    break
 
     def father_message(self):
         """ return the rule's error message """
@@ -1480,35 +1470,23 @@ class YoungParent(FamilyRule):
         """ return the rule's parameters """
         return (self.yng_mom, self.yng_dad, self.est)
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        mother = get_mother(self.db, self.obj)
-        father = get_father(self.db, self.obj)
-        mother_birth_date = get_birth_date(self.db, mother, self.est)
-        father_birth_date = get_birth_date(self.db, father, self.est)
-        mother_birth_date_ok = mother_birth_date > 0
-        father_birth_date_ok = father_birth_date > 0
-
-        for child_ref in self.obj.get_child_ref_list():
-            child = find_person(self.db, child_ref.ref)
-            child_birth_date = get_birth_date(self.db, child, self.est)
-            child_birth_date_ok = child_birth_date > 0
-            if not child_birth_date_ok:
-                continue
-            father_broken = (
-                father_birth_date_ok and
-                ((child_birth_date - father_birth_date) / 365 < self.yng_dad))
-            if father_broken:
-                self.get_message = self.father_message
-                return True
-
-            mother_broken = (
-                mother_birth_date_ok and
-                ((child_birth_date - mother_birth_date) / 365 < self.yng_mom))
-            if mother_broken:
-                self.get_message = self.mother_message
-                return True
-        return False
+    @classmethod
+    def find(cls, facts, start, stop, yng_mom, yng_dad, est):
+        """ return the families for which this rule is violated """
+        for family in range(start, stop):
+            mother_birth_date = facts.get_birth(facts.mother[family])
+            father_birth_date = facts.get_birth(facts.father[family])
+            for child_birth_date in facts.get_child_birth_dates(family):
+                if (father_birth_date > 0 and
+                        (child_birth_date - father_birth_date) / 365
+                        < yng_dad):
+                    yield family, 'father_message'
+                    break
+                if (mother_birth_date > 0 and
+                        (child_birth_date - mother_birth_date) / 365
+                        < yng_mom):
+                    yield family, 'mother_message'
+                    break
 
     def father_message(self):
         """ return the rule's error message """
@@ -1531,32 +1509,19 @@ class UnbornParent(FamilyRule):
         """ return the rule's parameters """
         return (self.est,)
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        mother = get_mother(self.db, self.obj)
-        father = get_father(self.db, self.obj)
-        mother_birth_date = get_birth_date(self.db, mother, self.est)
-        father_birth_date = get_birth_date(self.db, father, self.est)
-        mother_birth_date_ok = mother_birth_date > 0
-        father_birth_date_ok = father_birth_date > 0
-
-        for child_ref in self.obj.get_child_ref_list():
-            child = find_person(self.db, child_ref.ref)
-            child_birth_date = get_birth_date(self.db, child, self.est)
-            child_birth_date_ok = child_birth_date > 0
-            if not child_birth_date_ok:
-                continue
-            father_broken = (father_birth_date_ok
-                             and (father_birth_date > child_birth_date))
-            if father_broken:
-                self.get_message = self.father_message
-                return True
-
-            mother_broken = (mother_birth_date_ok
-                             and (mother_birth_date > child_birth_date))
-            if mother_broken:
-                self.get_message = self.mother_message
-                return True
+    @classmethod
+    def find(cls, facts, start, stop, est):
+        """ return the families for which this rule is violated """
+        for family in range(start, stop):
+            mother_birth_date = facts.get_birth(facts.mother[family])
+            father_birth_date = facts.get_birth(facts.father[family])
+            for child_birth_date in facts.get_child_birth_dates(family):
+                if father_birth_date > child_birth_date:
+                    yield family, 'father_message'
+                    break
+                if mother_birth_date > child_birth_date:
+                    yield family, 'mother_message'
+                    break
 
     def father_message(self):
         """ return the rule's error message """
@@ -1579,39 +1544,24 @@ class DeadParent(FamilyRule):
         """ return the rule's parameters """
         return (self.est,)
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        mother = get_mother(self.db, self.obj)
-        father = get_father(self.db, self.obj)
-        mother_death_date = get_death_date(self.db, mother, self.est)
-        father_death_date = get_death_date(self.db, father, self.est)
-        mother_death_date_ok = mother_death_date > 0
-        father_death_date_ok = father_death_date > 0
-
-        for child_ref in self.obj.get_child_ref_list():
-            child = find_person(self.db, child_ref.ref)
-            child_birth_date = get_birth_date(self.db, child, self.est)
-            child_birth_date_ok = child_birth_date > 0
-            if not child_birth_date_ok:
-                continue
-
-            has_birth_rel_to_mother = child_ref.mrel == ChildRefType.BIRTH
-            has_birth_rel_to_father = child_ref.frel == ChildRefType.BIRTH
-
-            father_broken = (
-                has_birth_rel_to_father
-                and father_death_date_ok
-                and ((father_death_date + 294) < child_birth_date))
-            if father_broken:
-                self.get_message = self.father_message
-                return True
-
-            mother_broken = (has_birth_rel_to_mother
-                             and mother_death_date_ok
-                             and (mother_death_date < child_birth_date))
-            if mother_broken:
-                self.get_message = self.mother_message
-                return True
+    @classmethod
+    def find(cls, facts, start, stop, est):
+        """ return the families for which this rule is violated """
+        for family in range(start, stop):
+            mother_death_date = facts.get_death(facts.mother[family])
+            father_death_date = facts.get_death(facts.father[family])
+            for child, frel, mrel in facts.children[family]:
+                child_birth_date = facts.get_birth(child)
+                if child_birth_date <= 0:
+                    continue
+                if (frel == ChildRefType.BIRTH and father_death_date > 0
+                        and father_death_date + 294 < child_birth_date):
+                    yield family, 'father_message'
+                    break
+                if (mrel == ChildRefType.BIRTH and
+                        0 < mother_death_date < child_birth_date):
+                    yield family, 'mother_message'
+                    break
 
     def father_message(self):
         """ return the rule's error message """
@@ -1635,13 +1585,15 @@ class LargeChildrenSpan(FamilyRule):
         """ return the rule's parameters """
         return (self.cbs, self.est)
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        child_birh_dates = get_child_birth_dates(self.db, self.obj, self.est)
-        child_birh_dates.sort()
-
-        return (child_birh_dates and
-                ((child_birh_dates[-1] - child_birh_dates[0]) / 365 > self.cbs))
+    @classmethod
+    def find_broken(cls, facts, start, stop, cb_span, est):
+        """ return the families for which this rule is violated """
+        for family in range(start, stop):
+            child_birth_dates = facts.get_child_birth_dates(family)
+            if (child_birth_dates and
+                    (max(child_birth_dates) - min(child_birth_dates)) / 365
+                    > cb_span):
+                yield family
 
     def get_message(self):
         """ return the rule's error message """
@@ -1661,14 +1613,17 @@ class LargeChildrenAgeDiff(FamilyRule):
         """ return the rule's parameters """
         return (self.c_space, self.est)
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        child_birh_dates = get_child_birth_dates(self.db, self.obj, self.est)
-        child_birh_dates_diff = [child_birh_dates[i+1] - child_birh_dates[i]
-                                 for i in range(len(child_birh_dates)-1)]
-
-        return (child_birh_dates_diff and
-                max(child_birh_dates_diff) / 365 > self.c_space)
+    @classmethod
+    def find_broken(cls, facts, start, stop, c_space, est):
+        """ return the families for which this rule is violated """
+        for family in range(start, stop):
+            child_birth_dates = facts.get_child_birth_dates(family)
+            child_birth_dates_diff = [
+                child_birth_dates[i+1] - child_birth_dates[i]
+                for i in range(len(child_birth_dates)-1)]
+            if (child_birth_dates_diff and
+                    max(child_birth_dates_diff) / 365 > c_space):
+                yield family
 
     def get_message(self):
         """ return the rule's error message """
@@ -1678,10 +1633,12 @@ class Disconnected(PersonRule):
     """ test if a person has no children and no parents """
     ID = 28
     SEVERITY = Rule.WARNING
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        return (len(self.obj.get_parent_family_handle_list())
-                + len(self.obj.get_family_handle_list()) == 0)
+    @classmethod
+    def find_broken(cls, facts, start, stop):
+        """ return the people for whom this rule is violated """
+        return (person for person in range(start, stop)
+                if facts.n_parents[person] == 0
+                and not facts.families[person])
 
     def get_message(self):
         """ return the rule's error message """
@@ -1696,19 +1653,13 @@ class InvalidBirthDate(PersonRule):
         PersonRule.__init__(self, db, person)
         self._invdate = invdate
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        if not self._invdate: # should we check?
-            return False
-        # if so, let's get the birth date
-        person = self.obj
-        birth_ref = person.get_birth_ref()
-        if birth_ref:
-            birth_event = self.db.get_event_from_handle(birth_ref.ref)
-            birth_date = birth_event.get_date_object()
-            if birth_date and not birth_date.get_valid():
-                return True
-        return False
+    @classmethod
+    def find_broken(cls, facts, start, stop, invdate):
+        """ return the people for whom this rule is violated """
+        if not invdate: # should we check?
+            return ()
+        return (person for person in range(start, stop)
+                if facts.invalid_birth[person])
 
     def get_message(self):
         """ return the rule's error message """
@@ -1723,19 +1674,13 @@ class InvalidDeathDate(PersonRule):
         PersonRule.__init__(self, db, person)
         self._invdate = invdate
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        if not self._invdate: # should we check?
-            return False
-        # if so, let's get the death date
-        person = self.obj
-        death_ref = person.get_death_ref()
-        if death_ref:
-            death_event = self.db.get_event_from_handle(death_ref.ref)
-            death_date = death_event.get_date_object()
-            if death_date and not death_date.get_valid():
-                return True
-        return False
+    @classmethod
+    def find_broken(cls, facts, start, stop, invdate):
+        """ return the people for whom this rule is violated """
+        if not invdate: # should we check?
+            return ()
+        return (person for person in range(start, stop)
+                if facts.invalid_death[person])
 
     def get_message(self):
         """ return the rule's error message """
@@ -1749,13 +1694,11 @@ class MarriedRelation(FamilyRule):
         """ initialize the rule """
         FamilyRule.__init__(self, db, obj)
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        marr_date = get_marriage_date(self.db, self.obj)
-        marr_date_ok = marr_date > 0
-        married = self.obj.get_relationship() == FamilyRelType.MARRIED
-        if not married and marr_date_ok:
-            return self.get_message
+    @classmethod
+    def find_broken(cls, facts, start, stop):
+        """ return the families for which this rule is violated """
+        return (family for family in range(start, stop)
+                if not facts.married[family] and facts.marriage[family] > 0)
 
     def get_message(self):
         """ return the rule's error message """
@@ -1775,15 +1718,15 @@ class OldAgeButNoDeath(PersonRule):
         """ return the rule's parameters """
         return (self.old_age, self.est)
 
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        birth_date = get_birth_date(self.db, self.obj, self.est)
-        dead = get_death(self.db, self.obj)
-        death_date = get_death_date(self.db, self.obj, True) # or burial date
-        if dead or death_date or not birth_date:
-            return 0
-        age = (_today - birth_date) / 365
-        return age > self.old_age
+    @classmethod
+    def find_broken(cls, facts, start, stop, old_age, est):
+        """ return the people for whom this rule is violated """
+        # a burial date counts as a death date
+        return (person for person in range(start, stop)
+                if not facts.has_death[person]
+                and not facts.any_bury[person]
+                and facts.est_birth[person]
+                and (_today - facts.est_birth[person]) / 365 > old_age)
 
     def get_message(self):
         """ return the rule's error message """
@@ -1793,13 +1736,11 @@ class BirthEqualsDeath(PersonRule):
     """ test if a person's birth date is the same as their death date """
     ID = 33
     SEVERITY = Rule.WARNING
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        birth_date = get_birth_date(self.db, self.obj)
-        death_date = get_death_date(self.db, self.obj)
-        birth_ok = birth_date > 0 if birth_date is not None else False
-        death_ok = death_date > 0 if death_date is not None else False
-        return death_ok and birth_ok and birth_date == death_date
+    @classmethod
+    def find_broken(cls, facts, start, stop):
+        """ return the people for whom this rule is violated """
+        return (person for person in range(start, stop)
+                if 0 < facts.birth[person] == facts.death[person])
 
     def get_message(self):
         """ return the rule's error message """
@@ -1809,15 +1750,13 @@ class BirthEqualsMarriage(PersonRule):
     """ test if a person's birth date is the same as their marriage date """
     ID = 34
     SEVERITY = Rule.ERROR
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        birth_date = get_birth_date(self.db, self.obj)
-        birth_ok = birth_date > 0 if birth_date is not None else False
-        for fhandle in self.obj.get_family_handle_list():
-            family = self.db.get_family_from_handle(fhandle)
-            marr_date = get_marriage_date(self.db, family)
-            marr_ok = marr_date > 0 if marr_date is not None else False
-            return marr_ok and birth_ok and birth_date == marr_date
+    @classmethod
+    def find_broken(cls, facts, start, stop):
+        """ return the people for whom this rule is violated """
+        # only the first family is checked
+        return (person for person in range(start, stop)
+                if 0 < facts.birth[person]
+                == facts.get_first_marriage(person))
 
     def get_message(self):
         """ return the rule's error message """
@@ -1827,17 +1766,14 @@ class DeathEqualsMarriage(PersonRule):
     """ test if a person's death date is the same as their marriage date """
     ID = 35
     SEVERITY = Rule.WARNING # it's possible
-    def broken(self):
-        """ return boolean indicating whether this rule is violated """
-        death_date = get_death_date(self.db, self.obj)
-        death_ok = death_date > 0 if death_date is not None else False
-        for fhandle in self.obj.get_family_handle_list():
-            family = self.db.get_family_from_handle(fhandle)
-            marr_date = get_marriage_date(self.db, family)
-            marr_ok = marr_date > 0 if marr_date is not None else False
-            return marr_ok and death_ok and death_date == marr_date
+    @classmethod
+    def find_broken(cls, facts, start, stop):
+        """ return the people for whom this rule is violated """
+        # only the first family is checked
+        return (person for person in range(start, stop)
+                if 0 < facts.death[person]
+                == facts.get_first_marriage(person))
 
     def get_message(self):
         """ return the rule's error message """
         return _("Death equals marriage")
-
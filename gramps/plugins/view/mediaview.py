@@ -55,6 +55,8 @@ from gramps.gen.config import config
 from gramps.gen.utils.file import (media_path, relative_path, media_path_full,
                                    create_checksum)
 from gramps.gen.utils.db import get_media_referents
+from gramps.gen.utils.thumbnails import (prefetch_thumbnails, SIZE_NORMAL,
+                                         SIZE_LARGE)
 from gramps.gui.views.bookmarks import MediaBookmarks
 from gramps.gen.mime import get_type, is_valid_type
 from gramps.gen.lib import Media
@@ -231,6 +233,35 @@ class MediaView(ListView):
                 mfolder, mfile = os.path.split(mpath)
                 open_file_with_default_application(mfolder, self.uistate)
 
+    def row_changed(self, selection):
+        """
+        Called when the selection is changed.
+
+        The thumbnails of the media shown in the list are created in the
+        background, for the media preview, as the next selected media are
+        likely to be among them.
+        """
+        ListView.row_changed(self, selection)
+        visible = self.list.get_visible_range()
+        if visible is None:
+            return
+        media = []
+        for path in range(visible[0].get_indices()[0],
+                          visible[1].get_indices()[0] + 1):
+            try:
+                handle = self.model.get_handle(path)
+            except IndexError:
+                break
+            obj = self.dbstate.db.get_media_from_handle(handle)
+            if obj is not None:
+                media.append((media_path_full(self.dbstate.db,
+                                              obj.get_path()),
+                              obj.get_mime_type(), None))
+        if self.uistate.screen_height() < 1000:
+            prefetch_thumbnails(media, SIZE_NORMAL)
+        else:
+            prefetch_thumbnails(media, SIZE_LARGE)
+
     def get_stock(self):
         """
         Return the icon for this view
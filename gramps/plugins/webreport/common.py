@@ -45,6 +45,7 @@ from gramps.plugins.lib.libgedcom import make_gedcom_date, DATE_QUALITY
 from gramps.gen.plug.report import utils
 from gramps.plugins.lib.libhtml import Html
 
+_ = glocale.translation.sgettext
 LOG = logging.getLogger(".NarrativeWeb")
 
 # define clear blank line for proper styling
@@ -960,6 +961,16 @@ def build_event_data_by_individuals(dbase, ppl_handle_list):
     # return event_handle_list and event types to its caller
     return event_handle_list, event_types
 
+def missing_media_title(photo):
+    """
+    Return the title of the warning given when the file of a media object
+    cannot be copied to the web site.
+
+    @param: photo -- The media object
+    """
+    return _("Missing media object:") + "%s (%s)" % (photo.get_description(),
+                                                     photo.get_gramps_id())
+
 def name_to_md5(text):
     """This creates an MD5 hex string to be used as filename."""
 
@@ -119,15 +119,26 @@ class EventPages(BasePage):
         with self.r_user.progress(progress_title, message,
                                   len(event_handle_list) + 1
                                  ) as step:
-            index = 1
-            for event_handle in event_handle_list:
-                step()
-                index += 1
-                self.eventpage(self.report, the_lang, the_title, event_handle)
+            self.report.write_pages(
+                [(self.write_event_page, (the_lang, the_title, event_handle))
+                 for event_handle in event_handle_list],
+                step)
             step()
         self.eventlistpage(self.report, the_lang, the_title, event_types,
                            event_handle_list)
 
+    def write_event_page(self, the_lang, the_title, event_handle):
+        """
+        Write the page of an event, unless it is kept from the last build.
+
+        @param: the_lang     -- The lang to process
+        @param: the_title    -- The title page related to the language
+        @param: event_handle -- The handle of the event
+        """
+        with self.report.page_build(the_lang, Event, event_handle) as build:
+            if build:
+                self.eventpage(self.report, the_lang, the_title, event_handle)
+
     def eventlistpage(self, report, the_lang, the_title,
                       event_types, event_handle_list):
         """
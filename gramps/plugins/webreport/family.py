@@ -109,19 +109,31 @@ class FamilyPages(BasePage):
             LOG.debug("    %s", str(item))
 
         message = _("Creating family pages...")
-        index = 1
         progress_title = self.report.pgrs_title(the_lang)
         with self.r_user.progress(progress_title, message,
                                   len(self.report.obj_dict[Family]) + 1
                                  ) as step:
-            for family_handle in self.report.obj_dict[Family]:
-                step()
-                index += 1
-                self.familypage(self.report, the_lang, the_title, family_handle)
+            self.report.write_pages(
+                [(self.write_family_page, (the_lang, the_title, family_handle))
+                 for family_handle in self.report.obj_dict[Family]],
+                step)
             step()
             self.familylistpage(self.report, the_lang, the_title,
                                 self.report.obj_dict[Family].keys())
 
+    def write_family_page(self, the_lang, the_title, family_handle):
+        """
+        Write the page of a family, unless it is kept from the last build.
+
+        @param: the_lang      -- The lang to process
+        @param: the_title     -- The title page related to the language
+        @param: family_handle -- The handle of the family
+        """
+        with self.report.page_build(the_lang, Family, family_handle) as build:
+            if build:
+                self.familypage(self.report, the_lang, the_title,
+                                family_handle)
+
     def familylistpage(self, report, the_lang, the_title, fam_list):
         """
         Create a family index
@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Narrative Web Page generator.
+
+Incremental builds: only the pages whose objects changed since the last
+build are written again.
+
+Classes:
+    RecordingProxyDb - database proxy recording the objects read for a page
+    RecordingDict    - report data recording the objects looked up for a page
+    BuildManifest    - what the pages of the last build were made from
+"""
+#------------------------------------------------
+# python modules
+#------------------------------------------------
+from collections import defaultdict
+from contextlib import contextmanager
+import gzip
+import json
+import logging
+import os
+
+#------------------------------------------------
+# Gramps module
+#------------------------------------------------
+from gramps.gen.proxy import CacheProxyDb
+
+LOG = logging.getLogger(".NarrativeWeb")
+
+#------------------------------------------------
+# constants
+#------------------------------------------------
+_OBJECTS = ("people", "families", "events", "places", "sources",
+            "citations", "media", "repositories", "notes", "tags")
+
+_GETTERS = ["get_%s_from_%s" % (name, key)
+            for name in ("person", "family", "event", "place", "source",
+                         "citation", "media", "repository", "note", "tag")
+            for key in ("handle", "gramps_id")
+            if (name, key) != ("tag", "gramps_id")]
+
+
+def count_objects(database):
+    """
+    Return the number of objects read by BuildManifest.scan.
+
+    @param: database -- The database of the report
+    """
+    return sum(getattr(database, "get_number_of_" + name)()
+               for name in _OBJECTS)
+
+def write_if_changed(path, data, date):
+    """
+    Write the data to a file, unless the file already holds the same data.
+
+    @param: path -- The path of the file
+    @param: data -- The bytes to write
+    @param: date -- The modification time to give to the file, if not zero
+    """
+    try:
+        with open(path, 'rb') as old_file:
+            if old_file.read() == data:
+                return
+    except IOError:
+        pass
+    with open(path, 'wb') as new_file:
+        new_file.write(data)
+    if date is not None and date > 0:
+        os.utime(path, (date, date))
+
+#------------------------------------------------
+#
+# RecordingProxyDb
+#
+#------------------------------------------------
+class RecordingProxyDb(CacheProxyDb):
+    """
+    A cache proxy that can record the handles of all the objects read.
+
+    The handles are added to the set 'reads' while it is not None.
+    """
+    def __init__(self, database):
+        CacheProxyDb.__init__(self, database)
+        self.reads = None
+
+def _recording_getter(name):
+    """
+    Return a method of RecordingProxyDb reading an object like the method
+    with the given name of CacheProxyDb or of the database, and recording
+    its handle.
+    """
+    def getter(self, value):
+        if hasattr(CacheProxyDb, name):
+            obj = getattr(CacheProxyDb, name)(self, value)
+        else:
+            obj = getattr(self.db, name)(value)
+        if self.reads is not None and obj is not None:
+            self.reads.add(obj.handle)
+        return obj
+    getter.__name__ = name
+    return getter
+
+for _name in _GETTERS:
+    setattr(RecordingProxyDb, _name, _recording_getter(_name))
+
+#------------------------------------------------
+#
+# RecordingDict
+#
+#------------------------------------------------
+class RecordingDict(defaultdict):
+    """
+    The objects, or the back references, of one class in the report.
+
+    The handles looked up are recorded like the objects read from the
+    RecordingProxyDb, with the handles of the back references found.
+    """
+    def __init__(self, database, data, bkrefs=False):
+        """
+        @param: database -- The RecordingProxyDb of the report
+        @param: data     -- The dictionary of the objects of the class
+        @param: bkrefs   -- Whether the values are sets of back references
+        """
+        defaultdict.__init__(self, set, data)
+        self.database = database
+        self.bkrefs = bkrefs
+
+    def __record(self, key, value):
+        """
+        Record a looked up handle, and the back references found.
+        """
+        reads = self.database.reads
+        if reads is not None:
+            reads.add(key)
+            if self.bkrefs and value:
+                reads.update(bkref[1] for bkref in value)
+
+    def __getitem__(self, key):
+        value = defaultdict.__getitem__(self, key)
+        self.__record(key, value)
+        return value
+
+    def __contains__(self, key):
+        self.__record(key, None)
+        return defaultdict.__contains__(self, key)
+
+    def get(self, key, default=None):
+        value = defaultdict.get(self, key, default)
+        self.__record(key, value)
+        return value
+
+#------------------------------------------------
+#
+# BuildManifest
+#
+#------------------------------------------------
+class BuildManifest:
+    """
+    The objects and pages of the last build of a web site.
+
+    The manifest keeps the change time of every object of the database, and
+    for each page written for an object: its files, the handles of the
+    objects read or looked up to write it, and a digest of the other data
+    it shows.  A
+    page needs to be written again if one of the objects it read changed,
+    or was removed, or is now referred to by a new or changed object.
+
+    The manifest is stored next to the web site, in a file with the name of
+    the directory followed by '.manifest.gz'.
+    """
+    VERSION = 1
+
+    def __init__(self, directory, digest):
+        """
+        @param: directory -- The directory of the web site
+        @param: digest    -- A digest of the options of the report; all the
+                             pages are written if they changed
+        """
+        self.directory = directory
+        self.filename = os.path.normpath(directory) + ".manifest.gz"
+        self.digest = digest
+        # handle: change time, as in the last build
+        self.changes = {}
+        # list of the handles in the last build, which the pages refer to
+        self.handles = []
+        # page key: (files, indexes of the handles read, digest)
+        self.pages = {}
+        # indexes of the handles which changed, or None to build everything
+        self.dirty = None
+        # handle: change time, now
+        self.current = {}
+        # page key: (files, handles read or None if the page was kept,
+        #            digest)
+        self.new_pages = {}
+        self.files = None
+        # handle: url of the family map of the person
+        self.fam_link = {}
+
+    def load(self):
+        """
+        Read the manifest of the last build.  Return False if there is none,
+        or if the report options changed since.
+        """
+        try:
+            with gzip.open(self.filename, 'rt', encoding='utf-8') as mfile:
+                data = json.load(mfile)
+        except (IOError, OSError, ValueError) as msg:
+            LOG.debug("No manifest of the last build: %s", msg)
+            return False
+        if (data.get('version') != self.VERSION or
+                data.get('options') != self.digest):
+            return False
+        self.handles = data['handles']
+        self.changes = dict(zip(self.handles, data['changes']))
+        self.pages = data['pages']
+        self.fam_link = data['fam_link']
+        self.dirty = set()
+        return True
+
+    def scan(self, database, included, step):
+        """
+        Read the change time of all the objects, and find those which
+        changed since the last build, if it was loaded.
+
+        @param: database -- The database of the report
+        @param: included -- The handles of the objects with a page, for the
+                            name of each class
+        @param: step     -- Function called for each object of the database
+        """
+        dirty = set()
+        for name in _OBJECTS:
+            for obj in getattr(database, "iter_" + name)():
+                step()
+                self.current[obj.handle] = obj.change
+                if (self.dirty is not None and
+                        self.changes.get(obj.handle) != obj.change):
+                    # the pages of the objects it refers to may now list it
+                    dirty.add(obj.handle)
+                    dirty.update(handle for dummy, handle
+                                 in obj.get_referenced_handles_recursively())
+        if self.dirty is None:
+            return
+        dirty.update(handle for handle in self.changes
+                     if handle not in self.current)
+        # objects which got or lost a page are linked to differently
+        built = {}
+        for key in self.pages:
+            dummy_lang, name, handle = key.split('/', 2)
+            built.setdefault(name, set()).add(handle)
+        for name, handles in built.items():
+            dirty.update(handles.symmetric_difference(included.get(name, ())))
+        index = dict((handle, idx) for idx, handle in enumerate(self.handles))
+        self.dirty = set(index[handle] for handle in dirty
+                         if handle in index)
+
+    def is_current(self, key, digest):
+        """
+        Return True if the page with the given key and digest does not need
+        to be written again.
+        """
+        if key in self.new_pages:
+            # written for another name of the same place
+            return self.new_pages[key][1] is None
+        if self.dirty is None:
+            return False
+        page = self.pages.get(key)
+        if (page is None or page[2] != digest or
+                not self.dirty.isdisjoint(page[1]) or
+                not all(os.path.exists(os.path.join(self.directory, fname))
+                        for fname in page[0])):
+            return False
+        self.new_pages[key] = (page[0], None, digest)
+        return True
+
+    @contextmanager
+    def record(self, database, key, digest, handle):
+        """
+        Record the files written and the objects read for the page of the
+        object with the given handle.
+        """
+        files, reads, digest = self.new_pages.get(key, ([], set(), digest))
+        reads.add(handle)
+        self.files = files
+        database.reads = reads
+        try:
+            yield
+        finally:
+            self.new_pages[key] = (files, reads, digest)
+            database.reads = None
+            self.files = None
+
+    def merge(self, new_pages):
+        """
+        Add the pages recorded by a worker process.
+
+        @param: new_pages -- The pages kept or written by the process
+        """
+        for key, (files, reads, digest) in new_pages.items():
+            page = self.new_pages.get(key)
+            if page is None or page[1] is None or reads is None:
+                self.new_pages[key] = (files, reads, digest)
+            else:
+                page[0].extend(files)
+                page[1].update(reads)
+
+    def add_file(self, path):
+        """
+        Add a file to the page being recorded.
+
+        @param: path -- The path of the file, in the web site
+        """
+        if self.files is not None:
+            self.files.append(os.path.relpath(path, self.directory))
+
+    def remove_old_pages(self):
+        """
+        Remove the files of the pages of the last build which were neither
+        kept nor written again, like those of removed objects.
+        """
+        used = set()
+        for files, dummy_reads, dummy_digest in self.new_pages.values():
+            used.update(files)
+        for key, page in self.pages.items():
+            if key in self.new_pages:
+                continue
+            for fname in page[0]:
+                if fname not in used:
+                    try:
+                        os.remove(os.path.join(self.directory, fname))
+                    except OSError:
+                        pass
+
+    def save(self):
+        """
+        Write the manifest of the build.
+        """
+        handles = sorted(self.current)
+        index = dict((handle, idx) for idx, handle in enumerate(handles))
+        pages = {}
+        for key, (files, reads, digest) in self.new_pages.items():
+            if reads is None:
+                reads = [self.handles[idx] for idx in self.pages[key][1]]
+            pages[key] = (files,
+                          sorted(index[handle] for handle in reads
+                                 if handle in index),
+                          digest)
+        data = {'version': self.VERSION,
+                'options': self.digest,
+                'handles': handles,
+                'changes': [self.current[handle] for handle in handles],
+                'pages': pages,
+                'fam_link': self.fam_link}
+        temp = self.filename + ".new"
+        with gzip.open(temp, 'wt', encoding='utf-8') as mfile:
+            json.dump(data, mfile)
+        os.replace(temp, self.filename)
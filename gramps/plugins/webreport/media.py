@@ -44,7 +44,6 @@ Classe:
 #------------------------------------------------
 import gc
 import os
-import shutil
 import tempfile
 from collections import defaultdict
 from decimal import getcontext
@@ -66,7 +65,7 @@ from gramps.plugins.lib.libhtml import Html
 #------------------------------------------------
 from gramps.plugins.webreport.basepage import BasePage
 from gramps.plugins.webreport.common import (FULLCLEAR, _WRONGMEDIAPATH,
-                                             html_escape)
+                                             html_escape, missing_media_title)
 
 _ = glocale.translation.sgettext
 LOG = logging.getLogger(".NarrativeWeb")
@@ -145,11 +144,11 @@ class MediaPages(BasePage):
                 self.report.obj_dict[Media].keys(),
                 key=lambda x: sort_by_desc_and_gid(
                     self.r_db.get_media_from_handle(x)))
+            pages = []
             prev = None
             total = len(sorted_media_handles)
             index = 1
             for handle in sorted_media_handles:
-                gc.collect() # Reduce memory usage when there are many images.
                 if index == media_count:
                     next_ = None
                 elif index < total:
@@ -158,10 +157,10 @@ class MediaPages(BasePage):
                     next_ = self.unused_media_handles[0]
                 else:
                     next_ = None
-                self.mediapage(self.report, the_lang, the_title,
-                               handle, (prev, next_, index, media_count))
+                pages.append((self.write_media_page,
+                              (the_lang, the_title, handle,
+                               (prev, next_, index, media_count))))
                 prev = handle
-                step()
                 index += 1
 
             total = len(self.unused_media_handles)
@@ -170,22 +169,37 @@ class MediaPages(BasePage):
             prev = sorted_media_handles[total_m-1] if total_m > 0 else 0
             if total > 0:
                 for media_handle in self.unused_media_handles:
-                    gc.collect() # Reduce memory usage when many images.
                     if index == media_count:
                         next_ = None
                     else:
                         next_ = self.unused_media_handles[idx]
-                    self.mediapage(self.report, the_lang, the_title,
-                                   media_handle,
-                                   (prev, next_, index, media_count))
+                    pages.append((self.write_media_page,
+                                  (the_lang, the_title, media_handle,
+                                   (prev, next_, index, media_count))))
                     prev = media_handle
-                    step()
                     index += 1
                     idx += 1
+            self.report.write_pages(pages, step)
 
         self.medialistpage(self.report, the_lang, the_title,
                            sorted_media_handles)
 
+    def write_media_page(self, the_lang, the_title, handle, info):
+        """
+        Write the page of a media object, unless it is kept from the last
+        build.
+
+        @param: the_lang  -- The lang to process
+        @param: the_title -- The title page related to the language
+        @param: handle    -- The handle of the media object
+        @param: info      -- A tuple (prev, next, page number, total pages)
+        """
+        gc.collect() # Reduce memory usage when there are many images.
+        with self.report.page_build(the_lang, Media, handle, info) as build:
+            if build:
+                self.mediapage(self.report, the_lang, the_title, handle,
+                               info)
+
     def medialistpage(self, report, the_lang, the_title, sorted_media_handles):
         """
         Generate and output the Media index page.
@@ -684,23 +698,9 @@ class MediaPages(BasePage):
             _WRONGMEDIAPATH.append([photo.get_gramps_id(), fullpath])
             return None
         try:
-            mtime = os.stat(fullpath).st_mtime
-            if self.report.archive:
-                if str(newpath) not in self.report.archive.getnames():
-                    # The current file not already archived.
-                    self.report.archive.add(fullpath, str(newpath))
-            else:
-                to_dir = os.path.join(self.html_dir, to_dir)
-                if not os.path.isdir(to_dir):
-                    os.makedirs(to_dir)
-                new_file = os.path.join(self.html_dir, newpath)
-                if not os.path.exists(newpath):
-                    shutil.copyfile(fullpath, new_file)
-                    os.utime(new_file, (mtime, mtime))
+            self.report.copy_source_file(fullpath, newpath,
+                                         missing_media_title(photo))
             return newpath
         except (IOError, OSError) as msg:
-            error = _("Missing media object:"
-                     ) + "%s (%s)" % (photo.get_description(),
-                                      photo.get_gramps_id())
-            self.r_user.warn(error, str(msg))
+            self.r_user.warn(missing_media_title(photo), str(msg))
             return None
@@ -48,6 +48,7 @@ Classes:
 #------------------------------------------------
 import logging
 from functools import partial
+import multiprocessing
 import os
 import sys
 import time
@@ -55,7 +56,9 @@ import shutil
 import tarfile
 from io import BytesIO, TextIOWrapper
 from collections import defaultdict
+from contextlib import contextmanager
 from decimal import getcontext
+from hashlib import md5
 
 #------------------------------------------------
 # Gramps module
@@ -76,12 +79,19 @@ from gramps.gen.plug.report import MenuReportOptions
 from gramps.gen.plug.report import stdoptions
 from gramps.gen.constfunc import win, get_curr_dir
 from gramps.gen.config import config
+from gramps.gen.db.dbconst import DBMODE_R
+from gramps.gen.db.generic import DbGeneric
+from gramps.gen.db.utils import get_dbid_from_path, make_database
 from gramps.gen.datehandler import displayer as _dd
 from gramps.gen.display.name import displayer as _nd
 from gramps.gen.display.place import displayer as _pd
-from gramps.gen.proxy import CacheProxyDb
 from gramps.plugins.lib.libhtmlconst import _CHARACTER_SETS, _CC, _COPY_OPTIONS
 from gramps.gen.relationship import get_relationship_calculator
+from gramps.gen.mime import is_image_type
+from gramps.gen.utils.file import media_path_full
+from gramps.gen.utils.thumbnails import (prefetch_thumbnails,
+                                         stop_thumbnail_threads)
+from gramps.version import VERSION
 
 #------------------------------------------------
 # specific narrative web import
@@ -108,11 +118,17 @@ from gramps.plugins.webreport.introduction import IntroductionPage
 from gramps.plugins.webreport.addressbook import AddressBookPage
 from gramps.plugins.webreport.addressbooklist import AddressBookListPage
 from gramps.plugins.webreport.calendar import CalendarPage
+from gramps.plugins.webreport.incremental import (RecordingProxyDb,
+                                                  RecordingDict,
+                                                  BuildManifest,
+                                                  count_objects,
+                                                  write_if_changed)
 
 from gramps.plugins.webreport.common import (get_gendex_data,
                                              HTTP, HTTPS, _WEB_EXT, CSS,
                                              _NARRATIVESCREEN, _NARRATIVEPRINT,
-                                             _WRONGMEDIAPATH, sort_people)
+                                             _WRONGMEDIAPATH, sort_people,
+                                             name_to_md5)
 
 LOG = logging.getLogger(".NarrativeWeb")
 _ = glocale.translation.sgettext
@@ -124,6 +140,13 @@ getcontext().prec = 8
 _DEFAULT_MAX_IMG_WIDTH = 800   # resize images that are wider than this
 _DEFAULT_MAX_IMG_HEIGHT = 600  # resize images that are taller than this
                                # The two values above are settable in options.
+
+# Number of pages written by a task of a worker process
+TASK_SIZE = 20
+
+# Minimum number of pages for the pages to be written by worker processes
+PARALLEL_THRESHOLD = 200
+
 class NavWebReport(Report):
     """
     Create WebReport object that produces the report.
@@ -151,7 +174,7 @@ class NavWebReport(Report):
 
         stdoptions.run_private_data_option(self, menu)
         stdoptions.run_living_people_option(self, menu)
-        self.database = CacheProxyDb(self.database)
+        self.database = RecordingProxyDb(self.database)
         self._db = self.database
 
         filters_option = menu.get_option_by_name('filter')
@@ -276,6 +299,11 @@ class NavWebReport(Report):
         else:
             self.html_dir = self.target_path
         self.warn_dir = True       # Only give warning once.
+        self.manifest = None       # Only for incremental builds: what the
+                                   # pages of the last build were made from.
+        self.collector = None      # Only in worker processes: the files and
+                                   # other output of the pages, for the main
+                                   # process.
         self.obj_dict = None
         self.visited = None
         self.bkref_dict = None
@@ -299,9 +327,9 @@ class NavWebReport(Report):
         #pr = cProfile.Profile()
         #pr.enable()
         # end performance check
-        global _WRONGMEDIAPATH
 
-        _WRONGMEDIAPATH = []
+        # the list the media pages add to, also for the worker processes
+        del _WRONGMEDIAPATH[:]
         if not self.use_archive:
             dir_name = self.target_path
             if dir_name is None:
@@ -347,6 +375,8 @@ class NavWebReport(Report):
                        ) % image_dir_name + "\n" + str(exception)
                 self.user.notify_error(msg)
                 return
+            if self.options['incremental']:
+                self.manifest = BuildManifest(dir_name, self._options_digest())
         else:
             if os.path.isdir(self.target_path):
                 self.user.notify_error(
@@ -449,6 +479,12 @@ class NavWebReport(Report):
                 if media:
                     self._add_media(media.handle, Media, media.handle)
 
+        if self.manifest:
+            self._scan_changes()
+
+        if self.inc_gallery:
+            self._prefetch_thumbnails()
+
         #################################################
         #
         # Pass 2 Generate the web pages
@@ -537,6 +573,11 @@ class NavWebReport(Report):
         # copy all of the necessary files
         self.copy_narrated_files()
 
+        if self.manifest:
+            self.manifest.remove_old_pages()
+            self.manifest.fam_link = self.fam_link
+            self.manifest.save()
+
         # if an archive is being used, close it?
         if self.archive:
             self.archive.close()
@@ -555,6 +596,99 @@ class NavWebReport(Report):
         #pr.print_stats()
         # end print performance check
 
+    def _options_digest(self):
+        """
+        Return a digest of the options of the report: all the pages are
+        written again when they change.
+        """
+        options = sorted((name, str(value))
+                         for name, value in self.options.items()
+                         if name != 'incremental')
+        return md5(str((VERSION, options)).encode('utf-8')).hexdigest()
+
+    def _scan_changes(self):
+        """
+        Find the objects which changed since the last incremental build.
+        """
+        included = {}
+        for obj_class in (Person, Family, Event, Place, Source, Repository):
+            included[obj_class.__name__] = set(self.obj_dict[obj_class])
+        if self.inc_unused_gallery:
+            included["Media"] = set(self.database.iter_media_handles())
+        else:
+            included["Media"] = set(self.obj_dict[Media])
+        # the pages show the names of the objects they link to, from here
+        for obj_class in list(self.obj_dict):
+            self.obj_dict[obj_class] = RecordingDict(
+                self.database, self.obj_dict[obj_class])
+        for obj_class in list(self.bkref_dict):
+            self.bkref_dict[obj_class] = RecordingDict(
+                self.database, self.bkref_dict[obj_class], bkrefs=True)
+        if self.manifest.load():
+            # the family map links of the person pages which are kept
+            self.fam_link.update(self.manifest.fam_link)
+        message = _("Looking for changes")
+        with self.user.progress(self.pgrs_title(None), message,
+                                count_objects(self.database)) as step:
+            self.manifest.scan(self.database, included, step)
+
+    def _prefetch_thumbnails(self):
+        """
+        Start creating the thumbnails of the media in the background, while
+        the pages are written: those of the media pages, and those of the
+        regions of the first image of the objects referring to them.
+        """
+        media = []
+        for media_handle in self.obj_dict[Media]:
+            photo = self._db.get_media_from_handle(media_handle)
+            mime_type = photo.get_mime_type()
+            if not mime_type:
+                continue
+            full_path = media_path_full(self._db, photo.get_path())
+            media.append((full_path, mime_type, None))
+            if not is_image_type(mime_type):
+                continue
+            for bkref in self.bkref_dict[Media][media_handle]:
+                obj = self._db.method("get_%s_from_handle",
+                                      bkref[0].__name__)(bkref[1])
+                media_list = obj.get_media_list() if obj else []
+                if media_list and media_list[0].ref == media_handle:
+                    for mediaref in media_list:
+                        if (mediaref.ref == media_handle and
+                                mediaref.rect is not None):
+                            media.append((full_path, mime_type,
+                                          mediaref.rect))
+                            break
+        prefetch_thumbnails(media)
+
+    @contextmanager
+    def page_build(self, the_lang, obj_class, handle, *args):
+        """
+        Tell if the page of an object needs to be written.  In an
+        incremental build, the page does not if nothing it shows changed
+        since the last build; otherwise the files written and the objects
+        read for the page are recorded.
+
+        @param: the_lang  -- The lang to process
+        @param: obj_class -- The class of the object, or the name of the page
+        @param: handle    -- The handle of the object
+        @param: args      -- Other data shown in the page
+        """
+        if self.manifest is None:
+            yield True
+            return
+        if isinstance(obj_class, str):
+            name = obj_class
+        else:
+            name = obj_class.__name__
+        key = "%s/%s/%s" % (the_lang or "", name, handle)
+        digest = md5(str(args).encode('utf-8')).hexdigest()
+        if self.manifest.is_current(key, digest):
+            yield False
+        else:
+            with self.manifest.record(self.database, key, digest, handle):
+                yield True
+
     def _build_obj_dict(self):
         """
         Construct the dictionaries of objects to be included in the reports.
@@ -1269,12 +1403,25 @@ class NavWebReport(Report):
             SurnameListPage(self, the_lang, the_title, ind_list,
                             SurnameListPage.ORDER_BY_COUNT, "surnames_count")
 
-            index = 1
-            for (surname, handle_list) in local_list:
-                SurnamePage(self, the_lang, the_title, surname,
-                            sorted(handle_list))
-                step()
-                index += 1
+            self.write_pages(
+                [(self.surname_page,
+                  (the_lang, the_title, surname, sorted(handle_list)))
+                 for (surname, handle_list) in local_list],
+                step)
+
+    def surname_page(self, the_lang, the_title, surname, handle_list):
+        """
+        Write the page of a surname, unless it is kept from the last build.
+
+        @param: the_lang    -- The lang to process
+        @param: the_title   -- The title page for the lang
+        @param: surname     -- The surname
+        @param: handle_list -- The sorted handles of the people
+        """
+        with self.page_build(the_lang, "Surname", name_to_md5(surname),
+                             handle_list) as build:
+            if build:
+                SurnamePage(self, the_lang, the_title, surname, handle_list)
 
     def thumbnail_preview_page(self):
         """
@@ -1673,6 +1820,7 @@ class NavWebReport(Report):
                     self.cur_fname = fname + ext
         if self.archive:
             string_io = BytesIO()
+            string_io.path = None
             output_file = TextIOWrapper(string_io, encoding=self.encoding,
                                         errors='xmlcharrefreplace')
         else:
@@ -1699,8 +1847,16 @@ class NavWebReport(Report):
             dir_name = os.path.dirname(fname)
             if not os.path.isdir(dir_name):
                 os.makedirs(dir_name)
-            output_file = open(fname, 'w', encoding=self.encoding,
-                               errors='xmlcharrefreplace')
+            if self.manifest or self.collector is not None:
+                # written in close_file, if the page changed, or by the main
+                # process
+                string_io = BytesIO()
+                string_io.path = fname
+                output_file = TextIOWrapper(string_io, encoding=self.encoding,
+                                            errors='xmlcharrefreplace')
+            else:
+                output_file = open(fname, 'w', encoding=self.encoding,
+                                   errors='xmlcharrefreplace')
         return (output_file, string_io)
 
     def close_file(self, output_file, string_io, date):
@@ -1708,29 +1864,55 @@ class NavWebReport(Report):
         will close any file passed to it
 
         @param: output_file -- The output file to flush
-        @param: string_io   -- The string IO used when we are in archive mode
+        @param: string_io   -- The string IO used when we are in archive or
+                               incremental mode, or in a worker process
         @param: date        -- The last modification date for this object
                                If we have "zero", we use the current time.
                                This is related to bug 8950 and very useful
                                when we use rsync.
         """
+        if string_io is None:
+            output_file.close()
+            if date is not None and date > 0:
+                os.utime(output_file.name, (date, date))
+            return
+        output_file.flush()
+        if self.collector is not None:
+            self.collector.append(("write", self.cur_fname, string_io.path,
+                                   string_io.getvalue(), date))
+        else:
+            self.write_file(self.cur_fname, string_io.path,
+                            string_io.getvalue(), date)
+        if self.manifest:
+            self.manifest.add_file(string_io.path)
+        output_file.close()
+
+    def write_file(self, cur_fname, fname, data, date):
+        """
+        Write the content of a page to the archive or to its file.
+
+        @param: cur_fname -- The name of the file in the archive
+        @param: fname     -- The path of the file, if not in an archive
+        @param: data      -- The encoded content of the page
+        @param: date      -- The last modification date for this object
+        """
         if self.archive:
-            if self.cur_fname not in self.archive.getnames():
+            if cur_fname not in self.archive.getnames():
                 # The current file not already archived.
-                output_file.flush()
-                tarinfo = tarfile.TarInfo(self.cur_fname)
-                tarinfo.size = len(string_io.getvalue())
+                tarinfo = tarfile.TarInfo(cur_fname)
+                tarinfo.size = len(data)
                 tarinfo.mtime = date if date != 0 else time.time()
                 if not win():
                     tarinfo.uid = os.getuid()
                     tarinfo.gid = os.getgid()
-                string_io.seek(0)
-                self.archive.addfile(tarinfo, string_io)
-            output_file.close()
+                self.archive.addfile(tarinfo, BytesIO(data))
+        elif self.manifest:
+            write_if_changed(fname, data, date)
         else:
-            output_file.close()
+            with open(fname, 'wb') as output_file:
+                output_file.write(data)
             if date is not None and date > 0:
-                os.utime(output_file.name, (date, date))
+                os.utime(fname, (date, date))
 
     def prepare_copy_media(self, photo):
         """
@@ -1760,6 +1942,9 @@ class NavWebReport(Report):
         @param: to_dir     -- Is the relative path name in the destination root.
                               It will be prepended before 'to_fname'.
         """
+        if self.collector is not None:
+            self.collector.append(("copy", from_fname, to_fname, to_dir))
+            return
         if self.usecms:
             to_dir = "/".join([self.target_uri, to_dir])
         LOG.debug("copying '%s' to '%s/%s'", from_fname, to_dir, to_fname)
@@ -1808,6 +1993,122 @@ class NavWebReport(Report):
                       "web pages."))
                 self.warn_dir = False
 
+    def copy_source_file(self, from_fname, to_fname, title=""):
+        """
+        Copy the file of a media object to the web site.
+
+        @param: from_fname -- The path of the file to copy.
+        @param: to_fname   -- The path of the copy in the destination root.
+        @param: title      -- The title of the warning given if the file
+                              cannot be copied by the main process
+        """
+        mtime = os.stat(from_fname).st_mtime
+        if self.manifest:
+            self.manifest.add_file(os.path.join(self.html_dir, to_fname))
+        if self.collector is not None:
+            self.collector.append(("media", from_fname, to_fname, title))
+        elif self.archive:
+            if str(to_fname) not in self.archive.getnames():
+                # The current file not already archived.
+                self.archive.add(from_fname, str(to_fname))
+        else:
+            to_dir = os.path.join(self.html_dir, os.path.dirname(to_fname))
+            if not os.path.isdir(to_dir):
+                os.makedirs(to_dir)
+            new_file = os.path.join(self.html_dir, to_fname)
+            if not os.path.exists(to_fname):
+                shutil.copyfile(from_fname, new_file)
+                os.utime(new_file, (mtime, mtime))
+
+    def get_processes(self, count):
+        """
+        Return the number of worker processes writing the pages, set by the
+        'behavior.report-processes' option, or 0 if the pages should be
+        written by this process: the option is not set, the report is run
+        from the user interface, the database is not a SQLite family tree,
+        the processes cannot be forked from this one, or there are too few
+        pages to benefit.
+
+        The workers are forked, with the state of the report, so they are
+        only used from the command line: the process of the user interface
+        has threads and a main loop which a forked process cannot use.
+
+        @param: count -- The number of pages
+        """
+        processes = config.get('behavior.report-processes')
+        if (processes < 2 or count < PARALLEL_THRESHOLD or
+                self.collector is not None or
+                getattr(self.user, 'uistate', None) is not None or
+                'fork' not in multiprocessing.get_all_start_methods()):
+            return 0
+        database = self.database
+        while not isinstance(database, DbGeneric):
+            database = getattr(database, 'db', None)
+            if database is None:
+                return 0
+        directory = database.get_save_path()
+        if (not directory or directory == ':memory:' or
+                get_dbid_from_path(directory) != 'sqlite'):
+            return 0
+        return processes
+
+    def write_pages(self, pages, cb_progress):
+        """
+        Write the pages of the objects of a class.
+
+        They are written by worker processes when there are many, each
+        opening its own read-only connection to the family tree, and
+        writing the pages with the state of this report when they were
+        forked.  The files and the other output of the pages are sent back
+        to this process, which writes them in the order of the pages, as
+        when it writes the pages itself.
+
+        @param: pages       -- List of (function, arguments) writing a page
+        @param: cb_progress -- The step used for the progress bar
+        """
+        processes = self.get_processes(len(pages))
+        if not processes:
+            for function, args in pages:
+                function(*args)
+                cb_progress()
+            return
+        tasks = [(start, min(start + TASK_SIZE, len(pages)))
+                 for start in range(0, len(pages), TASK_SIZE)]
+        # no thread of this process may hold a lock when it is forked
+        stop_thumbnail_threads()
+        context = multiprocessing.get_context('fork')
+        with context.Pool(processes, _init_worker, (self, pages)) as pool:
+            for (start, stop), output in zip(tasks,
+                                             pool.imap(_write_pages, tasks)):
+                self.__collect(*output)
+                for dummy in range(start, stop):
+                    cb_progress()
+
+    def __collect(self, collector, new_pages, missing_media):
+        """
+        Write the output of the pages of a task of a worker process.
+        """
+        for output in collector:
+            if output[0] == "write":
+                self.write_file(*output[1:])
+            elif output[0] == "copy":
+                self.copy_file(*output[1:])
+            elif output[0] == "media":
+                try:
+                    self.copy_source_file(output[1], output[2])
+                except (IOError, OSError) as msg:
+                    self.user.warn(output[3], str(msg))
+            elif output[0] == "warn":
+                self.user.warn(*output[1:])
+            elif output[2] is None:
+                # a family map link removed
+                self.fam_link.pop(output[1], None)
+            else:
+                self.fam_link[output[1]] = output[2]
+        if self.manifest:
+            self.manifest.merge(new_pages)
+        _WRONGMEDIAPATH.extend(missing_media)
+
     def person_in_webreport(self, person_handle):
         """
         Return the handle if we created a page for this person.
@@ -1829,6 +2130,84 @@ class NavWebReport(Report):
         else:
             return _("Narrative Web Site Report")
 
+#------------------------------------------------
+#
+# Worker processes
+#
+#------------------------------------------------
+
+# Report and pages of a worker process, None in the main process
+_REPORT = None
+_PAGES = None
+
+class _WorkerUser:
+    """
+    Minimal user object of a worker process, which sends the warnings to
+    the main process.
+    """
+    def __init__(self, report):
+        self.report = report
+
+    def warn(self, title, warning=""):
+        self.report.collector.append(("warn", title, warning))
+
+class _WorkerLinks(dict):
+    """
+    The family map links of a worker process, with the changes sent to the
+    main process, as the family pages use the links of the person pages.
+    """
+    def __init__(self, report):
+        dict.__init__(self, report.fam_link)
+        self.report = report
+
+    def __setitem__(self, handle, url):
+        dict.__setitem__(self, handle, url)
+        self.report.collector.append(("link", handle, url))
+
+    def pop(self, handle, *default):
+        self.report.collector.append(("link", handle, None))
+        return dict.pop(self, handle, *default)
+
+def _init_worker(report, pages):
+    """
+    Replace the family tree of the report forked by a worker process with
+    a read-only connection of its own.
+    """
+    global _REPORT, _PAGES
+    forked = report.database
+    while not isinstance(forked, DbGeneric):
+        forked = forked.db
+    database = make_database('sqlite')
+    database.load(forked.get_save_path(), mode=DBMODE_R, update=False)
+    proxy = report.database
+    while proxy is not forked:
+        if getattr(proxy, 'basedb', None) is forked:
+            proxy.basedb = database
+        next_proxy = proxy.db
+        if next_proxy is forked:
+            proxy.db = database
+        proxy = next_proxy
+    report.user = _WorkerUser(report)
+    report.collector = []
+    report.fam_link = _WorkerLinks(report)
+    _REPORT = report
+    _PAGES = pages
+
+def _write_pages(task):
+    """
+    Write the pages of a task, and return their output, the pages recorded
+    by an incremental build, and the media files found missing.
+    """
+    start, stop = task
+    _REPORT.collector = collector = []
+    if _REPORT.manifest:
+        _REPORT.manifest.new_pages = {}
+    missing = len(_WRONGMEDIAPATH)
+    for function, args in _PAGES[start:stop]:
+        function(*args)
+    new_pages = _REPORT.manifest.new_pages if _REPORT.manifest else None
+    return collector, new_pages, _WRONGMEDIAPATH[missing:]
+
 #################################################
 #
 #    Creates the NarrativeWeb Report Menu Options
@@ -1845,6 +2224,7 @@ class NavWebOptions(MenuReportOptions):
         """
         self.__db = dbase
         self.__archive = None
+        self.__incremental = None
         self.__target = None
         self.__target_uri = None
         self.__pid = None
@@ -1957,6 +2337,14 @@ class NavWebOptions(MenuReportOptions):
                                  "files"))
         addopt("target", self.__target)
 
+        self.__incremental = BooleanOption(
+            _('Only update the pages of changed objects'), False)
+        self.__incremental.set_help(_('Whether to keep the pages of the '
+                                      'objects which did not change since '
+                                      'the last time the web site was '
+                                      'created in the destination directory'))
+        addopt("incremental", self.__incremental)
+
         self.__archive_changed()
 
         title = StringOption(_("Web site title"), _('My Family Tree'))
@@ -2661,8 +3049,10 @@ class NavWebOptions(MenuReportOptions):
         if self.__archive.get_value() is True:
             self.__target.set_extension(".tar.gz")
             self.__target.set_directory_entry(False)
+            self.__incremental.set_available(False)
         else:
             self.__target.set_directory_entry(True)
+            self.__incremental.set_available(True)
             # We don't use an archive. If usecms is True, set it to False
             if self.__usecms:
                 self.__usecms.set_value(False)
@@ -151,16 +151,29 @@ class PersonPages(BasePage):
         with self.r_user.progress(progress_title, message,
                                   len(self.report.obj_dict[Person]) + 1
                                  ) as step:
-            index = 1
-            for person_handle in sorted(self.report.obj_dict[Person]):
-                step()
-                index += 1
-                person = self.r_db.get_person_from_handle(person_handle)
-                self.individualpage(self.report, the_lang, the_title, person)
+            self.report.write_pages(
+                [(self.write_person_page, (the_lang, the_title, person_handle))
+                 for person_handle in sorted(self.report.obj_dict[Person])],
+                step)
             step()
             self.individuallistpage(self.report, the_lang, the_title,
                                     self.report.obj_dict[Person].keys())
 
+    def write_person_page(self, the_lang, the_title, person_handle):
+        """
+        Write the page of a person, unless it is kept from the last build.
+
+        @param: the_lang      -- The lang to process
+        @param: the_title     -- The title page related to the language
+        @param: person_handle -- The handle of the person
+        """
+        with self.report.page_build(the_lang, Person, person_handle) as build:
+            if build:
+                # a link to the family map kept from the last build
+                self.report.fam_link.pop(person_handle, None)
+                person = self.r_db.get_person_from_handle(person_handle)
+                self.individualpage(self.report, the_lang, the_title, person)
+
 #################################################
 #
 #    creates the Individual List Page
@@ -126,16 +126,30 @@ class PlacePages(BasePage):
         with self.r_user.progress(progress_title, message,
                                   len(self.report.obj_dict[Place]) + 1
                                  ) as step:
-            index = 1
-            for place_name in self.report.obj_dict[PlaceName].keys():
-                step()
-                p_handle = self.report.obj_dict[PlaceName][place_name]
-                index += 1
-                self.placepage(self.report, the_lang, the_title, p_handle[0],
-                               place_name)
+            place_names = self.report.obj_dict[PlaceName]
+            self.report.write_pages(
+                [(self.write_place_page,
+                  (the_lang, the_title, place_names[place_name][0],
+                   place_name))
+                 for place_name in place_names.keys()],
+                step)
             step()
             self.placelistpage(self.report, the_lang, the_title)
 
+    def write_place_page(self, the_lang, the_title, place_handle, place_name):
+        """
+        Write the page of a place, unless it is kept from the last build.
+
+        @param: the_lang     -- The lang to process
+        @param: the_title    -- The title page related to the language
+        @param: place_handle -- The handle of the place
+        @param: place_name   -- The name of the place
+        """
+        with self.report.page_build(the_lang, Place, place_handle) as build:
+            if build:
+                self.placepage(self.report, the_lang, the_title, place_handle,
+                               place_name)
+
     def placelistpage(self, report, the_lang, the_title):
         """
         Create a place index
@@ -120,13 +120,26 @@ class RepositoryPages(BasePage):
             self.repositorylistpage(self.report, the_lang, the_title,
                                     repos_dict, keys)
 
-            idx = 1
-            for dummy_index, key in enumerate(keys):
-                (repo, handle) = repos_dict[key]
-                step()
-                idx += 1
-                self.repositorypage(self.report, the_lang, the_title,
-                                    repo, handle)
+            self.report.write_pages(
+                [(self.write_repository_page,
+                  (the_lang, the_title) + repos_dict[key])
+                 for key in keys],
+                step)
+
+    def write_repository_page(self, the_lang, the_title, repo, handle):
+        """
+        Write the page of a repository, unless it is kept from the last
+        build.
+
+        @param: the_lang  -- The lang to process
+        @param: the_title -- The title page related to the language
+        @param: repo      -- The repository
+        @param: handle    -- The handle of the repository
+        """
+        with self.report.page_build(the_lang, Repository, handle) as build:
+            if build:
+                self.repositorypage(self.report, the_lang, the_title, repo,
+                                    handle)
 
     def repositorylistpage(self, report, the_lang, the_title, repos_dict, keys):
         """
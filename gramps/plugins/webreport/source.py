@@ -110,11 +110,23 @@ class SourcePages(BasePage):
             self.sourcelistpage(self.report, the_lang, the_title,
                                 self.report.obj_dict[Source].keys())
 
-            index = 1
-            for source_handle in self.report.obj_dict[Source]:
-                step()
-                index += 1
-                self.sourcepage(self.report, the_lang, the_title, source_handle)
+            self.report.write_pages(
+                [(self.write_source_page, (the_lang, the_title, source_handle))
+                 for source_handle in self.report.obj_dict[Source]],
+                step)
+
+    def write_source_page(self, the_lang, the_title, source_handle):
+        """
+        Write the page of a source, unless it is kept from the last build.
+
+        @param: the_lang      -- The lang to process
+        @param: the_title     -- The title page related to the language
+        @param: source_handle -- The handle of the source
+        """
+        with self.report.page_build(the_lang, Source, source_handle) as build:
+            if build:
+                self.sourcepage(self.report, the_lang, the_title,
+                                source_handle)
 
     def sourcelistpage(self, report, the_lang, the_title, source_handles):
         """
@@ -0,0 +1,145 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest for the manifest of incremental Narrated Web Site builds.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import tempfile
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.const import DATA_DIR
+from gramps.gen.db import DbTxn
+from gramps.gen.db.utils import import_as_dict
+from gramps.cli.user import User
+from gramps.plugins.webreport.incremental import (RecordingProxyDb,
+                                                  RecordingDict,
+                                                  BuildManifest)
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+
+class BuildManifestTest(unittest.TestCase):
+    """
+    Build the pages of two people with a manifest, and check which pages
+    are kept by the next builds.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmpdir.name, "web")
+        os.mkdir(self.directory)
+        home = self.db.get_default_person()
+        family = self.db.get_family_from_handle(
+            home.get_main_parents_family_handle())
+        self.father = self.db.get_person_from_handle(family.father_handle)
+        self.mother = self.db.get_person_from_handle(family.mother_handle)
+        self.people = {home.handle: "home", self.father.handle: "father"}
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def build(self, digest="options"):
+        """
+        Build the pages of the people, reading the people shown in the
+        page of the home person from the database, and looking the name of
+        the mother up in the report data.  Return the pages written.
+        """
+        database = RecordingProxyDb(self.db)
+        names = RecordingDict(database, {self.mother.handle: "mother"})
+        manifest = BuildManifest(self.directory, digest)
+        manifest.load()
+        manifest.scan(database, {"Person": set(self.people)}, lambda: None)
+        written = []
+        for handle, name in sorted(self.people.items()):
+            key = "/Person/" + handle
+            if manifest.is_current(key, ""):
+                continue
+            with manifest.record(database, key, "", handle):
+                path = os.path.join(self.directory, name + ".html")
+                with open(path, "w") as page:
+                    if name == "home":
+                        page.write(database.get_person_from_handle(
+                            self.father.handle).gramps_id)
+                        page.write(names[self.mother.handle])
+                manifest.add_file(path)
+            written.append(name)
+        manifest.remove_old_pages()
+        manifest.save()
+        return written
+
+    def test_unchanged(self):
+        self.assertEqual(self.build(), ["father", "home"])
+        self.assertEqual(self.build(), [])
+        self.assertEqual(self.build("other options"), ["father", "home"])
+        os.remove(os.path.join(self.directory, "father.html"))
+        self.assertEqual(self.build("other options"), ["father"])
+
+    def test_changed(self):
+        self.build()
+        try:
+            with DbTxn("Change the father", self.db) as trans:
+                self.db.commit_person(self.father, trans)
+            self.assertEqual(self.build(), ["father", "home"])
+            with DbTxn("Change the mother", self.db) as trans:
+                self.db.commit_person(self.mother, trans)
+            self.assertEqual(self.build(), ["home"])
+            self.assertEqual(self.build(), [])
+        finally:
+            self.db.undo()
+            self.db.undo()
+
+    def test_removed(self):
+        self.build()
+        del self.people[self.father.handle]
+        self.assertEqual(self.build(), ["home"])
+        self.assertEqual(sorted(os.listdir(self.directory)), ["home.html"])
+
+    def test_merge(self):
+        manifest = BuildManifest(self.directory, "options")
+        manifest.merge({"/Place/a": (["a.html"], {"a"}, "")})
+        manifest.merge({"/Place/a": (["a.html"], {"b"}, ""),
+                        "/Place/c": (["c.html"], None, "")})
+        self.assertEqual(manifest.new_pages,
+                         {"/Place/a": (["a.html", "a.html"], {"a", "b"}, ""),
+                          "/Place/c": (["c.html"], None, "")})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Micro-benchmark for the DB-API blob codecs.
+
+Encodes the objects of a Gramps XML file with every codec, and reports the
+size of the blobs and the decode throughput per object type.  Run from the
+root directory with:
+
+PYTHONPATH=. python3 test/codec_benchmark.py [filename.gramps]
+"""
+import gc
+import os
+import sys
+import time
+
+from gramps.cli.user import User
+from gramps.gen.db.utils import import_as_dict
+from gramps.plugins.db.dbapi.codec import CODECS, decode_blob
+
+TEST_DIR = os.path.abspath(os.path.dirname(__file__))
+EXAMPLE = os.path.join(TEST_DIR, "..", "example", "gramps", "example.gramps")
+REPEAT = 5
+
+OBJ_CLASSES = ('Person', 'Family', 'Event', 'Place', 'Repository', 'Source',
+               'Citation', 'Media', 'Note', 'Tag')
+
+
+def decode_time(blobs):
+    best = None
+    for dummy in range(REPEAT):
+        start = time.perf_counter()
+        for blob in blobs:
+            decode_blob(blob)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    filename = sys.argv[1] if len(sys.argv) > 1 else EXAMPLE
+    db = import_as_dict(filename, User(quiet=True))
+    print("%-10s %6s  %s" % ("", "count",
+                             "  ".join("%22s" % name for name in CODECS)))
+    print("%-10s %6s  %s" % ("", "",
+                             "  ".join("%10s %11s" % ("bytes", "objects/s")
+                                       for name in CODECS)))
+    gc.disable()
+    for obj_class in OBJ_CLASSES:
+        data = [db.method('get_raw_%s_data', obj_class)(handle)
+                for handle in db.method('get_%s_handles', obj_class)()]
+        if not data:
+            continue
+        columns = []
+        for codec in CODECS.values():
+            blobs = [codec.encode(obj_class, item) for item in data]
+            size = sum(len(blob) for blob in blobs)
+            rate = len(blobs) / max(decode_time(blobs), 1e-9)
+            columns.append("%10d %11.0f" % (size, rate))
+        print("%-10s %6d  %s" % (obj_class, len(data), "  ".join(columns)))
+    gc.enable()
+
+if __name__ == "__main__":
+    main()
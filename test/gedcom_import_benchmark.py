@@ -0,0 +1,133 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Benchmark for GEDCOM imports.
+
+Generates a GEDCOM file with the given number of people, and imports it
+into the SQLite backend with the dates parsed in this process, and in
+worker processes.  Run from the root directory with:
+
+PYTHONPATH=. python3 test/gedcom_import_benchmark.py [number of people] [processes]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from gramps.cli.user import User
+from gramps.gen.config import config
+from gramps.gen.db.utils import make_database
+from gramps.plugins.lib import libgedcom
+from gramps.plugins.lib.libmixin import DbMixin
+
+ARGV = list(sys.argv)
+
+GIVEN = ["John", "Mary", "William", "Elizabeth", "James", "Anna", "George",
+         "Sarah", "Thomas", "Margaret"]
+SURNAMES = ["Smith", "Jones", "Brown", "Miller", "Davis", "Garcia", "Wilson",
+            "Moore", "Taylor", "Clark"]
+PLACES = ["Akron, Summit, OH, USA", "Paris, France",
+          "Boston, Suffolk, MA, USA", "London, England", "Berlin, Germany"]
+MONTHS = "JAN FEB MAR APR MAY JUN JUL AUG SEP OCT NOV DEC".split()
+
+
+def write_gedcom(filename, count, seed=1):
+    """
+    Write a GEDCOM file with count people, in families of two parents and
+    three children.
+    """
+    rnd = random.Random(seed)
+    def date():
+        year = rnd.randint(1600, 1950)
+        kind = rnd.random()
+        if kind < 0.5:
+            return "%d %s %d" % (rnd.randint(1, 28), rnd.choice(MONTHS), year)
+        if kind < 0.7:
+            return "ABT %d" % year
+        if kind < 0.8:
+            return "BEF %s %d" % (rnd.choice(MONTHS), year)
+        if kind < 0.9:
+            return "BET %d AND %d" % (year, year + 5)
+        return "%d" % year
+    families = count // 3
+    with open(filename, "w", encoding="utf-8") as ofile:
+        ofile.write("0 HEAD\n1 SOUR BENCHMARK\n1 GEDC\n2 VERS 5.5.1\n"
+                    "2 FORM LINEAGE-LINKED\n1 CHAR UTF-8\n")
+        for index in range(count):
+            ofile.write("0 @I%d@ INDI\n1 NAME %s /%s/\n1 SEX %s\n"
+                        % (index, rnd.choice(GIVEN), rnd.choice(SURNAMES),
+                           "MF"[index % 3 == 1]))
+            for tag in ("BIRT", "DEAT"):
+                ofile.write("1 %s\n2 DATE %s\n2 PLAC %s\n"
+                            % (tag, date(), rnd.choice(PLACES)))
+            ofile.write("1 NOTE Note for person %d\n2 CONT second line\n"
+                        % index)
+            if index % 3 != 2 and index // 3 < families:
+                ofile.write("1 FAMS @F%d@\n" % (index // 3))
+            if index >= 3:
+                ofile.write("1 FAMC @F%d@\n" % ((index - 3) // 3))
+        for index in range(families):
+            ofile.write("0 @F%d@ FAM\n1 HUSB @I%d@\n1 WIFE @I%d@\n"
+                        "1 MARR\n2 DATE %s\n"
+                        % (index, 3 * index, 3 * index + 1, date()))
+            for child in range(3 * index + 3, min(3 * index + 6, count)):
+                ofile.write("1 CHIL @I%d@\n" % child)
+        ofile.write("0 TRLR\n")
+
+def import_gedcom(filename, processes):
+    db = make_database("sqlite")
+    db.load(":memory:")
+    if DbMixin not in db.__class__.__bases__:
+        db.__class__.__bases__ = (DbMixin,) + db.__class__.__bases__
+    config.set('behavior.import-processes', processes)
+    start = time.perf_counter()
+    with open(filename, "rb") as ifile:
+        stage_one = libgedcom.GedcomStageOne(ifile)
+        stage_one.parse()
+        ifile.seek(0)
+        parser = libgedcom.GedcomParser(db, ifile, filename, User(quiet=True),
+                                        stage_one, None, None)
+        parser.parse_gedcom_file(False)
+    elapsed = time.perf_counter() - start
+    count = db.get_number_of_people()
+    db.close()
+    return elapsed, count
+
+def main():
+    count = int(ARGV[1]) if len(ARGV) > 1 else 20000
+    processes = int(ARGV[2]) if len(ARGV) > 2 else os.cpu_count()
+    saved = config.get('behavior.import-processes')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, "benchmark.ged")
+        write_gedcom(filename, count)
+        size = os.path.getsize(filename) / 1e6
+        try:
+            serial, imported = import_gedcom(filename, 0)
+            parallel, _imported = import_gedcom(filename, processes)
+        finally:
+            config.set('behavior.import-processes', saved)
+    print("%7d people (%.1f MB)  serial %7.3fs  %d processes %7.3fs  "
+          "(%.0f people/s)" % (imported, size, serial, processes, parallel,
+                               imported / parallel))
+
+if __name__ == "__main__":
+    main()
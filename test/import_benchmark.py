@@ -0,0 +1,107 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Benchmark for batch imports into the SQLite backend.
+
+Imports the example Gramps XML file, and a synthetic tree, with the batch
+write buffer enabled and disabled.  Run from the root directory with:
+
+PYTHONPATH=. python3 test/import_benchmark.py [filename.gramps] [number of people]
+"""
+import os
+import sys
+import time
+
+from gramps.cli.user import User
+from gramps.gen.db import DbTxn
+from gramps.gen.db.utils import make_database
+from gramps.gen.lib import Person, Family, ChildRef, Event, EventRef
+from gramps.plugins.importer.importxml import importData
+
+TEST_DIR = os.path.abspath(os.path.dirname(__file__))
+EXAMPLE = os.path.join(TEST_DIR, "..", "example", "gramps", "example.gramps")
+
+
+def new_database(buffered):
+    db = make_database("sqlite")
+    db.load(":memory:")
+    db.set_feature("batch-write-buffer", buffered)
+    return db
+
+def import_xml(filename, buffered):
+    db = new_database(buffered)
+    start = time.perf_counter()
+    importData(db, filename, User(quiet=True))
+    elapsed = time.perf_counter() - start
+    count = db.get_number_of_people()
+    db.close()
+    return elapsed, count
+
+def import_synthetic(count, buffered):
+    db = new_database(buffered)
+    start = time.perf_counter()
+    with DbTxn("Synthetic import", db, batch=True) as trans:
+        father = None
+        for i in range(count):
+            person = Person()
+            person.set_gramps_id(db.find_next_person_gramps_id())
+            person.primary_name.first_name = "Person %d" % i
+            person.primary_name.get_primary_surname().set_surname("Smith")
+            event = Event()
+            event.set_gramps_id(db.find_next_event_gramps_id())
+            db.add_event(event, trans)
+            ref = EventRef()
+            ref.ref = event.handle
+            person.add_event_ref(ref)
+            db.add_person(person, trans)
+            if father is not None:
+                family = Family()
+                family.set_gramps_id(db.find_next_family_gramps_id())
+                family.set_father_handle(father.handle)
+                ref = ChildRef()
+                ref.ref = person.handle
+                family.add_child_ref(ref)
+                db.add_family(family, trans)
+                father.add_family_handle(family.handle)
+                person.add_parent_family_handle(family.handle)
+                db.commit_person(father, trans)
+                db.commit_person(person, trans)
+            father = person
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed, count
+
+def report(title, func, *args):
+    results = {}
+    for buffered in (False, True):
+        results[buffered] = func(*args, buffered)
+    (plain, count), (fast, _count) = results[False], results[True]
+    print("%-30s %7d people  unbuffered %7.3fs  buffered %7.3fs  (x%.2f)"
+          % (title, count, plain, fast, plain / fast))
+
+def main():
+    filename = sys.argv[1] if len(sys.argv) > 1 else EXAMPLE
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    report(os.path.basename(filename), import_xml, filename)
+    report("synthetic", import_synthetic, count)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Benchmark for the drawing of the markers of the geography views.
+
+Fills a marker layer with the given number of random markers, most of them
+around a few towns, and draws it offscreen into a cairo image at several
+zoom levels, while the map is moved as when panning.  The markers are
+drawn one by one, then grouped in clusters.  Needs OsmGpsMap and pycairo.
+Run from the root directory with:
+
+PYTHONPATH=. python3 test/marker_layer_benchmark.py [number of markers]
+"""
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+import cairo
+import gi
+gi.require_version('OsmGpsMap', '1.0')
+from gi.repository import OsmGpsMap as osmgpsmap
+
+from gramps.plugins.lib.maps import markerlayer
+from gramps.plugins.lib.maps.clusters import (world_position, world_degrees,
+                                              world_size)
+
+ARGV = list(sys.argv)
+WIDTH = 1024
+HEIGHT = 768
+FRAMES = 20
+
+
+class OffscreenMap:
+    """
+    The parts of an OsmGpsMap.Map used by the marker layer, for a map of
+    WIDTH x HEIGHT pixels.
+    """
+    def __init__(self):
+        self.props = SimpleNamespace(zoom=0, max_zoom=18)
+        self.left = self.top = 0.0
+
+    def set_center_and_zoom(self, lat, lon, zoom):
+        self.props.zoom = zoom
+        world = world_size(zoom)
+        pos_x, pos_y = world_position(lat, lon)
+        self.left = pos_x * world - WIDTH / 2
+        self.top = pos_y * world - HEIGHT / 2
+
+    def get_allocated_width(self):
+        return WIDTH
+
+    def get_allocated_height(self):
+        return HEIGHT
+
+    def convert_geographic_to_screen(self, point):
+        world = world_size(self.props.zoom)
+        pos_x, pos_y = world_position(*point.get_degrees())
+        return (int(pos_x * world - self.left),
+                int(pos_y * world - self.top))
+
+    def get_bbox(self):
+        world = world_size(self.props.zoom)
+        lat1, lon1 = world_degrees(self.left / world, self.top / world)
+        lat2, lon2 = world_degrees((self.left + WIDTH) / world,
+                                   (self.top + HEIGHT) / world)
+        return (osmgpsmap.MapPoint.new_degrees(lat1, lon1),
+                osmgpsmap.MapPoint.new_degrees(lat2, lon2))
+
+def make_layer(count):
+    """
+    Return a marker layer with random markers, and the position of the
+    first town.
+    """
+    rand = random.Random(1)
+    icon = cairo.ImageSurface(cairo.FORMAT_ARGB32, 48, 48)
+    ctx = cairo.Context(icon)
+    ctx.set_source_rgba(0.8, 0.1, 0.1, 1.0)
+    ctx.arc(24, 20, 12, 0, 6.3)
+    ctx.fill()
+    towns = [(rand.uniform(35, 60), rand.uniform(-10, 30))
+             for dummy in range(50)]
+    layer = markerlayer.MarkerLayer()
+    for index in range(count):
+        if index % 10:
+            lat, lon = rand.choice(towns)
+            point = (lat + rand.gauss(0, 0.2), lon + rand.gauss(0, 0.3))
+        else:
+            point = (rand.uniform(-60, 70), rand.uniform(-180, 180))
+        layer.add_marker(point, icon, rand.randint(1, 50))
+    return layer, towns[0]
+
+def draw_frames(layer, gpsmap, zoom, center):
+    """
+    Draw the layer once at a zoom level around a position, then for FRAMES
+    positions of the map as when panning.  Return the time of the first
+    frame and the average time of the others.
+    """
+    image = cairo.ImageSurface(cairo.FORMAT_ARGB32, WIDTH, HEIGHT)
+    ctx = cairo.Context(image)
+    times = []
+    for frame in range(FRAMES + 1):
+        gpsmap.set_center_and_zoom(center[0] + frame * 0.001,
+                                   center[1] + frame * 0.002, zoom)
+        start = time.perf_counter()
+        layer.do_draw(gpsmap, ctx)
+        times.append(time.perf_counter() - start)
+    return times[0], sum(times[1:]) / FRAMES
+
+def main():
+    count = int(ARGV[1]) if len(ARGV) > 1 else 100000
+    start = time.perf_counter()
+    layer, center = make_layer(count)
+    print("%7d markers: layer filled in %.3fs"
+          % (count, time.perf_counter() - start))
+    gpsmap = OffscreenMap()
+    for clustered in (False, True):
+        markerlayer.CLUSTER_MIN_MARKERS = count if clustered else count + 1
+        for zoom in (3, 6, 9, 12, 15):
+            first, average = draw_frames(layer, gpsmap, zoom, center)
+            print("%7d markers, %-10s zoom %2d: first frame %7.3fs, "
+                  "panning %7.3fs by frame"
+                  % (count, "clusters" if clustered else "one by one",
+                     zoom, first, average))
+
+if __name__ == "__main__":
+    main()
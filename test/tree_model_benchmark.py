@@ -0,0 +1,96 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Benchmark for the memory used by the person tree view.
+
+Imports a generated Gramps XML file with the given number of people into a
+SQLite family tree, builds the grouped person tree model, and loads all its
+groups, reporting the time and the memory used by the model at each step.
+Run from the root directory with:
+
+PYTHONPATH=. python3 test/tree_model_benchmark.py [number of people]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from gramps.cli.user import User
+from gramps.gen.db.dbconst import DBBACKEND
+from gramps.gen.db.utils import make_database
+from gramps.gui.views.treemodels import PersonTreeModel
+from gramps.plugins.importer.importxml import importData
+from xml_import_benchmark import write_gramps_xml
+
+ARGV = list(sys.argv)
+
+
+def load_groups(model):
+    """
+    Load the people of all the groups of the model, as expanding all the
+    nodes of the view does.
+    """
+    top = model.tree[None]
+    for index in range(len(top.children)):
+        model.do_iter_n_children(model.do_get_iter((index,))[1])
+
+def measure(func, *args):
+    """
+    Return the result of a function, the time it took, and the memory it
+    allocated and kept.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, size
+
+def main():
+    count = int(ARGV[1]) if len(ARGV) > 1 else 1000000
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = os.path.join(tmpdir, "source.gramps")
+        write_gramps_xml(source, count)
+        with open(os.path.join(tmpdir, DBBACKEND), "w") as backend:
+            backend.write("sqlite")
+        db = make_database("sqlite")
+        db.load(tmpdir)
+        importData(db, source, User(quiet=True))
+        try:
+            model, elapsed, size = measure(PersonTreeModel, db, None)
+            print("%7d people: top level %7.3fs %8.1f MB  (%d groups)"
+                  % (count, elapsed, size / 1e6, len(model.tree) - 1))
+            dummy, elapsed, size = measure(load_groups, model)
+            rows = len(model.tree) - 1
+            print("%7d people: all rows  %7.3fs %8.1f MB  (%d rows, "
+                  "%.0f bytes per row)"
+                  % (count, elapsed, size / 1e6, rows, size / rows))
+            model.destroy()
+        finally:
+            db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Benchmark for the Verify tool.
+
+Imports a generated GEDCOM file with the given number of people, and checks
+the rules of the Verify tool on it, with and without estimated dates.  Run
+from the root directory with:
+
+PYTHONPATH=. python3 test/verify_benchmark.py [number of people]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from gramps.cli.user import User
+from gramps.gen.db.utils import import_as_dict
+from gramps.plugins.tool.verify import VerifyFacts, find_broken_rules
+from gedcom_import_benchmark import write_gedcom
+
+ARGV = list(sys.argv)
+
+OPTIONS = {
+    'oldage': 90, 'hwdif': 30, 'cspace': 8, 'cbspan': 25, 'yngmar': 17,
+    'oldmar': 50, 'oldmom': 48, 'yngmom': 17, 'yngdad': 18, 'olddad': 65,
+    'wedder': 3, 'mxchildmom': 12, 'mxchilddad': 15, 'lngwdw': 30,
+    'oldunm': 99, 'estimate_age': 0, 'invdate': 1,
+}
+
+
+def main():
+    count = int(ARGV[1]) if len(ARGV) > 1 else 20000
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, "benchmark.ged")
+        write_gedcom(filename, count)
+        db = import_as_dict(filename, User(quiet=True))
+    for estimate in (0, 1):
+        options = dict(OPTIONS, estimate_age=estimate)
+        start = time.perf_counter()
+        VerifyFacts(db, estimate)
+        facts = time.perf_counter() - start
+        start = time.perf_counter()
+        results = list(find_broken_rules(db, options))
+        elapsed = time.perf_counter() - start
+        print("%7d people, estimate %d: facts %7.3fs  all %7.3fs  "
+              "(%d results, %.0f people/s)"
+              % (db.get_number_of_people(), estimate, facts, elapsed,
+                 len(results), db.get_number_of_people() / elapsed))
+    db.close()
+
+if __name__ == "__main__":
+    main()
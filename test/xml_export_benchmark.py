@@ -0,0 +1,81 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Benchmark for Gramps XML exports.
+
+Imports a generated Gramps XML file with the given number of people into a
+SQLite family tree, and exports it compressed at the given gzip level, with
+the objects written by this process, and by worker processes.  Run from the
+root directory with:
+
+PYTHONPATH=. python3 test/xml_export_benchmark.py [number of people] [processes] [level]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from gramps.cli.user import User
+from gramps.gen.config import config
+from gramps.gen.db.dbconst import DBBACKEND
+from gramps.gen.db.utils import make_database
+from gramps.plugins.export.exportxml import XmlWriter
+from gramps.plugins.importer.importxml import importData
+from xml_import_benchmark import write_gramps_xml
+
+ARGV = list(sys.argv)
+
+
+def export_xml(db, filename, processes, level):
+    config.set('behavior.export-processes', processes)
+    start = time.perf_counter()
+    writer = XmlWriter(db, User(quiet=True), 0)
+    writer.compresslevel = level
+    writer.write(filename)
+    return time.perf_counter() - start
+
+def main():
+    count = int(ARGV[1]) if len(ARGV) > 1 else 100000
+    processes = int(ARGV[2]) if len(ARGV) > 2 else os.cpu_count()
+    level = int(ARGV[3]) if len(ARGV) > 3 else 6
+    saved = config.get('behavior.export-processes')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = os.path.join(tmpdir, "source.gramps")
+        write_gramps_xml(source, count)
+        with open(os.path.join(tmpdir, DBBACKEND), "w") as backend:
+            backend.write("sqlite")
+        db = make_database("sqlite")
+        db.load(tmpdir)
+        importData(db, source, User(quiet=True))
+        filename = os.path.join(tmpdir, "export.gramps")
+        try:
+            serial = export_xml(db, filename, 0, level)
+            parallel = export_xml(db, filename, processes, level)
+        finally:
+            config.set('behavior.export-processes', saved)
+            db.close()
+        size = os.path.getsize(filename) / 1e6
+    print("%7d people (%.1f MB at level %d)  serial %7.3fs  "
+          "%d processes %7.3fs" % (count, size, level, serial, processes,
+                                   parallel))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Benchmark for the memory used by Gramps XML imports.
+
+Generates compressed Gramps XML files of growing sizes, and imports each of
+them into a SQLite family tree in a new process, reporting the time and the
+peak memory of the process.  Run from the root directory with:
+
+PYTHONPATH=. python3 test/xml_import_benchmark.py [number of people] ...
+"""
+import gzip
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+from gramps.cli.user import User
+from gramps.gen.db.utils import make_database
+from gramps.plugins.importer.importxml import importData
+
+ARGV = list(sys.argv)
+
+GIVEN = ["John", "Mary", "William", "Elizabeth", "James", "Anna", "George",
+         "Sarah", "Thomas", "Margaret"]
+SURNAMES = ["Smith", "Jones", "Brown", "Miller", "Davis", "Garcia", "Wilson",
+            "Moore", "Taylor", "Clark"]
+
+
+def write_gramps_xml(filename, count, seed=1):
+    """
+    Write a compressed Gramps XML file with count people, each with a birth
+    event, in families of two parents and three children.
+    """
+    rnd = random.Random(seed)
+    families = count // 3
+    with gzip.open(filename, "wt", encoding="utf-8") as ofile:
+        ofile.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                    '<database xmlns="http://gramps-project.org/xml/1.7.1/">\n'
+                    '  <header>\n'
+                    '    <created date="2026-01-01" version="5.2.0"/>\n'
+                    '  </header>\n  <events>\n')
+        for index in range(count):
+            ofile.write('    <event handle="_e%d" change="1" id="E%d">\n'
+                        '      <type>Birth</type>\n'
+                        '      <dateval val="%d-%02d-%02d"/>\n'
+                        '    </event>\n'
+                        % (index, index, rnd.randint(1600, 1950),
+                           rnd.randint(1, 12), rnd.randint(1, 28)))
+        ofile.write('  </events>\n  <people>\n')
+        for index in range(count):
+            ofile.write('    <person handle="_p%d" change="1" id="I%d">\n'
+                        '      <gender>%s</gender>\n'
+                        '      <name type="Birth Name">\n'
+                        '        <first>%s</first>\n'
+                        '        <surname>%s</surname>\n'
+                        '      </name>\n'
+                        '      <eventref hlink="_e%d" role="Primary"/>\n'
+                        % (index, index, "MF"[index % 3 == 1],
+                           rnd.choice(GIVEN), rnd.choice(SURNAMES), index))
+            if index >= 3:
+                ofile.write('      <childof hlink="_f%d"/>\n'
+                            % ((index - 3) // 3))
+            if index % 3 != 2 and index // 3 < families:
+                ofile.write('      <parentin hlink="_f%d"/>\n' % (index // 3))
+            ofile.write('    </person>\n')
+        ofile.write('  </people>\n  <families>\n')
+        for index in range(families):
+            ofile.write('    <family handle="_f%d" change="1" id="F%d">\n'
+                        '      <rel type="Married"/>\n'
+                        '      <father hlink="_p%d"/>\n'
+                        '      <mother hlink="_p%d"/>\n'
+                        % (index, index, 3 * index, 3 * index + 1))
+            for child in range(3 * index + 3, min(3 * index + 6, count)):
+                ofile.write('      <childref hlink="_p%d"/>\n' % child)
+            ofile.write('    </family>\n')
+        ofile.write('  </families>\n</database>\n')
+
+def import_xml(filename, directory, queue):
+    db = make_database("sqlite")
+    db.load(directory)
+    start = time.perf_counter()
+    importData(db, filename, User(quiet=True))
+    elapsed = time.perf_counter() - start
+    count = db.get_number_of_people()
+    db.close()
+    # ru_maxrss is in kilobytes on Linux
+    queue.put((elapsed, count,
+               resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+def main():
+    counts = [int(arg) for arg in ARGV[1:]] or [10000, 40000, 160000]
+    context = multiprocessing.get_context()
+    for count in counts:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "benchmark.gramps")
+            write_gramps_xml(filename, count)
+            size = os.path.getsize(filename) / 1e6
+            queue = context.Queue()
+            process = context.Process(target=import_xml,
+                                      args=(filename, tmpdir, queue))
+            process.start()
+            elapsed, imported, peak = queue.get()
+            process.join()
+        print("%7d people (%5.1f MB compressed)  %8.3fs  peak %7.1f MB"
+              % (imported, size, elapsed, peak))
+
+if __name__ == "__main__":
+    main()